@@ -1,5 +1,6 @@
 from flask import Blueprint, request, jsonify
 from app.service.admin_test import AdminTestService
+from app.service.http_transport import parse_concurrency
 
 admin_test_bp = Blueprint('admin_test', __name__)
 
@@ -37,11 +38,16 @@ def test_add_package():
                 "message": "缺少test_cases参数"
             }), 400
         
-        test_service = AdminTestService()
+        try:
+            concurrency = parse_concurrency(data.get('concurrency'))
+        except ValueError as e:
+            return jsonify({"success": False, "message": str(e)}), 400
+        test_service = AdminTestService(concurrency)
         results = test_service.run_add_package_tests(data['test_cases'])
         
         return jsonify({
             "success": True,
+            "latency_stats": test_service.http.latency_stats(),
             "test_results": results,
             "summary": test_service.generate_summary(results)
         })
@@ -70,14 +76,19 @@ def run_all_package_tests():
     
     请求体格式（可选）：
     {
-        "stop_on_failure": false  // 是否在失败时停止，默认false
+        "stop_on_failure": false,  // 是否在失败时停止，默认false；为true时按顺序执行
+        "concurrency": 8  // 并发执行的用例数，默认8
     }
     """
     try:
         data = request.get_json() or {}
         stop_on_failure = data.get('stop_on_failure', False)
         
-        test_service = AdminTestService()
+        try:
+            concurrency = parse_concurrency(data.get('concurrency'))
+        except ValueError as e:
+            return jsonify({"success": False, "message": str(e)}), 400
+        test_service = AdminTestService(concurrency)
         
         # 获取所有预定义的package测试用例
         package_cases = test_service.get_package_predefined_cases()
@@ -90,6 +101,7 @@ def run_all_package_tests():
         
         return jsonify({
             "success": True,
+            "latency_stats": test_service.http.latency_stats(),
             "test_module": "add_package",
             "total_cases": len(package_cases),
             "test_results": results["test_results"],
@@ -136,11 +148,16 @@ def test_add_plant():
                 "message": "缺少test_cases参数"
             }), 400
         
-        test_service = AdminTestService()
+        try:
+            concurrency = parse_concurrency(data.get('concurrency'))
+        except ValueError as e:
+            return jsonify({"success": False, "message": str(e)}), 400
+        test_service = AdminTestService(concurrency)
         results = test_service.run_add_plant_tests(data['test_cases'])
         
         return jsonify({
             "success": True,
+            "latency_stats": test_service.http.latency_stats(),
             "test_results": results,
             "summary": test_service.generate_summary(results)
         })
@@ -169,14 +186,19 @@ def run_all_plant_tests():
     
     请求体格式（可选）：
     {
-        "stop_on_failure": false  // 是否在失败时停止，默认false
+        "stop_on_failure": false,  // 是否在失败时停止，默认false；为true时按顺序执行
+        "concurrency": 8  // 并发执行的用例数，默认8
     }
     """
     try:
         data = request.get_json() or {}
         stop_on_failure = data.get('stop_on_failure', False)
         
-        test_service = AdminTestService()
+        try:
+            concurrency = parse_concurrency(data.get('concurrency'))
+        except ValueError as e:
+            return jsonify({"success": False, "message": str(e)}), 400
+        test_service = AdminTestService(concurrency)
         
         # 获取所有预定义的plant测试用例
         plant_cases = test_service.get_plant_predefined_cases()
@@ -189,6 +211,7 @@ def run_all_plant_tests():
         
         return jsonify({
             "success": True,
+            "latency_stats": test_service.http.latency_stats(),
             "test_module": "add_plant",
             "total_cases": len(plant_cases),
             "test_results": results["test_results"],
@@ -233,11 +256,16 @@ def test_city_input():
                 "message": "缺少test_cases参数"
             }), 400
         
-        test_service = AdminTestService()
+        try:
+            concurrency = parse_concurrency(data.get('concurrency'))
+        except ValueError as e:
+            return jsonify({"success": False, "message": str(e)}), 400
+        test_service = AdminTestService(concurrency)
         results = test_service.run_city_input_tests(data['test_cases'])
         
         return jsonify({
             "success": True,
+            "latency_stats": test_service.http.latency_stats(),
             "test_results": results,
             "summary": test_service.generate_summary(results)
         })
@@ -276,7 +304,8 @@ def run_all_city_tests():
     请求体格式：
     {
         "target_api": "http://47.120.78.249:8000/admin/weather/city_input",
-        "stop_on_failure": false
+        "stop_on_failure": false,
+        "concurrency": 8
     }
     """
     try:
@@ -284,11 +313,16 @@ def run_all_city_tests():
         target_api = data.get('target_api', 'http://47.120.78.249:8000/admin/weather/city_input')
         stop_on_failure = data.get('stop_on_failure', False)
         
-        test_service = AdminTestService()
+        try:
+            concurrency = parse_concurrency(data.get('concurrency'))
+        except ValueError as e:
+            return jsonify({"success": False, "message": str(e)}), 400
+        test_service = AdminTestService(concurrency)
         results = test_service.run_city_tests_batch(target_api, stop_on_failure)
         
         return jsonify({
             "success": True,
+            "latency_stats": test_service.http.latency_stats(),
             "test_results": results,
             "summary": test_service.generate_module_summary(results, "city_input")
         })
@@ -334,11 +368,16 @@ def test_disease_input():
                 "message": "缺少test_cases参数"
             }), 400
         
-        test_service = AdminTestService()
+        try:
+            concurrency = parse_concurrency(data.get('concurrency'))
+        except ValueError as e:
+            return jsonify({"success": False, "message": str(e)}), 400
+        test_service = AdminTestService(concurrency)
         results = test_service.run_disease_input_tests(data['test_cases'])
         
         return jsonify({
             "success": True,
+            "latency_stats": test_service.http.latency_stats(),
             "test_results": results,
             "summary": test_service.generate_module_summary(results, "add_disease")
         })
@@ -377,14 +416,19 @@ def run_all_disease_tests():
     
     请求体格式（可选）：
     {
-        "stop_on_failure": false
+        "stop_on_failure": false,
+        "concurrency": 8
     }
     """
     try:
         data = request.get_json() or {}
         stop_on_failure = data.get('stop_on_failure', False)
         
-        test_service = AdminTestService()
+        try:
+            concurrency = parse_concurrency(data.get('concurrency'))
+        except ValueError as e:
+            return jsonify({"success": False, "message": str(e)}), 400
+        test_service = AdminTestService(concurrency)
         predefined_cases = test_service.get_disease_predefined_cases()
         
         batch_result = test_service.run_disease_tests_batch(
@@ -394,6 +438,7 @@ def run_all_disease_tests():
         
         return jsonify({
             "success": True,
+            "latency_stats": test_service.http.latency_stats(),
             "batch_result": batch_result,
             "summary": test_service.generate_module_summary(
                 batch_result["test_results"], 
@@ -1,7 +1,7 @@
 from flask import Blueprint, request, jsonify
 from typing import List, Dict, Any
-from app.service.detect_controller_test import DetectTestService
-import asyncio
+from app.service.detect_controller_test import get_detect_test_service
+from app.service.async_bridge import run_sync
 
 detect_test_bp = Blueprint('detect_test', __name__)
 
@@ -11,7 +11,7 @@ def get_function_source():
     获取 validate_plot_access 函数的源代码
     """
     try:
-        test_service = DetectTestService()
+        test_service = get_detect_test_service()
         source_info = test_service.get_function_source_code()
         
         return jsonify({
@@ -41,11 +41,11 @@ def test_validate_plot_access():
                 "error": "Missing test_case in request"
             }), 400
         
-        # 创建服务实例
-        service = DetectTestService()
+        # 共享的服务实例
+        service = get_detect_test_service()
         
         # 执行单个测试
-        result = asyncio.run(service._execute_validate_plot_access_test(test_case))
+        result = run_sync(service._execute_validate_plot_access_test(test_case))
         
         # 返回统一格式
         return jsonify({
@@ -78,7 +78,7 @@ def get_validate_plot_access_predefined_cases():
     获取validate_plot_access函数的预定义测试用例
     """
     try:
-        test_service = DetectTestService()
+        test_service = get_detect_test_service()
         cases = test_service.get_validate_plot_access_predefined_cases()
         
         return jsonify({
@@ -100,8 +100,8 @@ def run_validate_plot_access_all_tests():
     运行所有validate_plot_access测试用例
     """
     try:
-        service = DetectTestService()
-        result = asyncio.run(service.run_validate_plot_access_tests_batch())
+        service = get_detect_test_service()
+        result = run_sync(service.run_validate_plot_access_tests_batch())
         return jsonify(result)
     except Exception as e:
         return jsonify({
@@ -125,18 +125,11 @@ def get_validate_plot_access_report():
         include_details = data.get('include_details', False)
         include_source_code = data.get('include_source_code', True)
         
-        test_service = DetectTestService()
-        
-        # 使用 asyncio 运行异步测试
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            results = loop.run_until_complete(
-                test_service.run_validate_plot_access_tests_batch()
-            )
-            report = test_service.generate_test_report(results)
-        finally:
-            loop.close()
+        test_service = get_detect_test_service()
+        
+        # 在共享的后台事件循环中运行异步测试
+        results = run_sync(test_service.run_validate_plot_access_tests_batch())
+        report = test_service.generate_test_report(results)
         
         response_data = {
             "success": True,
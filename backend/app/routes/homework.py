@@ -1,7 +1,18 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+import json
 import os
 from app.static.homework_data import HOMEWORK_CODES, SUPPORTED_FUNCTIONS, SUPPORTED_TEST_METHODS
-from app.service.homework import generate_test_cases
+from app.service.homework import generate_test_cases, coverage_by_method
+from app.service.case_generator import get_test_suite, available_methods
+from app.service.sandbox import DEFAULT_CASE_TIMEOUT
+from app.service.oracle import run_exhaustive, SUPPORTED_ORACLES, DEFAULT_BLOCK_TIMEOUT
+from app.service.mutation import run_mutation
+from app.service.differential import run_differential, SUPPORTED_DIFFERENTIAL, DOMAINS
+from app.service.benchmark import run_benchmark, DEFAULT_REPEAT, DEFAULT_WARMUP
+from app.service.fuzz import FUZZ_METHOD
+from app.service.batch_grading import iter_grade_batch, submissions_from_json, submissions_from_zip
+from app.service.jobs import get_job_manager
+from app.routes.jobs import wants_background, job_accepted
 homework_bp = Blueprint('homework', __name__)
 
 @homework_bp.route('/homework/code', methods=['GET'])
@@ -58,9 +69,20 @@ def run_test_cases():
     {
         "code": "要测试的代码字符串",
         "function_name": "函数名称",
-        "test_method": "测试方法名称"
+        "test_method": "测试方法名称",
+        "case_timeout": 单个用例的执行时间上限（秒，可选）,
+        "coverage": 是否统计分支覆盖，默认 true（可选）,
+        "max_examples": test_method 为 fuzz 时生成的输入数（可选）,
+        "seed": test_method 为 fuzz 时的随机种子（可选）,
+        "async": true 时提交为后台任务，立即返回任务ID（可选）
     }
     
+    test_method 为 fuzz 时进行模糊测试：随机生成输入与参考实现比较，先重放 temp/fuzz_corpus 中的历史反例，
+    test_results 为每类失败的最小反例，结果中增加 fuzz（seed、重放数、每秒用例数等）。
+    
+    async 为 true 时返回 202 和 {"job_id", "status_url", "events_url", "cancel_url"}，
+    进度通过 /jobs/<job_id>/events 推送；否则返回格式：
+    
     返回格式：
     {
         "success": true/false,
@@ -82,9 +104,18 @@ def run_test_cases():
                 "Expected": 期望结果,
                 "Actual": 实际结果,
                 "Passed": true/false,
-                "Duration": "执行时间"
+                "Duration": "执行时间",
+                "DurationNs": 执行时间（纳秒）,
+                "Branches": ["覆盖的分支ID，如 5:T"]
             }
-        ]
+        ],
+        "coverage": {
+            "backend": "sys.monitoring 或 sys.settrace",
+            "summary": {"total_branches", "covered_branches", "branch_rate", "total_lines", "covered_lines", "line_rate"},
+            "minimal_cases": [覆盖全部已覆盖分支的最小用例ID集合],
+            "missing_branches": [{"id", "line", "kind", "outcome", "source"}],
+            "missing_lines": [未执行的行号]
+        }
     }
     """
     try:
@@ -130,15 +161,32 @@ def run_test_cases():
                 "available_functions": SUPPORTED_FUNCTIONS
             }), 400
         
-        if test_method not in SUPPORTED_TEST_METHODS:
+        if test_method not in SUPPORTED_TEST_METHODS and test_method != FUZZ_METHOD:
             return jsonify({
                 "success": False,
                 "message": f"不支持的测试方法：{test_method}",
                 "available_methods": SUPPORTED_TEST_METHODS
             }), 400
         
-        # 调用测试用例生成函数
-        result = generate_test_cases(code, function_name, test_method)
+        # 调用测试用例生成函数，用例在沙箱进程中执行
+        case_timeout = float(data.get('case_timeout', DEFAULT_CASE_TIMEOUT))
+        coverage = bool(data.get('coverage', True))
+        fuzz_options = {"max_examples": data.get('max_examples'), "seed": data.get('seed')}
+        
+        if wants_background(data.get('async')):
+            suite = get_test_suite(function_name, test_method)
+            cases = suite["cases"] if suite else None
+            job = get_job_manager().submit(
+                'homework',
+                lambda job: generate_test_cases(code, function_name, test_method, case_timeout, job.report,
+                                                coverage=coverage, fuzz_options=fuzz_options),
+                suite_path=request.path,
+                total=len(cases) if cases is not None else None
+            )
+            return job_accepted(job)
+        
+        result = generate_test_cases(code, function_name, test_method, case_timeout, coverage=coverage,
+                                     fuzz_options=fuzz_options)
         
         # 根据结果返回相应的HTTP状态码
         if result["success"]:
@@ -151,3 +199,469 @@ def run_test_cases():
             "success": False,
             "message": f"服务器内部错误：{str(e)}"
         }), 500
+
+
+@homework_bp.route('/homework/coverage', methods=['POST'])
+def compare_method_coverage():
+    """
+    比较各测试方法的用例集对代码的分支覆盖
+    
+    请求体格式（JSON）：
+    {
+        "function_name": "函数名称",
+        "code": "被测代码，不提供时使用题目的参考实现（可选）",
+        "test_methods": ["测试方法", ...]（可选，默认为题目支持的全部方法）,
+        "case_timeout": 单个用例的执行时间上限（秒，可选）
+    }
+    
+    返回格式：
+    {
+        "success": true/false,
+        "function_name": "函数名称",
+        "total_branches": 分支总数,
+        "methods": {
+            "测试方法": {"test_name", "total_cases", "pass_rate", "coverage", "minimal_cases", "missing_branches"}
+        },
+        "uncovered_by_all": [所有测试方法都没有覆盖到的分支]
+    }
+    """
+    try:
+        data = request.get_json() or {}
+        function_name = data.get('function_name')
+        
+        if function_name not in SUPPORTED_FUNCTIONS:
+            return jsonify({
+                "success": False,
+                "message": f"不支持的函数名称：{function_name}",
+                "available_functions": SUPPORTED_FUNCTIONS
+            }), 400
+        
+        code = data.get('code') or HOMEWORK_CODES.get(function_name)
+        if not code:
+            return jsonify({
+                "success": False,
+                "message": "缺少必需参数：code"
+            }), 400
+        
+        test_methods = data.get('test_methods')
+        if test_methods is not None and not isinstance(test_methods, list):
+            return jsonify({
+                "success": False,
+                "message": "test_methods 必须是数组"
+            }), 400
+        
+        case_timeout = float(data.get('case_timeout', DEFAULT_CASE_TIMEOUT))
+        result = coverage_by_method(code, function_name, test_methods, case_timeout)
+        return jsonify(result), 200 if result["success"] else 400
+        
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "message": f"服务器内部错误：{str(e)}"
+        }), 500
+
+
+@homework_bp.route('/homework/mutation', methods=['POST'])
+def run_mutation_test():
+    """
+    变异测试：比较各测试方法用例集杀死变异体的能力
+    
+    请求体格式（JSON）：
+    {
+        "function_name": "函数名称",
+        "code": "被测代码，不提供时使用题目的参考实现（可选）",
+        "test_methods": ["测试方法", ...]（可选，默认为题目支持的全部方法）,
+        "case_timeout": 单个用例的执行时间上限（秒，可选）,
+        "async": true 时提交为后台任务，进度通过 /jobs/<job_id>/events 推送（可选）
+    }
+    
+    返回格式：
+    {
+        "success": true/false,
+        "function_name": "函数名称",
+        "total_mutants": 变异体总数,
+        "operators": {"ROR": {"name", "count"}, ...},
+        "mutants": [{"id", "operator", "line", "col", "description"}],
+        "methods": {
+            "测试方法": {
+                "test_name", "total_cases",
+                "summary": {"killed", "timeout", "survived", "not_covered", "invalid", "valid_mutants", "mutation_score"},
+                "score": 变异得分,
+                "survivors": [存活或未覆盖的变异体],
+                "killed_by": {变异体ID: 杀死它的用例ID}
+            }
+        },
+        "ranking": [按变异得分从高到低排列的测试方法]
+    }
+    """
+    try:
+        data = request.get_json() or {}
+        function_name = data.get('function_name')
+        
+        if function_name not in SUPPORTED_FUNCTIONS:
+            return jsonify({
+                "success": False,
+                "message": f"不支持的函数名称：{function_name}",
+                "available_functions": SUPPORTED_FUNCTIONS
+            }), 400
+        
+        code = data.get('code') or HOMEWORK_CODES.get(function_name)
+        if not code:
+            return jsonify({
+                "success": False,
+                "message": "缺少必需参数：code"
+            }), 400
+        
+        test_methods = data.get('test_methods')
+        if test_methods is not None and not isinstance(test_methods, list):
+            return jsonify({
+                "success": False,
+                "message": "test_methods 必须是数组"
+            }), 400
+        
+        case_timeout = float(data.get('case_timeout', DEFAULT_CASE_TIMEOUT))
+        
+        if wants_background(data.get('async')):
+            job = get_job_manager().submit(
+                'homework_mutation',
+                lambda job: run_mutation(code, function_name, test_methods, case_timeout, job.step)
+            )
+            return job_accepted(job)
+        
+        result = run_mutation(code, function_name, test_methods, case_timeout)
+        return jsonify(result), 200 if result["success"] else 400
+        
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "message": f"服务器内部错误：{str(e)}"
+        }), 500
+
+
+@homework_bp.route('/homework/benchmark', methods=['POST'])
+def run_benchmark_test():
+    """
+    微基准测试：每个用例预热后重复计时，并与参考实现在同一沙箱进程中的耗时比较
+    
+    请求体格式（JSON）：
+    {
+        "code": "要测试的代码字符串",
+        "function_name": "函数名称",
+        "test_method": "测试方法名称",
+        "repeat": 计时轮数（可选，默认 7）,
+        "warmup": 预热调用次数（可选，默认 10）,
+        "case_timeout": 提交代码和参考实现各自对单个用例的计时时间上限（秒，可选）,
+        "async": true 时提交为后台任务，进度通过 /jobs/<job_id>/events 推送（可选）
+    }
+    
+    返回格式：
+    {
+        "success": true/false,
+        "function_name", "test_method", "test_name", "summary",
+        "benchmark": {
+            "repeat", "warmup", "timed_cases", "total_median_ns", "reference_total_median_ns",
+            "geomean_ratio": 各用例耗时比值的几何平均, "max_ratio",
+            "slow_ratio": 判定过慢的比值阈值, "slow_cases": [过慢的用例ID], "slow": 是否存在过慢的用例
+        },
+        "test_results": [
+            {"ID", "Input", "Expected", "Actual", "Passed", "MinNs", "MedianNs", "Number": 每轮调用次数,
+             "ReferenceMinNs", "ReferenceMedianNs", "Ratio", "Slow", "TimingError"}
+        ]
+    }
+    """
+    try:
+        data = request.get_json() or {}
+        code = data.get('code')
+        function_name = data.get('function_name')
+        test_method = data.get('test_method')
+        
+        if not code or not function_name or not test_method:
+            return jsonify({
+                "success": False,
+                "message": "缺少必需参数：code, function_name, test_method"
+            }), 400
+        
+        repeat = int(data.get('repeat', DEFAULT_REPEAT))
+        warmup = int(data.get('warmup', DEFAULT_WARMUP))
+        case_timeout = float(data.get('case_timeout', DEFAULT_CASE_TIMEOUT))
+        
+        if wants_background(data.get('async')):
+            suite = get_test_suite(function_name, test_method)
+            job = get_job_manager().submit(
+                'homework_benchmark',
+                lambda job: run_benchmark(code, function_name, test_method, repeat, warmup, case_timeout, job.report),
+                total=len(suite["cases"]) if suite else None
+            )
+            return job_accepted(job)
+        
+        result = run_benchmark(code, function_name, test_method, repeat, warmup, case_timeout)
+        return jsonify(result), 200 if result["success"] else 400
+        
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "message": f"服务器内部错误：{str(e)}"
+        }), 500
+
+
+@homework_bp.route('/homework/grade_batch', methods=['POST'])
+def grade_batch():
+    """
+    批量评测整个班级的提交
+    
+    两种提交方式：
+    1. multipart/form-data：file 为 zip 压缩包，包中每个 .py 文件是一份提交，
+       学生名取第一级目录名（根目录下的文件取文件名），题目按文件名、function_name 参数或代码中的函数判断；
+       表单参数 function_name、test_methods（逗号分隔）、case_timeout、async 均可选
+    2. JSON：{"submissions": [{"student", "code", "function_name", "test_methods"}], 
+       "function_name", "test_methods", "case_timeout", "async"}，也可以直接传提交数组
+    
+    test_methods 默认为题目支持的全部测试方法；规范化后相同的代码只评测一次。
+    
+    返回 application/x-ndjson 流，每行一个 JSON：
+    - {"type": "student", "index", "student", "function_name", "hash", "duplicate_of", "success",
+       "score", "total_cases", "passed_cases", "methods": {测试方法: {"pass_rate", "failed_cases", ...}}}
+      每评完一份提交输出一行（完成顺序）
+    - {"type": "summary", "total_submissions", "unique_submissions", "average_score", "functions",
+       "duplicate_groups", ...} 最后一行为班级汇总
+    
+    async 为 true 时返回 202 和任务ID，学生结果通过 /jobs/<job_id>/events 推送，任务结果为班级汇总和全部学生结果
+    """
+    try:
+        if 'file' in request.files:
+            options = request.form
+            test_methods = [m.strip() for m in options.get('test_methods', '').split(',') if m.strip()] or None
+            submissions = submissions_from_zip(request.files['file'].read(), options.get('function_name'))
+        else:
+            data = request.get_json(silent=True)
+            if data is None:
+                return jsonify({
+                    "success": False,
+                    "message": "需要上传 zip 文件（file）或 JSON 格式的提交数组"
+                }), 400
+            options = data if isinstance(data, dict) else {}
+            items = data.get('submissions') if isinstance(data, dict) else data
+            test_methods = options.get('test_methods')
+            if test_methods is not None and not isinstance(test_methods, list):
+                return jsonify({
+                    "success": False,
+                    "message": "test_methods 必须是数组"
+                }), 400
+            submissions = submissions_from_json(items, options.get('function_name'))
+        
+        if not submissions:
+            return jsonify({
+                "success": False,
+                "message": "没有可评测的提交"
+            }), 400
+        
+        case_timeout = float(options.get('case_timeout', DEFAULT_CASE_TIMEOUT))
+        batch = iter_grade_batch(submissions, test_methods, case_timeout)
+        
+        if wants_background(options.get('async')):
+            def run_batch(job):
+                students = []
+                for kind, result in batch:
+                    if kind == "student":
+                        students.append(result)
+                        job.report(result)
+                    else:
+                        summary = result
+                students.sort(key=lambda student: student["index"])
+                return {"success": True, "summary": summary, "students": students}
+            
+            job = get_job_manager().submit('homework_batch', run_batch, total=len(submissions))
+            return job_accepted(job)
+        
+        def generate():
+            for kind, result in batch:
+                yield json.dumps({"type": kind, **result}, ensure_ascii=False, default=str) + "\n"
+        
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+        
+    except ValueError as e:
+        return jsonify({
+            "success": False,
+            "message": str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "message": f"服务器内部错误：{str(e)}"
+        }), 500
+
+
+@homework_bp.route('/homework/exhaustive', methods=['POST'])
+def run_exhaustive_test():
+    """
+    在题目的整个有界输入域上穷举比较提交代码与参考实现
+    
+    请求体格式（JSON）：
+    {
+        "code": "要测试的代码字符串",
+        "function_name": "函数名称",
+        "block_timeout": 每块输入点的执行时间上限（秒，可选）,
+        "async": true 时提交为后台任务，进度通过 /jobs/<job_id>/events 推送（可选）
+    }
+    
+    返回格式：
+    {
+        "success": true/false,
+        "function_name": "函数名称",
+        "domain": {"size": 输入点总数, "params": {参数名: {"min", "max", "points"}}},
+        "summary": {"total_points", "passed_points", "failed_points", "pass_rate", "duration", "points_per_second"},
+        "mismatches": [
+            {
+                "expected": "期望输出类别",
+                "actual": "实际输出类别",
+                "count": 不一致的点数,
+                "regions": [{"count", "dense": 区间内是否全部不一致, "ranges": {参数名: [最小值, 最大值]}}],
+                "samples": [{"Input", "Expected", "Actual"}]
+            }
+        ]
+    }
+    """
+    try:
+        data = request.get_json()
+        
+        if not data:
+            return jsonify({
+                "success": False,
+                "message": "请求体不能为空，需要JSON格式数据"
+            }), 400
+        
+        code = data.get('code')
+        function_name = data.get('function_name')
+        
+        if not code:
+            return jsonify({
+                "success": False,
+                "message": "缺少必需参数：code"
+            }), 400
+        
+        if function_name not in SUPPORTED_ORACLES:
+            return jsonify({
+                "success": False,
+                "message": f"不支持穷举测试的函数：{function_name}",
+                "available_functions": SUPPORTED_ORACLES
+            }), 400
+        
+        block_timeout = float(data.get('block_timeout', DEFAULT_BLOCK_TIMEOUT))
+        
+        if wants_background(data.get('async')):
+            job = get_job_manager().submit(
+                'homework_exhaustive',
+                lambda job: run_exhaustive(code, function_name, block_timeout, job.step)
+            )
+            return job_accepted(job)
+        
+        result = run_exhaustive(code, function_name, block_timeout)
+        return jsonify(result), 200 if result["success"] else 400
+        
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "message": f"服务器内部错误：{str(e)}"
+        }), 500
+
+
+@homework_bp.route('/homework/differential', methods=['POST'])
+def run_differential_test():
+    """
+    差分测试：比较 course_exercise 中发给学生的实现、HOMEWORK_CODES 参考代码和 NumPy 向量化实现的输出
+    
+    请求体格式（JSON）：
+    {
+        "function_name": "函数名称",
+        "domain": "generated（各测试方法的用例，默认）或 exhaustive（穷举输入域）",
+        "block_timeout": 每个实现执行每块输入的时间上限（秒，可选）,
+        "async": true 时提交为后台任务，进度通过 /jobs/<job_id>/events 推送（可选）
+    }
+    
+    返回格式：
+    {
+        "success": true/false,
+        "function_name", "domain", "domain_info",
+        "baseline": "homework_data",
+        "implementations": [{"name", "source"}],
+        "summary": {"total_points", "checked_points", "divergent_points", "agreement_rate", "duration", "points_per_second"},
+        "by_implementation": {实现名: 与基准不一致的点数},
+        "divergences": [{"outputs": {实现名: 输出类别}, "count", "samples": [{"Input", "Outputs": {实现名: 输出}}]}],
+        "aborted": [未完成比较的原因]
+    }
+    """
+    try:
+        data = request.get_json() or {}
+        function_name = data.get('function_name')
+        domain = data.get('domain', 'generated')
+        
+        if function_name not in SUPPORTED_DIFFERENTIAL:
+            return jsonify({
+                "success": False,
+                "message": f"不支持差分测试的函数：{function_name}",
+                "available_functions": SUPPORTED_DIFFERENTIAL
+            }), 400
+        
+        if domain not in DOMAINS:
+            return jsonify({
+                "success": False,
+                "message": f"不支持的输入域：{domain}，可选 {', '.join(DOMAINS)}"
+            }), 400
+        
+        block_timeout = float(data.get('block_timeout', DEFAULT_BLOCK_TIMEOUT))
+        
+        if wants_background(data.get('async')):
+            job = get_job_manager().submit(
+                'homework_differential',
+                lambda job: run_differential(function_name, domain, block_timeout, job.step)
+            )
+            return job_accepted(job)
+        
+        result = run_differential(function_name, domain, block_timeout)
+        return jsonify(result), 200 if result["success"] else 400
+        
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "message": f"服务器内部错误：{str(e)}"
+        }), 500
+
+
+@homework_bp.route('/homework/cases', methods=['GET'])
+def get_test_suite_cases():
+    """
+    查看题目某个测试方法的用例（有生成规格的题目按规格生成）
+    
+    查询参数：
+    - function_name: 函数名称
+    - test_method: 测试方法（可选，不提供时返回支持的测试方法列表）
+    """
+    function_name = request.args.get('function_name')
+    test_method = request.args.get('test_method')
+    
+    if function_name not in SUPPORTED_FUNCTIONS:
+        return jsonify({
+            "success": False,
+            "message": f"不支持的函数名称：{function_name}",
+            "available_functions": SUPPORTED_FUNCTIONS
+        }), 400
+    
+    if not test_method:
+        return jsonify({"success": True, "available_methods": available_methods(function_name)})
+    
+    try:
+        suite = get_test_suite(function_name, test_method)
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "message": f"生成测试用例失败：{str(e)}"
+        }), 500
+    
+    if suite is None:
+        return jsonify({
+            "success": False,
+            "message": f"函数{function_name}不支持的测试方法：{test_method}",
+            "available_methods": available_methods(function_name)
+        }), 400
+    
+    return jsonify({"success": True, "function_name": function_name, "test_method": test_method, **suite})
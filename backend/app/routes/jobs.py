@@ -0,0 +1,97 @@
+import json
+
+from flask import Blueprint, Response, request, jsonify, url_for, stream_with_context
+from app.service.jobs import get_job_manager, Job
+
+jobs_bp = Blueprint('jobs', __name__)
+
+
+def wants_background(value) -> bool:
+    """解析请求中的 async 参数，JSON 中的布尔值或表单中的 1/true 均可"""
+    if isinstance(value, str):
+        return value.strip().lower() in ('1', 'true', 'yes')
+    return bool(value)
+
+
+def job_accepted(job: Job):
+    """提交后台任务后的统一响应"""
+    return jsonify({
+        "success": True,
+        "message": "测试任务已提交",
+        "job_id": job.id,
+        "status": job.status,
+        "status_url": url_for('jobs.get_job', job_id=job.id),
+        "events_url": url_for('jobs.stream_job_events', job_id=job.id),
+        "cancel_url": url_for('jobs.cancel_job', job_id=job.id)
+    }), 202
+
+
+def _job_not_found(job_id: str):
+    return jsonify({"success": False, "message": f"任务不存在: {job_id}"}), 404
+
+
+@jobs_bp.route('/jobs', methods=['GET'])
+def list_jobs():
+    """
+    任务列表（不含用例结果）
+
+    查询参数: status 按状态过滤 queued/running/succeeded/failed/cancelled（可选）
+    """
+    jobs = get_job_manager().list_jobs(request.args.get('status'))
+    return jsonify({"success": True, "data": [job.to_dict(include_results=False) for job in jobs]})
+
+
+@jobs_bp.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """任务状态、进度、已完成用例的结果，任务成功结束后包含最终结果"""
+    job = get_job_manager().get(job_id)
+    if job is None:
+        return _job_not_found(job_id)
+    return jsonify({"success": True, "data": job.to_dict()})
+
+
+@jobs_bp.route('/jobs/<job_id>/events', methods=['GET'])
+def stream_job_events(job_id):
+    """
+    以 Server-Sent Events 推送任务进度
+
+    事件类型:
+    - status: 状态变化 {"status", "error"}
+    - progress: 一个用例完成 {"done", "total", "item"}
+    - step: 用例内部步骤（端到端测试）
+    - result: 最终结果，任务成功结束时发送
+
+    断线重连时浏览器会带上 Last-Event-ID 请求头，从该事件之后继续推送
+    """
+    job = get_job_manager().get(job_id)
+    if job is None:
+        return _job_not_found(job_id)
+
+    last_event_id = request.headers.get('Last-Event-ID', request.args.get('last_event_id', -1))
+    try:
+        after = int(last_event_id)
+    except (TypeError, ValueError):
+        after = -1
+
+    def generate():
+        for event in job.events(after):
+            if event is None:
+                yield ": keep-alive\n\n"
+                continue
+            data = json.dumps(event["data"], ensure_ascii=False, default=str)
+            yield f"id: {event['id']}\nevent: {event['event']}\ndata: {data}\n\n"
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@jobs_bp.route('/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    """取消任务，排队中的任务立即取消，执行中的任务在当前用例结束后中止"""
+    job = get_job_manager().cancel(job_id)
+    if job is None:
+        return _job_not_found(job_id)
+    return jsonify({"success": True, "message": "已请求取消任务", "data": job.to_dict(include_results=False)})
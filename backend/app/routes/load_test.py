@@ -0,0 +1,77 @@
+from flask import Blueprint, request, jsonify
+from app.service.load_test import LoadTestService, SUPPORTED_SCENARIOS, MAX_DURATION, DEFAULT_BASE_URL
+
+load_test_bp = Blueprint('load_test', __name__)
+
+
+@load_test_bp.route('/loadtest/run', methods=['POST'])
+def run_load_test():
+    """
+    按预定义用例对 PGuard 接口进行压测
+
+    请求体格式：
+    {
+        "base_url": "http://localhost:8000",  // 可选，默认 http://localhost:8000
+        "scenarios": ["add_plot", "plot_detail", "detect"],  // 可选 add_package / add_plot / plot_detail / detect
+        "mode": "rps",  // rps：按固定速率发送；concurrency：固定并发数，默认 concurrency
+        "rps": 50,  // rps 模式下的目标每秒请求数
+        "concurrency": 10,  // concurrency 模式下的并发数
+        "duration": 30,  // 持续时间（秒），上限 300
+        "auth_token": "",  // 可选，不填时使用测试账号登录
+        "username": "",
+        "password": ""
+    }
+    """
+    try:
+        data = request.get_json() or {}
+        scenarios = data.get('scenarios') or SUPPORTED_SCENARIOS
+        if not isinstance(scenarios, list):
+            return jsonify({
+                "success": False,
+                "message": "scenarios必须是列表"
+            }), 400
+
+        mode = data.get('mode', 'concurrency')
+        try:
+            rps = float(data.get('rps', 10))
+            concurrency = int(data.get('concurrency', 10))
+            duration = float(data.get('duration', 30))
+        except (TypeError, ValueError):
+            return jsonify({
+                "success": False,
+                "message": "rps、concurrency、duration必须是数字"
+            }), 400
+        if rps <= 0 or concurrency <= 0 or duration <= 0:
+            return jsonify({
+                "success": False,
+                "message": "rps、concurrency、duration必须大于0"
+            }), 400
+        if duration > MAX_DURATION:
+            return jsonify({
+                "success": False,
+                "message": f"duration不能超过{MAX_DURATION}秒"
+            }), 400
+
+        service = LoadTestService(
+            data.get('base_url') or DEFAULT_BASE_URL,
+            auth_token=data.get('auth_token', ''),
+            username=data.get('username'),
+            password=data.get('password')
+        )
+        report = service.run(scenarios, mode=mode, rps=rps, concurrency=concurrency, duration=duration)
+
+        return jsonify({
+            "success": True,
+            "report": report
+        })
+
+    except ValueError as e:
+        return jsonify({
+            "success": False,
+            "message": str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "message": f"压测执行失败: {str(e)}"
+        }), 500
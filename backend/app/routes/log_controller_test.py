@@ -1,12 +1,12 @@
 from flask import Blueprint, request, jsonify
-import asyncio
-from app.service.log_controller_test import LogControllerTestService
+from app.service.log_controller_test import get_log_controller_test_service
+from app.service.async_bridge import run_sync
 
 # 创建蓝图
 log_test_bp = Blueprint('log_test', __name__, url_prefix='/log/test')
 
-# 创建服务实例
-log_test_service = LogControllerTestService()
+# 共享的服务实例
+log_test_service = get_log_controller_test_service()
 
 @log_test_bp.route('/set_log', methods=['POST'])
 def test_set_log():
@@ -22,7 +22,7 @@ def test_set_log():
             }), 400
         
         test_cases = data['test_cases']
-        results = asyncio.run(log_test_service.run_set_log_tests(test_cases))
+        results = run_sync(log_test_service.run_set_log_tests(test_cases))
         
         # 统一数据格式
         total_tests = len(results)
@@ -88,7 +88,7 @@ def run_set_log_all_tests():
     运行所有预定义的 set_log 测试用例并生成报告
     """
     try:
-        results = asyncio.run(log_test_service.run_set_log_tests_batch())
+        results = run_sync(log_test_service.run_set_log_tests_batch())
         
         # 统一数据格式
         total_tests = len(results)
@@ -1,7 +1,7 @@
 from flask import Blueprint, request, jsonify
-import asyncio
 import time
-from app.service.plot_controller_test import PlotControllerTestService
+from app.service.plot_controller_test import get_plot_controller_test_service
+from app.service.async_bridge import run_sync
 
 
 # 创建蓝图
@@ -23,10 +23,10 @@ def test_call_get_logs():
             }), 400
         
         # 创建服务实例
-        service = PlotControllerTestService()
+        service = get_plot_controller_test_service()
         
         # 执行单个测试
-        result = asyncio.run(service._execute_call_get_logs_test(test_case))
+        result = run_sync(service._execute_call_get_logs_test(test_case))
         
         # 返回统一格式
         return jsonify({
@@ -59,7 +59,7 @@ def get_call_get_logs_predefined_cases():
     获取call_get_logs的预定义测试用例
     """
     try:
-        service = PlotControllerTestService()
+        service = get_plot_controller_test_service()
         test_cases = service.get_call_get_logs_predefined_cases()
         
         return jsonify({
@@ -80,8 +80,8 @@ def run_call_get_logs_all_tests():
     运行所有call_get_logs测试用例
     """
     try:
-        service = PlotControllerTestService()
-        result = asyncio.run(service.run_call_get_logs_tests_batch())
+        service = get_plot_controller_test_service()
+        result = run_sync(service.run_call_get_logs_tests_batch())
         return jsonify(result)
     except Exception as e:
         return jsonify({
@@ -96,7 +96,7 @@ def get_call_get_logs_function_source():
     获取call_get_logs函数的源代码
     """
     try:
-        service = PlotControllerTestService()
+        service = get_plot_controller_test_service()
         source_info = service.get_call_get_logs_function_source_code()
         
         return jsonify({
@@ -119,7 +119,7 @@ def generate_call_get_logs_report():
         data = request.get_json()
         results = data.get('results', [])
         
-        service = PlotControllerTestService()
+        service = get_plot_controller_test_service()
         report = service.generate_test_report(results)
         
         return jsonify({
@@ -143,8 +143,8 @@ def test_get_plot_by_id():
         data = request.get_json()
         test_case = data
         
-        service = PlotControllerTestService()
-        result = asyncio.run(service._execute_get_plot_by_id_test(test_case))
+        service = get_plot_controller_test_service()
+        result = run_sync(service._execute_get_plot_by_id_test(test_case))
         
         # 计算统计信息
         total_cases = 1
@@ -185,7 +185,7 @@ def get_get_plot_by_id_predefined_cases():
     获取get_plot_by_id函数的预定义测试用例
     """
     try:
-        service = PlotControllerTestService()
+        service = get_plot_controller_test_service()
         test_cases = service.get_get_plot_by_id_predefined_cases()
         
         return jsonify({
@@ -203,8 +203,8 @@ def run_get_plot_by_id_all_tests():
     运行所有get_plot_by_id预定义测试用例并生成报告
     """
     try:
-        service = PlotControllerTestService()
-        result = asyncio.run(service.run_get_plot_by_id_tests_batch())
+        service = get_plot_controller_test_service()
+        result = run_sync(service.run_get_plot_by_id_tests_batch())
         
         return jsonify(result)
         
@@ -217,7 +217,7 @@ def get_get_plot_by_id_function_source():
     获取get_plot_by_id函数的源代码
     """
     try:
-        service = PlotControllerTestService()
+        service = get_plot_controller_test_service()
         source_info = service.get_get_plot_by_id_function_source_code()
         
         return jsonify({
@@ -244,8 +244,8 @@ def generate_get_plot_by_id_report():
         if not test_results:
             return jsonify({"error": "请提供测试结果数据"}), 400
         
-        service = PlotControllerTestService()
-        report = asyncio.run(service.generate_get_plot_by_id_test_report(test_results))
+        service = get_plot_controller_test_service()
+        report = service.generate_get_plot_by_id_test_report(test_results)
         
         return jsonify({
             "message": "测试报告生成成功",
@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify
 from typing import List, Dict, Any
 from app.service.plot_test import PlotTestService
+from app.service.http_transport import parse_concurrency
 
 plot_test_bp = Blueprint('plot_test', __name__)
 
@@ -38,7 +39,11 @@ def test_add_plot():
                 "message": "缺少test_cases参数"
             }), 400
         
-        test_service = PlotTestService()
+        try:
+            concurrency = parse_concurrency(data.get('concurrency'))
+        except ValueError as e:
+            return jsonify({"success": False, "message": str(e)}), 400
+        test_service = PlotTestService(concurrency)
         
         # 设置认证token（如果提供）
         if 'auth_token' in data:
@@ -48,6 +53,7 @@ def test_add_plot():
         
         return jsonify({
             "success": True,
+            "latency_stats": test_service.http.latency_stats(),
             "test_results": results,
             "summary": test_service.generate_module_summary(results, "add_plot")
         })
@@ -87,14 +93,19 @@ def run_all_plot_tests():
     请求体格式（可选）：
     {
         "stop_on_failure": false,
-        "auth_token": "your_auth_token_here"
+        "auth_token": "your_auth_token_here",
+        "concurrency": 8
     }
     """
     try:
         data = request.get_json() or {}
         stop_on_failure = data.get('stop_on_failure', False)
         
-        test_service = PlotTestService()
+        try:
+            concurrency = parse_concurrency(data.get('concurrency'))
+        except ValueError as e:
+            return jsonify({"success": False, "message": str(e)}), 400
+        test_service = PlotTestService(concurrency)
         
         # 设置认证token（如果提供）
         if 'auth_token' in data:
@@ -109,6 +120,7 @@ def run_all_plot_tests():
         
         return jsonify({
             "success": True,
+            "latency_stats": test_service.http.latency_stats(),
             "test_results": batch_result["test_results"],  # 直接提取test_results
             "execution_info": batch_result["execution_info"],  # 添加执行信息
             "summary": test_service.generate_module_summary(
@@ -157,7 +169,11 @@ def test_get_plot_detail():
                 "message": "缺少test_cases参数"
             }), 400
         
-        test_service = PlotTestService()
+        try:
+            concurrency = parse_concurrency(data.get('concurrency'))
+        except ValueError as e:
+            return jsonify({"success": False, "message": str(e)}), 400
+        test_service = PlotTestService(concurrency)
         
         # 设置认证token（如果提供）
         if 'auth_token' in data:
@@ -167,6 +183,7 @@ def test_get_plot_detail():
         
         return jsonify({
             "success": True,
+            "latency_stats": test_service.http.latency_stats(),
             "test_results": results,
             "summary": test_service.generate_module_summary(results, "get_plot_detail")
         })
@@ -206,14 +223,19 @@ def run_all_plot_detail_tests():
     请求体格式（可选）：
     {
         "stop_on_failure": false,
-        "auth_token": "your_auth_token_here"
+        "auth_token": "your_auth_token_here",
+        "concurrency": 8
     }
     """
     try:
         data = request.get_json() or {}
         stop_on_failure = data.get('stop_on_failure', False)
         
-        test_service = PlotTestService()
+        try:
+            concurrency = parse_concurrency(data.get('concurrency'))
+        except ValueError as e:
+            return jsonify({"success": False, "message": str(e)}), 400
+        test_service = PlotTestService(concurrency)
         
         # 设置认证token（如果提供）
         if 'auth_token' in data:
@@ -225,6 +247,7 @@ def run_all_plot_detail_tests():
         
         return jsonify({
             "success": True,
+            "latency_stats": test_service.http.latency_stats(),
             "test_results": batch_result["test_results"],  # 只返回测试结果部分
             "execution_info": batch_result["execution_info"],  # 添加执行信息
             "summary": test_service.generate_module_summary(
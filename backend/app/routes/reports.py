@@ -0,0 +1,78 @@
+from flask import Blueprint, request, jsonify
+from app.service.history import HistoryQueries
+
+reports_bp = Blueprint('reports', __name__)
+
+
+@reports_bp.route('/reports/suites', methods=['GET'])
+def get_suites():
+    """
+    各测试套件的运行次数和通过率
+
+    查询参数: days 统计最近多少天，默认30
+    """
+    days = request.args.get('days', 30, type=float)
+    return jsonify({"success": True, "data": HistoryQueries().suites(days)})
+
+
+@reports_bp.route('/reports/runs', methods=['GET'])
+def get_recent_runs():
+    """
+    最近的测试运行记录
+
+    查询参数: suite 测试套件（可选），limit 返回条数，默认50
+    """
+    suite = request.args.get('suite')
+    limit = request.args.get('limit', 50, type=int)
+    return jsonify({"success": True, "data": HistoryQueries().recent_runs(suite, limit)})
+
+
+@reports_bp.route('/reports/trend', methods=['GET'])
+def get_pass_rate_trend():
+    """
+    通过率趋势
+
+    查询参数: suite 测试套件（必填），bucket 统计粒度 day/hour/run，默认day，days 默认30
+    """
+    suite = request.args.get('suite')
+    if not suite:
+        return jsonify({"success": False, "message": "缺少suite参数"}), 400
+    bucket = request.args.get('bucket', 'day')
+    days = request.args.get('days', 30, type=float)
+    try:
+        data = HistoryQueries().pass_rate_trend(suite, bucket, days)
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+    return jsonify({"success": True, "data": data})
+
+
+@reports_bp.route('/reports/slowest', methods=['GET'])
+def get_slowest_cases():
+    """
+    平均耗时最长的用例
+
+    查询参数: suite（可选），days 默认7，limit 默认20
+    """
+    suite = request.args.get('suite')
+    days = request.args.get('days', 7, type=float)
+    limit = request.args.get('limit', 20, type=int)
+    return jsonify({"success": True, "data": HistoryQueries().slowest_cases(suite, days, limit)})
+
+
+@reports_bp.route('/reports/flaky', methods=['GET'])
+def get_flaky_cases():
+    """
+    不稳定用例（最近若干次运行中结果时好时坏）
+
+    查询参数: suite（可选），days 默认30，window 每个用例取最近多少次运行，默认50，
+             min_runs 最少运行次数，默认5，limit 默认20
+    """
+    suite = request.args.get('suite')
+    days = request.args.get('days', 30, type=float)
+    window = request.args.get('window', 50, type=int)
+    min_runs = request.args.get('min_runs', 5, type=int)
+    limit = request.args.get('limit', 20, type=int)
+    return jsonify({
+        "success": True,
+        "data": HistoryQueries().flaky_cases(suite, days, window, min_runs, limit)
+    })
@@ -3,15 +3,23 @@ import traceback
 import os
 
 # 更新导入语句
-from app.service.system_test.e2e_test import E2ETestService
+from app.service.system_test.e2e_test import E2ETestService, PARALLEL_TEST_TYPES, DEFAULT_PARALLEL_TEST_TYPES
+from app.service.system_test.browser_pool import get_browser_pool
 from app.service.system_test.utils import E2ETestUtils
 from app.service.system_test.config import E2ETestConfig
+from app.service.jobs import get_job_manager
+from app.routes.jobs import wants_background, job_accepted
 
 system_test_bp = Blueprint('system_test', __name__)
 
 @system_test_bp.route('/system/test/e2e/plot_detection', methods=['POST'])
 def test_e2e_plot_detection():
-    """端到端测试 - 地块检测功能"""
+    """
+    端到端测试 - 地块检测功能
+
+    请求体中 "async": true 时提交为后台任务，返回 202 和任务ID，
+    每个步骤通过 /jobs/<job_id>/events 推送
+    """
     try:
         data = request.get_json()
         if not data:
@@ -32,6 +40,21 @@ def test_e2e_plot_detection():
                 "error_code": "CONFIG_VALIDATION_ERROR"
             }), 400
         
+        if wants_background(data.get('async')):
+            def run_job(job):
+                result = E2ETestService(on_step=job.step).run_plot_detection_test(test_config, test_data)
+                job.report(result)
+                passed = result.get("status") == "PASSED"
+                return {
+                    "success": passed,
+                    "data": result,
+                    "message": "地块检测测试执行成功" if passed
+                    else f"地块检测测试执行失败: {result.get('message', '未知错误')}"
+                }
+
+            job = get_job_manager().submit('e2e_plot_detection', run_job, suite_path=request.path, total=1)
+            return job_accepted(job)
+        
         # 执行测试
         e2e_service = E2ETestService()
         result = e2e_service.run_plot_detection_test(
@@ -360,7 +383,8 @@ def run_batch_e2e_tests():
         test_types = data.get('test_types', ['plot_detection', 'weather_info', 'plot_management', 'plot_logs'])
         
         results = []
-        e2e_service = E2ETestService()
+        # 无头模式下从浏览器池借用浏览器，各场景之间复用同一个已登录的浏览器
+        e2e_service = E2ETestService(browser_pool=get_browser_pool() if test_config.get('headless') else None)
         
         for test_type in test_types:
             try:
@@ -427,6 +451,94 @@ def run_batch_e2e_tests():
             "error_details": error_details if request.args.get('debug') == 'true' else None
         }), 500
 
+@system_test_bp.route('/system/test/e2e/parallel', methods=['POST'])
+def run_parallel_e2e_tests():
+    """
+    并行执行端到端测试
+
+    各场景在独立的无头浏览器中同时执行，浏览器来自共享的会话池并复用登录状态；
+    读写地块数据的场景（plot_detection、plot_management、plot_logs）使用同一账号，按给定顺序依次执行
+
+    请求体格式：
+    {
+        "test_config": {...},
+        "test_data": {...},
+        "test_types": ["plot_detection", "weather_info", "plot_management"],  // 可选
+        "max_workers": 3,  // 可选，并行数，不超过浏览器池大小
+        "async": true  // 可选，提交为后台任务，每个场景和步骤通过 /jobs/<job_id>/events 推送
+    }
+    """
+    try:
+        data = request.get_json()
+        if not data:
+            return jsonify({
+                "success": False,
+                "message": "缺少请求参数",
+                "error_code": "MISSING_PARAMS"
+            }), 400
+        
+        try:
+            test_config = E2ETestUtils.validate_test_config(data.get('test_config', {}))
+            test_data = E2ETestUtils.validate_test_data(data.get('test_data', {}))
+        except ValueError as e:
+            return jsonify({
+                "success": False,
+                "message": f"配置验证失败: {str(e)}",
+                "error_code": "CONFIG_VALIDATION_ERROR"
+            }), 400
+        
+        test_types = data.get('test_types')
+        unknown = [test_type for test_type in test_types or [] if test_type not in PARALLEL_TEST_TYPES]
+        if unknown:
+            return jsonify({
+                "success": False,
+                "message": f"未知的测试类型: {', '.join(unknown)}",
+                "error_code": "VALIDATION_ERROR"
+            }), 400
+        
+        def run_suite(on_step=None, on_result=None):
+            e2e_service = E2ETestService(on_step=on_step)
+            parallel_result = e2e_service.run_parallel_tests(
+                test_config, test_data, test_types=test_types, max_workers=data.get('max_workers'),
+                on_result=on_result
+            )
+            
+            report = E2ETestUtils.generate_test_report(parallel_result["results"])
+            report["parallel"] = parallel_result["parallel"]
+            
+            return {
+                "success": True,
+                "data": report,
+                "message": f"并行测试完成，通过率: {report['summary']['pass_rate']}%"
+            }
+        
+        if wants_background(data.get('async')):
+            job = get_job_manager().submit(
+                'e2e_parallel',
+                lambda job: run_suite(job.step, job.report),
+                suite_path=request.path,
+                total=len(test_types or DEFAULT_PARALLEL_TEST_TYPES)
+            )
+            return job_accepted(job)
+        
+        return jsonify(run_suite())
+        
+    except Exception as e:
+        error_details = {
+            "error_type": type(e).__name__,
+            "error_message": str(e),
+            "traceback": traceback.format_exc()
+        }
+        
+        print(f"并行测试执行出错: {error_details}")
+        
+        return jsonify({
+            "success": False,
+            "message": f"并行测试执行失败: {str(e)}",
+            "error_code": "PARALLEL_TEST_ERROR",
+            "error_details": error_details if request.args.get('debug') == 'true' else None
+        }), 500
+
 @system_test_bp.route('/system/test/environment/validate', methods=['GET'])
 def validate_test_environment():
     """验证测试环境"""
@@ -1,13 +1,17 @@
+import json
 import random
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, send_from_directory, url_for
 import importlib
 import inspect
 import os
 import sys
 import app.service.scan as scan_service
 from app.service.unit import UnitTestService
-from app.service.utils import ExcelTestCaseLoader,TestCaseObjectBuilder
+from app.service.utils import ExcelTestCaseLoader,TestCaseObjectBuilder,ExcelTestCaseWriter
+from app.service.jobs import get_job_manager
+from app.service.fuzz import FUZZ_METHOD, DEFAULT_MAX_EXAMPLES
+from app.routes.jobs import wants_background, job_accepted
 import datetime
 import pandas as pd
 unit_bp = Blueprint("unit", __name__)
@@ -37,6 +41,31 @@ def scan_functions():
     function_map = scan_service.scan_functions_in_directory(directory)
     return jsonify({"success": True, "data": function_map})
 
+@unit_bp.route("/scan_project", methods=["GET"])
+def scan_project():
+    """
+    静态扫描目录，返回每个模块的类、方法签名、顶层函数及是否为 async
+    """
+    directory = request.args.get("directory")
+
+    if not directory or not os.path.isdir(directory):
+        return jsonify({"success": False, "message": "无效目录路径"}), 400
+
+    return jsonify({"success": True, "data": scan_service.scan_project(directory)})
+
+
+def _parse_invariants(value):
+    """不变式支持 JSON 数组或每行一个表达式"""
+    if not value or not value.strip():
+        return []
+    try:
+        parsed = json.loads(value)
+    except ValueError:
+        parsed = None
+    if isinstance(parsed, list):
+        return [str(item) for item in parsed if str(item).strip()]
+    return [line.strip() for line in value.splitlines() if line.strip()]
+
 
 @unit_bp.route('/run_unit_test', methods=['POST'])
 def run_unit_test():
@@ -48,7 +77,14 @@ def run_unit_test():
     - class_name: 类名（如 models.models.Disease）
     - method_name: 方法名（如 clone）
     - mock_config: Mock配置字典 {mock_target: mock_value} (可选)
-    - excel_file: Excel文件（multipart/form-data）
+    - max_workers: 同步用例并行线程数，默认顺序执行 (可选)
+    - max_concurrency: 异步用例最大并发数，默认顺序执行 (可选)
+    - async: 为 1/true 时提交为后台任务，返回 202 和任务ID，进度通过 /jobs/<job_id>/events 推送 (可选)
+    - fuzz: 为 1/true 时进行模糊测试：按第二行的参数类型随机生成输入，Excel 中的用例只提供无法随机构造的参数取值 (可选)
+    - max_examples: 模糊测试生成的输入数 (可选)
+    - seed: 模糊测试的随机种子 (可选)
+    - invariants: 模糊测试检查的不变式，JSON 数组或每行一个表达式，可使用参数名和 result (可选)
+    - excel_file: Excel或CSV文件（multipart/form-data，支持 .xlsx/.xls/.csv）
 
     Excel文件格式：
     - 第一行：列名（ID、测试方法、测试描述、属性名等）
@@ -61,6 +97,12 @@ def run_unit_test():
         class_name = request.form.get('class_name')
         method_name = request.form.get('method_name')
         mock_config = eval(request.form.get('mock_config', '{}'))  # Mock配置
+        max_workers = request.form.get('max_workers', type=int)
+        max_concurrency = request.form.get('max_concurrency', type=int)
+        fuzz = request.form.get('fuzz', '').strip().lower() in ('1', 'true', 'yes')
+        max_examples = request.form.get('max_examples', type=int)
+        fuzz_seed = request.form.get('seed', type=int)
+        invariants = _parse_invariants(request.form.get('invariants'))
 
         # 处理上传的Excel文件
         if 'excel_file' not in request.files:
@@ -179,42 +221,85 @@ def run_unit_test():
             }), 400
 
         # 4. 调用service执行单元测试
-        test_service = UnitTestService()
-        test_result = test_service.execute_unit_test(
-            root=root,
-            class_name=class_name,
-            method_name=method_name,
-            test_cases=converted_test_cases,
-            param_types=param_types,
-            mock_config=mock_config  # 传递mock配置
-        )
+        def run_suite(on_result=None):
+            test_service = UnitTestService()
+            if fuzz:
+                test_result = test_service.fuzz_unit_test(
+                    root=root,
+                    class_name=class_name,
+                    method_name=method_name,
+                    param_types=param_types,
+                    seed_cases=converted_test_cases,
+                    invariants=invariants,
+                    max_examples=max_examples or DEFAULT_MAX_EXAMPLES,
+                    seed=fuzz_seed,
+                    mock_config=mock_config,
+                    max_workers=max_workers,
+                    on_progress=on_result
+                )
+                return {
+                    "success": test_result.get("success", False),
+                    "message": test_result.get("message", ""),
+                    "class": class_name,
+                    "method_name": method_name,
+                    "test_method": FUZZ_METHOD,
+                    "test_name": "模糊测试",
+                    "description": description,
+                    "mock_config": mock_config,
+                    "summary": test_result.get("summary"),
+                    "test_results": test_result.get("test_results", []),
+                    "fuzz": test_result.get("fuzz")
+                }
+            test_result = test_service.execute_unit_test(
+                root=root,
+                class_name=class_name,
+                method_name=method_name,
+                test_cases=converted_test_cases,
+                param_types=param_types,
+                mock_config=mock_config,  # 传递mock配置
+                max_workers=max_workers,
+                max_concurrency=max_concurrency,
+                on_result=on_result
+            )
 
-        # 5. 封装响应体
-        response = {
-            "success": test_result.get("success", False),
-            "message": test_result.get("message", ""),
-            "class": class_name,
-            "method_name": method_name,
-            "test_method": test_method,
-            "test_name": test_name,
-            "description": description,
-            "mock_config": mock_config,  # 包含mock配置信息
-            "summary": test_result.get("summary", {
-                "total_cases": 0,
-                "passed_cases": 0,
-                "failed_cases": 0,
-                "pass_rate": "0%"
-            }),
-            "test_results": test_result.get("test_results", [])
-        }
-
-        # 6. 清理临时文件（如果是上传的文件）
+            # 5. 封装响应体
+            return {
+                "success": test_result.get("success", False),
+                "message": test_result.get("message", ""),
+                "class": class_name,
+                "method_name": method_name,
+                "test_method": test_method,
+                "test_name": test_name,
+                "description": description,
+                "mock_config": mock_config,  # 包含mock配置信息
+                "summary": test_result.get("summary", {
+                    "total_cases": 0,
+                    "passed_cases": 0,
+                    "failed_cases": 0,
+                    "pass_rate": "0%"
+                }),
+                "test_results": test_result.get("test_results", [])
+            }
+
+        # 6. 清理临时文件（如果是上传的文件），用例此时已全部加载到内存
         if not request.is_json and os.path.exists(excel_path):
             try:
                 os.remove(excel_path)
             except:
                 pass  # 忽略删除失败
 
+        # 后台执行时立即返回任务ID
+        if wants_background(request.form.get('async')):
+            job = get_job_manager().submit(
+                'unit_test',
+                lambda job: run_suite(job.step if fuzz else lambda index, result: job.report(result)),
+                suite_path=request.path,
+                total=None if fuzz else len(converted_test_cases)
+            )
+            return job_accepted(job)
+
+        response = run_suite()
+
         return jsonify(response)
 
     except Exception as e:
@@ -226,3 +311,125 @@ def run_unit_test():
             "method_name": request.get_json().get('method_name', '') if request.is_json else request.form.get(
                 'method_name', '')
         }), 500
+
+
+@unit_bp.route('/minimize_unit_test', methods=['POST'])
+def minimize_unit_test():
+    """
+    用例集约简：逐个执行用例并记录目标模块内的执行路径，路径和期望结果类别相同的用例只保留第一个，
+    约简后的用例按原格式写入 temp 目录，分支覆盖与原用例集相同
+
+    请求参数（multipart/form-data）:
+    - root, class_name, method_name, mock_config: 同 /run_unit_test
+    - excel_file: Excel或CSV文件，格式同 /run_unit_test
+
+    返回:
+    {
+        "success": true/false,
+        "summary": {"total_cases", "kept_cases", "removed_cases", "reduction", "duration"},
+        "coverage": {"traced_file", "backend", "original": 原用例集覆盖, "minimized": 约简后覆盖,
+                     "branch_minimal_ids": 只按分支覆盖可进一步缩减到的用例ID},
+        "kept_ids": [保留的用例ID],
+        "groups": [{"kept": 保留的用例ID, "removed": [被合并的用例ID], "passed"}],
+        "output_file": "约简后的文件名",
+        "download_url": "下载地址"
+    }
+    """
+    try:
+        root = request.form.get('root')
+        class_name = request.form.get('class_name')
+        method_name = request.form.get('method_name')
+        mock_config = eval(request.form.get('mock_config', '{}'))
+
+        if not all([root, class_name, method_name]):
+            return jsonify({
+                "success": False,
+                "message": "缺少必要参数: root, class_name, method_name"
+            }), 400
+
+        if mock_config and not isinstance(mock_config, dict):
+            return jsonify({
+                "success": False,
+                "message": "mock_config必须是字典格式"
+            }), 400
+
+        excel_file = request.files.get('excel_file')
+        if excel_file is None or excel_file.filename == '':
+            return jsonify({
+                "success": False,
+                "message": "缺少excel_file文件"
+            }), 400
+
+        timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+        file_name = os.path.basename(excel_file.filename)
+        os.makedirs('temp', exist_ok=True)
+        excel_path = os.path.join('temp', f"test_cases_{timestamp}_{file_name}")
+        excel_file.save(excel_path)
+        try:
+            loader_result = ExcelTestCaseLoader.load_test_cases(excel_path)
+        finally:
+            try:
+                os.remove(excel_path)
+            except OSError:
+                pass
+
+        if not loader_result["success"]:
+            return jsonify({
+                "success": False,
+                "message": f"Excel文件加载失败: {loader_result.get('message', '未知错误')}"
+            }), 400
+
+        test_cases = loader_result["test_cases"]
+        param_types = loader_result["param_types"]
+        try:
+            converted_test_cases = TestCaseObjectBuilder.build_test_objects(test_cases, param_types, root)
+        except ValueError as e:
+            return jsonify({
+                "success": False,
+                "message": f"数据类型转换失败: {str(e)}"
+            }), 400
+
+        result = UnitTestService().minimize_unit_test(
+            root=root,
+            class_name=class_name,
+            method_name=method_name,
+            test_cases=converted_test_cases,
+            param_types=param_types,
+            mock_config=mock_config
+        )
+        if not result["success"]:
+            return jsonify(result), 400
+
+        # 写出原始单元格的值，而不是转换后的对象
+        output_path = ExcelTestCaseWriter.write_test_cases(
+            os.path.join('temp', f"minimized_{timestamp}_{file_name}"),
+            loader_result["columns"],
+            loader_result["data_types"],
+            [test_cases[index] for index in result.pop("kept_indexes")]
+        )
+        output_file = os.path.basename(output_path)
+        result.update({
+            "class": class_name,
+            "method_name": method_name,
+            "output_file": output_file,
+            "download_url": url_for('unit.download_minimized', file=output_file)
+        })
+        return jsonify(result)
+
+    except Exception as e:
+        print(e)
+        return jsonify({
+            "success": False,
+            "message": f"用例集约简时发生错误: {str(e)}"
+        }), 500
+
+
+@unit_bp.route('/minimize_unit_test/download', methods=['GET'])
+def download_minimized():
+    """下载约简后的用例文件，查询参数 file 为 /minimize_unit_test 返回的 output_file"""
+    file_name = request.args.get('file', '')
+    if not file_name.startswith('minimized_') or os.path.basename(file_name) != file_name:
+        return jsonify({"success": False, "message": "无效的文件名"}), 400
+    if not os.path.exists(os.path.join('temp', file_name)):
+        return jsonify({"success": False, "message": "文件不存在"}), 404
+    return send_from_directory(os.path.abspath('temp'), file_name, as_attachment=True)
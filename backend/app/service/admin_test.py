@@ -2,12 +2,30 @@ import requests
 import time
 from typing import List, Dict, Any
 
+from app.service.http_transport import HttpTestClient
+
 class AdminTestService:
-    def __init__(self):
+    def __init__(self, concurrency: int = None):
+        # 共享连接池的HTTP客户端，concurrency 为并发执行的用例数
+        self.http = HttpTestClient(concurrency)
         # 目标API的基础URL
         self.base_url = "http://47.120.78.249:8000"
         # self.base_url = "http://localhost:8000"
-    
+
+    # 依赖链：操作同一名称的用例（先添加成功、再测试重名）必须按原顺序执行；
+    # 用例可以用 chain 字段显式指定所属的链
+    @staticmethod
+    def _package_chain(test_case: Dict[str, Any]):
+        return test_case.get('chain') or test_case.get('packageName')
+
+    @staticmethod
+    def _plant_chain(test_case: Dict[str, Any]):
+        return test_case.get('chain') or test_case.get('plantName')
+
+    @staticmethod
+    def _disease_chain(test_case: Dict[str, Any]):
+        return test_case.get('chain') or test_case.get('diseaseName')
+
     '''
         测试add_package接口
     '''
@@ -113,10 +131,7 @@ class AdminTestService:
         """
         执行add_package接口测试
         """
-        results = []
-        for test_case in test_cases:
-            result = self._execute_package_test(test_case)
-            results.append(result)
+        results = self.http.map(self._execute_package_test, test_cases, chain=self._package_chain)
         return results
     
     def _execute_package_test(self, test_case: Dict[str, Any]) -> Dict[str, Any]:
@@ -136,7 +151,7 @@ class AdminTestService:
                 params['sumNum'] = test_case['sumNum']
             
             # 发送请求
-            response = requests.post(
+            response = self.http.post(
                 f"{self.base_url}/admin/package/add",
                 params=params,
                 timeout=10
@@ -222,10 +237,13 @@ class AdminTestService:
         try:
             print(f"开始执行add_package模块测试，共{len(test_cases)}个用例...")
             
+            # 不需要失败即停时所有用例并发执行，再按原顺序输出
+            concurrent_results = None if stop_on_failure else iter(self.http.map(self._execute_package_test, test_cases, chain=self._package_chain))
+
             for i, test_case in enumerate(test_cases, 1):
                 print(f"执行add_package测试 {i}/{len(test_cases)}: {test_case['test_id']} - {test_case['test_purpose']}")
                 
-                result = self._execute_package_test(test_case)
+                result = next(concurrent_results) if concurrent_results else self._execute_package_test(test_case)
                 results.append(result)
                 
                 # 输出测试结果
@@ -370,11 +388,7 @@ class AdminTestService:
         """
         执行add_plant接口测试
         """
-        results = []
-        
-        for test_case in test_cases:
-            result = self._execute_plant_test(test_case)
-            results.append(result)
+        results = self.http.map(self._execute_plant_test, test_cases, chain=self._plant_chain)
             
         return results
     
@@ -395,7 +409,7 @@ class AdminTestService:
                 params['plantIconURL'] = test_case['plantIconURL']
             
             # 发送请求
-            response = requests.post(
+            response = self.http.post(
                 f"{self.base_url}/admin/plant/add",
                 params=params,
                 timeout=10
@@ -482,10 +496,13 @@ class AdminTestService:
         try:
             print(f"开始执行add_plant模块测试，共{len(test_cases)}个用例...")
             
+            # 不需要失败即停时所有用例并发执行，再按原顺序输出
+            concurrent_results = None if stop_on_failure else iter(self.http.map(self._execute_plant_test, test_cases, chain=self._plant_chain))
+
             for i, test_case in enumerate(test_cases, 1):
                 print(f"执行add_plant测试 {i}/{len(test_cases)}: {test_case['test_id']} - {test_case['test_purpose']}")
                 
-                result = self._execute_plant_test(test_case)
+                result = next(concurrent_results) if concurrent_results else self._execute_plant_test(test_case)
                 results.append(result)
                 
                 # 输出测试结果
@@ -600,10 +617,7 @@ class AdminTestService:
         if target_api is None:
             target_api = f"{self.base_url}/admin/weather/city_input"
         
-        results = []
-        for test_case in test_cases:
-            result = self._execute_city_test(test_case, target_api)
-            results.append(result)
+        results = self.http.map(lambda test_case: self._execute_city_test(test_case, target_api), test_cases)
         
         return results
     
@@ -620,7 +634,7 @@ class AdminTestService:
                 params['csvURL'] = test_case['csvURL']
             
             # 发送POST请求
-            response = requests.post(
+            response = self.http.post(
                 target_api,
                 params=params,
                 timeout=30
@@ -692,6 +706,9 @@ class AdminTestService:
         批量执行所有预定义的城市导入测试用例
         """
         predefined_cases = self.get_city_predefined_cases()
+        if not stop_on_failure:
+            return self.run_city_input_tests(predefined_cases, target_api)
+
         results = []
         
         for test_case in predefined_cases:
@@ -821,11 +838,7 @@ class AdminTestService:
         """
         执行add_disease接口测试
         """
-        results = []
-        
-        for test_case in test_cases:
-            result = self._execute_disease_test(test_case)
-            results.append(result)
+        results = self.http.map(self._execute_disease_test, test_cases, chain=self._disease_chain)
             
         return results
     
@@ -846,7 +859,7 @@ class AdminTestService:
                 params['advice'] = test_case['advice']
             
             # 发送请求
-            response = requests.post(
+            response = self.http.post(
                 f"{self.base_url}/admin/disease/add",
                 params=params,
                 timeout=10
@@ -933,10 +946,13 @@ class AdminTestService:
         try:
             print(f"开始执行add_disease模块测试，共{len(test_cases)}个用例...")
             
+            # 不需要失败即停时所有用例并发执行，再按原顺序输出
+            concurrent_results = None if stop_on_failure else iter(self.http.map(self._execute_disease_test, test_cases, chain=self._disease_chain))
+
             for i, test_case in enumerate(test_cases, 1):
                 print(f"执行add_disease测试 {i}/{len(test_cases)}: {test_case['test_id']} - {test_case['test_purpose']}")
                 
-                result = self._execute_disease_test(test_case)
+                result = next(concurrent_results) if concurrent_results else self._execute_disease_test(test_case)
                 results.append(result)
                 
                 # 输出测试结果
@@ -0,0 +1,108 @@
+"""
+同步的 Flask 视图调用异步测试服务的桥接
+
+进程内只有一个后台事件循环线程，视图函数通过 run_coroutine_threadsafe 把协程提交到该循环
+并等待结果，避免每个请求都用 asyncio.run 新建和销毁事件循环。
+每次提交在事件循环中是一个独立的任务，任务内设置的 TaskLocal 属性互不可见
+"""
+import asyncio
+import atexit
+import contextvars
+import threading
+from typing import Any, Callable, Coroutine, Optional
+
+# 等待协程结果的默认时间上限（秒），None 表示不限
+DEFAULT_TIMEOUT: Optional[float] = None
+
+
+class _LoopThread:
+    """在守护线程中运行的事件循环"""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._ready = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="async-bridge", daemon=True)
+        self.thread.start()
+        self._ready.wait()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.call_soon(self._ready.set)
+        self.loop.run_forever()
+
+    def stop(self):
+        if self.loop.is_closed():
+            return
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout=5)
+        if not self.thread.is_alive():
+            self.loop.close()
+
+
+_loop_thread: Optional[_LoopThread] = None
+_loop_lock = threading.Lock()
+
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    """进程级共享的后台事件循环，首次使用时启动"""
+    global _loop_thread
+    if _loop_thread is None:
+        with _loop_lock:
+            if _loop_thread is None:
+                _loop_thread = _LoopThread()
+                atexit.register(_loop_thread.stop)
+    return _loop_thread.loop
+
+
+def run_sync(coro: Coroutine, timeout: Optional[float] = DEFAULT_TIMEOUT) -> Any:
+    """
+    在后台事件循环中执行协程并阻塞等待结果，协程抛出的异常原样抛出
+
+    超时后取消协程并抛出 concurrent.futures.TimeoutError；不能在事件循环线程内调用
+    """
+    loop = get_loop()
+    if _loop_thread is not None and threading.current_thread() is _loop_thread.thread:
+        coro.close()
+        raise RuntimeError("不能在后台事件循环线程中同步等待协程")
+    future = asyncio.run_coroutine_threadsafe(coro, loop)
+    try:
+        return future.result(timeout)
+    except BaseException:
+        future.cancel()
+        raise
+
+
+class TaskLocal:
+    """
+    按事件循环任务隔离的实例属性
+
+    共享的服务单例在并发请求中修改异常模拟标志等状态时，每个任务只看到自己设置的值；
+    未设置时返回 default，或调用 default_factory 创建并保存到当前任务
+    """
+
+    def __init__(self, default: Any = None, default_factory: Callable[[], Any] = None):
+        self.default = default
+        self.default_factory = default_factory
+        self.name = None
+        self._var: Optional[contextvars.ContextVar] = None
+
+    def __set_name__(self, owner, name):
+        self.name = name
+        self._var = contextvars.ContextVar(f"{owner.__name__}.{name}", default={})
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        values = self._var.get()
+        key = id(instance)
+        if key in values:
+            return values[key]
+        if self.default_factory is None:
+            return self.default
+        value = self.default_factory()
+        self.__set__(instance, value)
+        return value
+
+    def __set__(self, instance, value):
+        # 每次复制字典，避免修改从父上下文继承来的同一个对象
+        self._var.set({**self._var.get(), id(instance): value})
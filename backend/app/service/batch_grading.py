@@ -0,0 +1,267 @@
+"""
+整个班级提交代码的批量评测
+
+提交按规范化语法树的哈希去重（忽略注释、空白和文档字符串），相同的代码只评测一次；
+去重后的代码按题目并行提交到沙箱进程池，每评完一份就产出对应学生的结果，最后产出班级汇总
+"""
+import ast
+import hashlib
+import io
+import os
+import posixpath
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Any, List, Iterator, Optional, Tuple
+
+from app.static.homework_data import SUPPORTED_FUNCTIONS
+from app.service.homework import grade_submission
+from app.service.sandbox import get_pool, DEFAULT_CASE_TIMEOUT
+
+# 一次批量评测最多的提交数
+MAX_SUBMISSIONS = int(os.getenv("BATCH_MAX_SUBMISSIONS", 2000))
+# 压缩包中单个代码文件的大小上限（字节）
+MAX_FILE_BYTES = 256 * 1024
+# 班级汇总中列出的失败最多的用例数
+MOST_FAILED_LIMIT = 10
+# 分数段
+SCORE_BANDS = [(90, "90-100"), (80, "80-89"), (70, "70-79"), (60, "60-69"), (0, "0-59")]
+
+
+def normalized_hash(code: str) -> str:
+    """规范化语法树的哈希：格式、注释和文档字符串不同的同一份代码哈希相同；语法错误时按去除行尾空白的源码计算"""
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        text = "\n".join(line.rstrip() for line in code.strip().splitlines())
+    else:
+        for node in ast.walk(tree):
+            body = getattr(node, "body", None)
+            if isinstance(body, list) and body and isinstance(body[0], ast.Expr) \
+                    and isinstance(body[0].value, ast.Constant) and isinstance(body[0].value.value, str):
+                node.body = body[1:] or [ast.Pass()]
+        text = ast.dump(tree, include_attributes=False)
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def detect_function(code: str) -> Optional[str]:
+    """根据代码中定义的顶层函数判断题目，无法判断时返回 None"""
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return None
+    for node in tree.body:
+        if isinstance(node, ast.FunctionDef) and node.name in SUPPORTED_FUNCTIONS:
+            return node.name
+    return None
+
+
+def submissions_from_json(items: List[Any], function_name: str = None) -> List[Dict[str, Any]]:
+    """
+    解析 JSON 数组形式的提交
+
+    每项为 {"student", "code", "function_name"（可选）, "test_methods"（可选）}；
+    未给出 function_name 时使用 function_name 参数，仍没有时根据代码判断
+    """
+    if not isinstance(items, list):
+        raise ValueError("submissions 必须是数组")
+    submissions = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict) or not isinstance(item.get("code"), str):
+            raise ValueError(f"第{index + 1}项提交缺少 code")
+        test_methods = item.get("test_methods")
+        if test_methods is not None and not isinstance(test_methods, list):
+            raise ValueError(f"第{index + 1}项提交的 test_methods 必须是数组")
+        submissions.append({
+            "student": str(item.get("student") or f"submission_{index + 1}"),
+            "code": item["code"],
+            "function_name": item.get("function_name") or function_name,
+            "test_methods": test_methods,
+        })
+    return submissions
+
+
+def _decode(data: bytes) -> str:
+    for encoding in ("utf-8-sig", "gbk"):
+        try:
+            return data.decode(encoding)
+        except UnicodeDecodeError:
+            continue
+    return data.decode("utf-8", errors="replace")
+
+
+def submissions_from_zip(data: bytes, function_name: str = None) -> List[Dict[str, Any]]:
+    """
+    解析压缩包形式的提交，包中每个 .py 文件是一份提交
+
+    学生名取文件所在的第一级目录（如 2021001/triangle_judge.py），文件在根目录时取文件名；
+    题目优先按文件名判断，其次使用 function_name 参数，最后根据代码中定义的函数判断
+    """
+    try:
+        archive = zipfile.ZipFile(io.BytesIO(data))
+    except zipfile.BadZipFile:
+        raise ValueError("无法解析压缩包")
+
+    submissions = []
+    with archive:
+        for info in archive.infolist():
+            path = info.filename
+            if info.is_dir() or not path.endswith(".py") or path.startswith("__MACOSX/") \
+                    or posixpath.basename(path).startswith("."):
+                continue
+            if info.file_size > MAX_FILE_BYTES:
+                raise ValueError(f"文件过大: {path}")
+            code = _decode(archive.read(info))
+            parts = path.strip("/").split("/")
+            stem = posixpath.splitext(parts[-1])[0]
+            student = parts[0] if len(parts) > 1 else stem
+            submissions.append({
+                "student": student,
+                "file": path,
+                "code": code,
+                "function_name": stem if stem in SUPPORTED_FUNCTIONS else function_name,
+                "test_methods": None,
+            })
+    return submissions
+
+
+def _student_result(submission: Dict[str, Any], index: int, graded: Dict[str, Any],
+                    duplicate_of: Optional[str]) -> Dict[str, Any]:
+    result = {
+        "index": index + 1,
+        "student": submission["student"],
+        "function_name": submission["function_name"],
+        "hash": submission["hash"][:12],
+        "duplicate_of": duplicate_of,
+    }
+    if "file" in submission:
+        result["file"] = submission["file"]
+    if graded["success"]:
+        result.update({
+            "success": True,
+            "score": graded["score"],
+            "total_cases": graded["total_cases"],
+            "passed_cases": graded["passed_cases"],
+            "methods": graded["methods"],
+        })
+    else:
+        result.update({"success": False, "score": 0, "message": graded["message"]})
+    return result
+
+
+def _band(score: float) -> str:
+    for low, name in SCORE_BANDS:
+        if score >= low:
+            return name
+    return SCORE_BANDS[-1][1]
+
+
+def class_summary(results: List[Dict[str, Any]], unique_count: int, duration: float) -> Dict[str, Any]:
+    """按题目汇总分数分布、各测试方法平均通过率、失败最多的用例和重复提交"""
+    functions: Dict[str, Dict[str, Any]] = {}
+    for result in results:
+        name = result["function_name"] or "unknown"
+        summary = functions.setdefault(name, {
+            "submissions": 0, "errors": 0, "scores": [], "full_marks": 0,
+            "bands": {band: 0 for _, band in SCORE_BANDS}, "methods": {}, "failed": {}
+        })
+        summary["submissions"] += 1
+        if not result["success"]:
+            summary["errors"] += 1
+        summary["scores"].append(result["score"])
+        summary["bands"][_band(result["score"])] += 1
+        if result["score"] == 100:
+            summary["full_marks"] += 1
+        for method, detail in result.get("methods", {}).items():
+            summary["methods"].setdefault(method, []).append(detail["pass_rate"])
+            for case_id in detail["failed_cases"]:
+                key = (method, case_id)
+                summary["failed"][key] = summary["failed"].get(key, 0) + 1
+
+    for summary in functions.values():
+        scores = sorted(summary.pop("scores"))
+        failed = summary.pop("failed")
+        summary["average_score"] = round(sum(scores) / len(scores), 2)
+        summary["median_score"] = scores[len(scores) // 2]
+        summary["min_score"] = scores[0]
+        summary["max_score"] = scores[-1]
+        summary["methods"] = {
+            method: round(sum(rates) / len(rates), 2) for method, rates in summary["methods"].items()
+        }
+        summary["most_failed_cases"] = [
+            {"test_method": method, "case_id": case_id, "failed_submissions": count}
+            for (method, case_id), count in sorted(failed.items(), key=lambda item: -item[1])[:MOST_FAILED_LIMIT]
+        ]
+
+    groups: Dict[Tuple[str, str], List[str]] = {}
+    for result in results:
+        groups.setdefault((result["function_name"], result["hash"]), []).append(result["student"])
+
+    return {
+        "total_submissions": len(results),
+        "unique_submissions": unique_count,
+        "errors": sum(1 for result in results if not result["success"]),
+        "average_score": round(sum(result["score"] for result in results) / len(results), 2) if results else 0,
+        "duration": f"{round(duration, 3)}s",
+        "functions": functions,
+        # 代码完全相同（规范化后）的学生分组
+        "duplicate_groups": [
+            {"function_name": function_name, "students": students}
+            for (function_name, _), students in groups.items() if len(students) > 1
+        ]
+    }
+
+
+def iter_grade_batch(submissions: List[Dict[str, Any]], test_methods: List[str] = None,
+                     case_timeout: float = DEFAULT_CASE_TIMEOUT) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    批量评测，返回的迭代器依次产出 ("student", 学生结果)（完成顺序），最后产出 ("summary", 班级汇总)
+
+    提交数为 0 或超过上限时立即抛出 ValueError；迭代器提前关闭时尚未开始的评测被取消
+    """
+    if not submissions:
+        raise ValueError("没有可评测的提交")
+    if len(submissions) > MAX_SUBMISSIONS:
+        raise ValueError(f"提交数超过上限 {MAX_SUBMISSIONS}")
+    return _grade_units(submissions, test_methods, case_timeout, time.perf_counter())
+
+
+def _grade_units(submissions: List[Dict[str, Any]], test_methods: Optional[List[str]], case_timeout: float,
+                 start_time: float) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    units: Dict[tuple, List[int]] = {}
+    for index, submission in enumerate(submissions):
+        if not submission.get("function_name"):
+            submission["function_name"] = detect_function(submission["code"])
+        submission["hash"] = normalized_hash(submission["code"])
+        methods = submission.get("test_methods") or test_methods
+        key = (submission["hash"], submission["function_name"], tuple(methods) if methods else None)
+        units.setdefault(key, []).append(index)
+
+    def grade(key):
+        code_hash, function_name, methods = key
+        if function_name is None:
+            return {"success": False, "message": "无法判断提交对应的题目，请指定 function_name"}
+        code = submissions[units[key][0]]["code"]
+        return grade_submission(code, function_name, list(methods) if methods else None, case_timeout)
+
+    results = []
+    # 每个评测单元在一个线程中占用沙箱进程，线程数与沙箱进程数相同即可让进程池保持满载
+    executor = ThreadPoolExecutor(max_workers=max(1, get_pool().size), thread_name_prefix="grade")
+    try:
+        futures = {executor.submit(grade, key): key for key in units}
+        for future in as_completed(futures):
+            indexes = units[futures[future]]
+            try:
+                graded = future.result()
+            except Exception as e:
+                graded = {"success": False, "message": f"评测失败: {str(e)}"}
+            first = submissions[indexes[0]]["student"]
+            for position, index in enumerate(indexes):
+                result = _student_result(submissions[index], index, graded, first if position else None)
+                results.append(result)
+                yield "student", result
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    results.sort(key=lambda result: result["index"])
+    yield "summary", class_summary(results, len(units), time.perf_counter() - start_time)
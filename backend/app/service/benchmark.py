@@ -0,0 +1,221 @@
+"""
+课程练习的微基准测试
+
+沙箱进程对每个用例先预热若干次，再像 timeit 一样自动确定每轮调用次数，重复多轮计时，
+报告单次调用耗时的最小值和中位数（纳秒）。参考实现在同一进程中对同一用例交替计时，
+两者的比值不受机器负载影响，比值明显偏大的用例（如意外写成 O(n²) 的循环）标记为过慢
+"""
+import math
+import os
+import statistics
+import timeit
+from typing import Dict, Any, List, Callable, Optional
+
+from app.static.homework_data import SUPPORTED_FUNCTIONS
+from app.service.sandbox import (
+    get_pool, load_function, picklable, case_limit, CaseTimeout, DEFAULT_CASE_TIMEOUT, KILL_GRACE_SECONDS
+)
+from app.service.case_generator import get_test_suite, available_methods, reference_function
+
+BENCHMARK_TASK = "app.service.benchmark:benchmark_task"
+
+# 默认的计时轮数和预热调用次数
+DEFAULT_REPEAT = 7
+DEFAULT_WARMUP = 10
+MAX_REPEAT = 50
+MAX_WARMUP = 1000
+# 每轮计时的最短时间（秒），每轮调用次数按 1, 2, 5, 10, 20, 50... 增加直到达到该时间
+MIN_ROUND_SECONDS = 0.001
+# 提交的中位耗时超过参考实现的该倍数，且差值超过 SLOW_MARGIN_NS 时判定为过慢
+SLOW_RATIO = float(os.getenv("BENCHMARK_SLOW_RATIO", 10))
+SLOW_MARGIN_NS = 20000
+
+
+def _autorange(timer: timeit.Timer) -> int:
+    """与 timeit.Timer.autorange 相同的调用次数序列，最短时间改为 MIN_ROUND_SECONDS"""
+    i = 1
+    while True:
+        for j in (1, 2, 5):
+            number = i * j
+            if timer.timeit(number) >= MIN_ROUND_SECONDS:
+                return number
+        i *= 10
+
+
+def _measure(function: Callable, args: List[Any], warmup: int, repeat: int) -> Dict[str, Any]:
+    """对一个用例计时，返回单次调用耗时（纳秒）的最小值和中位数"""
+    # 计时循环由 timeit 编译一次，循环内只有函数调用；计时期间关闭垃圾回收
+    timer = timeit.Timer("function(*args)", globals={"function": function, "args": args})
+    timer.timeit(warmup)
+    number = _autorange(timer)
+    per_call = [seconds / number * 1e9 for seconds in timer.repeat(repeat, number)]
+    return {
+        "min_ns": int(min(per_call)),
+        "median_ns": int(statistics.median(per_call)),
+        "number": number,
+    }
+
+
+def _benchmark_one(function: Callable, args: List[Any], warmup: int, repeat: int, timeout: float) -> Dict[str, Any]:
+    """先执行一次取得输出，正常返回的用例再计时；抛出异常的用例不计时"""
+    try:
+        with case_limit(timeout):
+            actual = function(*args)
+    except CaseTimeout:
+        return {"actual": None, "error": f"执行超时(>{timeout}s)"}
+    except BaseException as e:
+        return {"actual": None, "error": str(e)}
+    try:
+        with case_limit(timeout):
+            timing = _measure(function, args, warmup, repeat)
+    except CaseTimeout:
+        return {"actual": picklable(actual), "error": None, "timing_error": f"计时超时(>{timeout}s)"}
+    except BaseException as e:
+        # 第一次调用正常但重复调用出错，说明函数依赖可变的全局状态
+        return {"actual": picklable(actual), "error": None, "timing_error": f"重复执行出错: {str(e)}"}
+    return {"actual": picklable(actual), "error": None, **timing}
+
+
+def benchmark_task(payload: Dict[str, Any], emit: Callable):
+    """
+    沙箱进程内逐个用例计时，每个用例依次测量提交代码和参考实现
+
+    payload: {code, function_name, cases, case_timeout, warmup, repeat}
+    每个结果为 {"actual", "error", "min_ns", "median_ns", "number", "reference": {"min_ns", "median_ns", "number"}}
+    """
+    timeout = payload.get("case_timeout", DEFAULT_CASE_TIMEOUT)
+    warmup = payload.get("warmup", DEFAULT_WARMUP)
+    repeat = payload.get("repeat", DEFAULT_REPEAT)
+    try:
+        function = load_function(payload["code"], payload["function_name"], timeout)
+    except CaseTimeout:
+        return {"error": "代码执行错误: 模块加载超时"}
+    except BaseException as e:
+        return {"error": f"代码执行错误: {str(e)}"}
+    if function is None:
+        return {"error": f"代码中未找到函数: {payload['function_name']}", "not_found": True}
+    reference = reference_function(payload["function_name"])
+
+    for case in payload["cases"]:
+        case_input = case["input"]
+        args = case_input if isinstance(case_input, list) else [case_input]
+        item = _benchmark_one(function, args, warmup, repeat, timeout)
+        if "median_ns" in item:
+            item["reference"] = _benchmark_one(reference, args, warmup, repeat, timeout)
+        emit(item)
+    return None
+
+
+def _ratio(outcome: Dict[str, Any]) -> Optional[float]:
+    reference = outcome.get("reference") or {}
+    if "median_ns" not in outcome or "median_ns" not in reference:
+        return None
+    return outcome["median_ns"] / max(reference["median_ns"], 1)
+
+
+def _is_slow(outcome: Dict[str, Any], ratio: Optional[float]) -> bool:
+    if ratio is None:
+        return False
+    return ratio > SLOW_RATIO and outcome["median_ns"] - outcome["reference"]["median_ns"] > SLOW_MARGIN_NS
+
+
+def _case_result(index: int, case: Dict[str, Any], outcome: Dict[str, Any]) -> Dict[str, Any]:
+    expected = case["expected"]
+    actual = outcome["actual"] if outcome["error"] is None else f"执行错误: {outcome['error']}"
+    ratio = _ratio(outcome)
+    reference = outcome.get("reference") or {}
+    return {
+        "ID": index + 1,
+        "Input": case["input"],
+        "Expected": expected,
+        "Actual": actual,
+        "Passed": actual == expected,
+        "MinNs": outcome.get("min_ns"),
+        "MedianNs": outcome.get("median_ns"),
+        "Number": outcome.get("number"),
+        "ReferenceMinNs": reference.get("min_ns"),
+        "ReferenceMedianNs": reference.get("median_ns"),
+        "Ratio": round(ratio, 2) if ratio is not None else None,
+        "Slow": _is_slow(outcome, ratio),
+        "TimingError": outcome.get("timing_error") or reference.get("timing_error") or reference.get("error"),
+    }
+
+
+def run_benchmark(code: str, function_name: str, test_method: str, repeat: int = DEFAULT_REPEAT,
+                  warmup: int = DEFAULT_WARMUP, case_timeout: float = DEFAULT_CASE_TIMEOUT,
+                  on_case: Callable[[Dict[str, Any]], None] = None) -> Dict[str, Any]:
+    """
+    对测试方法的每个用例做微基准测试，并与参考实现的耗时比较
+
+    Args:
+        repeat: 计时轮数，结果取各轮单次耗时的最小值和中位数
+        warmup: 计时前的预热调用次数
+        case_timeout: 提交代码和参考实现各自对单个用例（含全部计时轮）的时间上限
+        on_case: 每个用例完成时以该用例的结果调用（完成顺序）
+    """
+    if function_name not in SUPPORTED_FUNCTIONS:
+        return {
+            "success": False,
+            "message": f"不支持的函数: {function_name}",
+            "available_functions": SUPPORTED_FUNCTIONS
+        }
+    suite = get_test_suite(function_name, test_method)
+    if suite is None:
+        return {
+            "success": False,
+            "message": f"函数{function_name}不支持的测试方法: {test_method}",
+            "available_methods": available_methods(function_name)
+        }
+    repeat = max(1, min(int(repeat), MAX_REPEAT))
+    warmup = max(0, min(int(warmup), MAX_WARMUP))
+    cases = suite["cases"]
+
+    def _forward(index, outcome):
+        on_case(_case_result(index, cases[index], outcome))
+
+    on_result = _forward if on_case is not None else None
+
+    # 每个用例最多依次执行：输出、提交代码计时、参考实现输出、参考实现计时
+    run_result = get_pool().run_cases(
+        code, function_name, cases, case_timeout, on_result,
+        task=BENCHMARK_TASK,
+        options={"warmup": warmup, "repeat": repeat},
+        item_timeout=case_timeout * 4 + KILL_GRACE_SECONDS
+    )
+    if "error" in run_result:
+        return {"success": False, "message": run_result["error"], "function_name": function_name}
+
+    test_results = [_case_result(i, case, outcome)
+                    for i, (case, outcome) in enumerate(zip(cases, run_result["results"]))]
+    ratios = [result["Ratio"] for result in test_results if result["Ratio"]]
+    timed = [result for result in test_results if result["MedianNs"] is not None]
+    slow_cases = [result["ID"] for result in test_results if result["Slow"]]
+    passed_count = sum(1 for result in test_results if result["Passed"])
+    total_cases = len(test_results)
+
+    return {
+        "success": True,
+        "function_name": function_name,
+        "test_method": test_method,
+        "test_name": suite["name"],
+        "summary": {
+            "total_cases": total_cases,
+            "passed_cases": passed_count,
+            "failed_cases": total_cases - passed_count,
+            "pass_rate": f"{round(passed_count / total_cases * 100, 2) if total_cases else 0}%"
+        },
+        "benchmark": {
+            "repeat": repeat,
+            "warmup": warmup,
+            "timed_cases": len(timed),
+            "total_median_ns": sum(result["MedianNs"] for result in timed),
+            "reference_total_median_ns": sum(result["ReferenceMedianNs"] or 0 for result in timed),
+            # 各用例耗时比值的几何平均，不受个别慢用例支配
+            "geomean_ratio": round(math.exp(sum(math.log(r) for r in ratios) / len(ratios)), 2) if ratios else None,
+            "max_ratio": max(ratios) if ratios else None,
+            "slow_ratio": SLOW_RATIO,
+            "slow_cases": slow_cases,
+            "slow": bool(slow_cases),
+        },
+        "test_results": test_results
+    }
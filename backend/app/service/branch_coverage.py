@@ -0,0 +1,310 @@
+"""
+被测代码的分支覆盖统计
+
+沙箱进程在执行每个用例时记录被测代码内部的行跳转（弧），父进程根据代码的语法树
+把弧换算为分支覆盖：if / elif / while / for 语句的真假两个出口各算一个分支。
+
+Python 3.12 及以上使用 sys.monitoring，非被测代码的位置在首次触发后即被禁用；
+更早的版本退回 sys.settrace，只对被测代码的帧安装行跟踪函数，其余帧不产生开销。
+条件表达式、布尔短路等同一行内的分支无法通过行事件区分，不在统计范围内
+"""
+import ast
+import sys
+from typing import Dict, Any, List, Optional, Set, Tuple
+
+Arc = Tuple[int, int]
+
+BACKEND = "sys.monitoring" if hasattr(sys, "monitoring") else "sys.settrace"
+
+_BRANCH_KINDS = {ast.If: "if", ast.While: "while", ast.For: "for", ast.AsyncFor: "for"}
+_OUTCOME_LABELS = {
+    "if": ("条件为真", "条件为假"),
+    "while": ("进入循环体", "退出循环"),
+    "for": ("进入循环体", "退出循环"),
+}
+
+
+# ---------------------------------------------------------------------------
+# 沙箱进程内：收集执行弧
+# ---------------------------------------------------------------------------
+
+class _TraceBackend:
+    """sys.settrace 实现：只有被测代码的帧返回行跟踪函数"""
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.arcs: Set[Arc] = set()
+
+    def _trace_call(self, frame, event, arg):
+        code = frame.f_code
+        if event != "call" or code.co_filename != self.filename:
+            return None
+        arcs = self.arcs
+        exit_line = -code.co_firstlineno
+        last = exit_line
+
+        def trace_line(frame, event, arg):
+            nonlocal last
+            if event == "line":
+                line = frame.f_lineno
+                arcs.add((last, line))
+                last = line
+            elif event == "return":
+                arcs.add((last, exit_line))
+            return trace_line
+
+        return trace_line
+
+    def start(self):
+        self.arcs = set()
+        sys.settrace(self._trace_call)
+
+    def stop(self) -> Set[Arc]:
+        sys.settrace(None)
+        return self.arcs
+
+
+class _MonitoringBackend:
+    """sys.monitoring 实现（Python 3.12+），每个进程只注册一次回调"""
+
+    TOOL_NAME = "branch_coverage"
+    _registered: Optional["_MonitoringBackend"] = None
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.arcs: Set[Arc] = set()
+        self._last: Dict[Any, int] = {}
+        monitoring = sys.monitoring
+        self.tool_id = monitoring.COVERAGE_ID
+        if monitoring.get_tool(self.tool_id) != self.TOOL_NAME:
+            monitoring.use_tool_id(self.tool_id, self.TOOL_NAME)
+        events = monitoring.events
+        monitoring.register_callback(self.tool_id, events.PY_START, self._on_start)
+        monitoring.register_callback(self.tool_id, events.LINE, self._on_line)
+        monitoring.register_callback(self.tool_id, events.PY_RETURN, self._on_return)
+        monitoring.register_callback(self.tool_id, events.PY_UNWIND, self._on_unwind)
+        _MonitoringBackend._registered = self
+
+    def _on_start(self, code, offset):
+        if code.co_filename != self.filename:
+            return sys.monitoring.DISABLE
+        self._last[code] = -code.co_firstlineno
+
+    def _on_line(self, code, line):
+        if code.co_filename != self.filename:
+            return sys.monitoring.DISABLE
+        self.arcs.add((self._last.get(code, -code.co_firstlineno), line))
+        self._last[code] = line
+
+    def _on_return(self, code, offset, retval):
+        if code.co_filename != self.filename:
+            return sys.monitoring.DISABLE
+        self.arcs.add((self._last.get(code, -code.co_firstlineno), -code.co_firstlineno))
+
+    def _on_unwind(self, code, offset, exception):
+        # PY_UNWIND 不是局部事件，不能返回 DISABLE
+        if code.co_filename == self.filename:
+            self.arcs.add((self._last.get(code, -code.co_firstlineno), -code.co_firstlineno))
+
+    def start(self):
+        self.arcs = set()
+        self._last.clear()
+        events = sys.monitoring.events
+        sys.monitoring.set_events(
+            self.tool_id, events.PY_START | events.LINE | events.PY_RETURN | events.PY_UNWIND
+        )
+
+    def stop(self) -> Set[Arc]:
+        sys.monitoring.set_events(self.tool_id, 0)
+        return self.arcs
+
+
+class ArcCollector:
+    """
+    记录指定文件名的代码在 start() 与 stop() 之间执行过的弧 (上一行, 当前行)
+
+    函数入口和出口用负的首行号表示，例如 (-1, 2) 为进入函数后执行第 2 行，
+    (5, -1) 为执行第 5 行后函数返回或抛出异常
+    """
+
+    def __init__(self, filename: str):
+        if BACKEND == "sys.monitoring":
+            backend = _MonitoringBackend._registered
+            if backend is None or backend.filename != filename:
+                backend = _MonitoringBackend(filename)
+            self._backend = backend
+        else:
+            self._backend = _TraceBackend(filename)
+
+    def start(self):
+        self._backend.start()
+
+    def stop(self) -> List[Arc]:
+        return sorted(self._backend.stop())
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.arcs = self.stop()
+        return False
+
+
+# ---------------------------------------------------------------------------
+# 父进程：静态分析与覆盖率汇总
+# ---------------------------------------------------------------------------
+
+class _FunctionBodyVisitor(ast.NodeVisitor):
+    """只收集函数体内的语句，模块级代码在加载时执行，不计入用例覆盖"""
+
+    def __init__(self, source_lines: List[str]):
+        self.source_lines = source_lines
+        self.depth = 0
+        self.lines: Set[int] = set()
+        self.branches: List[Dict[str, Any]] = []
+
+    def _visit_function(self, node):
+        self.depth += 1
+        body = node.body
+        if body and isinstance(body[0], ast.Expr) and isinstance(body[0].value, ast.Constant) \
+                and isinstance(body[0].value.value, str):
+            body = body[1:]
+        for statement in body:
+            self.visit(statement)
+        self.depth -= 1
+
+    visit_FunctionDef = _visit_function
+    visit_AsyncFunctionDef = _visit_function
+
+    def generic_visit(self, node):
+        if self.depth and isinstance(node, ast.stmt) and not isinstance(node, (ast.Global, ast.Nonlocal)):
+            self.lines.add(node.lineno)
+            kind = _BRANCH_KINDS.get(type(node))
+            if kind is not None:
+                self._add_branch(node, kind)
+        super().generic_visit(node)
+
+    def _add_branch(self, node, kind: str):
+        header = node.iter if kind == "for" else node.test
+        header_lines = set(range(node.lineno, header.end_lineno + 1))
+        body_line = node.body[0].lineno
+        # 条件与语句体写在同一行时无法从行事件区分真假出口
+        if body_line in header_lines:
+            return
+        if kind == "if" and self._is_elif(node):
+            kind_label = "elif"
+        else:
+            kind_label = kind
+        source = self.source_lines[node.lineno - 1].strip() if node.lineno <= len(self.source_lines) else ""
+        true_label, false_label = _OUTCOME_LABELS[kind]
+        for outcome, label in ((True, true_label), (False, false_label)):
+            self.branches.append({
+                "id": f"{node.lineno}:{'T' if outcome else 'F'}",
+                "line": node.lineno,
+                "kind": kind_label,
+                "outcome": label,
+                "source": source,
+                "_header": header_lines,
+                "_body": body_line,
+                "_true": outcome,
+            })
+
+    def _is_elif(self, node) -> bool:
+        line = self.source_lines[node.lineno - 1] if node.lineno <= len(self.source_lines) else ""
+        return line.lstrip().startswith("elif")
+
+
+def analyze_code(code: str) -> Dict[str, Any]:
+    """解析被测代码，返回 {"lines": 可执行行号集合, "branches": 分支列表}；语法错误时返回空结构"""
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return {"lines": set(), "branches": []}
+    visitor = _FunctionBodyVisitor(code.splitlines())
+    visitor.visit(tree)
+    return {"lines": visitor.lines, "branches": visitor.branches}
+
+
+def covered_branches(branches: List[Dict[str, Any]], arcs) -> List[str]:
+    """根据执行弧判断覆盖的分支：进入语句体为真出口，从条件行跳到其他位置为假出口"""
+    covered = []
+    for branch in branches:
+        header, body = branch["_header"], branch["_body"]
+        for source, target in arcs:
+            if source not in header or target in header:
+                continue
+            if (target == body) == branch["_true"]:
+                covered.append(branch["id"])
+                break
+    return covered
+
+
+def minimal_cover(case_branches: List[Set[str]]) -> List[int]:
+    """
+    贪心求覆盖全部已覆盖分支的最小用例子集，返回用例下标
+
+    每次选择新覆盖分支最多的用例，分支数相同时取靠前的用例
+    """
+    remaining = set().union(*case_branches) if case_branches else set()
+    selected = []
+    while remaining:
+        best, gain = None, 0
+        for index, branches in enumerate(case_branches):
+            count = len(branches & remaining)
+            if count > gain:
+                best, gain = index, count
+        if best is None:
+            break
+        selected.append(best)
+        remaining -= case_branches[best]
+    return sorted(selected)
+
+
+def _rate(covered: int, total: int) -> str:
+    return f"{round(covered / total * 100, 2) if total else 100.0}%"
+
+
+def summarize(code: str, case_arcs: List[Optional[list]]) -> Dict[str, Any]:
+    """
+    汇总一组用例的覆盖情况
+
+    Args:
+        case_arcs: 与用例顺序一致的执行弧列表，沙箱进程被杀的用例为 None
+
+    Returns:
+        {"summary", "case_branches": 每个用例覆盖的分支ID, "minimal_cases": 最小覆盖子集的用例ID,
+         "missing_branches", "missing_lines"}
+    """
+    analysis = analyze_code(code)
+    branches, lines = analysis["branches"], analysis["lines"]
+
+    case_branches = []
+    executed_lines = set()
+    for arcs in case_arcs:
+        arcs = arcs or []
+        case_branches.append(set(covered_branches(branches, arcs)))
+        executed_lines.update(target for _, target in arcs if target > 0)
+
+    all_covered = set().union(*case_branches) if case_branches else set()
+    covered_lines = lines & executed_lines
+    order = {branch["id"]: position for position, branch in enumerate(branches)}
+
+    return {
+        "backend": BACKEND,
+        "summary": {
+            "total_branches": len(branches),
+            "covered_branches": len(all_covered),
+            "branch_rate": _rate(len(all_covered), len(branches)),
+            "total_lines": len(lines),
+            "covered_lines": len(covered_lines),
+            "line_rate": _rate(len(covered_lines), len(lines)),
+        },
+        "case_branches": [sorted(ids, key=order.get) for ids in case_branches],
+        "minimal_cases": [index + 1 for index in minimal_cover(case_branches)],
+        "missing_branches": [
+            {key: branch[key] for key in ("id", "line", "kind", "outcome", "source")}
+            for branch in branches if branch["id"] not in all_covered
+        ],
+        "missing_lines": sorted(lines - covered_lines),
+    }
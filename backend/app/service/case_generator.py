@@ -0,0 +1,297 @@
+"""
+根据题目规格生成边界值、等价类和决策表测试用例
+
+规格定义在 app.static.case_specs 中，期望结果由 HOMEWORK_CODES 中的参考实现计算。
+生成结果按 (规格哈希, 测试方法) 缓存，规格或参考实现修改后自动重新生成
+"""
+import hashlib
+import itertools
+import json
+import threading
+from typing import Dict, Any, List, Optional, Callable
+
+from app.static.case_specs import CASE_SPECS
+from app.static.homework_data import HOMEWORK_CODES, TEST_CASES
+
+# 可由规格生成的测试方法
+GENERATED_METHODS = {
+    "boundary_basic": "基本边界值测试",
+    "boundary_robust": "健壮边界值测试",
+    "equivalent_weak": "弱一般等价类测试",
+    "equivalent_strong": "强一般等价类测试",
+    "equivalent_weak_robust": "弱健壮等价类测试",
+    "equivalent_strong_robust": "强健壮等价类测试",
+    "decision_table": "决策表测试",
+}
+# 决策表展开的规则数上限
+MAX_DECISION_RULES = 512
+# 条件表达式中可用的内置函数
+_EXPRESSION_BUILTINS = {"all": all, "any": any, "min": min, "max": max, "abs": abs, "len": len}
+
+_suite_cache: Dict[tuple, Dict[str, Any]] = {}
+_reference_cache: Dict[str, Callable] = {}
+_cache_lock = threading.Lock()
+
+
+def spec_hash(function_name: str, spec: Dict[str, Any]) -> str:
+    """规格与参考实现源码共同决定生成结果"""
+    content = json.dumps(spec, sort_keys=True, ensure_ascii=False) + HOMEWORK_CODES.get(function_name, "")
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+
+def reference_function(function_name: str) -> Callable:
+    """参考实现是项目自带的可信代码，直接在服务进程中执行"""
+    code = HOMEWORK_CODES[function_name]
+    function = _reference_cache.get(code)
+    if function is None:
+        namespace = {"__name__": "__reference__"}
+        exec(compile(code, f"<reference:{function_name}>", "exec"), namespace)
+        function = _reference_cache[code] = namespace[function_name]
+    return function
+
+
+def _expected(function: Callable, case_input: List[Any]) -> Any:
+    """参考实现抛出异常时，期望结果与 generate_test_cases 中异常用例的实际结果格式一致"""
+    try:
+        return function(*case_input)
+    except Exception as e:
+        return f"执行错误: {str(e)}"
+
+
+def _dedupe(inputs: List[List[Any]]) -> List[List[Any]]:
+    seen, unique = set(), []
+    for case_input in inputs:
+        key = tuple(case_input)
+        if key not in seen:
+            seen.add(key)
+            unique.append(list(case_input))
+    return unique
+
+
+# ---------------------------------------------------------------------------
+# 各测试方法的输入生成
+# ---------------------------------------------------------------------------
+
+def _nominal(spec) -> List[Any]:
+    return [param["nominal"] for param in spec["params"]]
+
+
+def _boundary_inputs(spec, robust: bool) -> List[List[Any]]:
+    """单缺陷假设：每次只让一个参数取边界值，其余参数取正常值"""
+    nominal = _nominal(spec)
+    inputs = []
+    for position, param in enumerate(spec["params"]):
+        values = [param["min"], param["min"] + 1, param["max"] - 1, param["max"]]
+        if robust:
+            values = [param["min"] - 1] + values + [param["max"] + 1]
+        for value in values:
+            case_input = list(nominal)
+            case_input[position] = value
+            inputs.append(case_input)
+    inputs.append(nominal)
+    return inputs
+
+
+def _class_values(spec, kind: str) -> List[List[Any]]:
+    """每个参数指定类型等价类的代表值；规格中没有给出时使用正常值"""
+    values = []
+    for param in spec["params"]:
+        classes = spec.get("partitions", {}).get(param["name"], {}).get(kind, [])
+        if kind == "valid" and not classes:
+            classes = [{"value": param["nominal"]}]
+        values.append([item["value"] for item in classes])
+    return values
+
+
+def _output_class_inputs(spec) -> List[List[Any]]:
+    return [item["input"] for item in spec.get("output_classes", [])]
+
+
+def _equivalent_inputs(spec, strong: bool, robust: bool) -> List[List[Any]]:
+    valid = _class_values(spec, "valid")
+    invalid = _class_values(spec, "invalid")
+
+    if strong:
+        # 强等价类：各参数等价类的笛卡尔积，健壮时无效类也参与组合
+        domains = [v + i for v, i in zip(valid, invalid)] if robust else valid
+        inputs = [list(combination) for combination in itertools.product(*domains)]
+    else:
+        # 弱等价类：用例数等于等价类最多的参数的类数，每个用例覆盖各参数的一个有效类
+        width = max(len(values) for values in valid)
+        inputs = [[values[i % len(values)] for values in valid] for i in range(width)]
+        if robust:
+            # 弱健壮：每个无效类单独一个用例，其余参数取第一个有效类
+            base = [values[0] for values in valid]
+            for position, values in enumerate(invalid):
+                for value in values:
+                    case_input = list(base)
+                    case_input[position] = value
+                    inputs.append(case_input)
+    return inputs + _output_class_inputs(spec)
+
+
+def _compile_expression(expression: str):
+    return compile(expression, "<case_spec>", "eval")
+
+
+def _candidate_inputs(spec) -> List[List[Any]]:
+    """决策表规则的候选输入：正常值、等价类代表值和边界值的组合，正常值优先"""
+    per_param = []
+    for position, param in enumerate(spec["params"]):
+        partitions = spec.get("partitions", {}).get(param["name"], {})
+        values = [param["nominal"]]
+        values += [item["value"] for item in partitions.get("valid", [])]
+        values += [param["min"], param["min"] + 1, param["max"] - 1, param["max"]]
+        values += [item["value"] for item in partitions.get("invalid", [])]
+        values += [param["min"] - 1, param["max"] + 1]
+        values += [item["input"][position] for item in spec.get("output_classes", [])]
+        per_param.append(list(dict.fromkeys(values)))
+    return [list(combination) for combination in itertools.product(*per_param)]
+
+
+def _decision_rules(spec) -> List[Dict[str, Any]]:
+    """
+    按条件顺序展开规则，final 条目之后的条件记为 "-"
+
+    每条规则选取第一个满足全部条件的候选输入，没有候选输入满足的规则视为不可能的组合并跳过
+    """
+    names = [param["name"] for param in spec["params"]]
+    definitions = [(name, _compile_expression(expression))
+                   for name, expression in spec.get("definitions", {}).items()]
+    conditions = [
+        [(entry["name"], _compile_expression(entry["when"]), entry.get("final", False))
+         for entry in condition["entries"]]
+        for condition in spec.get("decision_conditions", [])
+    ]
+
+    # 预先计算每个候选输入的变量环境
+    environments = []
+    for case_input in _candidate_inputs(spec):
+        env = dict(zip(names, case_input))
+        try:
+            for name, compiled in definitions:
+                env[name] = eval(compiled, {"__builtins__": _EXPRESSION_BUILTINS}, env)
+        except Exception:
+            continue
+        environments.append((case_input, env))
+
+    def holds(compiled, env):
+        try:
+            return bool(eval(compiled, {"__builtins__": _EXPRESSION_BUILTINS}, env))
+        except Exception:
+            return False
+
+    rules = []
+
+    def expand(depth, entries, candidates):
+        if len(rules) >= MAX_DECISION_RULES or not candidates:
+            return
+        if depth == len(conditions):
+            rules.append({"entries": entries, "input": candidates[0][0]})
+            return
+        for name, compiled, final in conditions[depth]:
+            matched = [item for item in candidates if holds(compiled, item[1])]
+            if final:
+                if matched:
+                    rules.append({
+                        "entries": entries + [name] + ["-"] * (len(conditions) - depth - 1),
+                        "input": matched[0][0]
+                    })
+                continue
+            expand(depth + 1, entries + [name], matched)
+
+    expand(0, [], environments)
+
+    condition_names = [condition["name"] for condition in spec.get("decision_conditions", [])]
+    for rule in rules:
+        rule["description"] = ", ".join(
+            f"{name}: {entry}" for name, entry in zip(condition_names, rule["entries"])
+        )
+    return rules
+
+
+# ---------------------------------------------------------------------------
+# 对外接口
+# ---------------------------------------------------------------------------
+
+def _ranges_text(spec) -> str:
+    return "，".join(f"{param['name']}∈[{param['min']},{param['max']}]" for param in spec["params"])
+
+
+def generate_suite(function_name: str, test_method: str, spec: Dict[str, Any] = None) -> Dict[str, Any]:
+    """
+    按规格生成一个测试方法的用例集，格式与 TEST_CASES 中的测试方法一致
+
+    Returns:
+        {"name", "description", "cases": [{"input", "expected"}], "generated": True}
+    """
+    spec = spec or CASE_SPECS[function_name]
+    if test_method not in GENERATED_METHODS:
+        raise ValueError(f"不支持生成的测试方法: {test_method}")
+
+    key = (spec_hash(function_name, spec), test_method)
+    suite = _suite_cache.get(key)
+    if suite is not None:
+        return suite
+
+    descriptions = {}
+    if test_method in ("boundary_basic", "boundary_robust"):
+        robust = test_method == "boundary_robust"
+        inputs = _boundary_inputs(spec, robust)
+        values = "min-1, min, min+1, max-1, max, max+1" if robust else "min, min+1, max-1, max"
+        description = f"每次一个参数取 {values}，其余参数取正常值（{_ranges_text(spec)}）"
+    elif test_method == "decision_table":
+        rules = _decision_rules(spec)
+        inputs = [rule["input"] for rule in rules]
+        descriptions = {tuple(rule["input"]): rule["description"] for rule in rules}
+        description = f"按条件桩展开的 {len(rules)} 条决策规则，每条规则一个用例"
+    else:
+        strong = "strong" in test_method
+        robust = test_method.endswith("robust")
+        inputs = _equivalent_inputs(spec, strong, robust)
+        description = ("各参数等价类的笛卡尔积组合" if strong else "每个等价类至少被一个用例覆盖") + \
+                      ("，包含无效等价类" if robust else "")
+
+    inputs = _dedupe(inputs + spec.get("extra_cases", {}).get(test_method, []))
+    reference = reference_function(function_name)
+    cases = []
+    for case_input in inputs:
+        case = {"input": case_input, "expected": _expected(reference, case_input)}
+        if tuple(case_input) in descriptions:
+            case["rule"] = descriptions[tuple(case_input)]
+        cases.append(case)
+
+    suite = {
+        "name": GENERATED_METHODS[test_method],
+        "description": description,
+        "cases": cases,
+        "generated": True,
+    }
+    with _cache_lock:
+        _suite_cache[key] = suite
+    return suite
+
+
+def available_methods(function_name: str) -> List[str]:
+    """题目支持的测试方法：规格可生成的方法加上 TEST_CASES 中手写的方法"""
+    methods = list(GENERATED_METHODS) if function_name in CASE_SPECS else []
+    methods += [method for method in TEST_CASES.get(function_name, {}).get("test_methods", {})
+                if method not in methods]
+    return methods
+
+
+def get_test_suite(function_name: str, test_method: str) -> Optional[Dict[str, Any]]:
+    """
+    取得测试用例集：TEST_CASES 中的手写用例优先，保证已有题目的评分范围不变；
+    没有手写用例的方法再按规格生成
+    """
+    suite = TEST_CASES.get(function_name, {}).get("test_methods", {}).get(test_method)
+    if suite is None and function_name in CASE_SPECS and test_method in GENERATED_METHODS:
+        suite = generate_suite(function_name, test_method)
+    return suite
+
+
+def clear_cache():
+    with _cache_lock:
+        _suite_cache.clear()
+        _reference_cache.clear()
@@ -1,9 +1,12 @@
 import time
 import inspect
+import threading
 from typing import List, Dict, Any, Optional
 from dataclasses import dataclass
 from enum import Enum
 
+from app.service.async_bridge import TaskLocal
+
 # 模拟数据模型
 @dataclass
 class User:
@@ -26,6 +29,9 @@ class HTTPException(Exception):
         super().__init__(detail)
 
 class DetectTestService:
+    # 当前认证用户，每个测试任务各自独立
+    current_user = TaskLocal()
+
     def __init__(self):
         # 模拟数据库数据
         self.mock_users = {
@@ -57,9 +63,6 @@ class DetectTestService:
                 createdAt="2024-01-03"
             )
         }
-        
-        # 当前认证用户
-        self.current_user = None
     
     def set_current_user(self, user_id: str):
         """设置当前认证用户"""
@@ -487,4 +490,18 @@ class DetectTestService:
             "failed_cases": [r for r in results if r['result'] == 'FAIL'],
             "error_cases": [r for r in results if r['result'] == 'ERROR'],
             "function_info": self.get_function_source_code()
-        }
\ No newline at end of file
+        }
+
+
+_service: Optional[DetectTestService] = None
+_service_lock = threading.Lock()
+
+
+def get_detect_test_service() -> DetectTestService:
+    """进程级共享的服务实例，模拟数据只在首次使用时构造一次，之后只读"""
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = DetectTestService()
+    return _service
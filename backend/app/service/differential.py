@@ -0,0 +1,315 @@
+"""
+课程练习各版本之间的差分测试
+
+同一道练习有三份实现：发给学生的 course_exercise/*.py、评测使用的 HOMEWORK_CODES 参考代码，
+以及穷举预言中的 NumPy 向量化实现。三者在同一个沙箱进程中对相同的输入逐块执行，
+输出按穷举预言的类别归一化后比较（数值结果允许 VALUE_TOLERANCE 的误差），
+与 HOMEWORK_CODES 不一致的输入点按各实现的输出分组报告
+"""
+import json
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Callable
+
+import numpy as np
+
+from app.static.homework_data import HOMEWORK_CODES
+from app.service.sandbox import get_pool, load_function, CaseTimeout, SandboxError, KILL_GRACE_SECONDS
+from app.service.case_generator import get_test_suite, available_methods
+from app.service.oracle import (
+    get_oracle, ExhaustiveOracle, evaluate_block, mismatches, outcome_label,
+    BLOCK_SIZE, DEFAULT_BLOCK_TIMEOUT, VALUE
+)
+
+DIFFERENTIAL_TASK = "app.service.differential:differential_task"
+
+COURSE_EXERCISE_DIR = os.getenv(
+    "COURSE_EXERCISE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "course_exercise")
+)
+# 题目对应的 course_exercise 文件和其中的函数名
+COURSE_EXERCISES = {
+    "triangle_judge": ("triangle_judge.py", "triangle_judge"),
+    "computer_selling": ("computer_selling.py", "computer_selling"),
+    "telecom_system": ("telecom_system.py", "telecom_system"),
+    "calendar_problem": ("calendar_problem.py", "calendar_problem"),
+    "seller_bonus": ("selller_bonus.py", "calculate_commission"),
+}
+SUPPORTED_DIFFERENTIAL = list(COURSE_EXERCISES)
+
+# 输入域：测试方法生成的全部用例，或穷举预言的整个输入域
+DOMAINS = ("generated", "exhaustive")
+# 作为比较基准的实现
+BASELINE = "homework_data"
+NUMPY_ORACLE = "numpy_oracle"
+# 报告中最多列出的分歧分组数和每组的样例数
+MAX_GROUPS = 20
+SAMPLE_SIZE = 5
+
+
+def implementations(function_name: str) -> List[Dict[str, str]]:
+    """题目的各 Python 实现 [{"name", "source", "code", "function_name"}]，基准实现排在第一位"""
+    file_name, course_function = COURSE_EXERCISES[function_name]
+    path = os.path.normpath(os.path.join(COURSE_EXERCISE_DIR, file_name))
+    with open(path, "r", encoding="utf-8") as f:
+        course_code = f.read()
+    return [
+        {"name": BASELINE, "source": f"HOMEWORK_CODES['{function_name}']",
+         "code": HOMEWORK_CODES[function_name], "function_name": function_name},
+        {"name": "course_exercise", "source": path, "code": course_code, "function_name": course_function},
+    ]
+
+
+# ---------------------------------------------------------------------------
+# 沙箱进程内执行的部分
+# ---------------------------------------------------------------------------
+
+def _describe(oracle: ExhaustiveOracle, code: int, value: float, labels: List[str]) -> Any:
+    described = oracle.describe(code, value)
+    return described if described is not None else outcome_label(oracle, code, value, labels)
+
+
+def _numpy_outcome(oracle: ExhaustiveOracle, columns: List[np.ndarray]):
+    """向量化实现的输出；生成用例中有无法转换为数值数组的输入时返回 None"""
+    try:
+        codes, values = oracle.reference(*[np.asarray(column.tolist()) for column in columns])
+    except Exception:
+        return None
+    size = len(columns[0])
+    return (np.broadcast_to(np.asarray(codes, dtype=np.int16), size),
+            np.broadcast_to(np.asarray(values, dtype=np.float64), size), [])
+
+
+def differential_task(payload: Dict[str, Any], emit: Callable):
+    """
+    在沙箱进程中比较各实现在一段输入上的输出，每比较完一块发回分歧统计和样例
+
+    payload: {function_name, implementations: [{"name", "code", "function_name"}],
+              start, stop（穷举输入域的扁平下标范围）或 inputs（生成的用例输入）, block_timeout}
+    """
+    block_timeout = payload.get("block_timeout", DEFAULT_BLOCK_TIMEOUT)
+    oracle = get_oracle(payload["function_name"])
+    functions = []
+    for implementation in payload["implementations"]:
+        try:
+            function = load_function(implementation["code"], implementation["function_name"], block_timeout)
+        except CaseTimeout:
+            return {"error": f"{implementation['name']} 加载超时"}
+        except BaseException as e:
+            return {"error": f"{implementation['name']} 执行错误: {str(e)}"}
+        if function is None:
+            return {"error": f"{implementation['name']} 中未找到函数: {implementation['function_name']}"}
+        functions.append((implementation["name"], function))
+
+    inputs = payload.get("inputs")
+    if inputs is None:
+        ranges = [(start, min(start + BLOCK_SIZE, payload["stop"]))
+                  for start in range(payload["start"], payload["stop"], BLOCK_SIZE)]
+    else:
+        ranges = [(start, min(start + BLOCK_SIZE, len(inputs))) for start in range(0, len(inputs), BLOCK_SIZE)]
+
+    for block_start, block_stop in ranges:
+        if inputs is None:
+            columns = oracle.points(np.arange(block_start, block_stop, dtype=np.int64))
+        else:
+            rows = inputs[block_start:block_stop]
+            columns = [np.array([row[position] for row in rows], dtype=object) for position in range(len(rows[0]))]
+
+        outcomes = {}
+        timed_out = None
+        for name, function in functions:
+            codes, values, labels, timeout_at = evaluate_block(oracle, function, columns, block_timeout)
+            outcomes[name] = (np.asarray(codes, dtype=np.int16), np.asarray(values, dtype=np.float64), labels)
+            if timeout_at is not None and timed_out is None:
+                timed_out = name
+        numpy_outcome = _numpy_outcome(oracle, columns)
+        if numpy_outcome is not None:
+            outcomes[NUMPY_ORACLE] = numpy_outcome
+
+        # 有实现超时时只比较全部实现都执行到的部分
+        checked = min(len(codes) for codes, _, _ in outcomes.values())
+        base_codes, base_values, base_labels = outcomes[BASELINE]
+        base_codes, base_values = base_codes[:checked], base_values[:checked]
+        divergent = np.zeros(checked, dtype=bool)
+        by_implementation = {}
+        for name, (codes, values, labels) in outcomes.items():
+            if name == BASELINE:
+                continue
+            codes, values = codes[:checked], values[:checked]
+            wrong = mismatches(base_codes, base_values, codes, values)
+            # 异常和未知输出的数值字段是标签下标，按标签文本比较
+            same_label = (base_codes == codes) & (codes < VALUE)
+            for position in np.nonzero(same_label)[0]:
+                if base_labels[int(base_values[position])] != labels[int(values[position])]:
+                    wrong[position] = True
+            by_implementation[name] = int(wrong.sum())
+            divergent |= wrong
+
+        groups: Dict[str, Dict[str, Any]] = {}
+        for position in np.nonzero(divergent)[0].tolist():
+            described = {
+                name: _describe(oracle, int(codes[position]), float(values[position]), labels)
+                for name, (codes, values, labels) in outcomes.items()
+            }
+            labelled = {
+                name: outcome_label(oracle, int(codes[position]), float(values[position]), labels)
+                for name, (codes, values, labels) in outcomes.items()
+            }
+            key = json.dumps(labelled, ensure_ascii=False, sort_keys=True)
+            group = groups.setdefault(key, {"outputs": labelled, "count": 0, "samples": []})
+            group["count"] += 1
+            if len(group["samples"]) < SAMPLE_SIZE:
+                point = [column[position].item() if hasattr(column[position], "item") else column[position]
+                         for column in columns]
+                group["samples"].append({"Input": point, "Outputs": described})
+
+        emit({
+            "checked": checked,
+            "divergent": int(divergent.sum()),
+            "by_implementation": by_implementation,
+            "groups": list(groups.values()),
+            "timed_out": timed_out,
+        })
+        if timed_out is not None:
+            return {"timed_out": timed_out, "at": block_start + checked}
+    return None
+
+
+# ---------------------------------------------------------------------------
+# 父进程使用的部分
+# ---------------------------------------------------------------------------
+
+def generated_inputs(function_name: str, arity: int) -> List[List[Any]]:
+    """题目全部测试方法的用例输入（去重），参数个数不符的输入跳过"""
+    seen, inputs = set(), []
+    for method in available_methods(function_name):
+        suite = get_test_suite(function_name, method) or {}
+        for case in suite.get("cases", []):
+            case_input = case["input"]
+            if not isinstance(case_input, list) or len(case_input) != arity:
+                continue
+            key = json.dumps(case_input, sort_keys=True, default=repr)
+            if key not in seen:
+                seen.add(key)
+                inputs.append(list(case_input))
+    return inputs
+
+
+def run_differential(function_name: str, domain: str = "generated",
+                     block_timeout: float = DEFAULT_BLOCK_TIMEOUT,
+                     on_progress: Callable[[Dict[str, Any]], None] = None) -> Dict[str, Any]:
+    """
+    对比题目各版本实现的输出
+
+    Args:
+        domain: "generated" 为各测试方法生成的用例，"exhaustive" 为穷举预言的整个输入域
+        block_timeout: 每个实现执行每块输入的时间上限（秒）
+        on_progress: 每比较完一块时以 {"checked", "size", "divergent"} 调用，回调抛出的异常会中止执行
+    """
+    if function_name not in COURSE_EXERCISES:
+        return {
+            "success": False,
+            "message": f"不支持差分测试的函数: {function_name}",
+            "available_functions": SUPPORTED_DIFFERENTIAL
+        }
+    if domain not in DOMAINS:
+        return {"success": False, "message": f"不支持的输入域: {domain}，可选 {', '.join(DOMAINS)}"}
+    try:
+        candidates = implementations(function_name)
+    except OSError as e:
+        return {"success": False, "message": f"无法读取 course_exercise 实现: {str(e)}"}
+
+    oracle = get_oracle(function_name)
+    pool = get_pool()
+    if domain == "exhaustive":
+        size = oracle.size
+        chunk_count = max(1, min(pool.size * 4, math.ceil(size / BLOCK_SIZE)))
+        chunk_size = math.ceil(size / chunk_count)
+        payloads = [{"start": start, "stop": min(start + chunk_size, size)} for start in range(0, size, chunk_size)]
+        domain_info = oracle.domain()
+    else:
+        inputs = generated_inputs(function_name, len(oracle.params))
+        size = len(inputs)
+        chunk_size = max(1, math.ceil(size / pool.size))
+        payloads = [{"inputs": inputs[start:start + chunk_size]} for start in range(0, size, chunk_size)]
+        domain_info = {"size": size, "test_methods": available_methods(function_name)}
+
+    state = {"checked": 0, "divergent": 0, "by_implementation": {}, "groups": {}, "error": None, "aborted": []}
+    lock = threading.Lock()
+
+    def merge(data):
+        state["checked"] += data["checked"]
+        state["divergent"] += data["divergent"]
+        for name, count in data["by_implementation"].items():
+            state["by_implementation"][name] = state["by_implementation"].get(name, 0) + count
+        for group in data["groups"]:
+            key = json.dumps(group["outputs"], ensure_ascii=False, sort_keys=True)
+            merged = state["groups"].setdefault(key, {"outputs": group["outputs"], "count": 0, "samples": []})
+            merged["count"] += group["count"]
+            merged["samples"].extend(group["samples"][:SAMPLE_SIZE - len(merged["samples"])])
+
+    def run_chunk(extra):
+        payload = {
+            "function_name": function_name,
+            "implementations": [{key: item[key] for key in ("name", "code", "function_name")}
+                                for item in candidates],
+            "block_timeout": block_timeout,
+            **extra,
+        }
+        # 一块输入依次由每个 Python 实现执行
+        item_timeout = block_timeout * len(candidates) + KILL_GRACE_SECONDS
+        try:
+            for kind, data in pool.stream(DIFFERENTIAL_TASK, payload, item_timeout):
+                if kind == "item":
+                    with lock:
+                        merge(data)
+                        progress = {"checked": state["checked"], "size": size, "divergent": state["divergent"]}
+                    if on_progress is not None:
+                        on_progress(progress)
+                elif data is not None:
+                    with lock:
+                        if "error" in data:
+                            state["error"] = data["error"]
+                        else:
+                            state["aborted"].append(f"{data['timed_out']} 执行超时，输入位置 {data['at']} 之后未比较")
+        except SandboxError as e:
+            with lock:
+                state["aborted"].append(str(e))
+
+    start_time = time.perf_counter()
+    if len(payloads) == 1:
+        run_chunk(payloads[0])
+    elif payloads:
+        with ThreadPoolExecutor(max_workers=min(pool.size, len(payloads))) as executor:
+            list(executor.map(run_chunk, payloads))
+    duration = time.perf_counter() - start_time
+
+    if state["error"] is not None:
+        return {"success": False, "message": state["error"], "function_name": function_name}
+
+    checked = state["checked"]
+    groups = sorted(state["groups"].values(), key=lambda group: -group["count"])
+    return {
+        "success": True,
+        "function_name": function_name,
+        "domain": domain,
+        "domain_info": domain_info,
+        "baseline": BASELINE,
+        "implementations": [{"name": item["name"], "source": item["source"]} for item in candidates]
+                           + [{"name": NUMPY_ORACLE, "source": f"app.service.oracle.ORACLES['{function_name}']"}],
+        "summary": {
+            "total_points": size,
+            "checked_points": checked,
+            "divergent_points": state["divergent"],
+            "agreement_rate": f"{round((checked - state['divergent']) / checked * 100, 4) if checked else 0}%",
+            "duration": f"{round(duration, 3)}s",
+            "points_per_second": int(checked / duration) if duration > 0 else None
+        },
+        # 各实现与基准实现不一致的点数
+        "by_implementation": state["by_implementation"],
+        "divergences": groups[:MAX_GROUPS],
+        "aborted": state["aborted"]
+    }
@@ -0,0 +1,674 @@
+"""
+属性测试 / 模糊测试
+
+按参数类型随机生成大量输入（偏向边界值和特殊值），与参考实现的输出或给定的不变式比较；
+发现的失败输入会被逐步化简为最小反例，写入回归语料库 temp/fuzz_corpus，之后的测试先重放语料库中的输入。
+
+- 课程练习：参数范围取自 case_specs，提交的代码在沙箱进程中按批执行，与 HOMEWORK_CODES 中的参考实现比较，
+  化简也在沙箱进程内完成，不需要往返父进程
+- 单元测试：参数类型取自 Excel 第二行的 param_types，由 UnitTestService.fuzz_unit_test 在服务进程中执行
+"""
+import json
+import math
+from abc import ABC, abstractmethod
+import os
+import random
+import re
+import string
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Callable, Iterator, Optional
+
+from app.static.case_specs import CASE_SPECS
+from app.service.case_generator import reference_function
+from app.service.sandbox import (
+    get_pool, load_function, call_case, picklable, case_limit, CaseTimeout, SandboxError,
+    DEFAULT_CASE_TIMEOUT, KILL_GRACE_SECONDS
+)
+
+FUZZ_METHOD = "fuzz"
+FUZZ_TASK = "app.service.fuzz:fuzz_task"
+
+# 默认与最多的生成输入数
+DEFAULT_MAX_EXAMPLES = 2000
+MAX_EXAMPLES = 200000
+# 沙箱进程每执行这么多个输入向父进程报告一次
+FUZZ_BATCH = 256
+# 化简单个反例最多尝试的候选输入数
+MAX_SHRINK_STEPS = 200
+# 每个分片最多化简的失败输入数，其余失败只计数
+MAX_SHRINKS_PER_CHUNK = 10
+# 结果中列出的反例数
+MAX_COUNTEREXAMPLES = 20
+# 一个分片中超时的输入达到该数量后停止执行该分片
+FUZZ_TIMEOUT_LIMIT = 3
+# 沙箱进程执行一批输入时，除超时用例外额外允许的时间（秒）
+BATCH_SLACK_SECONDS = 10.0
+
+CORPUS_DIR = os.getenv("FUZZ_CORPUS_DIR", os.path.join("temp", "fuzz_corpus"))
+# 每个目标在语料库中保留的输入数，超出后丢弃最早的输入
+MAX_CORPUS_ENTRIES = 500
+
+# 不变式表达式中可用的内置函数
+INVARIANT_BUILTINS = {
+    "abs": abs, "all": all, "any": any, "len": len, "min": min, "max": max, "sum": sum, "round": round,
+    "isinstance": isinstance, "int": int, "float": float, "str": str, "bool": bool,
+    "list": list, "dict": dict, "tuple": tuple, "set": set, "sorted": sorted, "type": type, "None": None,
+}
+
+
+# ---------------------------------------------------------------------------
+# 输入生成策略
+# ---------------------------------------------------------------------------
+
+class Strategy(ABC):
+    """随机生成某种类型的值，并给出比某个值更简单的候选值（用于化简反例）"""
+
+    @abstractmethod
+    def draw(self, rnd: random.Random) -> Any:
+        """用 rnd 生成一个值"""
+
+    def shrink(self, value: Any) -> Iterator[Any]:
+        return iter(())
+
+
+class Integers(Strategy):
+    """整数：约四分之一取边界附近的特殊值，其余在范围内均匀分布，少量落在范围外"""
+
+    def __init__(self, min_value: int = None, max_value: int = None):
+        self.min_value = min_value
+        self.max_value = max_value
+        low = min_value if min_value is not None else -1000
+        high = max_value if max_value is not None else 1000
+        self.low, self.high = min(low, high), max(low, high)
+        span = max(1, self.high - self.low)
+        self.wide_low = self.low - span if min_value is not None else -2 ** 31
+        self.wide_high = self.high + span if max_value is not None else 2 ** 31 - 1
+        specials = {0, 1, -1}
+        for bound in (min_value, max_value):
+            if bound is not None:
+                specials.update({bound - 1, bound, bound + 1})
+        self.specials = sorted(specials)
+
+    def draw(self, rnd):
+        roll = rnd.random()
+        if roll < 0.25:
+            return rnd.choice(self.specials)
+        if roll < 0.9:
+            return rnd.randint(self.low, self.high)
+        return rnd.randint(self.wide_low, self.wide_high)
+
+    def shrink(self, value):
+        if not isinstance(value, int) or isinstance(value, bool) or value == 0:
+            return
+        yield 0
+        if value < 0:
+            yield -value
+        # 每次向 0 靠近一半的距离
+        delta = abs(value) // 2
+        sign = 1 if value > 0 else -1
+        while delta >= 1:
+            yield value - sign * delta
+            delta //= 2
+        yield value - sign
+
+
+class Floats(Strategy):
+    """浮点数：不生成 nan / inf，避免与参考实现比较时出现 nan != nan"""
+
+    def __init__(self, min_value: float = None, max_value: float = None):
+        self.min_value = min_value
+        self.max_value = max_value
+        self.low = float(min_value) if min_value is not None else -1e6
+        self.high = float(max_value) if max_value is not None else 1e6
+        specials = {0.0, 0.5, 1.0, -1.0, 1e-9}
+        for bound in (min_value, max_value):
+            if bound is not None:
+                specials.update({bound - 0.01, float(bound), bound + 0.01})
+        self.specials = sorted(specials)
+
+    def draw(self, rnd):
+        roll = rnd.random()
+        if roll < 0.25:
+            return rnd.choice(self.specials)
+        if roll < 0.9:
+            return round(rnd.uniform(self.low, self.high), rnd.choice((0, 1, 2, 6)))
+        return rnd.choice((-1, 1)) * 10 ** rnd.uniform(-9, 12)
+
+    def shrink(self, value):
+        if not isinstance(value, float) or value == 0:
+            return
+        yield 0.0
+        if value < 0:
+            yield -value
+        if value != int(value) and math.isfinite(value):
+            yield float(int(value))
+            yield round(value, 1)
+        yield value / 2
+
+
+class Booleans(Strategy):
+    def draw(self, rnd):
+        return rnd.random() < 0.5
+
+    def shrink(self, value):
+        if value:
+            yield False
+
+
+class Text(Strategy):
+    """字符串：包含 ASCII、中文、空白和标点，长度偏短"""
+
+    ALPHABET = string.ascii_letters + string.digits + " _-.,:;!?/\\'\"\t\n" + "中文测试数据"
+
+    def __init__(self, max_size: int = 20):
+        self.max_size = max_size
+
+    def draw(self, rnd):
+        size = min(self.max_size, int(rnd.expovariate(1 / 5)))
+        return "".join(rnd.choice(self.ALPHABET) for _ in range(size))
+
+    def shrink(self, value):
+        if not isinstance(value, str) or not value:
+            return
+        yield ""
+        if len(value) > 1:
+            yield value[:len(value) // 2]
+        for index in range(min(len(value), 16)):
+            yield value[:index] + value[index + 1:]
+        simplified = re.sub(r"[^a]", "a", value)
+        if simplified != value:
+            yield simplified
+
+
+class Lists(Strategy):
+    def __init__(self, elements: Strategy, max_size: int = 8):
+        self.elements = elements
+        self.max_size = max_size
+
+    def draw(self, rnd):
+        size = min(self.max_size, int(rnd.expovariate(1 / 3)))
+        return [self.elements.draw(rnd) for _ in range(size)]
+
+    def shrink(self, value):
+        if not isinstance(value, list) or not value:
+            return
+        yield []
+        if len(value) > 1:
+            yield value[:len(value) // 2]
+        for index in range(len(value)):
+            yield value[:index] + value[index + 1:]
+        for index, item in enumerate(value):
+            for candidate in self.elements.shrink(item):
+                yield value[:index] + [candidate] + value[index + 1:]
+
+
+class Dictionaries(Strategy):
+    def __init__(self, keys: Strategy = None, values: Strategy = None, max_size: int = 5):
+        self.keys = keys or Text(max_size=8)
+        self.values = values or Integers()
+        self.max_size = max_size
+
+    def draw(self, rnd):
+        size = min(self.max_size, int(rnd.expovariate(1 / 2)))
+        return {self.keys.draw(rnd): self.values.draw(rnd) for _ in range(size)}
+
+    def shrink(self, value):
+        if not isinstance(value, dict) or not value:
+            return
+        yield {}
+        for key in list(value):
+            yield {k: v for k, v in value.items() if k != key}
+
+
+class SampledFrom(Strategy):
+    """从给定的值中抽取，化简时取列表中更靠前的值；用于无法随机构造的类型（如项目中的类）"""
+
+    def __init__(self, values: List[Any]):
+        self.values = values
+
+    def draw(self, rnd):
+        return rnd.choice(self.values)
+
+    def shrink(self, value):
+        for candidate in self.values:
+            if candidate is value or candidate == value:
+                return
+            yield candidate
+
+
+def strategy_for(type_name: str) -> Optional[Strategy]:
+    """
+    按 Excel 中的类型字符串构造生成策略，类型写法与 DataTypeConverter 一致
+
+    int / float / str / bool / list / dict 以及 list(int) 等容器类型；类路径等无法随机构造的类型返回 None
+    """
+    type_name = str(type_name).strip()
+    match = re.match(r'^(\w+)\(([^)]+)\)$', type_name)
+    if match:
+        container, inner = match.group(1).lower(), match.group(2).strip()
+        inner_strategy = strategy_for(inner)
+        if inner_strategy is None:
+            return None
+        if container == "list":
+            return Lists(inner_strategy)
+        if container == "dict":
+            return Dictionaries(values=inner_strategy)
+        return None
+
+    lowered = type_name.lower()
+    if lowered in ("int", "integer"):
+        return Integers()
+    if lowered in ("float", "double"):
+        return Floats()
+    if lowered in ("str", "string"):
+        return Text()
+    if lowered in ("bool", "boolean"):
+        return Booleans()
+    if lowered in ("list", "array"):
+        return Lists(Integers())
+    if lowered in ("dict", "object"):
+        return Dictionaries()
+    return None
+
+
+def example_key(values: Any) -> str:
+    return json.dumps(values, sort_keys=True, ensure_ascii=False, default=repr)
+
+
+def draw_examples(strategies: List[Strategy], count: int, rnd: random.Random,
+                  seen: set = None) -> List[List[Any]]:
+    """生成 count 个互不相同的输入；取值空间太小时生成的数量可能少于 count"""
+    seen = set() if seen is None else seen
+    examples = []
+    attempts = 0
+    while len(examples) < count and attempts < count * 10:
+        attempts += 1
+        values = [strategy.draw(rnd) for strategy in strategies]
+        key = example_key(values)
+        if key not in seen:
+            seen.add(key)
+            examples.append(values)
+    return examples
+
+
+def shrink_example(values: List[Any], strategies: List[Strategy], fails: Callable[[List[Any]], bool],
+                   max_steps: int = MAX_SHRINK_STEPS) -> List[Any]:
+    """
+    贪心化简：依次尝试把每个参数换成更简单的候选值，仍然失败就接受，直到没有候选值能让输入继续变简单
+    """
+    steps = 0
+    improved = True
+    while improved and steps < max_steps:
+        improved = False
+        for position, strategy in enumerate(strategies):
+            for candidate in strategy.shrink(values[position]):
+                if type(candidate) is type(values[position]) and candidate == values[position]:
+                    continue
+                steps += 1
+                trial = list(values)
+                trial[position] = candidate
+                if fails(trial):
+                    values = trial
+                    improved = True
+                    break
+                if steps >= max_steps:
+                    return values
+    return values
+
+
+def compile_invariants(expressions: List[str]) -> List[tuple]:
+    """编译不变式表达式，语法错误时抛出 ValueError"""
+    compiled = []
+    for expression in expressions or []:
+        try:
+            compiled.append((expression, compile(expression, "<invariant>", "eval")))
+        except SyntaxError as e:
+            raise ValueError(f"不变式语法错误: {expression}: {e.msg}")
+    return compiled
+
+
+def check_invariants(invariants: List[tuple], env: Dict[str, Any]) -> Optional[str]:
+    """返回第一条不成立的不变式，全部成立时返回 None"""
+    for expression, compiled in invariants:
+        try:
+            holds = eval(compiled, {"__builtins__": INVARIANT_BUILTINS}, dict(env))
+        except Exception as e:
+            return f"{expression}（计算出错: {str(e)}）"
+        if not holds:
+            return expression
+    return None
+
+
+# ---------------------------------------------------------------------------
+# 回归语料库
+# ---------------------------------------------------------------------------
+
+_corpus_lock = threading.Lock()
+
+
+class FuzzCorpus:
+    """
+    一个测试目标的回归语料库，保存为 CORPUS_DIR/<目标>.json
+
+    条目可以带 submission 字段标明是哪一份提交发现的反例；同一输入在不同提交下分别保存
+    """
+
+    def __init__(self, target: str, directory: str = CORPUS_DIR):
+        self.target = target
+        safe_name = re.sub(r"[^\w.\-]", "_", target)
+        self.path = os.path.join(directory, f"{safe_name}.json")
+
+    def load(self) -> List[Dict[str, Any]]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f).get("entries", [])
+        except (OSError, ValueError):
+            return []
+
+    def inputs(self) -> List[Any]:
+        """全部条目的输入，不同提交保存的相同输入只返回一次"""
+        inputs, keys = [], set()
+        for entry in self.load():
+            key = example_key(entry["input"])
+            if key not in keys:
+                keys.add(key)
+                inputs.append(entry["input"])
+        return inputs
+
+    @staticmethod
+    def _entry_key(entry: Dict[str, Any]) -> tuple:
+        return entry.get("submission"), example_key(entry["input"])
+
+    def add(self, entries: List[Dict[str, Any]]) -> int:
+        """追加新的反例（同一提交已存在的输入跳过），返回新增数量；无法序列化为 JSON 的输入不保存"""
+        with _corpus_lock:
+            existing = self.load()
+            keys = {self._entry_key(entry) for entry in existing}
+            added = 0
+            for entry in entries:
+                try:
+                    json.dumps(entry["input"])
+                except (TypeError, ValueError):
+                    continue
+                key = self._entry_key(entry)
+                if key in keys:
+                    continue
+                keys.add(key)
+                existing.append({**entry, "found_at": time.strftime("%Y-%m-%d %H:%M:%S")})
+                added += 1
+            if not added:
+                return 0
+            existing = existing[-MAX_CORPUS_ENTRIES:]
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            # 先写临时文件再替换，避免并发读取到写了一半的文件
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(self.path), suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"target": self.target, "entries": existing}, f, ensure_ascii=False, indent=1,
+                          default=repr)
+            os.replace(temp_path, self.path)
+            return added
+
+
+# ---------------------------------------------------------------------------
+# 课程练习：沙箱进程内执行的部分
+# ---------------------------------------------------------------------------
+
+def homework_strategies(function_name: str) -> List[Strategy]:
+    """按 case_specs 中的参数范围构造策略，范围全为整数时生成整数，否则生成浮点数"""
+    strategies = []
+    for param in CASE_SPECS[function_name]["params"]:
+        bounds = (param["min"], param["max"], param["nominal"])
+        if all(isinstance(value, int) for value in bounds):
+            strategies.append(Integers(param["min"], param["max"]))
+        else:
+            strategies.append(Floats(param["min"], param["max"]))
+    return strategies
+
+
+def _outcome(function: Callable, case_input: List[Any], timeout: float = None) -> Any:
+    """执行一次并返回可比较的输出，异常格式与 generate_test_cases 一致"""
+    try:
+        if timeout is None:
+            return picklable(call_case(function, case_input))
+        with case_limit(timeout):
+            return picklable(call_case(function, case_input))
+    except CaseTimeout:
+        raise
+    except BaseException as e:
+        return f"执行错误: {str(e)}"
+
+
+def _output_class(output: Any) -> str:
+    """输出的类别：提示信息按原文，数值结果统一归为一类"""
+    if isinstance(output, (int, float)) and not isinstance(output, bool):
+        return "<数值>"
+    if isinstance(output, str):
+        try:
+            float(output)
+            return "<数值>"
+        except ValueError:
+            return output
+    return type(output).__name__
+
+
+def failure_signature(expected: Any, actual: Any) -> List[str]:
+    """
+    失败的特征 (期望输出类别, 实际输出类别)
+
+    化简时只接受特征不变的输入，避免从一个缺陷滑到另一个缺陷；同一特征的失败视为同一个缺陷
+    """
+    return [_output_class(expected), _output_class(actual)]
+
+
+def fuzz_task(payload: Dict[str, Any], emit: Callable):
+    """
+    对一批输入比较提交代码与参考实现，每种失败特征的第一个失败输入在进程内化简
+
+    payload: {code, function_name, inputs, case_timeout}
+    每执行 FUZZ_BATCH 个输入发送一次
+    {"checked", "failures": [{"input", "expected", "actual", "kind", "signature", "minimal"}]}
+    """
+    timeout = payload.get("case_timeout", DEFAULT_CASE_TIMEOUT)
+    function_name = payload["function_name"]
+    try:
+        function = load_function(payload["code"], function_name, timeout)
+    except CaseTimeout:
+        return {"error": "代码执行错误: 模块加载超时"}
+    except BaseException as e:
+        return {"error": f"代码执行错误: {str(e)}"}
+    if function is None:
+        return {"error": f"代码中未找到函数: {function_name}", "not_found": True}
+
+    reference = reference_function(function_name)
+    strategies = homework_strategies(function_name)
+
+    def run(case_input):
+        """返回 (期望输出, 实际输出)，超时时实际输出为 None"""
+        expected = _outcome(reference, case_input)
+        try:
+            return expected, _outcome(function, case_input, timeout)
+        except CaseTimeout:
+            return expected, None
+
+    inputs = payload["inputs"]
+    timeouts = 0
+    shrunk = set()
+    for start in range(0, len(inputs), FUZZ_BATCH):
+        failures = []
+        checked = 0
+        for case_input in inputs[start:start + FUZZ_BATCH]:
+            checked += 1
+            expected, actual = run(case_input)
+            if actual is None:
+                timeouts += 1
+                failures.append({"input": case_input, "expected": expected, "actual": f"执行超时(>{timeout}s)",
+                                 "kind": "timeout", "signature": ["<超时>"], "minimal": None})
+                if timeouts >= FUZZ_TIMEOUT_LIMIT:
+                    break
+                continue
+            if actual == expected:
+                continue
+            signature = failure_signature(expected, actual)
+            failure = {"input": case_input, "expected": expected, "actual": actual, "kind": "mismatch",
+                       "signature": signature, "minimal": None}
+            key = tuple(signature)
+            if key not in shrunk and len(shrunk) < MAX_SHRINKS_PER_CHUNK:
+                shrunk.add(key)
+
+                def still_fails(trial):
+                    trial_expected, trial_actual = run(trial)
+                    return trial_actual is not None and trial_actual != trial_expected \
+                        and failure_signature(trial_expected, trial_actual) == signature
+
+                minimal = shrink_example(list(case_input), strategies, still_fails)
+                minimal_expected, minimal_actual = run(minimal)
+                failure["minimal"] = {"input": minimal, "expected": minimal_expected, "actual": minimal_actual}
+            failures.append(failure)
+        emit({"checked": checked, "failures": failures})
+        if timeouts >= FUZZ_TIMEOUT_LIMIT:
+            return {"aborted": f"超时输入达到 {FUZZ_TIMEOUT_LIMIT} 个，停止执行"}
+    return None
+
+
+# ---------------------------------------------------------------------------
+# 课程练习：父进程（Flask）使用的部分
+# ---------------------------------------------------------------------------
+
+def _input_size(case_input: List[Any]) -> float:
+    return sum(abs(value) if isinstance(value, (int, float)) else len(str(value)) for value in case_input)
+
+
+def _counterexamples(failures: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    每种失败特征保留一个最简单（各参数绝对值之和最小）的反例，按出现次数从多到少排列
+    """
+    groups: Dict[str, Dict[str, Any]] = {}
+    for failure in failures:
+        candidate = failure["minimal"] or {key: failure[key] for key in ("input", "expected", "actual")}
+        key = example_key(failure["signature"])
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = {"Count": 0, "Kind": failure["kind"], "Signature": failure["signature"]}
+        group["Count"] += 1
+        if "Input" not in group or _input_size(candidate["input"]) < _input_size(group["Input"]):
+            group.update({
+                "Input": candidate["input"],
+                "Expected": candidate["expected"],
+                "Actual": candidate["actual"],
+                "Original": failure["input"],
+            })
+    return sorted(groups.values(), key=lambda group: -group["Count"])
+
+
+def run_homework_fuzz(code: str, function_name: str, max_examples: int = DEFAULT_MAX_EXAMPLES,
+                      seed: int = None, case_timeout: float = DEFAULT_CASE_TIMEOUT,
+                      on_progress: Callable[[Dict[str, Any]], None] = None) -> Dict[str, Any]:
+    """
+    模糊测试提交的练习代码：先重放语料库，再生成 max_examples 个新输入，与参考实现比较
+
+    语料库按题目共享，重放所有提交发现过的反例；条目记录发现它的提交（规范化代码哈希），
+    本提交之前的反例仍然失败时计入 regressions，其他提交的反例失败时计入 shared_failures
+
+    Args:
+        seed: 随机种子，相同的种子和语料库生成相同的输入；不提供时随机选择并在结果中返回
+        on_progress: 每执行完一批输入时以 {"checked", "total", "failures"} 调用，回调抛出的异常会中止执行
+    """
+    if function_name not in CASE_SPECS:
+        return {
+            "success": False,
+            "message": f"不支持模糊测试的函数: {function_name}",
+            "available_functions": list(CASE_SPECS)
+        }
+    max_examples = max(1, min(int(max_examples), MAX_EXAMPLES))
+    seed = seed if seed is not None else random.randrange(2 ** 32)
+
+    # 延迟导入：batch_grading 依赖 homework，homework 依赖本模块
+    from app.service.batch_grading import normalized_hash
+    submission = normalized_hash(code)
+    corpus = FuzzCorpus(f"homework.{function_name}")
+    own_keys = {example_key(entry["input"]) for entry in corpus.load() if entry.get("submission") == submission}
+    replay = corpus.inputs()
+    seen = {example_key(case_input) for case_input in replay}
+    inputs = replay + draw_examples(homework_strategies(function_name), max_examples, random.Random(seed), seen)
+
+    pool = get_pool()
+    chunk_size = max(FUZZ_BATCH, math.ceil(len(inputs) / pool.size))
+    chunks = [inputs[i:i + chunk_size] for i in range(0, len(inputs), chunk_size)]
+    item_timeout = case_timeout * (FUZZ_TIMEOUT_LIMIT + 1) + BATCH_SLACK_SECONDS + KILL_GRACE_SECONDS
+
+    state = {"checked": 0, "failures": [], "error": None, "aborted": []}
+    lock = threading.Lock()
+
+    def run_chunk(chunk):
+        payload = {"code": code, "function_name": function_name, "inputs": chunk, "case_timeout": case_timeout}
+        try:
+            for kind, data in pool.stream(FUZZ_TASK, payload, item_timeout):
+                if kind == "item":
+                    with lock:
+                        state["checked"] += data["checked"]
+                        state["failures"].extend(data["failures"])
+                        progress = {"checked": state["checked"], "total": len(inputs),
+                                    "failures": len(state["failures"])}
+                    if on_progress is not None:
+                        on_progress(progress)
+                elif data is not None:
+                    with lock:
+                        if "error" in data:
+                            state["error"] = data
+                        else:
+                            state["aborted"].append(data["aborted"])
+        except SandboxError as e:
+            with lock:
+                state["aborted"].append(str(e))
+
+    start_time = time.perf_counter()
+    if len(chunks) == 1:
+        run_chunk(chunks[0])
+    else:
+        with ThreadPoolExecutor(max_workers=len(chunks)) as executor:
+            list(executor.map(run_chunk, chunks))
+    duration = time.perf_counter() - start_time
+
+    if state["error"] is not None:
+        return {"success": False, "message": state["error"]["error"], "function_name": function_name}
+
+    failures = state["failures"]
+    replay_keys = {example_key(case_input) for case_input in replay}
+    regressions, shared_failures = [], []
+    for failure in failures:
+        key = example_key(failure["input"])
+        if key in own_keys:
+            regressions.append(failure["input"])
+        elif key in replay_keys:
+            shared_failures.append(failure["input"])
+    counterexamples = _counterexamples(failures)
+    added = corpus.add([
+        {"input": item["Input"], "expected": item["Expected"], "actual": item["Actual"], "submission": submission}
+        for item in counterexamples if item["Kind"] == "mismatch"
+    ])
+
+    checked = state["checked"]
+    return {
+        "success": True,
+        "function_name": function_name,
+        "seed": seed,
+        "summary": {
+            "examples": checked,
+            "replayed": len(replay),
+            "failures": len(failures),
+            "failure_rate": f"{round(len(failures) / checked * 100, 2) if checked else 0}%",
+            "unique_counterexamples": len(counterexamples),
+            "new_corpus_entries": added,
+            "duration": f"{round(duration, 3)}s",
+            "examples_per_second": int(checked / duration) if duration > 0 else None
+        },
+        "counterexamples": counterexamples[:MAX_COUNTEREXAMPLES],
+        # 本提交之前发现的反例中仍然失败的输入
+        "regressions": regressions,
+        # 其他提交发现的反例中本提交也失败的输入
+        "shared_failures": shared_failures,
+        "aborted": state["aborted"]
+    }
@@ -0,0 +1,405 @@
+import json
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, List, Optional
+
+# 测试历史数据库文件
+HISTORY_DB = os.getenv("TEST_HISTORY_DB", os.path.join("temp", "test_history.db"))
+# 单个事务最多写入的运行记录数
+BATCH_SIZE = 200
+# 凑批时最多等待的时间（秒）
+BATCH_WAIT = 0.2
+# 写入队列上限，后台写入跟不上时丢弃新记录而不阻塞测试请求
+QUEUE_SIZE = 10000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    suite TEXT NOT NULL,
+    path TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    duration_ms REAL,
+    total INTEGER NOT NULL,
+    passed INTEGER NOT NULL,
+    failed INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_runs_suite_time ON runs(suite, started_at);
+CREATE INDEX IF NOT EXISTS idx_runs_time ON runs(started_at);
+
+CREATE TABLE IF NOT EXISTS cases (
+    run_id INTEGER NOT NULL,
+    suite TEXT NOT NULL,
+    case_id TEXT NOT NULL,
+    passed INTEGER NOT NULL,
+    duration_ms REAL,
+    started_at REAL NOT NULL,
+    message TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_cases_suite_case_time ON cases(suite, case_id, started_at);
+CREATE INDEX IF NOT EXISTS idx_cases_time ON cases(started_at);
+CREATE INDEX IF NOT EXISTS idx_cases_run ON cases(run_id);
+"""
+
+_DURATION_PATTERN = re.compile(r"^\s*([\d.]+)\s*(ms|s)?\s*$")
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=10)
+    conn.row_factory = sqlite3.Row
+    # WAL 模式下读写互不阻塞，报表查询不会影响后台写入
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+# ---------------------------------------------------------------------------
+# 从各测试接口的响应中提取用例结果
+# ---------------------------------------------------------------------------
+
+def _case_id(case: Dict[str, Any], index: int) -> str:
+    for key in ("test_id", "ID", "case_id", "id"):
+        if case.get(key) not in (None, ""):
+            return str(case[key])
+    return str(index + 1)
+
+
+def _case_passed(case: Dict[str, Any]) -> bool:
+    for key in ("passed", "Passed"):
+        if key in case:
+            value = case[key]
+            if isinstance(value, str):
+                return value.lower() == "true"
+            return bool(value)
+    if "status" in case:
+        return str(case["status"]).upper() in ("PASSED", "PASS")
+    return case.get("result") == "PASS"
+
+
+def _case_duration(case: Dict[str, Any]) -> Optional[float]:
+    """统一换算为毫秒"""
+    if isinstance(case.get("duration_ms"), (int, float)):
+        return float(case["duration_ms"])
+    value = case.get("Duration")
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        match = _DURATION_PATTERN.match(value)
+        if match:
+            return float(match.group(1)) * (1000 if match.group(2) == "s" else 1)
+    # 端到端测试的 execution_time 单位为秒
+    if isinstance(case.get("execution_time"), (int, float)):
+        return float(case["execution_time"]) * 1000
+    return None
+
+
+def _case_message(case: Dict[str, Any]) -> Optional[str]:
+    for key in ("error_message", "error", "message"):
+        if case.get(key):
+            return str(case[key])[:500]
+    return None
+
+
+def extract_cases(body: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+    """
+    从测试接口的 JSON 响应中找出用例结果列表，不是测试结果的响应返回 None
+
+    支持 {"test_results": [...]}、{"data": {"test_results": [...]}}
+    以及端到端测试单个场景的 {"data": {"test_id", "status", ...}}
+    """
+    if not isinstance(body, dict):
+        return None
+    data = body.get("data")
+    if isinstance(body.get("test_results"), list):
+        cases = body["test_results"]
+    elif isinstance(data, dict) and isinstance(data.get("test_results"), list):
+        cases = data["test_results"]
+    elif isinstance(data, dict) and "test_id" in data and "status" in data:
+        cases = [data]
+    else:
+        return None
+
+    records = []
+    for index, case in enumerate(cases):
+        if not isinstance(case, dict):
+            continue
+        passed = _case_passed(case)
+        records.append({
+            "case_id": _case_id(case, index),
+            "passed": passed,
+            "duration_ms": _case_duration(case),
+            "message": None if passed else _case_message(case),
+        })
+    return records
+
+
+def suite_name(path: str, body: Dict[str, Any]) -> str:
+    """同一接口测试不同函数/类方法时分别统计"""
+    if body.get("function_name"):
+        return f"{path}:{body['function_name']}"
+    if body.get("class") and body.get("method_name"):
+        return f"{path}:{body['class']}.{body['method_name']}"
+    return path
+
+
+# ---------------------------------------------------------------------------
+# 后台批量写入
+# ---------------------------------------------------------------------------
+
+class HistoryRecorder:
+    """
+    测试运行历史记录器
+
+    请求线程只把原始响应放进队列，JSON 解析和数据库写入都在后台线程中批量完成，
+    对测试接口的响应时间几乎没有影响。数据只追加不修改
+    """
+
+    def __init__(self, db_path: str = HISTORY_DB):
+        self.db_path = db_path
+        self._queue = queue.Queue(maxsize=QUEUE_SIZE)
+        self._thread = None
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    def _ensure_started(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    conn = _connect(self.db_path)
+                    conn.executescript(SCHEMA)
+                    conn.close()
+                    self._thread = threading.Thread(target=self._writer_loop, name="test-history", daemon=True)
+                    self._thread.start()
+
+    def record_response(self, path: str, started_at: float, duration_ms: float, body: bytes):
+        """记录一次测试接口调用，只做入队操作"""
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(("response", path, started_at, duration_ms, body))
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self, timeout: float = 5.0):
+        """等待队列中已有的记录写入完成"""
+        if self._thread is None:
+            return
+        done = threading.Event()
+        self._queue.put(("flush", done))
+        done.wait(timeout)
+
+    def _writer_loop(self):
+        conn = _connect(self.db_path)
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.time() + BATCH_WAIT
+            while len(batch) < BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get(timeout=max(0.0, deadline - time.time())))
+                except queue.Empty:
+                    break
+            try:
+                self._write_batch(conn, [item for item in batch if item[0] == "response"])
+            except Exception as e:
+                print(f"写入测试历史失败: {e}")
+            for item in batch:
+                if item[0] == "flush":
+                    item[1].set()
+
+    def _write_batch(self, conn: sqlite3.Connection, items: List[tuple]):
+        rows = []
+        for _, path, started_at, duration_ms, body in items:
+            try:
+                payload = json.loads(body)
+            except ValueError:
+                continue
+            cases = extract_cases(payload)
+            if not cases:
+                continue
+            rows.append((suite_name(path, payload), path, started_at, duration_ms, cases))
+        if not rows:
+            return
+
+        with conn:
+            for suite, path, started_at, duration_ms, cases in rows:
+                passed = sum(1 for case in cases if case["passed"])
+                cursor = conn.execute(
+                    "INSERT INTO runs (suite, path, started_at, duration_ms, total, passed, failed) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (suite, path, started_at, duration_ms, len(cases), passed, len(cases) - passed)
+                )
+                conn.executemany(
+                    "INSERT INTO cases (run_id, suite, case_id, passed, duration_ms, started_at, message) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (cursor.lastrowid, suite, case["case_id"], int(case["passed"]),
+                         case["duration_ms"], started_at, case["message"])
+                        for case in cases
+                    ]
+                )
+
+
+_recorder: Optional[HistoryRecorder] = None
+_recorder_lock = threading.Lock()
+
+
+def get_recorder() -> HistoryRecorder:
+    global _recorder
+    if _recorder is None:
+        with _recorder_lock:
+            if _recorder is None:
+                _recorder = HistoryRecorder()
+    return _recorder
+
+
+def init_app(app):
+    """在 Flask 应用上注册钩子，自动记录所有测试接口返回的结果"""
+    from flask import g, request
+
+    @app.before_request
+    def _history_start():
+        g.history_started = (time.time(), time.perf_counter())
+
+    @app.after_request
+    def _history_record(response):
+        started = g.get("history_started")
+        if (started and request.method == "POST" and not request.path.startswith("/reports")
+                and response.mimetype == "application/json" and not response.is_streamed):
+            duration_ms = (time.perf_counter() - started[1]) * 1000
+            get_recorder().record_response(request.path, started[0], duration_ms, response.get_data())
+        return response
+
+
+# ---------------------------------------------------------------------------
+# 报表查询
+# ---------------------------------------------------------------------------
+
+class HistoryQueries:
+    """基于测试历史的统计查询，所有查询都走索引并限定时间范围"""
+
+    def __init__(self, db_path: str = HISTORY_DB):
+        self.db_path = db_path
+
+    def _query(self, sql: str, params: tuple = ()) -> List[Dict[str, Any]]:
+        # 先把排队中的记录写入，保证刚执行完的测试能被查到
+        if _recorder is not None and _recorder.db_path == self.db_path:
+            _recorder.flush(timeout=1.0)
+        if not os.path.exists(self.db_path):
+            return []
+        conn = _connect(self.db_path)
+        try:
+            return [dict(row) for row in conn.execute(sql, params)]
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _since(days: float) -> float:
+        return time.time() - days * 86400
+
+    def suites(self, days: float = 30) -> List[Dict[str, Any]]:
+        """各测试套件的运行次数、用例总数和通过率"""
+        return self._query(
+            """
+            SELECT suite, COUNT(*) AS runs, SUM(total) AS cases,
+                   ROUND(100.0 * SUM(passed) / MAX(SUM(total), 1), 2) AS pass_rate,
+                   DATETIME(MAX(started_at), 'unixepoch', 'localtime') AS last_run
+            FROM runs WHERE started_at >= ?
+            GROUP BY suite ORDER BY MAX(started_at) DESC
+            """,
+            (self._since(days),)
+        )
+
+    def recent_runs(self, suite: str = None, limit: int = 50) -> List[Dict[str, Any]]:
+        where, params = ("WHERE suite = ?", (suite,)) if suite else ("", ())
+        return self._query(
+            f"""
+            SELECT id, suite, DATETIME(started_at, 'unixepoch', 'localtime') AS started_at,
+                   ROUND(duration_ms, 2) AS duration_ms, total, passed, failed,
+                   ROUND(100.0 * passed / MAX(total, 1), 2) AS pass_rate
+            FROM runs {where}
+            ORDER BY started_at DESC LIMIT ?
+            """,
+            params + (limit,)
+        )
+
+    def pass_rate_trend(self, suite: str, bucket: str = "day", days: float = 30) -> List[Dict[str, Any]]:
+        """按天/小时（或逐次运行）统计通过率"""
+        if bucket == "run":
+            rows = self._query(
+                """
+                SELECT id AS run_id, DATETIME(started_at, 'unixepoch', 'localtime') AS period,
+                       total, passed, ROUND(100.0 * passed / MAX(total, 1), 2) AS pass_rate
+                FROM runs WHERE suite = ? AND started_at >= ?
+                ORDER BY started_at
+                """,
+                (suite, self._since(days))
+            )
+            return rows
+        fmt = {"day": "%Y-%m-%d", "hour": "%Y-%m-%d %H:00"}.get(bucket)
+        if fmt is None:
+            raise ValueError("bucket 只能是 day、hour 或 run")
+        return self._query(
+            """
+            SELECT STRFTIME(?, started_at, 'unixepoch', 'localtime') AS period,
+                   COUNT(*) AS runs, SUM(total) AS total, SUM(passed) AS passed,
+                   ROUND(100.0 * SUM(passed) / MAX(SUM(total), 1), 2) AS pass_rate,
+                   ROUND(AVG(duration_ms), 2) AS avg_duration_ms
+            FROM runs WHERE suite = ? AND started_at >= ?
+            GROUP BY period ORDER BY period
+            """,
+            (fmt, suite, self._since(days))
+        )
+
+    def slowest_cases(self, suite: str = None, days: float = 7, limit: int = 20) -> List[Dict[str, Any]]:
+        """平均耗时最长的用例"""
+        where, params = ("AND suite = ?", (suite,)) if suite else ("", ())
+        return self._query(
+            f"""
+            SELECT suite, case_id, COUNT(*) AS runs,
+                   ROUND(AVG(duration_ms), 2) AS avg_duration_ms,
+                   ROUND(MAX(duration_ms), 2) AS max_duration_ms
+            FROM cases
+            WHERE started_at >= ? AND duration_ms IS NOT NULL {where}
+            GROUP BY suite, case_id
+            ORDER BY avg_duration_ms DESC LIMIT ?
+            """,
+            (self._since(days),) + params + (limit,)
+        )
+
+    def flaky_cases(self, suite: str = None, days: float = 30, window: int = 50,
+                    min_runs: int = 5, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        不稳定用例：最近 window 次运行中既有通过也有失败
+
+        flip_rate 为相邻两次运行结果发生变化的比例，越接近 1 越不稳定；
+        持续失败的用例 flip_rate 为 0，不会被误判为不稳定
+        """
+        where, params = ("AND suite = ?", (suite,)) if suite else ("", ())
+        return self._query(
+            f"""
+            WITH recent AS (
+                SELECT suite, case_id, passed, started_at,
+                       ROW_NUMBER() OVER (PARTITION BY suite, case_id ORDER BY started_at DESC) AS rn
+                FROM cases WHERE started_at >= ? {where}
+            ),
+            ordered AS (
+                SELECT suite, case_id, passed,
+                       LAG(passed) OVER (PARTITION BY suite, case_id ORDER BY started_at) AS previous
+                FROM recent WHERE rn <= ?
+            )
+            SELECT suite, case_id, COUNT(*) AS runs, SUM(passed) AS passes,
+                   SUM(CASE WHEN previous IS NOT NULL AND previous != passed THEN 1 ELSE 0 END) AS flips,
+                   ROUND(1.0 * SUM(CASE WHEN previous IS NOT NULL AND previous != passed THEN 1 ELSE 0 END)
+                         / (COUNT(*) - 1), 3) AS flip_rate
+            FROM ordered
+            GROUP BY suite, case_id
+            HAVING runs >= ? AND passes > 0 AND passes < runs
+            ORDER BY flip_rate DESC, runs DESC LIMIT ?
+            """,
+            (self._since(days),) + params + (window, max(2, min_runs), limit)
+        )
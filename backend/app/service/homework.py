@@ -1,14 +1,43 @@
 import json
 import sys
 import os
-import time
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Callable
 
 
 
 from app.static.homework_data import TEST_CASES, SUPPORTED_TEST_METHODS, SUPPORTED_FUNCTIONS
+from app.service.sandbox import get_pool, DEFAULT_CASE_TIMEOUT
+from app.service.case_generator import get_test_suite, available_methods
+from app.service import branch_coverage
+from app.service.fuzz import FUZZ_METHOD, DEFAULT_MAX_EXAMPLES, run_homework_fuzz
 
-def generate_test_cases(code: str, function_name: str, test_method: str) -> Dict[str, Any]:
+def _case_result(index: int, case: Dict[str, Any], outcome: Dict[str, Any]) -> Dict[str, Any]:
+    """把沙箱返回的执行结果整理为单个用例的测试结果"""
+    duration = round(outcome["duration"] * 1000, 3)  # 转换为毫秒，保留3位小数；DurationNs 为纳秒整数
+    expected = case["expected"]
+
+    if outcome["error"] is None:
+        actual = outcome["actual"]
+    else:
+        # 参考实现本身抛出异常的生成用例，期望结果也是这一格式
+        actual = f"执行错误: {outcome['error']}"
+    is_passed = actual == expected
+
+    return {
+        "ID": index + 1,
+        "Input": case["input"],
+        "Expected": expected,
+        "Actual": actual,
+        "Passed": is_passed,
+        "Duration": f"{duration}ms",
+        "DurationNs": outcome.get("duration_ns")
+    }
+
+def generate_test_cases(code: str, function_name: str, test_method: str,
+                        case_timeout: float = DEFAULT_CASE_TIMEOUT,
+                        on_case: Callable[[Dict[str, Any]], None] = None,
+                        coverage: bool = False,
+                        fuzz_options: Dict[str, Any] = None) -> Dict[str, Any]:
     """
     通用测试用例生成函数
     
@@ -17,6 +46,10 @@ def generate_test_cases(code: str, function_name: str, test_method: str) -> Dict
     function_name: 函数名称 ("triangle_judge", "computer_selling", "telecom_system", "calendar_problem")
     test_method: 测试方法 ("boundary_basic", "boundary_robust", "equivalent_weak", 
                 "equivalent_strong", "equivalent_weak_robust", "equivalent_strong_robust", "decision_table")
+    case_timeout: 单个用例的执行时间上限（秒）
+    on_case: 每个用例执行完成时以该用例的测试结果调用（完成顺序，不一定是用例顺序）
+    coverage: 为 True 时统计被测代码的分支覆盖，结果中增加 coverage，每个用例增加 Branches
+    fuzz_options: test_method 为 "fuzz" 时的模糊测试参数 {"max_examples", "seed"}
     
     返回:
     包含测试用例和预期结果的JSON格式字典
@@ -30,98 +63,63 @@ def generate_test_cases(code: str, function_name: str, test_method: str) -> Dict
             "available_functions": SUPPORTED_FUNCTIONS
         }
     
-    function_test_cases = TEST_CASES[function_name]
+    if test_method == FUZZ_METHOD:
+        return _fuzz_test_cases(code, function_name, case_timeout, on_case, fuzz_options or {})
     
-    # 检查测试方法是否支持
-    if test_method not in function_test_cases["test_methods"]:
-        available_methods = list(function_test_cases["test_methods"].keys())
+    # 检查测试方法是否支持；有生成规格的题目按规格生成用例
+    selected_test = get_test_suite(function_name, test_method)
+    if selected_test is None:
         return {
             "success": False,
             "message": f"函数{function_name}不支持的测试方法: {test_method}",
-            "available_methods": available_methods
+            "available_methods": available_methods(function_name)
         }
     
-    selected_test = function_test_cases["test_methods"][test_method]
-    
-    # 执行测试用例
-    test_results = []
-    passed_count = 0
-    failed_count = 0
-    
-    try:
-        # 动态执行代码
-        local_vars = {}
-        exec(code, globals(), local_vars)
-        
-        # 获取要测试的函数
-        test_function = local_vars.get(function_name) or globals().get(function_name)
-        
-        if test_function is None:
+    # 在沙箱进程池中执行测试用例，超时或异常的用例不会阻塞服务进程
+    def _forward(index, outcome):
+        on_case(_case_result(index, selected_test["cases"][index], outcome))
+
+    on_result = _forward if on_case is not None else None
+
+    run_result = get_pool().run_cases(code, function_name, selected_test["cases"], case_timeout, on_result,
+                                      coverage=coverage)
+    if "error" in run_result:
+        if run_result.get("not_found"):
             return {
                 "success": False,
-                "message": f"代码中未找到函数: {function_name}",
+                "message": run_result["error"],
                 "function_name": function_name
             }
-        
-        for i, case in enumerate(selected_test["cases"]):
-            # 记录开始时间
-            start_time = time.perf_counter()
-            
-            try:
-                # 调用测试函数
-                if isinstance(case["input"], list):
-                    actual = test_function(*case["input"])
-                else:
-                    actual = test_function(case["input"])
-                
-                # 记录结束时间
-                end_time = time.perf_counter()
-                duration = round((end_time - start_time) * 1000, 3)  # 转换为毫秒，保留3位小数
-                
-                expected = case["expected"]
-                is_passed = actual == expected
-                
-                test_results.append({
-                    "ID": i + 1,
-                    "Input": case["input"],
-                    "Expected": expected,
-                    "Actual": actual,
-                    "Passed": is_passed,
-                    "Duration": f"{duration}ms"
-                })
-                
-                if is_passed:
-                    passed_count += 1
-                else:
-                    failed_count += 1
-                    
-            except Exception as e:
-                # 记录结束时间（即使出错也要记录）
-                end_time = time.perf_counter()
-                duration = round((end_time - start_time) * 1000, 3)
-                
-                test_results.append({
-                    "ID": i + 1,
-                    "Input": case["input"],
-                    "Expected": case["expected"],
-                    "Actual": f"执行错误: {str(e)}",
-                    "Passed": False,
-                    "Duration": f"{duration}ms"
-                })
-                failed_count += 1
-                
-    except Exception as e:
         return {
             "success": False,
-            "message": f"代码执行错误: {str(e)}",
+            "message": run_result["error"],
             "function_name": function_name,
             "test_method": test_method
         }
-    
+
+    test_results = []
+    passed_count = 0
+    failed_count = 0
+
+    for i, (case, outcome) in enumerate(zip(selected_test["cases"], run_result["results"])):
+        case_result = _case_result(i, case, outcome)
+        test_results.append(case_result)
+
+        if case_result["Passed"]:
+            passed_count += 1
+        else:
+            failed_count += 1
+
     total_cases = len(selected_test["cases"])
     pass_rate = round((passed_count / total_cases) * 100, 2) if total_cases > 0 else 0
     
-    return {
+    coverage_result = None
+    if coverage:
+        coverage_result = branch_coverage.summarize(code, [outcome.get("arcs") for outcome in run_result["results"]])
+        for case_result, branches in zip(test_results, coverage_result.pop("case_branches")):
+            case_result["Branches"] = branches
+
+    result = {
         "success": True,
         "function_name": function_name,
         "test_method": test_method,
@@ -135,6 +133,173 @@ def generate_test_cases(code: str, function_name: str, test_method: str) -> Dict
         },
         "test_results": test_results
     }
+    if coverage_result is not None:
+        result["coverage"] = coverage_result
+    return result
+
+def _fuzz_test_cases(code: str, function_name: str, case_timeout: float,
+                     on_case: Callable[[Dict[str, Any]], None], options: Dict[str, Any]) -> Dict[str, Any]:
+    """模糊测试结果整理为与其他测试方法一致的格式，test_results 为各类失败的最小反例"""
+    fuzz_result = run_homework_fuzz(
+        code, function_name,
+        max_examples=options.get("max_examples") or DEFAULT_MAX_EXAMPLES,
+        seed=options.get("seed"),
+        case_timeout=case_timeout
+    )
+    if not fuzz_result["success"]:
+        return fuzz_result
+
+    test_results = []
+    for i, example in enumerate(fuzz_result["counterexamples"]):
+        case_result = {
+            "ID": i + 1,
+            "Input": example["Input"],
+            "Expected": example["Expected"],
+            "Actual": example["Actual"],
+            "Passed": False,
+            "Duration": "",
+            "Count": example["Count"],
+            "Original": example["Original"]
+        }
+        test_results.append(case_result)
+        if on_case is not None:
+            on_case(case_result)
+
+    summary = fuzz_result["summary"]
+    total_cases = summary["examples"]
+    failed_count = summary["failures"]
+    pass_rate = round((total_cases - failed_count) / total_cases * 100, 2) if total_cases > 0 else 0
+    return {
+        "success": True,
+        "function_name": function_name,
+        "test_method": FUZZ_METHOD,
+        "test_name": "模糊测试",
+        "description": "按参数范围随机生成输入（偏向边界值）与参考实现比较，失败输入化简为最小反例",
+        "summary": {
+            "total_cases": total_cases,
+            "passed_cases": total_cases - failed_count,
+            "failed_cases": failed_count,
+            "pass_rate": f"{pass_rate}%"
+        },
+        "test_results": test_results,
+        "fuzz": {
+            "seed": fuzz_result["seed"],
+            "replayed": summary["replayed"],
+            "new_corpus_entries": summary["new_corpus_entries"],
+            "duration": summary["duration"],
+            "examples_per_second": summary["examples_per_second"],
+            "regressions": fuzz_result["regressions"],
+            "shared_failures": fuzz_result["shared_failures"],
+            "aborted": fuzz_result["aborted"]
+        }
+    }
+
+def coverage_by_method(code: str, function_name: str, test_methods: List[str] = None,
+                       case_timeout: float = DEFAULT_CASE_TIMEOUT) -> Dict[str, Any]:
+    """
+    比较各测试方法的用例集对同一份代码的分支覆盖
+
+    参数:
+    code: 被测代码源码
+    function_name: 函数名称
+    test_methods: 要比较的测试方法，默认为该题目支持的全部方法
+
+    返回:
+    {"success", "function_name", "methods": {测试方法: {...}}, "total_branches", "uncovered_by_all"}
+    """
+    test_methods = test_methods or available_methods(function_name)
+    methods = {}
+    uncovered = None
+    total_branches = 0
+    for method in test_methods:
+        result = generate_test_cases(code, function_name, method, case_timeout, coverage=True)
+        if not result["success"]:
+            return result
+        method_coverage = result["coverage"]
+        total_branches = method_coverage["summary"]["total_branches"]
+        missing = {branch["id"]: branch for branch in method_coverage["missing_branches"]}
+        uncovered = missing if uncovered is None else {key: value for key, value in uncovered.items() if key in missing}
+        methods[method] = {
+            "test_name": result["test_name"],
+            "total_cases": result["summary"]["total_cases"],
+            "pass_rate": result["summary"]["pass_rate"],
+            "coverage": method_coverage["summary"],
+            "minimal_cases": method_coverage["minimal_cases"],
+            "missing_branches": method_coverage["missing_branches"],
+        }
+
+    return {
+        "success": True,
+        "function_name": function_name,
+        "backend": branch_coverage.BACKEND,
+        "total_branches": total_branches,
+        "methods": methods,
+        # 所有测试方法都没有覆盖到的分支
+        "uncovered_by_all": list((uncovered or {}).values())
+    }
+
+def grade_submission(code: str, function_name: str, test_methods: List[str] = None,
+                     case_timeout: float = DEFAULT_CASE_TIMEOUT) -> Dict[str, Any]:
+    """
+    一份代码在多个测试方法下评分，所有方法的用例合并后一次提交沙箱执行
+
+    参数:
+    code: 被测代码源码
+    function_name: 函数名称
+    test_methods: 测试方法，默认为该题目支持的全部方法
+
+    返回:
+    {"success", "function_name", "score", "total_cases", "passed_cases",
+     "methods": {测试方法: {"test_name", "total_cases", "passed_cases", "pass_rate", "failed_cases": [用例ID]}}}
+    """
+    if function_name not in TEST_CASES:
+        return {
+            "success": False,
+            "message": f"不支持的函数: {function_name}",
+            "available_functions": SUPPORTED_FUNCTIONS
+        }
+
+    suites = []
+    for method in test_methods or available_methods(function_name):
+        suite = get_test_suite(function_name, method)
+        if suite is None:
+            return {
+                "success": False,
+                "message": f"函数{function_name}不支持的测试方法: {method}",
+                "available_methods": available_methods(function_name)
+            }
+        suites.append((method, suite))
+
+    cases = [case for _, suite in suites for case in suite["cases"]]
+    run_result = get_pool().run_cases(code, function_name, cases, case_timeout)
+    if "error" in run_result:
+        return {"success": False, "message": run_result["error"], "function_name": function_name}
+
+    methods = {}
+    offset = 0
+    total_passed = 0
+    for method, suite in suites:
+        outcomes = run_result["results"][offset:offset + len(suite["cases"])]
+        offset += len(suite["cases"])
+        case_results = [_case_result(i, case, outcome) for i, (case, outcome) in enumerate(zip(suite["cases"], outcomes))]
+        passed = sum(1 for case_result in case_results if case_result["Passed"])
+        total_passed += passed
+        methods[method] = {
+            "test_name": suite["name"],
+            "total_cases": len(case_results),
+            "passed_cases": passed,
+            "pass_rate": round(passed / len(case_results) * 100, 2) if case_results else 0,
+            "failed_cases": [case_result["ID"] for case_result in case_results if not case_result["Passed"]]
+        }
+
+    return {
+        "success": True,
+        "function_name": function_name,
+        "score": round(total_passed / len(cases) * 100, 2) if cases else 0,
+        "total_cases": len(cases),
+        "passed_cases": total_passed,
+        "methods": methods
+    }
 
 def get_test_results_json(code: str, function_name: str, test_method: str) -> str:
     """
@@ -181,14 +346,14 @@ if __name__ == "__main__":
         print("=" * 60)
         
         # 获取该函数支持的测试方法
-        available_methods = list(TEST_CASES[function_name]["test_methods"].keys())
+        supported_methods = available_methods(function_name)
         function_methods = 0
         function_cases = 0
         function_passed = 0
         function_failed = 0
         
         # 测试该函数的所有方法
-        for method in available_methods:
+        for method in supported_methods:
             result = generate_test_cases(sample_code, function_name, method)
             function_methods += 1
             total_methods += 1
@@ -252,10 +417,10 @@ if __name__ == "__main__":
     print("=" * 60)
     for function_name in SUPPORTED_FUNCTIONS:
         if function_name in TEST_CASES:
-            methods = list(TEST_CASES[function_name]["test_methods"].keys())
+            methods = available_methods(function_name)
             print(f"{function_name}:")
             for i, method in enumerate(methods, 1):
-                method_name = TEST_CASES[function_name]["test_methods"][method]["name"]
+                method_name = get_test_suite(function_name, method)["name"]
                 print(f"  {i}. {method} - {method_name}")
             print()
     
@@ -0,0 +1,161 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Callable, Hashable, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# 默认并发请求数
+DEFAULT_CONCURRENCY = int(os.getenv("IT_CONCURRENCY", 8))
+# 每个目标主机保持的最大连接数
+POOL_MAXSIZE = int(os.getenv("IT_POOL_MAXSIZE", 32))
+# 连接失败 / 网关错误时的重试次数
+RETRIES = int(os.getenv("IT_RETRIES", 2))
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """
+    进程内共享的 Session，复用 TCP 连接
+
+    POST 不是幂等请求，只有在连接阶段失败（请求尚未发出）时才重试；
+    GET 额外在 502/503/504 时重试
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                retry = Retry(
+                    total=RETRIES,
+                    connect=RETRIES,
+                    read=RETRIES,
+                    status=RETRIES,
+                    backoff_factor=0.2,
+                    status_forcelist=(502, 503, 504),
+                    raise_on_status=False
+                )
+                adapter = HTTPAdapter(pool_connections=10, pool_maxsize=POOL_MAXSIZE, max_retries=retry)
+                session = requests.Session()
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                _session = session
+    return _session
+
+
+def parse_concurrency(value: Any) -> Optional[int]:
+    """解析请求中的并发数：未提供时返回 None（使用默认值），只接受正整数或正整数字符串，否则抛出 ValueError"""
+    if value is None or value == '':
+        return None
+    if isinstance(value, str) and value.strip().isdigit():
+        value = int(value.strip())
+    elif isinstance(value, float) and value.is_integer():
+        value = int(value)
+    if isinstance(value, bool) or not isinstance(value, int) or value <= 0:
+        raise ValueError("concurrency必须是正整数")
+    return value
+
+
+def create_session(pool_maxsize: int = POOL_MAXSIZE) -> requests.Session:
+    """
+    不重试的独立 Session
+
+    压测需要如实记录每一次请求：失败的请求不能被重试成成功，退避等待也不能计入延迟；
+    pool_maxsize 不小于并发数，避免请求排队等待连接
+    """
+    adapter = HTTPAdapter(pool_connections=10, pool_maxsize=max(1, pool_maxsize), max_retries=0)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+class HttpTestClient:
+    """集成测试使用的 HTTP 客户端：共享连接池，按并发数执行用例，并记录请求耗时"""
+
+    def __init__(self, concurrency: int = None):
+        self.session = get_session()
+        self.concurrency = max(1, concurrency or DEFAULT_CONCURRENCY)
+        self._latencies: List[float] = []
+        self._errors = 0
+        self._lock = threading.Lock()
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        start_time = time.perf_counter()
+        try:
+            return self.session.request(method, url, **kwargs)
+        except requests.exceptions.RequestException:
+            with self._lock:
+                self._errors += 1
+            raise
+        finally:
+            with self._lock:
+                self._latencies.append((time.perf_counter() - start_time) * 1000)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def map(self, func: Callable, items: List[Any], chain: Callable[[Any], Optional[Hashable]] = None) -> List[Any]:
+        """
+        并发执行 func(item)，结果顺序与 items 一致
+
+        chain: 返回用例所属的依赖链，同一条链上的用例（如先创建、再测试重名）按原顺序依次执行，
+               不同的链和返回 None 的用例之间并发执行
+        """
+        items = list(items)
+        if self.concurrency <= 1 or len(items) <= 1:
+            return [func(item) for item in items]
+
+        # 按依赖链分组，每组是一串按原顺序执行的下标
+        groups: List[List[int]] = []
+        chain_groups: Dict[Hashable, List[int]] = {}
+        for index, item in enumerate(items):
+            key = chain(item) if chain is not None else None
+            if key is None:
+                groups.append([index])
+            elif key in chain_groups:
+                chain_groups[key].append(index)
+            else:
+                chain_groups[key] = [index]
+                groups.append(chain_groups[key])
+
+        results: List[Any] = [None] * len(items)
+
+        def run_group(indices: List[int]):
+            for index in indices:
+                results[index] = func(items[index])
+
+        with ThreadPoolExecutor(max_workers=min(self.concurrency, len(groups))) as executor:
+            # list() 取出每组的结果，使组内异常在这里抛出
+            list(executor.map(run_group, groups))
+        return results
+
+    def latency_stats(self) -> Dict[str, Any]:
+        """请求耗时统计（毫秒）"""
+        with self._lock:
+            latencies = sorted(self._latencies)
+            errors = self._errors
+        if not latencies:
+            return {"requests": 0, "errors": errors}
+
+        def percentile(p):
+            return round(latencies[min(len(latencies) - 1, int(len(latencies) * p))], 2)
+
+        return {
+            "requests": len(latencies),
+            "errors": errors,
+            "concurrency": self.concurrency,
+            "min_ms": round(latencies[0], 2),
+            "mean_ms": round(sum(latencies) / len(latencies), 2),
+            "p50_ms": percentile(0.5),
+            "p90_ms": percentile(0.9),
+            "p99_ms": percentile(0.99),
+            "max_ms": round(latencies[-1], 2)
+        }
@@ -0,0 +1,260 @@
+"""
+长时间测试任务的后台执行
+
+提交测试套件后立即返回任务ID，套件在后台线程池中执行；
+执行过程中的进度和已完成用例的结果可以随时查询，也可以通过 SSE 实时推送，并支持取消
+"""
+import atexit
+import json
+import os
+import threading
+import time
+import traceback
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Callable, Iterator, Optional
+
+from app.service import history
+
+# 同时执行的任务数
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", 4))
+# 最多保留的已结束任务数，超出后最早结束的任务被清理
+MAX_FINISHED_JOBS = int(os.getenv("JOB_MAX_FINISHED", 200))
+# 事件流空闲时发送心跳的间隔（秒）
+HEARTBEAT_INTERVAL = 15
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATES = {SUCCEEDED, FAILED, CANCELLED}
+
+
+class JobCancelled(BaseException):
+    """
+    任务被取消时由进度回调抛出
+
+    继承 BaseException，不会被被测代码或各测试服务中的 except Exception 吞掉，
+    可以一直传播到任务执行器
+    """
+
+
+class Job:
+    """一个后台测试任务，进度回调可以在多个线程中同时调用"""
+
+    def __init__(self, kind: str, suite_path: str = None, total: int = None):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        # 对应的同步接口路径，任务完成后按该路径写入测试历史
+        self.suite_path = suite_path
+        self.status = QUEUED
+        self.total = total
+        self.done = 0
+        self.partial_results: List[Any] = []
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.future = None
+        self._events: List[Dict[str, Any]] = []
+        self._cancel = threading.Event()
+        self._cond = threading.Condition()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATES
+
+    def check_cancelled(self):
+        if self._cancel.is_set():
+            raise JobCancelled()
+
+    def _publish(self, event: str, data: Any):
+        # 调用方需持有 self._cond
+        self._events.append({"id": len(self._events), "event": event, "data": data})
+        self._cond.notify_all()
+
+    def report(self, item: Any):
+        """报告一个用例完成；任务已取消时抛出 JobCancelled 中止执行"""
+        self.check_cancelled()
+        with self._cond:
+            self.done += 1
+            self.partial_results.append(item)
+            self._publish("progress", {"done": self.done, "total": self.total, "item": item})
+
+    def step(self, item: Any):
+        """报告用例内部的一个步骤（不计入完成数）；任务已取消时抛出 JobCancelled"""
+        self.check_cancelled()
+        with self._cond:
+            self._publish("step", item)
+
+    def _start(self) -> bool:
+        with self._cond:
+            if self.status != QUEUED:
+                return False
+            self.status = RUNNING
+            self.started_at = time.time()
+            self._publish("status", {"status": RUNNING})
+            return True
+
+    def _finish(self, status: str, result: Any = None, error: str = None) -> bool:
+        with self._cond:
+            if self.finished:
+                return False
+            self.status = status
+            self.result = result
+            self.error = error
+            self.finished_at = time.time()
+            self._publish("status", {"status": status, "error": error})
+            if result is not None:
+                self._publish("result", result)
+            return True
+
+    def events(self, after: int = -1, heartbeat: float = HEARTBEAT_INTERVAL) -> Iterator[Optional[Dict[str, Any]]]:
+        """
+        依次产出 id 大于 after 的事件，任务结束且事件发送完后停止
+
+        超过 heartbeat 秒没有新事件时产出 None，调用方据此发送心跳
+        """
+        index = after + 1
+        while True:
+            with self._cond:
+                if index >= len(self._events) and not self.finished:
+                    self._cond.wait(heartbeat)
+                pending = self._events[index:]
+                finished = self.finished
+            if not pending and not finished:
+                yield None
+            for event in pending:
+                yield event
+            index += len(pending)
+            if finished and index >= len(self._events):
+                return
+
+    def to_dict(self, include_results: bool = True) -> Dict[str, Any]:
+        with self._cond:
+            data = {
+                "job_id": self.id,
+                "kind": self.kind,
+                "status": self.status,
+                "progress": {"done": self.done, "total": self.total},
+                "created_at": self.created_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+                "error": self.error
+            }
+            if include_results:
+                data["partial_results"] = list(self.partial_results)
+                data["result"] = self.result
+        return data
+
+
+class JobManager:
+    """任务队列和执行线程池，任务数超过线程数时排队等待"""
+
+    def __init__(self, max_workers: int = JOB_WORKERS):
+        self.max_workers = max(1, max_workers)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="job")
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, func: Callable[[Job], Any], suite_path: str = None,
+               total: int = None) -> Job:
+        """
+        提交任务
+
+        Args:
+            kind: 任务类型，仅用于展示
+            func: 执行函数，接收 Job 并返回最终结果；执行过程中通过 job.report / job.step 报告进度
+            suite_path: 对应的同步接口路径，任务成功后结果按该路径写入测试历史
+            total: 用例总数（已知时）
+        """
+        job = Job(kind, suite_path, total)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+        job.future = self._executor.submit(self._run, job, func)
+        return job
+
+    def _run(self, job: Job, func: Callable[[Job], Any]):
+        if job.cancelled or not job._start():
+            return
+        try:
+            result = func(job)
+        except JobCancelled:
+            job._finish(CANCELLED)
+            return
+        except Exception as e:
+            print(f"后台任务 {job.id} 执行失败: {traceback.format_exc()}")
+            job._finish(FAILED, error=str(e))
+            return
+        if job._finish(SUCCEEDED, result=result):
+            self._record(job)
+
+    def _record(self, job: Job):
+        if not job.suite_path or not isinstance(job.result, dict):
+            return
+        try:
+            body = json.dumps(job.result, ensure_ascii=False, default=str).encode('utf-8')
+        except (TypeError, ValueError):
+            return
+        duration_ms = (job.finished_at - job.started_at) * 1000
+        history.get_recorder().record_response(job.suite_path, job.started_at, duration_ms, body)
+
+    def _prune(self):
+        # 调用方需持有 self._lock
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list_jobs(self, status: str = None) -> List[Job]:
+        with self._lock:
+            jobs = list(self._jobs.values())
+        if status:
+            jobs = [job for job in jobs if job.status == status]
+        return jobs
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """
+        取消任务：排队中的任务直接取消；执行中的任务在下一次报告进度时中止
+        """
+        job = self.get(job_id)
+        if job is None:
+            return None
+        job._cancel.set()
+        if job.future is not None and job.future.cancel():
+            job._finish(CANCELLED)
+        elif job.status == QUEUED:
+            # 已被线程取走但尚未开始，_run 中会检查取消标志
+            job._finish(CANCELLED)
+        return job
+
+    def shutdown(self):
+        for job in self.list_jobs():
+            job._cancel.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_manager: Optional[JobManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_job_manager() -> JobManager:
+    """进程级共享的任务管理器，首次使用时创建"""
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                _manager = JobManager()
+                atexit.register(_manager.shutdown)
+    return _manager
@@ -0,0 +1,359 @@
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
+
+import requests
+
+from app.service.admin_test import AdminTestService
+from app.service.plot_test import PlotTestService
+from app.service.http_transport import create_session
+from app.static.system_test import DEFAULT_TEST_CONFIG, DEFAULT_TEST_IMAGE, TEST_DIRECTORIES
+
+# 默认压测本地启动的 PGuard（可用 PGUARD_DB_SQLITE 指向 SQLite 文件启动）
+DEFAULT_BASE_URL = os.getenv("LOADTEST_BASE_URL", "http://localhost:8000")
+# 压测时长上限（秒），避免一次请求占用测试平台过久
+MAX_DURATION = 300
+# 开环模式下同时在途请求数的上限
+MAX_IN_FLIGHT = 256
+SUPPORTED_SCENARIOS = ["add_package", "add_plot", "plot_detail", "detect"]
+
+
+class LatencyHistogram:
+    """
+    HDR 风格的对数线性直方图（单位微秒）
+
+    小于 256us 的值精确记录；更大的值按 2 的幂分段，每段再均分为 128 个子桶，
+    相对误差不超过 1/128，内存占用与记录次数无关
+    """
+
+    SUB_BUCKETS = 128
+
+    def __init__(self):
+        self.counts: Dict[int, int] = {}
+        self.total = 0
+        self.sum = 0
+        self.min = None
+        self.max = None
+
+    @classmethod
+    def _index(cls, value: int) -> int:
+        if value < 2 * cls.SUB_BUCKETS:
+            return value
+        shift = value.bit_length() - 8
+        return 2 * cls.SUB_BUCKETS + (shift - 1) * cls.SUB_BUCKETS + ((value >> shift) - cls.SUB_BUCKETS)
+
+    @classmethod
+    def _upper_bound(cls, index: int) -> int:
+        """桶内可能的最大值"""
+        if index < 2 * cls.SUB_BUCKETS:
+            return index
+        offset = index - 2 * cls.SUB_BUCKETS
+        shift = offset // cls.SUB_BUCKETS + 1
+        mantissa = offset % cls.SUB_BUCKETS + cls.SUB_BUCKETS
+        return ((mantissa + 1) << shift) - 1
+
+    def record(self, value_us: float):
+        value = max(0, int(value_us))
+        index = self._index(value)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.total += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other: "LatencyHistogram"):
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.total += other.total
+        self.sum += other.sum
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+
+    def percentile(self, p: float) -> Optional[int]:
+        if not self.total:
+            return None
+        target = max(1, math.ceil(self.total * p / 100))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= target:
+                return min(self._upper_bound(index), self.max)
+        return self.max
+
+    def summary(self) -> Dict[str, Any]:
+        def ms(value):
+            return None if value is None else round(value / 1000, 3)
+
+        return {
+            "min_ms": ms(self.min),
+            "mean_ms": ms(self.sum / self.total) if self.total else None,
+            "p50_ms": ms(self.percentile(50)),
+            "p90_ms": ms(self.percentile(90)),
+            "p99_ms": ms(self.percentile(99)),
+            "p999_ms": ms(self.percentile(99.9)),
+            "max_ms": ms(self.max),
+        }
+
+    def buckets(self) -> List[List[float]]:
+        """[[桶上界(ms), 次数], ...]，只包含非空桶"""
+        return [[round(self._upper_bound(index) / 1000, 3), self.counts[index]] for index in sorted(self.counts)]
+
+
+class EndpointStats:
+    def __init__(self):
+        self.histogram = LatencyHistogram()
+        self.requests = 0
+        self.errors = 0
+        self.unexpected = 0
+        self.status_counts: Dict[str, int] = {}
+
+    def record(self, latency_us: float, status: Optional[int], expected_status: Optional[int]):
+        self.requests += 1
+        self.histogram.record(latency_us)
+        key = str(status) if status is not None else "error"
+        self.status_counts[key] = self.status_counts.get(key, 0) + 1
+        if status is None or status >= 500:
+            self.errors += 1
+        if expected_status is not None and status != expected_status:
+            self.unexpected += 1
+
+    def report(self, elapsed: float) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "throughput_rps": round(self.requests / elapsed, 2) if elapsed else 0,
+            "error_rate": round(self.errors / self.requests, 4) if self.requests else 0,
+            "unexpected_status_rate": round(self.unexpected / self.requests, 4) if self.requests else 0,
+            "status_counts": self.status_counts,
+            "latency": self.histogram.summary(),
+            "histogram": self.histogram.buckets(),
+        }
+
+
+class LoadTestService:
+    """把预定义的功能测试用例按目标 RPS 或并发数重放，统计各接口的延迟分布、错误率和吞吐量"""
+
+    def __init__(self, base_url: str, auth_token: str = "", username: str = None, password: str = None):
+        self.base_url = base_url.rstrip("/")
+        # 压测不使用共享的重试 Session，每次请求的结果和耗时都如实记录
+        self.session = create_session()
+        self.auth_token = auth_token
+        self.username = username or DEFAULT_TEST_CONFIG["test_username"]
+        self.password = password or DEFAULT_TEST_CONFIG["test_password"]
+        self._lock = threading.Lock()
+
+    def _auth_headers(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.auth_token}"} if self.auth_token else {}
+
+    def _login(self):
+        """未提供 token 时使用 E2E 测试账号登录"""
+        if self.auth_token:
+            return
+        response = self.session.post(
+            f"{self.base_url}/user/signin",
+            json={"userName": self.username, "password": self.password},
+            timeout=10
+        )
+        response.raise_for_status()
+        self.auth_token = response.json()["access_token"]
+
+    # ---------------- 用例目录 -> 请求模板 ----------------
+
+    def _package_requests(self) -> List[Dict[str, Any]]:
+        requests_ = []
+        for case in AdminTestService().get_package_predefined_cases():
+            params = {key: case[key] for key in ("packageName", "price", "sumNum") if case.get(key) is not None}
+            requests_.append({
+                "endpoint": "POST /admin/package/add",
+                "method": "POST",
+                "url": f"{self.base_url}/admin/package/add",
+                "kwargs": {"params": params},
+                "expected_status": case["expected_status"],
+            })
+        return requests_
+
+    def _plot_requests(self) -> List[Dict[str, Any]]:
+        requests_ = []
+        for case in PlotTestService().get_plot_predefined_cases():
+            data = {key: case[key] for key in ("plotName", "plantName") if case.get(key) is not None}
+            headers = {} if case.get("skip_auth") else self._auth_headers()
+            requests_.append({
+                "endpoint": "POST /plot/add",
+                "method": "POST",
+                "url": f"{self.base_url}/plot/add",
+                "kwargs": {"json": data, "headers": headers},
+                "expected_status": case["expected_status"],
+            })
+        return requests_
+
+    def _plot_detail_requests(self) -> List[Dict[str, Any]]:
+        requests_ = []
+        plot_service = PlotTestService()
+        for case in plot_service.get_plot_detail_predefined_cases():
+            plot_id = plot_service.resolve_plot_id(case.get("plotId"))
+            headers = {} if case.get("skip_auth") else self._auth_headers()
+            requests_.append({
+                "endpoint": "GET /plot/{plotId}",
+                "method": "GET",
+                "url": f"{self.base_url}/plot/{plot_id}" if plot_id is not None else f"{self.base_url}/plot/",
+                "kwargs": {"headers": headers},
+                "expected_status": case.get("expected_status"),
+            })
+        return requests_
+
+    def _detect_requests(self) -> List[Dict[str, Any]]:
+        """与 E2E 检测流程相同：测试账号的第一个地块 + 默认测试图片"""
+        response = self.session.get(f"{self.base_url}/plot", headers=self._auth_headers(), timeout=10)
+        response.raise_for_status()
+        plots = response.json()
+        # 没有地块时接口返回 {"message": ...}
+        if not isinstance(plots, list) or not plots:
+            raise ValueError("测试账号下没有地块，无法压测检测接口")
+        plot_id = plots[0]["plotId"]
+
+        image_path = os.path.join(TEST_DIRECTORIES["test_data"], DEFAULT_TEST_IMAGE["filename"])
+        if not os.path.exists(image_path):
+            from app.service.system_test.utils import E2ETestUtils
+            os.makedirs(TEST_DIRECTORIES["test_data"], exist_ok=True)
+            E2ETestUtils._create_default_test_image(image_path)
+        with open(image_path, "rb") as f:
+            image = f.read()
+
+        return [{
+            "endpoint": "POST /plot/{plotId}/detect",
+            "method": "POST",
+            "url": f"{self.base_url}/plot/{plot_id}/detect",
+            "kwargs": {"headers": self._auth_headers()},
+            "files": (DEFAULT_TEST_IMAGE["filename"], image, "image/jpeg"),
+            "expected_status": 200,
+        }]
+
+    def build_requests(self, scenarios: List[str]) -> List[Dict[str, Any]]:
+        builders = {
+            "add_package": self._package_requests,
+            "add_plot": self._plot_requests,
+            "plot_detail": self._plot_detail_requests,
+            "detect": self._detect_requests,
+        }
+        unknown = [name for name in scenarios if name not in builders]
+        if unknown:
+            raise ValueError(f"不支持的场景: {', '.join(unknown)}，可选: {', '.join(SUPPORTED_SCENARIOS)}")
+        if any(name in ("add_plot", "plot_detail", "detect") for name in scenarios):
+            self._login()
+
+        requests_ = []
+        for name in scenarios:
+            requests_.extend(builders[name]())
+        return requests_
+
+    # ---------------- 执行 ----------------
+
+    def _send(self, template: Dict[str, Any], stats: Dict[str, EndpointStats], scheduled: float):
+        status = None
+        try:
+            kwargs = dict(template["kwargs"])
+            if "files" in template:
+                # 文件对象不能在线程间复用，每次请求重新构造
+                kwargs["files"] = {"file": template["files"]}
+            response = self.session.request(template["method"], template["url"], timeout=30, **kwargs)
+            status = response.status_code
+        except requests.exceptions.RequestException:
+            pass
+        # 开环模式从计划发送时刻计时，排队等待也计入延迟，避免协调遗漏
+        latency_us = (time.perf_counter() - scheduled) * 1_000_000
+        with self._lock:
+            stats[template["endpoint"]].record(latency_us, status, template.get("expected_status"))
+
+    def run(self, scenarios: List[str], mode: str = "concurrency", rps: float = 10,
+            concurrency: int = 10, duration: float = 30) -> Dict[str, Any]:
+        """
+        执行压测
+
+        Args:
+            scenarios: 场景列表，可选 add_package / add_plot / plot_detail / detect
+            mode: "rps" 按固定速率开环发送；"concurrency" 固定并发数闭环发送
+            rps: 目标每秒请求数（rps 模式）
+            concurrency: 并发数（concurrency 模式）
+            duration: 持续时间（秒）
+
+        Returns:
+            JSON 格式的压测报告
+        """
+        if mode not in ("rps", "concurrency"):
+            raise ValueError("mode 只能是 rps 或 concurrency")
+        duration = min(float(duration), MAX_DURATION)
+        # 连接池不小于最大在途请求数，请求不会在客户端排队等待连接
+        self.session.close()
+        self.session = create_session(MAX_IN_FLIGHT if mode == "rps" else max(1, concurrency))
+        templates = self.build_requests(scenarios)
+        if not templates:
+            raise ValueError("所选场景没有可用的请求")
+        stats = {template["endpoint"]: EndpointStats() for template in templates}
+
+        start = time.perf_counter()
+        deadline = start + duration
+        if mode == "rps":
+            interval = 1.0 / max(rps, 0.001)
+            in_flight = threading.BoundedSemaphore(MAX_IN_FLIGHT)
+
+            def send_and_release(template, scheduled):
+                try:
+                    self._send(template, stats, scheduled)
+                finally:
+                    in_flight.release()
+
+            with ThreadPoolExecutor(max_workers=MAX_IN_FLIGHT) as executor:
+                sent = 0
+                while True:
+                    scheduled = start + sent * interval
+                    if scheduled >= deadline:
+                        break
+                    delay = scheduled - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                    in_flight.acquire()
+                    executor.submit(send_and_release, templates[sent % len(templates)], scheduled)
+                    sent += 1
+        else:
+            counter = iter(range(1 << 62))
+            counter_lock = threading.Lock()
+
+            def worker():
+                while time.perf_counter() < deadline:
+                    with counter_lock:
+                        index = next(counter)
+                    self._send(templates[index % len(templates)], stats, time.perf_counter())
+
+            with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+                for _ in range(max(1, concurrency)):
+                    executor.submit(worker)
+
+        elapsed = time.perf_counter() - start
+        return self._build_report(stats, elapsed, {
+            "base_url": self.base_url,
+            "scenarios": scenarios,
+            "mode": mode,
+            "target_rps": rps if mode == "rps" else None,
+            "concurrency": concurrency if mode == "concurrency" else None,
+            "duration": duration,
+        })
+
+    def _build_report(self, stats: Dict[str, EndpointStats], elapsed: float, config: Dict[str, Any]) -> Dict[str, Any]:
+        overall = EndpointStats()
+        for endpoint_stats in stats.values():
+            overall.histogram.merge(endpoint_stats.histogram)
+            overall.requests += endpoint_stats.requests
+            overall.errors += endpoint_stats.errors
+            overall.unexpected += endpoint_stats.unexpected
+            for status, count in endpoint_stats.status_counts.items():
+                overall.status_counts[status] = overall.status_counts.get(status, 0) + count
+
+        return {
+            "config": config,
+            "elapsed_seconds": round(elapsed, 3),
+            "overall": overall.report(elapsed),
+            "endpoints": {endpoint: endpoint_stats.report(elapsed) for endpoint, endpoint_stats in stats.items()},
+        }
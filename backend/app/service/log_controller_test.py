@@ -1,3 +1,4 @@
+import threading
 import time
 import uuid
 from typing import List, Dict, Any, Optional
@@ -5,6 +6,8 @@ from dataclasses import dataclass
 from datetime import datetime
 import asyncio
 
+from app.service.async_bridge import TaskLocal
+
 # 数据模型定义
 @dataclass
 class LogDetail:
@@ -38,6 +41,13 @@ class HTTPException(Exception):
         super().__init__(detail)
 
 class LogControllerTestService:
+    # 模拟日志存储和异常模拟标志，每个测试任务各自独立
+    mock_logs = TaskLocal(default_factory=list)
+    _simulate_db_error = TaskLocal(False)
+    _simulate_validation_error = TaskLocal(False)
+    _simulate_field_length_error = TaskLocal(False)
+    _simulate_plot_not_found = TaskLocal(False)
+
     def __init__(self):
         # 模拟地块数据
         self.mock_plots = {
@@ -63,15 +73,6 @@ class LogControllerTestService:
                 createTime=datetime(2024, 1, 3, 10, 0, 0)
             )
         }
-        
-        # 模拟日志存储
-        self.mock_logs = []
-        
-        # 异常模拟标志
-        self._simulate_db_error = False
-        self._simulate_validation_error = False
-        self._simulate_field_length_error = False
-        self._simulate_plot_not_found = False
     
     async def set_log(self, plotId: str, diseaseName: str, advice: str, imageURL: str) -> str:
         """
@@ -670,4 +671,18 @@ class LogControllerTestService:
             "statistics_by_type": type_stats,  # 这里包含了类型统计
             "test_results": results,
             "failed_cases": [r for r in results if not r["passed"]]
-        })
\ No newline at end of file
+        })
+
+
+_service: Optional[LogControllerTestService] = None
+_service_lock = threading.Lock()
+
+
+def get_log_controller_test_service() -> LogControllerTestService:
+    """进程级共享的服务实例，模拟数据只在首次使用时构造一次，之后只读"""
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = LogControllerTestService()
+    return _service
@@ -0,0 +1,442 @@
+"""
+变异测试：用变异体被杀死的比例衡量各测试方法用例集的检错能力
+
+对被测代码的语法树做单点修改生成变异体（关系/算术/逻辑运算符替换、常量 ±1、条件取反），
+在沙箱进程池中用测试用例逐个执行变异体，任一用例的输出与原代码不同即视为杀死，
+该变异体剩余的用例不再执行。原代码先带覆盖统计执行一遍，变异点所在行没有被任何用例
+执行到的变异体不可能被杀死，直接记为未覆盖而不运行
+"""
+import ast
+import copy
+import hashlib
+import math
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Callable, Optional
+
+from app.static.homework_data import TEST_CASES, SUPPORTED_FUNCTIONS
+from app.service.sandbox import (
+    get_pool, call_case, picklable, case_limit, CaseTimeout, SandboxError,
+    DEFAULT_CASE_TIMEOUT, KILL_GRACE_SECONDS
+)
+from app.service.case_generator import get_test_suite, available_methods
+
+MUTATION_TASK = "app.service.mutation:mutation_task"
+
+# 变异算子
+MUTATION_OPERATORS = {
+    "ROR": "关系运算符替换",
+    "AOR": "算术运算符替换",
+    "LCR": "逻辑连接符替换",
+    "CRP": "常量替换",
+    "COI": "条件取反",
+    "UOD": "删除 not",
+}
+# 变异体状态
+KILLED = "killed"
+TIMEOUT = "timeout"          # 超时同样视为被杀死
+SURVIVED = "survived"
+NOT_COVERED = "not_covered"  # 变异点没有被任何用例执行到
+INVALID = "invalid"          # 变异体加载失败，不计入变异得分
+
+# 父进程缓存的变异体集合数（按代码哈希）
+MUTANT_CACHE_SIZE = 32
+# 沙箱进程内缓存的已加载变异体数
+COMPILED_CACHE_SIZE = 1024
+
+_ROR = {
+    ast.Lt: (ast.LtE, ast.GtE),
+    ast.LtE: (ast.Lt, ast.Gt),
+    ast.Gt: (ast.GtE, ast.LtE),
+    ast.GtE: (ast.Gt, ast.Lt),
+    ast.Eq: (ast.NotEq,),
+    ast.NotEq: (ast.Eq,),
+}
+_AOR = {
+    ast.Add: (ast.Sub,),
+    ast.Sub: (ast.Add,),
+    ast.Mult: (ast.Div,),
+    ast.Div: (ast.Mult,),
+    ast.FloorDiv: (ast.Mult,),
+    ast.Mod: (ast.FloorDiv,),
+}
+_SYMBOLS = {ast.And: "and", ast.Or: "or"}
+
+_mutant_cache: "OrderedDict[str, List[Dict[str, Any]]]" = OrderedDict()
+_mutant_lock = threading.Lock()
+
+
+# ---------------------------------------------------------------------------
+# 变异体生成
+# ---------------------------------------------------------------------------
+
+def _has_docstring(node) -> bool:
+    return bool(node.body) and isinstance(node.body[0], ast.Expr) \
+        and isinstance(node.body[0].value, ast.Constant) and isinstance(node.body[0].value.value, str)
+
+
+class _Mutator(ast.NodeTransformer):
+    """
+    按固定顺序遍历函数体，枚举所有变异点
+
+    target 为 None 时只记录变异点；否则在第 target 个变异点处应用修改。
+    两种模式遍历顺序相同，变异点编号一致
+    """
+
+    def __init__(self, target: int = None):
+        self.target = target
+        self.sites: List[Dict[str, Any]] = []
+        self.depth = 0
+        self.line = None
+
+    def _offer(self, node, operator: str, description: str) -> bool:
+        """登记一个变异点，返回是否应在此处应用修改"""
+        self.sites.append({
+            "operator": operator,
+            "line": self.line,
+            "col": getattr(node, "col_offset", 0),
+            "description": description,
+        })
+        return len(self.sites) - 1 == self.target
+
+    def visit(self, node):
+        if isinstance(node, ast.stmt):
+            # 函数体外的模块级语句在加载时执行，不做变异
+            if not self.depth and not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                return node
+            line, self.line = self.line, node.lineno
+            result = super().visit(node)
+            self.line = line
+            return result
+        return super().visit(node)
+
+    def _visit_function(self, node):
+        self.depth += 1
+        start = 1 if _has_docstring(node) else 0
+        node.body[start:] = [self.visit(statement) for statement in node.body[start:]]
+        self.depth -= 1
+        return node
+
+    visit_FunctionDef = _visit_function
+    visit_AsyncFunctionDef = _visit_function
+
+    def visit_Compare(self, node):
+        self.generic_visit(node)
+        for position, op in enumerate(node.ops):
+            for replacement in _ROR.get(type(op), ()):
+                mutated = copy.copy(node)
+                mutated.ops = list(node.ops)
+                mutated.ops[position] = replacement()
+                description = f"{ast.unparse(node)} → {ast.unparse(mutated)}"
+                if self._offer(node, "ROR", description):
+                    node.ops[position] = replacement()
+        return node
+
+    def _replace_operator(self, node):
+        self.generic_visit(node)
+        for replacement in _AOR.get(type(node.op), ()):
+            mutated = copy.copy(node)
+            mutated.op = replacement()
+            description = f"{ast.unparse(node)} → {ast.unparse(mutated)}"
+            if self._offer(node, "AOR", description):
+                node.op = replacement()
+        return node
+
+    visit_BinOp = _replace_operator
+    visit_AugAssign = _replace_operator
+
+    def visit_BoolOp(self, node):
+        self.generic_visit(node)
+        replacement = ast.Or if isinstance(node.op, ast.And) else ast.And
+        description = f"{_SYMBOLS[type(node.op)]} → {_SYMBOLS[replacement]}"
+        if self._offer(node, "LCR", description):
+            node.op = replacement()
+        return node
+
+    def visit_UnaryOp(self, node):
+        self.generic_visit(node)
+        if isinstance(node.op, ast.Not):
+            operand = ast.unparse(node.operand)
+            if self._offer(node, "UOD", f"not {operand} → {operand}"):
+                return node.operand
+        return node
+
+    def visit_Constant(self, node):
+        value = node.value
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return node
+        for replacement in (value + 1, value - 1):
+            if self._offer(node, "CRP", f"{value!r} → {replacement!r}"):
+                return ast.copy_location(ast.Constant(replacement), node)
+        return node
+
+    def _negate_condition(self, node):
+        self.generic_visit(node)
+        if self._offer(node.test, "COI", f"{ast.unparse(node.test)} → not ({ast.unparse(node.test)})"):
+            node.test = ast.copy_location(ast.UnaryOp(ast.Not(), node.test), node.test)
+        return node
+
+    visit_If = _negate_condition
+    visit_While = _negate_condition
+
+
+def _code_hash(code: str) -> str:
+    return hashlib.sha1(code.encode("utf-8")).hexdigest()
+
+
+def generate_mutants(code: str) -> List[Dict[str, Any]]:
+    """
+    生成代码的全部一阶变异体，按代码哈希缓存
+
+    Returns:
+        [{"id", "operator", "line", "col", "description", "source"}]，
+        源码相同的变异体只保留一个；代码有语法错误时抛出 SyntaxError
+    """
+    key = _code_hash(code)
+    with _mutant_lock:
+        mutants = _mutant_cache.get(key)
+        if mutants is not None:
+            _mutant_cache.move_to_end(key)
+            return mutants
+
+    tree = ast.parse(code)
+    original = ast.unparse(tree)
+    counter = _Mutator()
+    counter.visit(copy.deepcopy(tree))
+
+    mutants, seen = [], {original}
+    for index, site in enumerate(counter.sites):
+        mutator = _Mutator(index)
+        mutated = ast.fix_missing_locations(mutator.visit(copy.deepcopy(tree)))
+        source = ast.unparse(mutated)
+        if source in seen:
+            continue
+        seen.add(source)
+        mutants.append({"id": len(mutants) + 1, **site, "source": source})
+
+    with _mutant_lock:
+        _mutant_cache[key] = mutants
+        while len(_mutant_cache) > MUTANT_CACHE_SIZE:
+            _mutant_cache.popitem(last=False)
+    return mutants
+
+
+# ---------------------------------------------------------------------------
+# 沙箱进程内执行的部分
+# ---------------------------------------------------------------------------
+
+_compiled_mutants: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+
+def outcome_value(actual: Any, error: Optional[str]) -> Any:
+    """用例输出的比较值，异常与 generate_test_cases 中的格式一致"""
+    return actual if error is None else f"执行错误: {error}"
+
+
+def _load_mutant(source: str, timeout: float) -> Dict[str, Any]:
+    key = _code_hash(source)
+    namespace = _compiled_mutants.get(key)
+    if namespace is None:
+        namespace = {"__name__": "__mutant__", "__builtins__": __builtins__}
+        with case_limit(timeout):
+            exec(compile(source, "<mutant>", "exec"), namespace)
+        _compiled_mutants[key] = namespace
+        if len(_compiled_mutants) > COMPILED_CACHE_SIZE:
+            _compiled_mutants.popitem(last=False)
+    else:
+        _compiled_mutants.move_to_end(key)
+    return namespace
+
+
+def _run_mutant(mutant: Dict[str, Any], function_name: str, cases: List[Dict[str, Any]],
+                timeout: float) -> Dict[str, Any]:
+    try:
+        function = _load_mutant(mutant["source"], timeout).get(function_name)
+    except BaseException as e:
+        return {"status": INVALID, "reason": f"加载失败: {str(e)}"}
+    if function is None:
+        return {"status": INVALID, "reason": f"未找到函数: {function_name}"}
+
+    for index in mutant["cases"]:
+        case = cases[index]
+        try:
+            with case_limit(timeout):
+                actual = outcome_value(picklable(call_case(function, case["input"])), None)
+        except CaseTimeout:
+            return {"status": TIMEOUT, "killed_by": index}
+        except BaseException as e:
+            actual = outcome_value(None, str(e))
+        if actual != case["expected"]:
+            return {"status": KILLED, "killed_by": index}
+    return {"status": SURVIVED}
+
+
+def mutation_task(payload: Dict[str, Any], emit: Callable):
+    """
+    逐个执行变异体，每个变异体在第一个输出不同的用例处停止
+
+    payload: {function_name, cases: [{"input", "expected": 原代码的输出}],
+              mutants: [{"id", "source", "cases": 需要执行的用例下标}], case_timeout}
+    """
+    timeout = payload.get("case_timeout", DEFAULT_CASE_TIMEOUT)
+    for mutant in payload["mutants"]:
+        outcome = _run_mutant(mutant, payload["function_name"], payload["cases"], timeout)
+        emit({"id": mutant["id"], **outcome})
+    return None
+
+
+# ---------------------------------------------------------------------------
+# 父进程（Flask）使用的部分
+# ---------------------------------------------------------------------------
+
+def _execute_mutants(function_name: str, cases: List[Dict[str, Any]], mutants: List[Dict[str, Any]],
+                     case_timeout: float, on_result: Callable[[Dict[str, Any]], None]):
+    """把变异体分片到沙箱进程并行执行；进程被杀时当前变异体记为超时，其余变异体换新进程继续"""
+    if not mutants:
+        return
+    pool = get_pool()
+    chunk_size = max(1, math.ceil(len(mutants) / pool.size))
+    chunks = [mutants[i:i + chunk_size] for i in range(0, len(mutants), chunk_size)]
+
+    def run_chunk(chunk):
+        finished = 0
+        while finished < len(chunk):
+            pending = chunk[finished:]
+            longest = max(len(mutant["cases"]) for mutant in pending)
+            payload = {
+                "function_name": function_name,
+                "cases": cases,
+                "mutants": pending,
+                "case_timeout": case_timeout,
+            }
+            try:
+                for kind, data in pool.stream(MUTATION_TASK, payload, case_timeout * (longest + 1) + KILL_GRACE_SECONDS):
+                    if kind == "item":
+                        finished += 1
+                        on_result(data)
+            except SandboxError as e:
+                on_result({"id": pending[0]["id"], "status": TIMEOUT, "reason": str(e)})
+                finished += 1
+
+    with ThreadPoolExecutor(max_workers=len(chunks)) as executor:
+        list(executor.map(run_chunk, chunks))
+
+
+def _public(mutant: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: mutant[key] for key in ("id", "operator", "line", "col", "description")}
+
+
+def _score_method(code: str, function_name: str, test_method: str, mutants: List[Dict[str, Any]],
+                  case_timeout: float, on_progress: Callable[[Dict[str, Any]], None] = None) -> Dict[str, Any]:
+    suite = get_test_suite(function_name, test_method)
+    if suite is None:
+        return {
+            "success": False,
+            "message": f"函数{function_name}不支持的测试方法: {test_method}",
+            "available_methods": available_methods(function_name)
+        }
+
+    # 原代码带覆盖统计执行一遍，得到每个用例的输出和执行过的行
+    baseline = get_pool().run_cases(code, function_name, suite["cases"], case_timeout, coverage=True)
+    if "error" in baseline:
+        return {"success": False, "message": baseline["error"], "function_name": function_name}
+
+    cases, case_lines = [], []
+    for case, outcome in zip(suite["cases"], baseline["results"]):
+        cases.append({"input": case["input"], "expected": outcome_value(outcome["actual"], outcome["error"])})
+        # 原代码自身超时或沙箱被杀的用例无法作为比较基准
+        usable = outcome["arcs"] is not None and not str(outcome["error"] or "").startswith("执行超时")
+        case_lines.append({target for _, target in outcome["arcs"]} if usable else set())
+
+    statuses: Dict[int, Dict[str, Any]] = {}
+    runnable = []
+    for mutant in mutants:
+        covering = [index for index, lines in enumerate(case_lines) if mutant["line"] in lines]
+        if covering:
+            runnable.append({"id": mutant["id"], "source": mutant["source"], "cases": covering})
+        else:
+            statuses[mutant["id"]] = {"status": NOT_COVERED}
+
+    lock = threading.Lock()
+
+    def on_result(data):
+        with lock:
+            statuses[data["id"]] = data
+            done = len(statuses)
+        if on_progress is not None:
+            on_progress({"test_method": test_method, "done": done, "total": len(mutants)})
+
+    _execute_mutants(function_name, cases, runnable, case_timeout, on_result)
+
+    counts = {status: 0 for status in (KILLED, TIMEOUT, SURVIVED, NOT_COVERED, INVALID)}
+    survivors, killed_by = [], {}
+    for mutant in mutants:
+        outcome = statuses[mutant["id"]]
+        counts[outcome["status"]] += 1
+        if outcome["status"] in (SURVIVED, NOT_COVERED):
+            survivors.append({**_public(mutant), "status": outcome["status"]})
+        elif "killed_by" in outcome:
+            killed_by[mutant["id"]] = outcome["killed_by"] + 1
+
+    valid = len(mutants) - counts[INVALID]
+    killed = counts[KILLED] + counts[TIMEOUT]
+    score = round(killed / valid * 100, 2) if valid else 0
+    return {
+        "success": True,
+        "test_name": suite["name"],
+        "total_cases": len(suite["cases"]),
+        "summary": {**counts, "valid_mutants": valid, "mutation_score": f"{score}%"},
+        "score": score,
+        "survivors": survivors,
+        # 变异体ID -> 杀死它的用例ID
+        "killed_by": killed_by,
+    }
+
+
+def run_mutation(code: str, function_name: str, test_methods: List[str] = None,
+                 case_timeout: float = DEFAULT_CASE_TIMEOUT,
+                 on_progress: Callable[[Dict[str, Any]], None] = None) -> Dict[str, Any]:
+    """
+    计算各测试方法用例集的变异得分
+
+    Args:
+        code: 被测代码（通常是题目的参考实现）
+        function_name: 函数名
+        test_methods: 要评估的测试方法，默认为题目支持的全部方法
+        on_progress: 每完成一个变异体时以 {"test_method", "done", "total"} 调用，回调抛出的异常会中止执行
+
+    Returns:
+        {"success", "function_name", "total_mutants", "operators", "mutants", "methods", "ranking"}
+    """
+    if function_name not in TEST_CASES:
+        return {
+            "success": False,
+            "message": f"不支持的函数: {function_name}",
+            "available_functions": SUPPORTED_FUNCTIONS
+        }
+    try:
+        mutants = generate_mutants(code)
+    except SyntaxError as e:
+        return {"success": False, "message": f"代码语法错误: {str(e)}", "function_name": function_name}
+
+    methods = {}
+    for method in test_methods or available_methods(function_name):
+        result = _score_method(code, function_name, method, mutants, case_timeout, on_progress)
+        if not result.pop("success"):
+            return {"success": False, **result}
+        methods[method] = result
+
+    operators = {}
+    for mutant in mutants:
+        operators[mutant["operator"]] = operators.get(mutant["operator"], 0) + 1
+
+    return {
+        "success": True,
+        "function_name": function_name,
+        "total_mutants": len(mutants),
+        "operators": {key: {"name": MUTATION_OPERATORS[key], "count": count} for key, count in operators.items()},
+        "mutants": [_public(mutant) for mutant in mutants],
+        "methods": methods,
+        "ranking": sorted(methods, key=lambda method: methods[method]["score"], reverse=True)
+    }
@@ -0,0 +1,676 @@
+"""
+课程练习函数的穷举测试预言（oracle）
+
+每个练习函数都有一个用 NumPy 向量化实现的参考版本，可以一次算出整个有界输入域上的期望输出。
+提交的代码在沙箱进程中对输入域逐点执行，与参考输出比较后，不一致的输入点按
+(期望输出, 实际输出) 分组并压缩成若干个参数区间返回
+"""
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Callable, Optional, Tuple
+
+import numpy as np
+
+from app.service.sandbox import (
+    get_pool, load_function, case_limit, CaseTimeout, SandboxError, KILL_GRACE_SECONDS
+)
+
+EXHAUSTIVE_TASK = "app.service.oracle:exhaustive_task"
+
+# 输出类别编码：>0 为 messages 中的提示信息（从 1 开始）
+VALUE = 0        # 正常的计算结果
+UNEXPECTED = -1  # 既不是提示信息也无法解析为计算结果
+EXCEPTION = -2   # 抛出了异常
+TIMEOUT = -3     # 执行超时，未得到结果
+
+# 沙箱进程每次比较的输入点数，每比较完一块向父进程发送一次结果
+BLOCK_SIZE = 65536
+# 每块输入点的执行时间上限（秒）
+DEFAULT_BLOCK_TIMEOUT = 20.0
+# 数值结果比较的绝对误差
+VALUE_TOLERANCE = 1e-6
+# 每个沙箱块最多记录的不同异常/未知输出
+MAX_LABELS_PER_BLOCK = 50
+# 报告中最多列出的不一致分组、每组的区间数和样例数
+MAX_GROUPS = 20
+MAX_REGIONS = 16
+SAMPLE_SIZE = 5
+
+
+class ExhaustiveOracle:
+    """
+    一个练习函数的输入域和向量化参考实现
+
+    Args:
+        function_name: 函数名
+        params: 参数名列表
+        axes: 每个参数的取值（一维数组），输入域为各参数取值的笛卡尔积
+        messages: 参考实现可能返回的提示信息
+        reference: reference(*各参数取值数组) -> (类别编码数组, 计算结果数组)
+        parse_value: 把提交代码的返回值解析为与计算结果数组可比较的数值，无法解析时返回 None
+        format_value: 把计算结果数组中的数值还原为函数的返回形式，用于报告
+    """
+
+    def __init__(self, function_name: str, params: List[str], axes: List[np.ndarray],
+                 messages: List[str], reference: Callable,
+                 parse_value: Callable[[Any], Optional[float]] = None,
+                 format_value: Callable[[float], Any] = None):
+        self.function_name = function_name
+        self.params = params
+        self.axes = [np.asarray(axis) for axis in axes]
+        self.messages = messages
+        self.message_codes = {message: code for code, message in enumerate(messages, start=1)}
+        self.reference = reference
+        self.parse_value = parse_value or _parse_number
+        self.format_value = format_value or _format_number
+        self.shape = tuple(len(axis) for axis in self.axes)
+        self.size = int(np.prod(self.shape))
+
+    def points(self, index: np.ndarray) -> List[np.ndarray]:
+        """扁平下标对应的各参数取值"""
+        coords = np.unravel_index(index, self.shape)
+        return [axis[coord] for axis, coord in zip(self.axes, coords)]
+
+    def expected(self, index: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        codes, values = self.reference(*self.points(index))
+        return np.asarray(codes, dtype=np.int16), np.asarray(values, dtype=np.float64)
+
+    def classify(self, output) -> Tuple[int, float]:
+        """把一次调用的返回值归类为 (类别编码, 数值)"""
+        if isinstance(output, str):
+            code = self.message_codes.get(output)
+            if code is not None:
+                return code, math.nan
+        value = self.parse_value(output)
+        if value is None:
+            return UNEXPECTED, math.nan
+        return VALUE, value
+
+    def describe(self, code: int, value: float) -> Any:
+        if code > 0:
+            return self.messages[code - 1]
+        if code == VALUE:
+            return self.format_value(value)
+        return None
+
+    def domain(self) -> Dict[str, Any]:
+        return {
+            "size": self.size,
+            "params": {
+                name: {"min": axis.min().item(), "max": axis.max().item(), "points": len(axis)}
+                for name, axis in zip(self.params, self.axes)
+            }
+        }
+
+
+def _parse_number(output) -> Optional[float]:
+    if isinstance(output, bool):
+        return None
+    if isinstance(output, (int, float)):
+        return float(output)
+    if isinstance(output, str):
+        try:
+            return float(output)
+        except ValueError:
+            return None
+    return None
+
+
+def _format_number(value: float) -> str:
+    return str(value)
+
+
+def _no_values(size: int) -> np.ndarray:
+    return np.full(size, np.nan)
+
+
+# ---------------------------------------------------------------------------
+# 向量化参考实现
+# ---------------------------------------------------------------------------
+
+def _triangle_reference(a, b, c):
+    codes = np.select(
+        [
+            (a <= 0) | (b <= 0) | (c <= 0) | (a > 200) | (b > 200) | (c > 200),
+            ~((a + b > c) & (a + c > b) & (b + c > a)),
+            (a == b) & (b == c),
+            (a == b) | (a == c) | (b == c),
+        ],
+        [1, 2, 3, 4],
+        default=5
+    )
+    return codes, _no_values(len(codes))
+
+
+def _computer_selling_reference(host, monitor, peripheral):
+    codes = np.select(
+        [
+            host == -1,
+            (host <= 0) | (monitor <= 0) | (peripheral <= 0),
+            host > 70,
+            monitor > 80,
+            peripheral > 90,
+        ],
+        [1, 2, 3, 4, 5],
+        default=VALUE
+    )
+    total = (host * 25 + monitor * 30 + peripheral * 45).astype(np.float64)
+    values = np.where(total <= 1000, total * 0.1, np.where(total <= 1800, total * 0.15, total * 0.2))
+    return codes, values
+
+
+def _telecom_reference(calling_time, count):
+    codes = np.select(
+        [
+            (calling_time < 0) | (calling_time > 31 * 24 * 60),
+            (count < 0) | (count > 11),
+        ],
+        [1, 2],
+        default=VALUE
+    )
+    level = np.select(
+        [
+            (calling_time > 0) & (calling_time <= 60),
+            (calling_time > 60) & (calling_time <= 120),
+            (calling_time > 120) & (calling_time <= 180),
+            (calling_time > 180) & (calling_time <= 300),
+        ],
+        [1, 2, 3, 4],
+        default=5
+    )
+    max_num = np.array([1, 2, 3, 3, 6])[level - 1]
+    # round 与 np.round 都是四舍六入五成双，结果与参考代码一致
+    discounted = np.round((25 + 0.15 * calling_time * (1 - (level + 1) * 0.005)) * 100) / 100
+    full = np.round((25 + 0.15 * calling_time) * 100) / 100
+    return codes, np.where(count <= max_num, discounted, full)
+
+
+_MONTH_DAYS = np.array([31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+
+
+def _calendar_reference(year, month, day):
+    leap = (year % 400 == 0) | ((year % 100 != 0) & (year % 4 == 0))
+    max_days = _MONTH_DAYS[np.clip(month, 1, 12) - 1] + (leap & (month == 2))
+    codes = np.select(
+        [
+            (year < 1900) | (year > 2100),
+            (month <= 0) | (month > 12),
+            (day <= 0) | (day > max_days),
+        ],
+        [1, 2, 3],
+        default=VALUE
+    )
+    last_day = day == max_days
+    next_day = np.where(last_day, 1, day + 1)
+    next_month = np.where(last_day, month + 1, month)
+    next_year = np.where(next_month > 12, year + 1, year)
+    next_month = np.where(next_month > 12, 1, next_month)
+    # 日期编码为 yyyymmdd 便于比较
+    return codes, (next_year * 10000 + next_month * 100 + next_day).astype(np.float64)
+
+
+def _parse_date(output) -> Optional[float]:
+    if not isinstance(output, str):
+        return None
+    parts = output.split("/")
+    if len(parts) != 3:
+        return None
+    try:
+        year, month, day = (int(part) for part in parts)
+    except ValueError:
+        return None
+    return float(year * 10000 + month * 100 + day)
+
+
+def _format_date(value: float) -> str:
+    value = int(value)
+    return f"{value // 10000}/{value // 100 % 100}/{value % 100}"
+
+
+def _commission_reference(sales_amount, leave_days, cash_arrival_percent):
+    codes = np.select(
+        [
+            sales_amount < 0,
+            (leave_days < 0) | (leave_days > 366),
+            (cash_arrival_percent < 0) | (cash_arrival_percent > 100),
+        ],
+        [1, 2, 3],
+        default=VALUE
+    )
+    high = (sales_amount > 200) & (leave_days <= 10)
+    factor = np.where(high, np.where(cash_arrival_percent >= 60, 7, 0),
+                      np.where(cash_arrival_percent <= 85, 6, 5))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        values = np.where(factor == 0, 0.0, np.round(sales_amount / np.where(factor == 0, 1, factor), 2))
+    return codes, values
+
+
+def _int_range(low: int, high: int) -> np.ndarray:
+    """[low, high] 的全部整数"""
+    return np.arange(low, high + 1, dtype=np.int64)
+
+
+_COMMISSION_ORACLE = dict(
+    params=["sales_amount", "leave_days", "cash_arrival_percent"],
+    # 销售额不是整数域：每 5 取一个点，并加上 200 附近的边界点
+    axes=[
+        np.unique(np.concatenate([np.arange(-5, 405, 5), [199, 199.99, 200.01, 201]])).astype(np.float64),
+        _int_range(-1, 367),
+        _int_range(-1, 101),
+    ],
+    messages=[
+        "销售额必须为非负数",
+        "请假天数必须为整数，且在 0 到 366 之间",
+        "现金到账比例必须为 0 到 100 之间的数",
+    ],
+    reference=_commission_reference,
+)
+
+# 输入域在合法范围两侧各多取一个点，用于检查越界处理
+ORACLES: Dict[str, ExhaustiveOracle] = {
+    "triangle_judge": ExhaustiveOracle(
+        "triangle_judge",
+        params=["a", "b", "c"],
+        axes=[_int_range(0, 201)] * 3,
+        messages=[
+            "边长数值越界",
+            "所给三边数据不能构成三角形",
+            "该三角形是等边三角形",
+            "该三角形是等腰三角形",
+            "该三角形是普通三角形",
+        ],
+        reference=_triangle_reference,
+    ),
+    "computer_selling": ExhaustiveOracle(
+        "computer_selling",
+        params=["host", "monitor", "peripheral"],
+        axes=[_int_range(-1, 71), _int_range(0, 81), _int_range(0, 91)],
+        messages=[
+            "系统开始统计月度销售额",
+            "数据非法，各部件销售数量不能小于1",
+            "数据非法，主机销售数量不能超过70",
+            "数据非法，显示器销售数量不能超过80",
+            "数据非法，外设销售数量不能超过90",
+        ],
+        reference=_computer_selling_reference,
+    ),
+    "telecom_system": ExhaustiveOracle(
+        "telecom_system",
+        params=["calling_time", "count"],
+        axes=[_int_range(-1, 31 * 24 * 60 + 1), _int_range(-1, 12)],
+        messages=["通话时长数值越界", "未按时缴费次数越界"],
+        reference=_telecom_reference,
+    ),
+    "calendar_problem": ExhaustiveOracle(
+        "calendar_problem",
+        params=["year", "month", "day"],
+        axes=[_int_range(1899, 2101), _int_range(0, 13), _int_range(0, 32)],
+        messages=["年份数值越界", "月份数值越界", "日期数值越界"],
+        reference=_calendar_reference,
+        parse_value=_parse_date,
+        format_value=_format_date,
+    ),
+    "seller_bonus": ExhaustiveOracle("seller_bonus", **_COMMISSION_ORACLE),
+    "calculate_commission": ExhaustiveOracle("calculate_commission", **_COMMISSION_ORACLE),
+}
+
+SUPPORTED_ORACLES = list(ORACLES.keys())
+
+
+def get_oracle(function_name: str) -> Optional[ExhaustiveOracle]:
+    return ORACLES.get(function_name)
+
+
+# ---------------------------------------------------------------------------
+# 沙箱进程内执行的部分
+# ---------------------------------------------------------------------------
+
+def evaluate_block(oracle: ExhaustiveOracle, function: Callable, columns: List[np.ndarray],
+                   block_timeout: float):
+    """
+    逐点调用提交的函数，返回 (类别编码列表, 数值列表, 标签列表, 超时位置)
+
+    未知输出和异常的数值字段存放标签下标；以异常形式给出的提示信息与返回提示信息视为一致
+    """
+    codes, values, labels = [], [], []
+    label_index = {}
+    seen = {}
+    message_codes = oracle.message_codes
+
+    def label(text):
+        index = label_index.get(text)
+        if index is None:
+            if len(labels) >= MAX_LABELS_PER_BLOCK:
+                text = "其他输出"
+                index = label_index.get(text)
+            if index is None:
+                index = label_index[text] = len(labels)
+                labels.append(text)
+        return float(index)
+
+    rows = zip(*[column.tolist() for column in columns])
+    try:
+        with case_limit(block_timeout):
+            for args in rows:
+                try:
+                    output = function(*args)
+                except CaseTimeout:
+                    raise
+                except BaseException as e:
+                    code = message_codes.get(str(e))
+                    if code is None:
+                        codes.append(EXCEPTION)
+                        values.append(label(f"{type(e).__name__}: {e}"))
+                    else:
+                        codes.append(code)
+                        values.append(math.nan)
+                    continue
+                # 同一返回值只归类一次
+                try:
+                    classified = seen.get(output)
+                except TypeError:
+                    classified = None
+                if classified is None:
+                    classified = oracle.classify(output)
+                    if classified[0] == UNEXPECTED:
+                        classified = (UNEXPECTED, label(repr(output)[:200]))
+                    try:
+                        seen[output] = classified
+                    except TypeError:
+                        pass
+                codes.append(classified[0])
+                values.append(classified[1])
+    except CaseTimeout:
+        return codes, values, labels, len(codes)
+    return codes, values, labels, None
+
+
+def mismatches(expected_codes, expected_values, actual_codes, actual_values) -> np.ndarray:
+    """逐点比较两组输出，返回不一致位置的布尔数组；数值输出按 VALUE_TOLERANCE 比较"""
+    wrong_code = expected_codes != actual_codes
+    is_value = (expected_codes == VALUE) & ~wrong_code
+    wrong_value = is_value & ~np.isclose(actual_values, expected_values, rtol=0, atol=VALUE_TOLERANCE)
+    return wrong_code | wrong_value
+
+
+def exhaustive_task(payload: Dict[str, Any], emit: Callable):
+    """
+    在沙箱进程中比较输入域 [start, stop) 上的输出，每比较完一块发回不一致的点
+
+    payload: {code, function_name, start, stop, block_timeout}
+    """
+    block_timeout = payload.get("block_timeout", DEFAULT_BLOCK_TIMEOUT)
+    oracle = get_oracle(payload["function_name"])
+    try:
+        function = load_function(payload["code"], payload["function_name"], block_timeout)
+    except CaseTimeout:
+        return {"error": "代码执行错误: 模块加载超时"}
+    except BaseException as e:
+        return {"error": f"代码执行错误: {str(e)}"}
+    if function is None:
+        return {"error": f"代码中未找到函数: {payload['function_name']}", "not_found": True}
+
+    for block_start in range(payload["start"], payload["stop"], BLOCK_SIZE):
+        block_stop = min(block_start + BLOCK_SIZE, payload["stop"])
+        index = np.arange(block_start, block_stop, dtype=np.int64)
+        codes, values, labels, timeout_at = evaluate_block(
+            oracle, function, oracle.points(index), block_timeout
+        )
+        evaluated = index[:len(codes)]
+        expected_codes, expected_values = oracle.expected(evaluated)
+        actual_codes = np.asarray(codes, dtype=np.int16)
+        actual_values = np.asarray(values, dtype=np.float64)
+        wrong = np.nonzero(mismatches(expected_codes, expected_values, actual_codes, actual_values))[0]
+        emit({
+            "start": block_start,
+            "stop": block_stop if timeout_at is None else block_start + timeout_at,
+            "index": evaluated[wrong],
+            "codes": actual_codes[wrong],
+            "values": actual_values[wrong],
+            "labels": labels,
+        })
+        if timeout_at is not None:
+            return {"timeout_at": block_start + timeout_at}
+    return None
+
+
+# ---------------------------------------------------------------------------
+# 父进程使用的部分
+# ---------------------------------------------------------------------------
+
+def _split(points: np.ndarray, low: np.ndarray, high: np.ndarray) -> np.ndarray:
+    """选择切分位置：优先在坐标的最大空隙处切开，没有空隙时从最长的轴中间切开"""
+    best_gap, best = 1, None
+    for axis in range(points.shape[1]):
+        values = np.unique(points[:, axis])
+        if len(values) > 1:
+            gaps = np.diff(values)
+            position = int(np.argmax(gaps))
+            if gaps[position] > best_gap:
+                best_gap, best = gaps[position], (axis, values[position])
+    if best is None:
+        axis = int(np.argmax(high - low))
+        best = (axis, (low[axis] + high[axis]) // 2)
+    axis, middle = best
+    return points[:, axis] <= middle
+
+
+def _merge(boxes: List[list]) -> List[list]:
+    """合并只在一个轴上首尾相接、其余轴范围相同的 dense 区间"""
+    merged = True
+    while merged:
+        merged = False
+        for i, first in enumerate(boxes):
+            if not first[3]:
+                continue
+            for j, second in enumerate(boxes):
+                if i == j or not second[3]:
+                    continue
+                differs = np.nonzero((first[0] != second[0]) | (first[1] != second[1]))[0]
+                if len(differs) == 1 and first[1][differs[0]] + 1 == second[0][differs[0]]:
+                    first[1] = second[1]
+                    first[2] += second[2]
+                    del boxes[j]
+                    merged = True
+                    break
+            if merged:
+                break
+    return boxes
+
+
+def _boxes(coords: np.ndarray, max_boxes: int) -> List[list]:
+    """
+    把一组网格坐标压缩为若干个轴对齐的区间 [下界, 上界, 点数, dense]
+
+    区间内的网格点全部属于该组时为 dense；区间数达到上限后剩余的点按外接区间输出
+    """
+    pending = [coords]
+    boxes = []
+    while pending:
+        points = pending.pop(0)
+        low, high = points.min(axis=0), points.max(axis=0)
+        dense = int(np.prod(high - low + 1)) == len(points)
+        if dense or len(boxes) + len(pending) + 2 > max_boxes:
+            boxes.append([low, high, len(points), dense])
+            continue
+        left = _split(points, low, high)
+        pending.extend([points[left], points[~left]])
+    return sorted(_merge(boxes), key=lambda box: -box[2])
+
+
+def outcome_label(oracle: ExhaustiveOracle, code: int, value: float, labels: List[str]) -> str:
+    """输出的可读描述：提示信息、计算结果或异常/未知输出的标签"""
+    if code > 0:
+        return oracle.messages[code - 1]
+    if code == VALUE:
+        return "计算结果"
+    if code == TIMEOUT:
+        return "执行超时"
+    return labels[int(value)]
+
+
+def _report(oracle: ExhaustiveOracle, index: np.ndarray, codes: np.ndarray, values: np.ndarray,
+            labels: List[str]) -> List[Dict[str, Any]]:
+    """按 (期望输出, 实际输出) 分组，每组给出压缩后的区间和几个样例"""
+    if len(index) == 0:
+        return []
+    expected_codes, expected_values = oracle.expected(index)
+    # 期望为计算结果、实际也为计算结果的分组按数值错误处理
+    keys = np.stack([expected_codes.astype(np.int64), codes.astype(np.int64),
+                     np.where(codes < VALUE, values, -1).astype(np.int64)], axis=1)
+    unique_keys, inverse, counts = np.unique(keys, axis=0, return_inverse=True, return_counts=True)
+    inverse = inverse.reshape(-1)
+
+    groups = []
+    for group in np.argsort(-counts)[:MAX_GROUPS]:
+        expected_code, actual_code, label_index = unique_keys[group].tolist()
+        members = np.nonzero(inverse == group)[0]
+        coords = np.stack(np.unravel_index(index[members], oracle.shape), axis=1)
+
+        regions = []
+        for low, high, count, dense in _boxes(coords, MAX_REGIONS):
+            regions.append({
+                "count": count,
+                "dense": dense,
+                "ranges": {
+                    name: [axis[lo].item(), axis[hi].item()]
+                    for name, axis, lo, hi in zip(oracle.params, oracle.axes, low, high)
+                }
+            })
+
+        samples = []
+        for member in members[:SAMPLE_SIZE]:
+            point = [column.item() for column in oracle.points(index[member:member + 1])]
+            actual_code = int(codes[member])
+            actual = oracle.describe(actual_code, float(values[member]))
+            samples.append({
+                "Input": point,
+                "Expected": oracle.describe(int(expected_codes[member]), float(expected_values[member])),
+                "Actual": actual if actual is not None
+                else outcome_label(oracle, actual_code, float(values[member]), labels),
+            })
+
+        groups.append({
+            "expected": outcome_label(oracle, expected_code, 0.0, labels),
+            "actual": outcome_label(oracle, actual_code, float(label_index), labels),
+            "count": int(counts[group]),
+            "regions": regions,
+            "samples": samples,
+        })
+    return groups
+
+
+def run_exhaustive(code: str, function_name: str, block_timeout: float = DEFAULT_BLOCK_TIMEOUT,
+                   on_progress: Callable[[Dict[str, Any]], None] = None) -> Dict[str, Any]:
+    """
+    在整个输入域上比较提交代码与参考实现
+
+    输入域按沙箱进程数分片并行执行，每个分片内逐块比较，只把不一致的点传回父进程
+
+    Args:
+        code: 提交的代码
+        function_name: 函数名
+        block_timeout: 每块输入点的执行时间上限（秒），超时后该分片剩余的点记为执行超时
+        on_progress: 每比较完一块时以 {"checked", "size"} 调用，回调抛出的异常会中止执行
+    """
+    oracle = get_oracle(function_name)
+    if oracle is None:
+        return {
+            "success": False,
+            "message": f"不支持穷举测试的函数: {function_name}",
+            "available_functions": SUPPORTED_ORACLES
+        }
+
+    pool = get_pool()
+    chunk_count = max(1, min(pool.size * 4, math.ceil(oracle.size / BLOCK_SIZE)))
+    chunk_size = math.ceil(oracle.size / chunk_count)
+    chunks = [(start, min(start + chunk_size, oracle.size)) for start in range(0, oracle.size, chunk_size)]
+
+    parts: List[Tuple[np.ndarray, np.ndarray, np.ndarray]] = []
+    label_index: Dict[str, int] = {}
+    state = {"checked": 0, "error": None}
+    lock = threading.Lock()
+
+    def add_part(index, codes, values, block_labels):
+        if block_labels:
+            # 把块内标签下标换成全局下标
+            mapping = np.array([label_index.setdefault(text, len(label_index)) for text in block_labels])
+            has_label = codes < VALUE
+            values = values.copy()
+            values[has_label] = mapping[values[has_label].astype(np.int64)]
+        parts.append((index, codes, values))
+
+    def fail_range(start, stop, code, message):
+        index = np.arange(start, stop, dtype=np.int64)
+        label = float(label_index.setdefault(message, len(label_index)))
+        parts.append((index, np.full(len(index), code, dtype=np.int16), np.full(len(index), label)))
+
+    def run_chunk(chunk):
+        start, stop = chunk
+        payload = {
+            "code": code,
+            "function_name": function_name,
+            "start": start,
+            "stop": stop,
+            "block_timeout": block_timeout,
+        }
+        done = start
+        try:
+            for kind, data in pool.stream(EXHAUSTIVE_TASK, payload, block_timeout + KILL_GRACE_SECONDS):
+                if kind == "item":
+                    with lock:
+                        add_part(data["index"], data["codes"], data["values"], data["labels"])
+                        state["checked"] += data["stop"] - data["start"]
+                        progress = {"checked": state["checked"], "size": oracle.size}
+                    done = data["stop"]
+                    if on_progress is not None:
+                        on_progress(progress)
+                elif data is not None and "error" in data:
+                    state["error"] = data
+                    return
+        except SandboxError as e:
+            with lock:
+                fail_range(done, stop, EXCEPTION, f"沙箱进程异常: {e}")
+            return
+        if done < stop:
+            with lock:
+                fail_range(done, stop, TIMEOUT, "执行超时")
+
+    start_time = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=min(pool.size, len(chunks))) as executor:
+        list(executor.map(run_chunk, chunks))
+    duration = time.perf_counter() - start_time
+
+    if state["error"] is not None:
+        return {
+            "success": False,
+            "message": state["error"]["error"],
+            "function_name": function_name
+        }
+
+    if parts:
+        index = np.concatenate([part[0] for part in parts])
+        codes = np.concatenate([part[1] for part in parts])
+        values = np.concatenate([part[2] for part in parts])
+    else:
+        index, codes, values = np.empty(0, np.int64), np.empty(0, np.int16), np.empty(0)
+    labels = [text for text, _ in sorted(label_index.items(), key=lambda item: item[1])]
+
+    mismatched = len(index)
+    pass_rate = round((oracle.size - mismatched) / oracle.size * 100, 4)
+    return {
+        "success": True,
+        "function_name": function_name,
+        "domain": oracle.domain(),
+        "summary": {
+            "total_points": oracle.size,
+            "passed_points": oracle.size - mismatched,
+            "failed_points": mismatched,
+            "pass_rate": f"{pass_rate}%",
+            "duration": f"{round(duration, 3)}s",
+            "points_per_second": int(oracle.size / duration) if duration > 0 else None
+        },
+        "mismatches": _report(oracle, index, codes, values, labels)
+    }
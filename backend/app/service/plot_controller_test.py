@@ -1,10 +1,13 @@
 import inspect
+import threading
 import time
 import uuid
 from typing import List, Dict, Any, Optional
 from dataclasses import dataclass
 from datetime import datetime
 
+from app.service.async_bridge import TaskLocal
+
 # 数据模型定义
 @dataclass
 class LogDetail:
@@ -52,6 +55,11 @@ class HTTPException(Exception):
         super().__init__(detail)
 
 class PlotControllerTestService:
+    # 异常模拟标志，每个测试任务各自独立
+    _simulate_db_error = TaskLocal(False)
+    _simulate_validation_error = TaskLocal(False)
+    _simulate_integrity_error = TaskLocal(False)
+
     def __init__(self):
         # 模拟日志数据
         self.mock_logs = {
@@ -209,11 +217,6 @@ class PlotControllerTestService:
                 createTime=datetime(2024, 1, 7, 10, 0, 0)
             )
         }
-        
-        # 异常模拟标志
-        self._simulate_db_error = False
-        self._simulate_validation_error = False
-        self._simulate_integrity_error = False
     
     async def get_logs(self, plotId: str) -> List[LogDetail]:
         """
@@ -1157,4 +1160,18 @@ class PlotControllerTestService:
             "error_cases": error_cases,
             "all_results": test_results,
             "timestamp": datetime.now().isoformat()
-        }
\ No newline at end of file
+        }
+
+
+_service: Optional[PlotControllerTestService] = None
+_service_lock = threading.Lock()
+
+
+def get_plot_controller_test_service() -> PlotControllerTestService:
+    """进程级共享的服务实例，模拟数据只在首次使用时构造一次，之后只读"""
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = PlotControllerTestService()
+    return _service
@@ -1,9 +1,12 @@
-import requests
 import time
 from typing import List, Dict, Any
 
+from app.service.http_transport import HttpTestClient
+
 class PlotTestService:
-    def __init__(self):
+    def __init__(self, concurrency: int = None):
+        # 共享连接池的HTTP客户端，concurrency 为并发执行的用例数
+        self.http = HttpTestClient(concurrency)
         # 目标API的基础URL
         self.base_url = "http://47.120.78.249:8000"
         # self.base_url = "http://localhost:8000"
@@ -130,11 +133,7 @@ class PlotTestService:
         """
         执行add_plot接口测试
         """
-        results = []
-        
-        for test_case in test_cases:
-            result = self._execute_plot_test(test_case)
-            results.append(result)
+        results = self.http.map(self._execute_plot_test, test_cases)
             
         return results
     
@@ -160,7 +159,7 @@ class PlotTestService:
                 headers.update(self.get_auth_headers())
             
             # 发送请求
-            response = requests.post(
+            response = self.http.post(
                 f"{self.base_url}/plot/add",
                 json=data,
                 headers=headers,
@@ -246,10 +245,13 @@ class PlotTestService:
         try:
             print(f"开始执行add_plot模块测试，共{len(test_cases)}个用例...")
             
+            # 不需要失败即停时所有用例并发执行，再按原顺序输出
+            concurrent_results = None if stop_on_failure else iter(self.http.map(self._execute_plot_test, test_cases))
+
             for i, test_case in enumerate(test_cases, 1):
                 print(f"执行add_plot测试 {i}/{len(test_cases)}: {test_case['test_id']} - {test_case['test_purpose']}")
                 
-                result = self._execute_plot_test(test_case)
+                result = next(concurrent_results) if concurrent_results else self._execute_plot_test(test_case)
                 results.append(result)
                 
                 # 输出测试结果
@@ -365,14 +367,25 @@ class PlotTestService:
         """
         执行get_plot_detail接口测试
         """
-        results = []
-        
-        for test_case in test_cases:
-            result = self._execute_plot_detail_test(test_case)
-            results.append(result)
+        results = self.http.map(self._execute_plot_detail_test, test_cases)
             
         return results
     
+    def resolve_plot_id(self, plot_id):
+        """把用例中描述性的plotId替换为实际请求使用的ID"""
+        if plot_id == "存在的合法ID":
+            # 这里需要替换为实际存在的地块ID，或者先创建一个地块
+            return "123e4567-e89b-12d3-a456-426614174000"  # 示例UUID
+        elif plot_id == "不存在的ID":
+            return "999e9999-e99b-99d9-a999-999999999999"  # 不存在的UUID
+        elif plot_id == "合法ID":
+            return "123e4567-e89b-12d3-a456-426614174000"  # 示例UUID
+        elif plot_id == "*恰好等于限制长度的ID":
+            return "123e4567-e89b-12d3-a456-426614174000"  # 标准UUID长度
+        elif plot_id == "*超过限制长度的ID":
+            return "invalid-very-long-id-that-exceeds-normal-uuid-length-limits-and-more"
+        return plot_id
+
     def _execute_plot_detail_test(self, test_case: Dict[str, Any]) -> Dict[str, Any]:
         """
         执行单个get_plot_detail测试用例
@@ -381,19 +394,7 @@ class PlotTestService:
         
         try:
             # 处理特殊测试用例的plotId
-            plot_id = test_case.get('plotId')
-            
-            if plot_id == "存在的合法ID":
-                # 这里需要替换为实际存在的地块ID，或者先创建一个地块
-                plot_id = "123e4567-e89b-12d3-a456-426614174000"  # 示例UUID
-            elif plot_id == "不存在的ID":
-                plot_id = "999e9999-e99b-99d9-a999-999999999999"  # 不存在的UUID
-            elif plot_id == "合法ID":
-                plot_id = "123e4567-e89b-12d3-a456-426614174000"  # 示例UUID
-            elif plot_id == "*恰好等于限制长度的ID":
-                plot_id = "123e4567-e89b-12d3-a456-426614174000"  # 标准UUID长度
-            elif plot_id == "*超过限制长度的ID":
-                plot_id = "invalid-very-long-id-that-exceeds-normal-uuid-length-limits-and-more"
+            plot_id = self.resolve_plot_id(test_case.get('plotId'))
             
             # 设置请求头
             headers = {'Content-Type': 'application/json'}
@@ -410,7 +411,7 @@ class PlotTestService:
                 url = f"{self.base_url}/plot/{plot_id}"
             
             # 发送GET请求
-            response = requests.get(
+            response = self.http.get(
                 url,
                 headers=headers,
                 timeout=10
@@ -504,10 +505,13 @@ class PlotTestService:
         try:
             print(f"开始执行get_plot_detail模块测试，共{len(test_cases)}个用例...")
             
+            # 不需要失败即停时所有用例并发执行，再按原顺序输出
+            concurrent_results = None if stop_on_failure else iter(self.http.map(self._execute_plot_detail_test, test_cases))
+
             for i, test_case in enumerate(test_cases, 1):
                 print(f"执行get_plot_detail测试 {i}/{len(test_cases)}: {test_case['test_id']} - {test_case['test_purpose']}")
                 
-                result = self._execute_plot_detail_test(test_case)
+                result = next(concurrent_results) if concurrent_results else self._execute_plot_detail_test(test_case)
                 results.append(result)
                 
                 # 输出测试结果
@@ -0,0 +1,404 @@
+import atexit
+import hashlib
+import importlib
+import math
+import multiprocessing
+import os
+import pickle
+import queue
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Callable, Optional
+
+from app.service.branch_coverage import ArcCollector
+
+try:
+    import resource
+except ImportError:  # Windows 没有 resource 模块，只依靠父进程的超时控制
+    resource = None
+
+# 单个用例的 CPU / 墙钟时间上限（秒）
+DEFAULT_CASE_TIMEOUT = float(os.getenv("SANDBOX_CASE_TIMEOUT", 2))
+# 每个沙箱进程可使用的地址空间上限（MB），0 表示不限制
+DEFAULT_MEMORY_LIMIT_MB = int(os.getenv("SANDBOX_MEMORY_MB", 512))
+# 沙箱进程数量
+DEFAULT_POOL_SIZE = int(os.getenv("SANDBOX_WORKERS", os.cpu_count() or 2))
+# 父进程在单个用例超时基础上额外等待的时间，超过后直接杀掉沙箱进程
+KILL_GRACE_SECONDS = 2.0
+# 每个沙箱进程缓存的已编译代码数量
+CODE_CACHE_SIZE = 64
+
+RUN_CASES_TASK = "app.service.sandbox:run_cases_task"
+# 被测代码编译时使用的文件名，覆盖统计据此区分被测代码与工具代码
+SUBMISSION_FILENAME = "<submission>"
+
+
+class CaseTimeout(BaseException):
+    """用例超时；继承 BaseException，避免被被测代码中的 except Exception 吞掉"""
+
+
+class SandboxError(Exception):
+    """沙箱进程超时被杀或意外退出"""
+
+
+# ---------------------------------------------------------------------------
+# 沙箱进程内执行的部分
+# ---------------------------------------------------------------------------
+
+_code_cache: Dict[str, Dict[str, Any]] = {}
+_task_cache: Dict[str, Callable] = {}
+
+
+def _raise_timeout(signum, frame):
+    raise CaseTimeout()
+
+
+class case_limit:
+    """在沙箱进程中限制一段代码的墙钟时间和 CPU 时间"""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.enabled = hasattr(signal, "setitimer") and seconds > 0
+
+    def __enter__(self):
+        if self.enabled:
+            signal.setitimer(signal.ITIMER_REAL, self.seconds)
+            signal.setitimer(signal.ITIMER_VIRTUAL, self.seconds)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.enabled:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.setitimer(signal.ITIMER_VIRTUAL, 0)
+        return False
+
+
+def load_namespace(code: str, timeout: float = DEFAULT_CASE_TIMEOUT) -> Dict[str, Any]:
+    """编译并执行被测代码，按代码哈希缓存执行后的命名空间，同一份代码在进程内只 exec 一次"""
+    key = hashlib.sha1(code.encode("utf-8")).hexdigest()
+    namespace = _code_cache.get(key)
+    if namespace is None:
+        compiled = compile(code, SUBMISSION_FILENAME, "exec")
+        namespace = {"__name__": "__submission__", "__builtins__": __builtins__}
+        with case_limit(timeout):
+            exec(compiled, namespace)
+        if len(_code_cache) >= CODE_CACHE_SIZE:
+            _code_cache.pop(next(iter(_code_cache)))
+        _code_cache[key] = namespace
+    return namespace
+
+
+def load_function(code: str, function_name: str, timeout: float = DEFAULT_CASE_TIMEOUT):
+    """返回代码中的目标函数，未找到时返回 None"""
+    return load_namespace(code, timeout).get(function_name)
+
+
+def call_case(function: Callable, case_input):
+    """与原有约定一致：列表输入展开为位置参数，其余作为单个参数"""
+    if isinstance(case_input, list):
+        return function(*case_input)
+    return function(case_input)
+
+
+def picklable(value):
+    try:
+        pickle.dumps(value)
+        return value
+    except Exception:
+        return repr(value)
+
+
+def run_cases_task(payload: Dict[str, Any], emit: Callable):
+    """
+    逐个执行用例，每完成一个就把结果发回父进程
+
+    payload: {code, function_name, cases: [{"input", "expected"}], case_timeout, coverage}
+    coverage 为 True 时每个结果附带被测代码的执行弧 "arcs"
+    """
+    timeout = payload.get("case_timeout", DEFAULT_CASE_TIMEOUT)
+    collector = ArcCollector(SUBMISSION_FILENAME) if payload.get("coverage") else None
+    try:
+        function = load_function(payload["code"], payload["function_name"], timeout)
+    except CaseTimeout:
+        return {"error": "代码执行错误: 模块加载超时"}
+    except BaseException as e:
+        return {"error": f"代码执行错误: {str(e)}"}
+    if function is None:
+        return {"error": f"代码中未找到函数: {payload['function_name']}", "not_found": True}
+
+    for case in payload["cases"]:
+        # 参数展开在计时之外完成，计时只包含函数调用本身
+        case_input = case["input"]
+        args = case_input if isinstance(case_input, list) else [case_input]
+        if collector is not None:
+            collector.start()
+        start_ns = time.perf_counter_ns()
+        try:
+            with case_limit(timeout):
+                start_ns = time.perf_counter_ns()
+                actual = function(*args)
+                end_ns = time.perf_counter_ns()
+            item = {"actual": picklable(actual), "error": None}
+        except CaseTimeout:
+            end_ns = time.perf_counter_ns()
+            item = {"actual": None, "error": f"执行超时(>{timeout}s)"}
+        except MemoryError:
+            end_ns = time.perf_counter_ns()
+            item = {"actual": None, "error": "内存超出限制"}
+        except BaseException as e:
+            end_ns = time.perf_counter_ns()
+            item = {"actual": None, "error": str(e)}
+        finally:
+            if collector is not None:
+                arcs = collector.stop()
+        item["duration_ns"] = end_ns - start_ns
+        item["duration"] = item["duration_ns"] / 1e9
+        if collector is not None:
+            item["arcs"] = arcs
+        emit(item)
+    return None
+
+
+def _resolve_task(name: str) -> Callable:
+    handler = _task_cache.get(name)
+    if handler is None:
+        module_name, func_name = name.split(":")
+        handler = getattr(importlib.import_module(module_name), func_name)
+        _task_cache[name] = handler
+    return handler
+
+
+def _worker_main(conn, memory_limit_mb: int):
+    """沙箱进程主循环：接收 (任务名, 参数)，执行时通过 item 消息流式返回中间结果"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if hasattr(signal, "SIGALRM"):
+        signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.signal(signal.SIGVTALRM, _raise_timeout)
+    if resource is not None and memory_limit_mb > 0:
+        limit = memory_limit_mb * 1024 * 1024
+        try:
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        except (ValueError, OSError):
+            pass
+
+    def emit(item):
+        conn.send(("item", item))
+
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            break
+        if message is None:
+            break
+        task, payload = message
+        try:
+            result = _resolve_task(task)(payload, emit)
+            conn.send(("done", picklable(result)))
+        except MemoryError:
+            conn.send(("error", "内存超出限制"))
+        except BaseException as e:
+            conn.send(("error", f"{type(e).__name__}: {str(e)}"))
+
+
+# ---------------------------------------------------------------------------
+# 父进程（Flask）使用的部分
+# ---------------------------------------------------------------------------
+
+def _get_context():
+    # forkserver 从干净的服务进程 fork，避免在多线程的 Flask 进程里直接 fork；Windows 只能使用 spawn
+    methods = multiprocessing.get_all_start_methods()
+    if "forkserver" in methods:
+        context = multiprocessing.get_context("forkserver")
+        # 测试工具相关模块在 forkserver 中预先导入，新进程 fork 出来即可使用
+        context.set_forkserver_preload(["app.service.sandbox", "app.static.homework_data"])
+        return context
+    return multiprocessing.get_context("spawn")
+
+
+class _Worker:
+    def __init__(self, context, memory_limit_mb: int):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn, memory_limit_mb), daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def alive(self) -> bool:
+        return self.process.is_alive()
+
+    def kill(self):
+        try:
+            self.process.kill()
+            self.process.join(1)
+        except Exception:
+            pass
+        self.conn.close()
+
+
+class SandboxPool:
+    """预先启动的沙箱进程池，线程安全，可被多个请求线程同时使用"""
+
+    def __init__(self, size: int = DEFAULT_POOL_SIZE, memory_limit_mb: int = DEFAULT_MEMORY_LIMIT_MB):
+        self.size = max(1, size)
+        self.memory_limit_mb = memory_limit_mb
+        self._context = _get_context()
+        self._idle = queue.Queue()
+        self._closed = False
+        for _ in range(self.size):
+            self._idle.put(self._spawn())
+
+    def _spawn(self) -> _Worker:
+        return _Worker(self._context, self.memory_limit_mb)
+
+    def _acquire(self) -> _Worker:
+        worker = self._idle.get()
+        if not worker.alive():
+            worker.kill()
+            worker = self._spawn()
+        return worker
+
+    def _release(self, worker: _Worker, healthy: bool = True):
+        if not healthy:
+            worker.kill()
+            worker = self._spawn()
+        self._idle.put(worker)
+
+    def stream(self, task: str, payload: Dict[str, Any], item_timeout: float):
+        """
+        在一个沙箱进程中执行任务，逐个产出 ("item", 数据)，最后产出 ("done", 结果)
+
+        两条消息之间超过 item_timeout 秒时杀掉该进程并抛出 SandboxError，进程随后被替换
+        """
+        worker = self._acquire()
+        healthy = False
+        try:
+            worker.conn.send((task, payload))
+            while True:
+                if not worker.conn.poll(item_timeout):
+                    raise SandboxError("执行超时，沙箱进程已被终止")
+                try:
+                    kind, data = worker.conn.recv()
+                except (EOFError, OSError):
+                    raise SandboxError("沙箱进程意外退出（可能超出内存限制）")
+                if kind == "item":
+                    yield kind, data
+                    continue
+                if kind == "error":
+                    healthy = True
+                    raise SandboxError(data)
+                healthy = True
+                yield kind, data
+                return
+        finally:
+            self._release(worker, healthy)
+
+    def call(self, task: str, payload: Dict[str, Any], timeout: float):
+        """执行不产生中间结果的任务，返回 (中间结果列表, 最终结果)"""
+        items, result = [], None
+        for kind, data in self.stream(task, payload, timeout):
+            if kind == "item":
+                items.append(data)
+            else:
+                result = data
+        return items, result
+
+    def run_cases(self, code: str, function_name: str, cases: List[Dict[str, Any]],
+                  case_timeout: float = DEFAULT_CASE_TIMEOUT,
+                  on_result: Callable[[int, Dict[str, Any]], None] = None,
+                  coverage: bool = False, task: str = RUN_CASES_TASK,
+                  options: Dict[str, Any] = None, item_timeout: float = None) -> Dict[str, Any]:
+        """
+        把用例分片到多个沙箱进程并行执行
+
+        Args:
+            task: 逐个用例产出结果的沙箱任务，默认为 run_cases_task
+            options: 合并到任务 payload 中的额外参数
+            item_timeout: 等待单个用例结果的时间上限，默认为 case_timeout 加上终止进程的宽限时间
+            on_result: 每个用例完成时在分片线程中调用 on_result(用例下标, 结果)；
+                       回调抛出的异常会中止执行，正在执行的沙箱进程被终止
+            coverage: 为 True 时每个结果附带执行弧 "arcs"，沙箱进程被杀的用例为 None
+
+        Returns:
+            {"error": 错误信息} 或 {"results": [与 cases 顺序一致的 {"actual", "error", "duration", "duration_ns"}]}
+        """
+        if not cases:
+            return {"results": []}
+        chunk_size = max(1, math.ceil(len(cases) / self.size))
+        chunks = [(i, cases[i:i + chunk_size]) for i in range(0, len(cases), chunk_size)]
+
+        def add_result(results, start, result):
+            results.append(result)
+            if on_result is not None:
+                on_result(start + len(results) - 1, result)
+
+        def run_chunk(start_chunk):
+            start, chunk = start_chunk
+            results = []
+            # 进程被杀时记录当前用例失败，其余用例换一个新进程继续执行
+            while len(results) < len(chunk):
+                payload = {
+                    "code": code,
+                    "function_name": function_name,
+                    "cases": chunk[len(results):],
+                    "case_timeout": case_timeout,
+                    "coverage": coverage,
+                    **(options or {}),
+                }
+                try:
+                    for kind, data in self.stream(task, payload, item_timeout or case_timeout + KILL_GRACE_SECONDS):
+                        if kind == "item":
+                            add_result(results, start, data)
+                        elif data is not None:
+                            return data
+                except SandboxError as e:
+                    killed = {"actual": None, "error": str(e), "duration": case_timeout,
+                              "duration_ns": int(case_timeout * 1e9)}
+                    if coverage:
+                        killed["arcs"] = None
+                    add_result(results, start, killed)
+            return results
+
+        if len(chunks) == 1:
+            outputs = [run_chunk(chunks[0])]
+        else:
+            with ThreadPoolExecutor(max_workers=len(chunks)) as executor:
+                outputs = list(executor.map(run_chunk, chunks))
+
+        results = []
+        for output in outputs:
+            if isinstance(output, dict):
+                return output
+            results.extend(output)
+        return {"results": results}
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                worker.conn.send(None)
+            except Exception:
+                pass
+            worker.kill()
+
+
+_pool: Optional[SandboxPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> SandboxPool:
+    """进程级共享的沙箱池，首次使用时创建"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = SandboxPool()
+                atexit.register(_pool.close)
+    return _pool
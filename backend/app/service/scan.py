@@ -1,8 +1,364 @@
 import inspect
 import ast
-import os
-import sys
+import builtins
 import importlib
+import json
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List, Optional
+
+EXCLUDE_DIRS = {'.venv', 'venv', '.git', '__pycache__', 'site-packages', 'node_modules'}
+
+# 扫描结果的持久化缓存文件，结构变化时修改 CACHE_VERSION 使旧缓存失效
+CACHE_FILE = os.getenv("SCAN_CACHE_FILE", os.path.join("temp", "scan_cache.json"))
+CACHE_VERSION = 2
+# 需要重新解析的文件数超过该值时使用进程池并行解析
+PARALLEL_THRESHOLD = 64
+
+_cache: Optional[Dict[str, Dict[str, Any]]] = None
+_cache_lock = threading.Lock()
+
+
+# ---------------------------------------------------------------------------
+# 单文件解析（只解析 AST，不导入模块，不会执行模块中的代码）
+# ---------------------------------------------------------------------------
+
+def _unparse(node) -> Optional[str]:
+    return None if node is None else ast.unparse(node)
+
+
+def _default_repr(node) -> str:
+    """与 str(参数默认值) 保持一致；无法静态求值的默认值返回源码"""
+    try:
+        return str(ast.literal_eval(node))
+    except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+        return ast.unparse(node)
+
+
+def _param(arg: ast.arg, kind, default=None) -> dict:
+    return {
+        "name": arg.arg,
+        "default": None if default is None else _default_repr(default),
+        "annotation": _unparse(arg.annotation),
+        "kind": str(kind)
+    }
+
+
+def serialize_arguments(args: ast.arguments) -> List[dict]:
+    """将函数参数序列化为可 JSON 化的列表，格式与 inspect.signature 的结果一致"""
+    positional = args.posonlyargs + args.args
+    defaults = [None] * (len(positional) - len(args.defaults)) + list(args.defaults)
+    params = []
+    for index, arg in enumerate(positional):
+        kind = inspect.Parameter.POSITIONAL_ONLY if index < len(args.posonlyargs) \
+            else inspect.Parameter.POSITIONAL_OR_KEYWORD
+        params.append(_param(arg, kind, defaults[index]))
+    if args.vararg:
+        params.append(_param(args.vararg, inspect.Parameter.VAR_POSITIONAL))
+    for arg, default in zip(args.kwonlyargs, args.kw_defaults):
+        params.append(_param(arg, inspect.Parameter.KEYWORD_ONLY, default))
+    if args.kwarg:
+        params.append(_param(args.kwarg, inspect.Parameter.VAR_KEYWORD))
+    return params
+
+
+def _decorator_names(node) -> List[str]:
+    names = []
+    for decorator in node.decorator_list:
+        if isinstance(decorator, ast.Call):
+            decorator = decorator.func
+        if isinstance(decorator, ast.Name):
+            names.append(decorator.id)
+        elif isinstance(decorator, ast.Attribute):
+            names.append(decorator.attr)
+    return names
+
+
+def _function_info(node) -> Dict[str, Any]:
+    return {
+        "name": node.name,
+        "args": [arg.arg for arg in node.args.posonlyargs + node.args.args],
+        "params": serialize_arguments(node.args),
+        "returns": _unparse(node.returns),
+        "async": isinstance(node, ast.AsyncFunctionDef),
+        "lineno": node.lineno
+    }
+
+
+def _class_info(node: ast.ClassDef) -> Dict[str, Any]:
+    methods = {}
+    for item in node.body:
+        if not isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+        decorators = _decorator_names(item)
+        # classmethod / property 不是普通函数，与原先 inspect.isfunction 的筛选结果保持一致
+        if {'classmethod', 'property', 'setter', 'getter', 'deleter'} & set(decorators):
+            continue
+        info = _function_info(item)
+        info["staticmethod"] = 'staticmethod' in decorators
+        methods[item.name] = info
+    return {
+        "name": node.name,
+        "bases": [ast.unparse(base) for base in node.bases],
+        "lineno": node.lineno,
+        "methods": methods
+    }
+
+
+def _import_names(node) -> Dict[str, str]:
+    """顶层 import 语句引入的名称 -> 完整名称；相对导入无法静态确定，忽略"""
+    names = {}
+    if isinstance(node, ast.Import):
+        for alias in node.names:
+            if alias.asname:
+                names[alias.asname] = alias.name
+            else:
+                top = alias.name.split('.')[0]
+                names[top] = top
+    elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+        for alias in node.names:
+            if alias.name != '*':
+                names[alias.asname or alias.name] = f"{node.module}.{alias.name}"
+    return names
+
+
+def parse_file(file_path: str) -> Dict[str, Any]:
+    """
+    解析单个文件，返回 {"classes": [...], "functions": [...], "imports": {...},
+    "future_annotations": 是否启用了延迟求值的注解, "error": 错误信息或 None}
+
+    参数和返回值的注解保存为源码文本
+    """
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            source = f.read()
+        tree = ast.parse(source, filename=file_path)
+    except (SyntaxError, UnicodeDecodeError, ValueError, OSError) as e:
+        return {"classes": [], "functions": [], "imports": {}, "future_annotations": False,
+                "error": f"{type(e).__name__}: {e}"}
+
+    classes, functions, imports = [], [], {}
+    future_annotations = False
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef):
+            classes.append(_class_info(node))
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            functions.append(_function_info(node))
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            imports.update(_import_names(node))
+            if isinstance(node, ast.ImportFrom) and node.module == '__future__':
+                future_annotations |= any(alias.name == 'annotations' for alias in node.names)
+    return {"classes": classes, "functions": functions, "imports": imports,
+            "future_annotations": future_annotations, "error": None}
+
+
+def _parse_with_path(file_path: str):
+    return file_path, parse_file(file_path)
+
+
+def extract_function_info(file_path, module_name):
+    functions = [
+        {"name": info["name"], "args": info["args"], "async": info["async"]}
+        for info in parse_file(file_path)["functions"]
+    ]
+    return {module_name: functions} if functions else {}
+
+
+# ---------------------------------------------------------------------------
+# 缓存
+# ---------------------------------------------------------------------------
+
+def _load_cache() -> Dict[str, Dict[str, Any]]:
+    global _cache
+    if _cache is None:
+        _cache = {}
+        try:
+            with open(CACHE_FILE, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("version") == CACHE_VERSION:
+                _cache = data.get("files", {})
+        except (OSError, ValueError):
+            pass
+    return _cache
+
+
+def _save_cache():
+    """先写临时文件再替换，避免中途出错留下损坏的缓存"""
+    directory = os.path.dirname(CACHE_FILE)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{CACHE_FILE}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"version": CACHE_VERSION, "files": _cache}, f, ensure_ascii=False)
+        os.replace(tmp_path, CACHE_FILE)
+    except OSError as e:
+        print(f"保存扫描缓存失败: {e}")
+
+
+def _parse_many(paths: List[str]) -> Dict[str, Dict[str, Any]]:
+    if len(paths) < PARALLEL_THRESHOLD:
+        return {path: parse_file(path) for path in paths}
+    # 在多线程的 Flask 进程中避免直接 fork
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+    workers = min(os.cpu_count() or 2, 8)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+        chunksize = max(1, len(paths) // (workers * 4))
+        return dict(executor.map(_parse_with_path, paths, chunksize=chunksize))
+
+
+def _list_python_files(directory: str) -> List[str]:
+    files = []
+    for root, dirs, filenames in os.walk(directory):
+        # 排除目录
+        dirs[:] = sorted(d for d in dirs if d not in EXCLUDE_DIRS)
+        for filename in sorted(filenames):
+            if filename.endswith('.py'):
+                files.append(os.path.join(root, filename))
+    return files
+
+
+def scan_project(directory: str) -> Dict[str, Dict[str, Any]]:
+    """
+    静态扫描目录下所有 .py 文件，返回 {模块名: {"path", "classes", "functions", "error"}}
+
+    每个文件的解析结果按 (路径, mtime, 大小) 缓存在内存和磁盘中，
+    目录未变化时再次扫描只需要 stat 每个文件
+    """
+    directory = os.path.abspath(directory)
+    files = _list_python_files(directory)
+
+    with _cache_lock:
+        cache = _load_cache()
+        signatures, stale = {}, []
+        for path in files:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            signatures[path] = [stat.st_mtime_ns, stat.st_size]
+            entry = cache.get(path)
+            if entry is None or entry["signature"] != signatures[path]:
+                stale.append(path)
+
+        changed = bool(stale)
+        for path, result in _parse_many(stale).items():
+            cache[path] = {"signature": signatures[path], "result": result}
+
+        # 清理该目录下已删除文件的缓存
+        prefix = directory + os.sep
+        for path in [p for p in cache if p.startswith(prefix) and p not in signatures]:
+            del cache[path]
+            changed = True
+
+        if changed:
+            _save_cache()
+
+        project = {}
+        for path in signatures:
+            module_name = os.path.relpath(path, directory)[:-3].replace(os.sep, '.')
+            project[module_name] = dict(cache[path]["result"], path=path)
+    return project
+
+
+def clear_cache():
+    """清空内存和磁盘上的扫描缓存"""
+    global _cache
+    with _cache_lock:
+        _cache = {}
+        _external_cache.clear()
+        try:
+            os.remove(CACHE_FILE)
+        except OSError:
+            pass
+
+
+# ---------------------------------------------------------------------------
+# 注解格式：还原导入模块时 str(param.annotation) 的结果
+# ---------------------------------------------------------------------------
+
+class _AnnotationFormatter:
+    """
+    按模块的导入和类定义解析注解中的名称，生成与 str(注解对象) 相同的文本，
+    如 int -> "<class 'int'>"、Optional[Disease] -> "typing.Optional[models.models.Disease]"；
+    无法静态确定的名称抛出 ValueError
+    """
+
+    def __init__(self, module_name: str, module: Dict[str, Any]):
+        self.module_name = module_name
+        self.imports = module.get("imports", {})
+        self.local_classes = {cls["name"] for cls in module["classes"]}
+
+    def qualify(self, node) -> str:
+        if isinstance(node, ast.Name):
+            if node.id in self.imports:
+                return self.imports[node.id]
+            if node.id in self.local_classes:
+                return f"{self.module_name}.{node.id}"
+            if isinstance(getattr(builtins, node.id, None), type):
+                return f"builtins.{node.id}"
+            raise ValueError(node.id)
+        if isinstance(node, ast.Attribute):
+            return f"{self.qualify(node.value)}.{node.attr}"
+        raise ValueError(ast.unparse(node))
+
+    def top(self, node) -> str:
+        """str(注解对象)"""
+        if isinstance(node, ast.Constant):
+            return str(node.value)
+        if isinstance(node, (ast.Name, ast.Attribute)):
+            qualified = self.qualify(node)
+            if qualified.startswith('typing.'):
+                return qualified
+            return f"<class '{qualified[len('builtins.'):] if qualified.startswith('builtins.') else qualified}'>"
+        return self.inner(node)
+
+    def inner(self, node, literal: bool = False) -> str:
+        """泛型参数中的写法，与 typing._type_repr 一致"""
+        if isinstance(node, ast.Constant):
+            if literal or node.value is Ellipsis:
+                return '...' if node.value is Ellipsis else repr(node.value)
+            if node.value is None:
+                return 'None'
+            if isinstance(node.value, str):
+                return f"ForwardRef({node.value!r})"
+            return repr(node.value)
+        if isinstance(node, (ast.Name, ast.Attribute)):
+            qualified = self.qualify(node)
+            return qualified[len('builtins.'):] if qualified.startswith('builtins.') else qualified
+        if isinstance(node, ast.List):
+            return f"[{', '.join(self.inner(item) for item in node.elts)}]"
+        if isinstance(node, ast.BinOp) and isinstance(node.op, ast.BitOr):
+            return f"{self.inner(node.left)} | {self.inner(node.right)}"
+        if isinstance(node, ast.Subscript):
+            origin = self.inner(node.value)
+            args = node.slice.elts if isinstance(node.slice, ast.Tuple) else [node.slice]
+            is_none = [isinstance(arg, ast.Constant) and arg.value is None for arg in args]
+            if origin == 'typing.Union' and len(args) == 2 and any(is_none):
+                # Union[X, None] 的字符串形式为 Optional[X]
+                return f"typing.Optional[{self.inner(args[is_none.index(False)])}]"
+            literal = origin == 'typing.Literal'
+            return f"{origin}[{', '.join(self.inner(arg, literal) for arg in args)}]"
+        raise ValueError(ast.unparse(node))
+
+    def format(self, annotation: Optional[str], future_annotations: bool) -> Optional[str]:
+        # 启用 from __future__ import annotations 时注解本身就是字符串
+        if annotation is None or future_annotations:
+            return annotation
+        try:
+            return self.top(ast.parse(annotation, mode='eval').body)
+        except (ValueError, SyntaxError):
+            return annotation
+
+
+# ---------------------------------------------------------------------------
+# 扫描范围外的父类：只导入父类所在的模块，按原先 inspect 的方式列出方法
+# ---------------------------------------------------------------------------
+
+_external_cache: Dict[str, Dict[str, Dict[str, Any]]] = {}
 
 
 def serialize_param(param: inspect.Parameter) -> dict:
@@ -15,103 +371,146 @@ def serialize_param(param: inspect.Parameter) -> dict:
     }
 
 
-def attach_parents(tree):
-    """给 AST 节点添加 parent 属性"""
-    for node in ast.walk(tree):
-        for child in ast.iter_child_nodes(node):
-            child.parent = node
+def _qualify_base(module_name: str, module: Dict[str, Any], base: str) -> Optional[str]:
+    """父类表达式 -> 完整名称，如 models.Model -> tortoise.models.Model；无法静态确定时返回 None"""
+    try:
+        node = ast.parse(base, mode='eval').body
+        if isinstance(node, ast.Subscript):
+            node = node.value
+        return _AnnotationFormatter(module_name, module).qualify(node)
+    except (ValueError, SyntaxError):
+        return None
 
-def is_top_level_function(node):
-    return isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and isinstance(getattr(node, 'parent', None), ast.Module)
 
+def _import_object(qualified_name: str):
+    """按最长的可导入模块前缀导入，再逐级取属性"""
+    parts = qualified_name.split('.')
+    for index in range(len(parts) - 1, 0, -1):
+        try:
+            obj = importlib.import_module('.'.join(parts[:index]))
+        except ImportError:
+            continue
+        for attr in parts[index:]:
+            obj = getattr(obj, attr)
+        return obj
+    raise ImportError(f"No module named {parts[0]!r}")
 
-def extract_function_info(file_path, module_name):
-    with open(file_path, 'r', encoding='utf-8') as f:
-        source = f.read()
+
+def _external_methods(qualified_name: str) -> Dict[str, Dict[str, Any]]:
+    """
+    扫描范围外父类的公开方法 {方法名: {"params": [...], "external": True}}，
+    params 已是最终格式；导入失败时返回空字典
+    """
+    methods = _external_cache.get(qualified_name)
+    if methods is not None:
+        return methods
+
+    methods = {}
     try:
-        tree = ast.parse(source, filename=file_path)
-        attach_parents(tree)
-    except SyntaxError:
+        base = _import_object(qualified_name)
+    except Exception as e:
+        print(f"Error loading {qualified_name}: {e}")
+        base = None
+    if inspect.isclass(base):
+        for method_name, method_obj in inspect.getmembers(base, inspect.isfunction):
+            if method_name.startswith('_'):
+                continue
+            try:
+                params = [
+                    serialize_param(param)
+                    for param in inspect.signature(method_obj).parameters.values()
+                    if param.name not in ('self', 'cls')
+                ]
+            except Exception as e:
+                params = [{"error": str(e)}]
+            methods[method_name] = {"params": params, "external": True}
+    _external_cache[qualified_name] = methods
+    return methods
+
+
+# ---------------------------------------------------------------------------
+# 对外接口
+# ---------------------------------------------------------------------------
+
+def _resolve_methods(project, module_name, class_info, resolving=None) -> Dict[str, Dict[str, Any]]:
+    """
+    合并父类的方法，子类中的同名方法优先。扫描范围内的父类按 AST 解析，
+    范围外的父类（如 tortoise 的 Model）导入其所在模块后列出公开方法
+
+    返回 {方法名: 方法信息}，方法信息的 module 为定义该方法的模块名
+    """
+    resolving = resolving or set()
+    key = (module_name, class_info["name"])
+    if key in resolving:
         return {}
+    resolving.add(key)
 
-    functions = []
-    for node in ast.walk(tree):
-        if is_top_level_function(node):
-            arg_names = [arg.arg for arg in node.args.args]
-            functions.append({
-                "name": node.name,
-                "args": arg_names,
-                "async": isinstance(node, ast.AsyncFunctionDef)
-            })
+    methods = {}
+    for base in reversed(class_info["bases"]):
+        base_name = base.split('.')[-1]
+        found = _find_class(project, module_name, base_name)
+        if found:
+            methods.update(_resolve_methods(project, found[0], found[1], resolving))
+            continue
+        qualified_name = _qualify_base(module_name, project[module_name], base)
+        if qualified_name:
+            methods.update(_external_methods(qualified_name))
+    methods.update({name: dict(info, module=module_name) for name, info in class_info["methods"].items()})
+    return methods
+
+
+def _find_class(project, module_name, class_name):
+    """优先在同一模块中查找，其次在整个扫描范围内查找唯一的同名类"""
+    for cls in project[module_name]["classes"]:
+        if cls["name"] == class_name:
+            return module_name, cls
+    matches = [
+        (name, cls)
+        for name, module in project.items()
+        for cls in module["classes"]
+        if cls["name"] == class_name
+    ]
+    return matches[0] if len(matches) == 1 else None
 
-    return {module_name: functions} if functions else {}
-EXCLUDE_DIRS = {'.venv', '__pycache__', 'site-packages'}
 
 def scan_classes_in_directory(directory: str) -> dict[str, dict]:
     """
     实际执行扫描目录，返回 {类名: {方法名: [参数信息, ...]}} 结构
+
+    参数的 annotation 与导入模块后 str(param.annotation) 的格式一致（如 "<class 'int'>"）；
+    无法静态解析的名称保留源码文本。只有扫描范围外的父类会被导入
     """
+    project = scan_project(directory)
     class_map = {}
-
-    if directory not in sys.path:
-        sys.path.insert(0, directory)
-
-    for root, dirs, files in os.walk(directory):
-        # 排除目录
-        dirs[:] = [d for d in dirs if d not in EXCLUDE_DIRS]
-
-        for file in files:
-            if file.endswith('.py') and not file.startswith('__'):
-                file_path = os.path.join(root, file)
-                rel_path = os.path.relpath(file_path, directory)
-                module_name = rel_path[:-3].replace(os.sep, '.')
-
-                try:
-                    module = importlib.import_module(module_name)
-                except Exception as e:
-                    print(f"Error loading {module_name}: {e}")
+    for module_name, module in project.items():
+        if os.path.basename(module["path"]).startswith('__'):
+            continue
+        for cls in module["classes"]:
+            method_map = {}
+            for method_name, method in _resolve_methods(project, module_name, cls).items():
+                if method_name.startswith('_'):
                     continue
-
-                for cls_name, cls_obj in inspect.getmembers(module, inspect.isclass):
-                    if cls_obj.__module__ != module.__name__:
-                        continue
-
-                    method_map = {}
-                    for method_name, method_obj in inspect.getmembers(cls_obj, inspect.isfunction):
-                        if method_name.startswith('_'):
-                            continue
-
-                        try:
-                            sig = inspect.signature(method_obj)
-                            param_list = []
-                            for param in sig.parameters.values():
-                                if param.name in ('self', 'cls'):
-                                    continue
-                                param_list.append(serialize_param(param))
-                            method_map[method_name] = param_list
-                        except Exception as e:
-                            method_map[method_name] = [{"error": str(e)}]
-
-                    full_class_name = f"{module_name}.{cls_name}"
-                    class_map[full_class_name] = method_map
-
+                if method.get("external"):
+                    method_map[method_name] = method["params"]
+                    continue
+                # 继承来的方法按定义它的模块解析注解中的名称
+                defining = project[method["module"]]
+                formatter = _AnnotationFormatter(method["module"], defining)
+                method_map[method_name] = [
+                    dict(param, annotation=formatter.format(param["annotation"], defining["future_annotations"]))
+                    for param in method["params"] if param["name"] not in ('self', 'cls')
+                ]
+            class_map[f"{module_name}.{cls['name']}"] = method_map
     return class_map
 
 def scan_functions_in_directory(root_dir):
+    """返回 {模块名: [{"name", "args", "async"}, ...]}，只包含定义了顶层函数的模块"""
     function_map = {}
-
-    for dirpath, dirnames, filenames in os.walk(root_dir):
-        # 排除虚拟环境目录
-        if any(exclude in dirpath for exclude in ['.venv', '__pycache__', 'site-packages']):
-            continue
-
-        for filename in filenames:
-            if filename.endswith(".py"):
-                file_path = os.path.join(dirpath, filename)
-                rel_path = os.path.relpath(file_path, root_dir).replace(os.path.sep, ".").rstrip(".py")
-                module_name = rel_path[:-3] if rel_path.endswith(".py") else rel_path
-
-                result = extract_function_info(file_path, module_name)
-                function_map.update(result)
-
-    return function_map
\ No newline at end of file
+    for module_name, module in scan_project(root_dir).items():
+        functions = [
+            {"name": info["name"], "args": info["args"], "async": info["async"]}
+            for info in module["functions"]
+        ]
+        if functions:
+            function_map[module_name] = functions
+    return function_map
@@ -0,0 +1,141 @@
+"""
+E2E测试浏览器会话池
+"""
+import atexit
+import queue
+import shutil
+import tempfile
+import threading
+from typing import Dict, Any, Optional, Tuple
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.support.ui import WebDriverWait
+
+from app.static.system_test import (
+    CHROME_OPTIONS, HEADLESS_WINDOW_SIZE, MAXIMIZED_WINDOW, WAIT_CONFIG, BROWSER_POOL_CONFIG
+)
+
+
+class BrowserSession:
+    """一个浏览器实例及其等待器，记录当前已登录的账号以便后续场景复用"""
+
+    def __init__(self, config: Dict[str, Any]):
+        self.headless = bool(config.get('headless', False))
+        self.user_data_dir = tempfile.mkdtemp(prefix="chrome_test_")
+        self.driver = self._create_driver(config)
+        timeout = config.get('timeout', WAIT_CONFIG["implicit_wait"])
+        self.wait = WebDriverWait(self.driver, timeout)
+        self.short_wait = WebDriverWait(self.driver, WAIT_CONFIG["short_wait"])
+        # (基础URL, 用户名)，未登录时为 None
+        self.logged_in: Optional[Tuple[str, str]] = None
+        self.uses = 0
+
+    def _create_driver(self, config: Dict[str, Any]):
+        chrome_options = Options()
+
+        for option in CHROME_OPTIONS:
+            chrome_options.add_argument(option)
+
+        if self.headless:
+            chrome_options.add_argument('--headless')
+            chrome_options.add_argument(HEADLESS_WINDOW_SIZE)
+        else:
+            chrome_options.add_argument(MAXIMIZED_WINDOW)
+
+        chrome_options.add_argument(f'--user-data-dir={self.user_data_dir}')
+
+        try:
+            driver = webdriver.Chrome(service=Service(), options=chrome_options)
+
+            driver.implicitly_wait(config.get('timeout', WAIT_CONFIG["implicit_wait"]))
+            driver.set_page_load_timeout(WAIT_CONFIG["page_load_timeout"])
+            driver.set_script_timeout(WAIT_CONFIG["script_timeout"])
+
+            if not self.headless:
+                driver.maximize_window()
+            return driver
+        except Exception as e:
+            shutil.rmtree(self.user_data_dir, ignore_errors=True)
+            raise Exception(f"Chrome浏览器初始化失败: {str(e)}")
+
+    def is_alive(self) -> bool:
+        try:
+            self.driver.current_url
+            return True
+        except Exception:
+            return False
+
+    def quit(self):
+        try:
+            self.driver.quit()
+        except Exception:
+            pass
+        shutil.rmtree(self.user_data_dir, ignore_errors=True)
+
+
+class BrowserPool:
+    """
+    浏览器会话池，线程安全
+
+    场景结束后浏览器不关闭而是放回池中，下一个场景直接复用，且保留登录状态；
+    同时存在的浏览器数量不超过 max_sessions
+    """
+
+    def __init__(self, max_sessions: int = BROWSER_POOL_CONFIG["max_sessions"],
+                 max_uses: int = BROWSER_POOL_CONFIG["max_uses"]):
+        self.max_sessions = max(1, max_sessions)
+        self.max_uses = max_uses
+        # 后进先出，优先复用最近使用过的浏览器
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.max_sessions)
+        self._closed = False
+
+    def acquire(self, config: Dict[str, Any]) -> BrowserSession:
+        self._slots.acquire()
+        try:
+            while True:
+                try:
+                    session = self._idle.get_nowait()
+                except queue.Empty:
+                    return BrowserSession(config)
+                if session.is_alive():
+                    return session
+                session.quit()
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, session: BrowserSession, healthy: bool = True):
+        session.uses += 1
+        try:
+            if not self._closed and healthy and session.uses < self.max_uses and session.is_alive():
+                self._idle.put(session)
+            else:
+                session.quit()
+        finally:
+            self._slots.release()
+
+    def close(self):
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().quit()
+            except queue.Empty:
+                break
+
+
+_pools: Dict[bool, BrowserPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_browser_pool(headless: bool = True) -> BrowserPool:
+    """进程级共享的浏览器池，有头和无头浏览器分开管理"""
+    headless = bool(headless)
+    with _pools_lock:
+        pool = _pools.get(headless)
+        if pool is None:
+            pool = _pools[headless] = BrowserPool()
+            atexit.register(pool.close)
+    return pool
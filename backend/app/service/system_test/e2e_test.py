@@ -1,35 +1,52 @@
 import os
 import time
 import json
-from typing import Dict, Any, List
-from selenium import webdriver
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Callable
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
-import tempfile
 
 from app.static.system_test import (
-    DEFAULT_TEST_CONFIG, CHROME_OPTIONS, HEADLESS_WINDOW_SIZE, MAXIMIZED_WINDOW,
-    TEST_DIRECTORIES, DEFAULT_TEST_IMAGE, RETRY_CONFIG, WAIT_CONFIG,
+    DEFAULT_TEST_CONFIG, TEST_DIRECTORIES, DEFAULT_TEST_IMAGE, RETRY_CONFIG, WAIT_CONFIG,
     DETECTION_WAIT_CONFIG, SELECTORS, URL_VALIDATION, TEST_CASES_CONFIG,
-    JAVASCRIPT_SCRIPTS
+    JAVASCRIPT_SCRIPTS, SETTLE_CONFIG
 )
 
+from .browser_pool import BrowserPool, BrowserSession, get_browser_pool
 from .config import E2ETestConfig
 from .utils import E2ETestUtils
 
+# 可并行执行的场景
+PARALLEL_TEST_TYPES = ['plot_detection', 'weather_info', 'plot_management', 'plot_logs']
+# 未指定场景时并行执行的场景
+DEFAULT_PARALLEL_TEST_TYPES = ['plot_detection', 'weather_info', 'plot_management']
+# 读写测试账号地块数据的场景：地块管理会增删地块，检测和日志场景使用第一个地块，
+# 同一账号下并发执行时结果取决于时序，这些场景在同一个浏览器中按顺序执行
+PLOT_DATA_TEST_TYPES = ['plot_detection', 'plot_management', 'plot_logs']
+
 
 class E2ETestService:
     """E2E测试服务主类"""
     
-    def __init__(self):
+    def __init__(self, browser_pool: BrowserPool = None, on_step: Callable[[Dict[str, Any]], None] = None):
+        """
+        Args:
+            browser_pool: 浏览器会话池；提供时从池中借用浏览器并复用登录状态，
+                          不提供时每次测试单独启动并关闭浏览器
+            on_step: 每记录一个步骤时以步骤信息调用，回调抛出的异常会中止当前场景
+        """
+        self.browser_pool = browser_pool
+        self.on_step = on_step
+        self.session = None
         self.driver = None
         self.wait = None
         self.short_wait = None
+        self.base_url = None
+        self._step_started = {}
         self.test_data_dir = TEST_DIRECTORIES["test_data"]
         self.screenshot_dir = TEST_DIRECTORIES["screenshots"]
         self._setup_test_directories()
@@ -119,48 +136,57 @@ class E2ETestService:
         return test_result
 
     def _setup_driver(self, config: Dict[str, Any]):
-        chrome_options = Options()
-        
-        for option in CHROME_OPTIONS:
-            chrome_options.add_argument(option)
-        
-        if config.get('headless', False):
-            chrome_options.add_argument('--headless')
-            chrome_options.add_argument(HEADLESS_WINDOW_SIZE)
+        if self.browser_pool is not None:
+            self.session = self.browser_pool.acquire(config)
         else:
-            chrome_options.add_argument(MAXIMIZED_WINDOW)
-        
-        user_data_dir = tempfile.mkdtemp(prefix="chrome_test_")
-        chrome_options.add_argument(f'--user-data-dir={user_data_dir}')
-        
-        try:
-            service = Service()
-            self.driver = webdriver.Chrome(service=service, options=chrome_options)
-            
-            timeout = config.get('timeout', WAIT_CONFIG["implicit_wait"])
-            self.driver.implicitly_wait(timeout)
-            self.driver.set_page_load_timeout(WAIT_CONFIG["page_load_timeout"])
-            
-            self.wait = WebDriverWait(self.driver, timeout)
-            self.short_wait = WebDriverWait(self.driver, WAIT_CONFIG["short_wait"])
-            
-            if not config.get('headless', False):
-                self.driver.maximize_window()
-            
-        except Exception as e:
-            raise Exception(f"Chrome浏览器初始化失败: {str(e)}")
+            self.session = BrowserSession(config)
+        self.driver = self.session.driver
+        self.wait = self.session.wait
+        self.short_wait = self.session.short_wait
 
     def _cleanup_driver(self):
-        if self.driver:
+        if self.session:
             try:
-                self.driver.quit()
-            except Exception:
-                pass
+                if self.browser_pool is not None:
+                    # 放回池中供后续场景复用，浏览器已失效时由池负责重建
+                    self.browser_pool.release(self.session)
+                else:
+                    self.session.quit()
             finally:
+                self.session = None
                 self.driver = None
                 self.wait = None
                 self.short_wait = None
 
+    def _wait_for_page_settled(self, max_seconds: float):
+        """
+        事件驱动的等待：页面加载完成且 DOM 连续一小段时间无变化即返回
+
+        max_seconds 为最长等待时间（即原先固定等待的时长），页面提前稳定时立即继续
+        """
+        try:
+            self.driver.execute_async_script(
+                JAVASCRIPT_SCRIPTS["wait_dom_quiet"], SETTLE_CONFIG["quiet_ms"], int(max_seconds * 1000)
+            )
+        except WebDriverException:
+            # 等待期间发生页面跳转时脚本会被中断，改为等待新页面加载完成
+            self._wait_for_document_ready(max_seconds)
+
+    def _wait_for_dom_change(self, max_seconds: float):
+        """轮询检查之间的等待：DOM 一有变化就返回，最多等待 max_seconds 秒"""
+        try:
+            self.driver.execute_async_script(JAVASCRIPT_SCRIPTS["wait_dom_change"], int(max_seconds * 1000))
+        except WebDriverException:
+            self._wait_for_document_ready(max_seconds)
+
+    def _wait_for_document_ready(self, max_seconds: float):
+        try:
+            WebDriverWait(self.driver, max_seconds, poll_frequency=SETTLE_CONFIG["poll_frequency"]).until(
+                lambda driver: driver.execute_script("return document.readyState") == "complete"
+            )
+        except WebDriverException:
+            pass
+
     def _execute_test_steps(self, config: E2ETestConfig, test_data: Dict[str, Any], result: Dict[str, Any]):
         base_url = config.get_base_url()
         username = config.get('test_username')
@@ -201,6 +227,7 @@ class E2ETestService:
     def _navigate_to_website(self, base_url: str):
         try:
             print(f"[调试] 正在访问网站: {base_url}")
+            self.base_url = base_url
             self.driver.get(base_url)
             self.wait.until(EC.presence_of_element_located((By.TAG_NAME, "body")))
             self._wait_for_ionic_ready()
@@ -223,7 +250,7 @@ class E2ETestService:
                     console.log('Ionic is ready');
                 }
             """)
-            time.sleep(1)
+            self._wait_for_page_settled(1)
         except Exception:
             pass
     
@@ -233,7 +260,16 @@ class E2ETestService:
             "status": status,
             "timestamp": time.strftime('%H:%M:%S')
         }
+        # 记录每个步骤从开始到结束的耗时
+        if status == "执行中":
+            self._step_started[step_name] = time.perf_counter()
+        elif step_name in self._step_started:
+            duration_ms = round((time.perf_counter() - self._step_started.pop(step_name)) * 1000)
+            step_info["duration_ms"] = duration_ms
+            result.setdefault("step_timings", {})[step_name] = duration_ms
         result["steps"].append(step_info)
+        if self.on_step is not None:
+            self.on_step(dict(step_info, test_name=result.get("test_name")))
         
         if status == "执行中":
             print(f"[测试] 正在执行: {step_name}")
@@ -245,7 +281,9 @@ class E2ETestService:
     def _perform_login(self, username: str, password: str):
         try:
             print(f"[调试] 开始登录流程 - 用户名: {username}")
-            time.sleep(WAIT_CONFIG["navigation_delay"])
+            self._wait_for_page_settled(WAIT_CONFIG["navigation_delay"])
+            if self._reuse_login(username):
+                return
             self._wait_for_login_form()
             
             login_elements = self._find_login_elements_js()
@@ -257,9 +295,11 @@ class E2ETestService:
                 print(f"[调试] 使用Selenium方式登录")
                 self._perform_login_selenium(username, password)
             
-            time.sleep(WAIT_CONFIG["login_delay"])
+            self._wait_for_page_settled(WAIT_CONFIG["login_delay"])
             print(f"[调试] 验证登录结果")
             self._verify_login_success()
+            if self.session:
+                self.session.logged_in = (self.base_url, username)
             print(f"[调试] 登录成功")
             
         except Exception as e:
@@ -270,6 +310,19 @@ class E2ETestService:
             else:
                 raise Exception(f"登录过程失败: {str(e)}")
 
+    def _reuse_login(self, username: str) -> bool:
+        """复用的浏览器已用同一账号登录且仍停留在首页时跳过登录"""
+        if not self.session or self.session.logged_in != (self.base_url, username):
+            return False
+        try:
+            if self.driver.execute_script(JAVASCRIPT_SCRIPTS["check_home_page_loaded"]):
+                print("[调试] 复用已登录的浏览器会话")
+                return True
+        except WebDriverException:
+            pass
+        self.session.logged_in = None
+        return False
+
     def _wait_for_login_form(self):
         try:
             self.wait.until(
@@ -278,7 +331,7 @@ class E2ETestService:
                     EC.presence_of_element_located((By.CSS_SELECTOR, "input[type='text']"))
                 )
             )
-            time.sleep(1)
+            self._wait_for_page_settled(1)
         except TimeoutException:
             raise Exception("登录表单加载超时")
 
@@ -319,7 +372,7 @@ class E2ETestService:
                     element.dispatchEvent(new Event('change', { bubbles: true }));
                 }
             """, elements['username'], username)
-            time.sleep(WAIT_CONFIG["input_delay"])
+            self._wait_for_page_settled(WAIT_CONFIG["input_delay"])
             
             self.driver.execute_script("""
                 const element = arguments[0];
@@ -331,7 +384,7 @@ class E2ETestService:
                     element.dispatchEvent(new Event('change', { bubbles: true }));
                 }
             """, elements['password'], password)
-            time.sleep(WAIT_CONFIG["input_delay"])
+            self._wait_for_page_settled(WAIT_CONFIG["input_delay"])
             
             # 简化的Vue按钮点击
             self.driver.execute_script("""
@@ -382,10 +435,10 @@ class E2ETestService:
     def _safe_input_vue(self, element, text: str, field_name: str):
         try:
             self.driver.execute_script("arguments[0].scrollIntoView(true);", element)
-            time.sleep(WAIT_CONFIG["scroll_delay"])
+            self._wait_for_page_settled(WAIT_CONFIG["scroll_delay"])
             
             element.click()
-            time.sleep(WAIT_CONFIG["input_delay"])
+            self._wait_for_page_settled(WAIT_CONFIG["input_delay"])
             
             element.clear()
             element.send_keys(text)
@@ -400,14 +453,14 @@ class E2ETestService:
                     element.dispatchEvent(new Event('input', { bubbles: true }));
                     element.dispatchEvent(new Event('change', { bubbles: true }));
                 """, element, text)
-                time.sleep(WAIT_CONFIG["input_delay"])
+                self._wait_for_page_settled(WAIT_CONFIG["input_delay"])
         except Exception as e:
             raise Exception(f"{field_name}输入失败: {str(e)}")
 
     def _safe_click_vue(self, element, element_name: str):
         try:
             self.driver.execute_script("arguments[0].scrollIntoView(true);", element)
-            time.sleep(WAIT_CONFIG["scroll_delay"])
+            self._wait_for_page_settled(WAIT_CONFIG["scroll_delay"])
             
             WebDriverWait(self.driver, 5).until(EC.element_to_be_clickable(element))
             
@@ -416,7 +469,7 @@ class E2ETestService:
             except Exception:
                 self.driver.execute_script("arguments[0].click();", element)
                 
-            time.sleep(WAIT_CONFIG["click_delay"])
+            self._wait_for_page_settled(WAIT_CONFIG["click_delay"])
         except Exception as e:
             raise Exception(f"{element_name}点击失败: {str(e)}")
 
@@ -437,7 +490,7 @@ class E2ETestService:
                     if error_msg:
                         raise Exception(f"登录失败，错误信息: {error_msg}")
                 
-                time.sleep(1)
+                self._wait_for_dom_change(1)
             
             current_url = self.driver.current_url
             if any(pattern in current_url for pattern in URL_VALIDATION["login_success_patterns"]):
@@ -487,7 +540,7 @@ class E2ETestService:
     def _click_first_plot_card(self):
         try:
             print(f"[调试] 正在查找并点击第一个地块卡片")
-            time.sleep(WAIT_CONFIG["navigation_delay"])
+            self._wait_for_page_settled(WAIT_CONFIG["navigation_delay"])
             
             # 直接使用JavaScript查找第一个地块卡片
             first_plot_card = self.driver.execute_script("""
@@ -518,7 +571,7 @@ class E2ETestService:
                 print(f"[调试] 找到 {len(plot_cards)} 个地块卡片")
                 self._safe_click_vue(plot_cards[0], "第一个地块卡片")
             
-            time.sleep(WAIT_CONFIG["plot_detail_delay"])
+            self._wait_for_page_settled(WAIT_CONFIG["plot_detail_delay"])
             
             current_url = self.driver.current_url
             print(f"[调试] 当前URL: {current_url}")
@@ -532,7 +585,7 @@ class E2ETestService:
     def _click_more_options_button(self):
         try:
             print(f"[调试] 正在点击更多选项按钮")
-            time.sleep(WAIT_CONFIG["navigation_delay"])
+            self._wait_for_page_settled(WAIT_CONFIG["navigation_delay"])
             
             # 首先尝试 JavaScript 点击
             click_result = self.driver.execute_script("""
@@ -555,7 +608,7 @@ class E2ETestService:
                 self._safe_click_vue(more_button, "更多选项按钮")
             
             # 等待 Popover 出现
-            time.sleep(WAIT_CONFIG["click_delay"] * 2)  # 稍微多等一会
+            self._wait_for_page_settled(WAIT_CONFIG["click_delay"] * 2)  # 稍微多等一会
             
             # 验证 Popover 是否出现
             popover_visible = self.driver.execute_script("""
@@ -568,14 +621,14 @@ class E2ETestService:
             else:
                 print(f"[调试] Popover 未显示，可能需要再次点击")
                 # 如果 Popover 没有显示，再尝试一次点击
-                time.sleep(1)
+                self._wait_for_page_settled(1)
                 self.driver.execute_script("""
                     var button = document.querySelector('#more-options-button');
                     if (button) {
                         button.click();
                     }
                 """)
-                time.sleep(WAIT_CONFIG["click_delay"])
+                self._wait_for_page_settled(WAIT_CONFIG["click_delay"])
             
             print(f"[调试] 更多选项按钮点击完成")
             
@@ -586,7 +639,7 @@ class E2ETestService:
     def _select_disease_detection_option(self):
         try:
             print(f"[调试] 正在查找疾病检测选项")
-            time.sleep(WAIT_CONFIG["click_delay"])
+            self._wait_for_page_settled(WAIT_CONFIG["click_delay"])
             
             # 等待 Popover 出现和渲染完成
             print(f"[调试] 等待 Popover 显示...")
@@ -598,7 +651,7 @@ class E2ETestService:
                 print(f"[调试] Popover 容器已出现")
                 
                 # 再等待一段时间确保内容渲染完成
-                time.sleep(WAIT_CONFIG["navigation_delay"])
+                self._wait_for_page_settled(WAIT_CONFIG["navigation_delay"])
                 
                 # 等待 Popover 内容加载
                 self.short_wait.until(
@@ -657,14 +710,17 @@ class E2ETestService:
             print(f"[调试] 等待疾病检测模态框出现...")
             
             # 等待Vue组件状态更新
-            time.sleep(WAIT_CONFIG["navigation_delay"] * 2)  # 增加等待时间
+            self._wait_for_page_settled(WAIT_CONFIG["navigation_delay"] * 2)  # 增加等待时间
             
             # 使用更灵活的方式检查模态框
             modal_opened = False
             max_attempts = 10
+            deadline = time.time() + max_attempts
+            attempt = 0
             
-            for attempt in range(max_attempts):
-                print(f"[调试] 检查模态框状态 (尝试 {attempt + 1}/{max_attempts})")
+            while time.time() < deadline:
+                attempt += 1
+                print(f"[调试] 检查模态框状态 (第 {attempt} 次)")
                 
                 modal_status = self.driver.execute_script("""
                     // 检查所有可能的模态框状态
@@ -697,7 +753,7 @@ class E2ETestService:
                     break
                 else:
                     print(f"[调试] 模态框状态: {modal_status.get('modals')}")
-                    time.sleep(1)  # 等待1秒后再次检查
+                    self._wait_for_dom_change(1)  # DOM 变化后立即再次检查，最多等待1秒
             
             if not modal_opened:
                 print(f"[调试] 模态框未能打开，尝试使用传统方式检查...")
@@ -741,7 +797,7 @@ class E2ETestService:
                 
                 # 尝试再次点击疾病检测选项
                 print(f"[调试] 尝试再次点击疾病检测选项...")
-                time.sleep(2)
+                self._wait_for_page_settled(2)
                 
                 retry_clicked = self.driver.execute_script("""
                     // 再次尝试找到并点击疾病检测选项
@@ -759,7 +815,7 @@ class E2ETestService:
                 
                 if retry_clicked:
                     print(f"[调试] 重新点击成功，再次等待模态框...")
-                    time.sleep(3)
+                    self._wait_for_page_settled(3)
                     
                     # 再次检查模态框
                     final_check = self.driver.execute_script("""
@@ -877,7 +933,7 @@ class E2ETestService:
                 raise Exception(f"测试图片不存在: {image_path}")
             
             print(f"[调试] 图片文件存在，大小: {os.path.getsize(image_path)} 字节")
-            time.sleep(WAIT_CONFIG["navigation_delay"])
+            self._wait_for_page_settled(WAIT_CONFIG["navigation_delay"])
             
             file_input = self._find_element_by_multiple_selectors(
                 SELECTORS["disease_detection"]["file_input"], "文件上传输入框"
@@ -887,7 +943,7 @@ class E2ETestService:
             absolute_path = os.path.abspath(image_path)
             file_input.send_keys(absolute_path)
             print(f"[调试] 文件路径已发送到输入框")
-            time.sleep(WAIT_CONFIG["input_delay"])
+            self._wait_for_page_settled(WAIT_CONFIG["input_delay"])
             
             file_value = file_input.get_attribute('value')
             if not file_value:
@@ -925,12 +981,13 @@ class E2ETestService:
             check_interval = DETECTION_WAIT_CONFIG["check_interval"]
             print(f"[调试] 开始等待检测结果，最大等待时间: {max_wait_time}秒")
             
-            # 先等待一段时间让请求处理
+            # 先等待请求处理，页面稳定后立即开始检查
             print(f"[调试] 等待检测请求处理...")
-            time.sleep(3)
+            self._wait_for_page_settled(3)
             
-            for attempt in range(max_wait_time // check_interval):
-                elapsed_time = (attempt + 1) * check_interval
+            start_time = time.time()
+            while time.time() - start_time < max_wait_time:
+                elapsed_time = round(time.time() - start_time, 1)
                 print(f"[调试] 等待检测结果中... ({elapsed_time}/{max_wait_time}秒)")
                 
                 # 检查是否有错误信息
@@ -942,18 +999,18 @@ class E2ETestService:
                 # 检查检测结果
                 if self._check_for_detection_result():
                     print(f"[调试] 检测结果已出现，等待时间: {elapsed_time}秒")
-                    # 额外等待一下确保结果完整加载
-                    time.sleep(2)
+                    # 等待结果完整加载
+                    self._wait_for_page_settled(2)
                     return True
                 
                 # 检查是否有成功提示
                 success_alert = self._check_for_success_alert()
                 if success_alert:
                     print(f"[调试] 检测到成功提示，继续等待结果显示...")
-                    time.sleep(3)
+                    self._wait_for_page_settled(3)
                     continue
                 
-                time.sleep(check_interval)
+                self._wait_for_dom_change(check_interval)
             
             # 超时后最后检查一次
             print(f"[调试] 等待超时，进行最终检查...")
@@ -1207,7 +1264,7 @@ class E2ETestService:
     
     def _verify_weather_info_display(self) -> Dict[str, Any]:
         print(f"[调试] 开始验证天气信息显示")
-        time.sleep(WAIT_CONFIG["weather_info_delay"])
+        self._wait_for_page_settled(WAIT_CONFIG["weather_info_delay"])
         
         try:
             # 简化的天气卡片查找
@@ -1334,40 +1391,39 @@ class E2ETestService:
         Args:
             check_function: 检查函数，返回True表示找到元素
             element_name: 元素名称（用于日志）
-            max_attempts: 最大重试次数
-            retry_interval: 重试间隔（秒）
+            max_attempts: 最大重试次数，与 retry_interval 相乘得到最长等待时间
+            retry_interval: 重试间隔（秒），DOM 变化时会提前检查
         
         Returns:
             bool: 是否成功找到元素
         """
-        print(f"[调试] 开始等待 {element_name}，最大重试次数: {max_attempts}")
+        timeout = max_attempts * retry_interval
+        print(f"[调试] 开始等待 {element_name}，最长 {timeout} 秒")
         
-        for attempt in range(max_attempts):
+        deadline = time.time() + timeout
+        attempt = 0
+        while True:
+            attempt += 1
             try:
-                print(f"[调试] 第 {attempt + 1}/{max_attempts} 次检查 {element_name}")
-                
                 if check_function():
-                    print(f"[调试] {element_name} 已出现 (第 {attempt + 1} 次尝试)")
+                    print(f"[调试] {element_name} 已出现 (第 {attempt} 次检查)")
                     return True
-                
-                if attempt < max_attempts - 1:  # 不是最后一次尝试
-                    print(f"[调试] {element_name} 未出现，等待 {retry_interval} 秒后重试")
-                    time.sleep(retry_interval)
-                else:
-                    print(f"[调试] {element_name} 在 {max_attempts} 次尝试后仍未出现")
-                    
             except Exception as e:
                 print(f"[调试] 检查 {element_name} 时发生异常: {str(e)}")
-                if attempt < max_attempts - 1:
-                    time.sleep(retry_interval)
-                continue
+            
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                print(f"[调试] {element_name} 在 {timeout} 秒内仍未出现")
+                break
+            # DOM 有变化时立即重新检查，而不是固定间隔轮询
+            self._wait_for_dom_change(min(remaining, retry_interval))
         
         return False
     def _click_add_plot_fab(self):
         """点击添加地块的FAB按钮 - 修复Vue响应式检查"""
         try:
             print(f"[调试] 正在查找并点击添加地块按钮")
-            time.sleep(WAIT_CONFIG["navigation_delay"])
+            self._wait_for_page_settled(WAIT_CONFIG["navigation_delay"])
             
             # 使用JavaScript查找FAB按钮
             fab_clicked = self.driver.execute_script("""
@@ -1478,7 +1534,7 @@ class E2ETestService:
                 """)
                 
                 # 增加等待时间给Vue更多时间渲染
-                time.sleep(3)
+                self._wait_for_page_settled(3)
                 
                 # 最终检查
                 final_check = self.driver.execute_script("""
@@ -1529,7 +1585,7 @@ class E2ETestService:
             print(f"[调试] 填写地块名称: {plot_name}")
             
             # 等待一下确保植物选择完成
-            time.sleep(WAIT_CONFIG["input_delay"])
+            self._wait_for_page_settled(WAIT_CONFIG["input_delay"])
             
             # 检查模态框是否仍然打开
             modal_still_open = self.driver.execute_script("""
@@ -1565,7 +1621,7 @@ class E2ETestService:
                 # 如果模态框关闭了，重新打开
                 print(f"[调试] 模态框已关闭，重新打开...")
                 self._click_add_plot_fab()
-                time.sleep(WAIT_CONFIG["modal_delay"] * 2)
+                self._wait_for_page_settled(WAIT_CONFIG["modal_delay"] * 2)
                 
                 # 重新检查
                 modal_reopened = self.driver.execute_script("""
@@ -1754,7 +1810,7 @@ class E2ETestService:
             print(f"[调试] 植物选择器已点击，等待选项Alert出现...")
             
             # 等待Alert选择框出现
-            time.sleep(WAIT_CONFIG["dropdown_delay"] * 2)
+            self._wait_for_page_settled(WAIT_CONFIG["dropdown_delay"] * 2)
             
             # 在Alert中选择第一个植物选项
             plant_selected = self.driver.execute_script("""
@@ -1822,7 +1878,7 @@ class E2ETestService:
             # 关键步骤：等待并点击Alert中的"OK"按钮
             if plant_selected.get('alertFound'):
                 print(f"[调试] 等待并点击Alert中的OK按钮...")
-                time.sleep(WAIT_CONFIG["click_delay"])
+                self._wait_for_page_settled(WAIT_CONFIG["click_delay"])
                 
                 ok_clicked = self.driver.execute_script("""
                     console.log('[JS] 查找并点击Alert中的OK按钮');
@@ -1856,7 +1912,7 @@ class E2ETestService:
                     print(f"[调试] 成功点击OK按钮: {ok_clicked.get('buttonText')}")
                     
                     # 等待Alert关闭和选择生效
-                    time.sleep(WAIT_CONFIG["click_delay"])
+                    self._wait_for_page_settled(WAIT_CONFIG["click_delay"])
                     
                     # 验证选择是否生效
                     selection_verified = self._verify_plant_selection(selected_plant)
@@ -1985,7 +2041,7 @@ class E2ETestService:
         """填写地块创建表单 - 修复版，确保植物选择完整"""
         try:
             print(f"[调试] 开始填写地块创建表单")
-            time.sleep(WAIT_CONFIG["input_delay"])
+            self._wait_for_page_settled(WAIT_CONFIG["input_delay"])
             
             # 1. 获取植物选项并完成完整选择流程（包括点击OK）
             first_plant = self._get_first_plant_option()
@@ -2068,7 +2124,7 @@ class E2ETestService:
             print(f"[调试] 设置植物到Vue数据: {plant_name}")
             
             # 等待一下确保植物选择器关闭
-            time.sleep(0.5)
+            self._wait_for_page_settled(0.5)
             
             # 验证模态框仍然打开并设置植物选择
             result = self.driver.execute_script("""
@@ -2275,7 +2331,7 @@ class E2ETestService:
                 print(f"[调试] 未找到OK按钮，可能提示框已自动关闭")
             
             # 等待提示框消失
-            time.sleep(WAIT_CONFIG["click_delay"])
+            self._wait_for_page_settled(WAIT_CONFIG["click_delay"])
             
             # 验证提示框是否已消失
             alert_gone = self.driver.execute_script("""
@@ -2569,7 +2625,7 @@ class E2ETestService:
         """等待地块详情页加载完成"""
         try:
             print(f"[调试] 等待地块详情页加载完成")
-            time.sleep(WAIT_CONFIG["plot_detail_delay"])
+            self._wait_for_page_settled(WAIT_CONFIG["plot_detail_delay"])
             
             # 验证是否在地块详情页
             current_url = self.driver.current_url
@@ -2593,7 +2649,7 @@ class E2ETestService:
             
             if not page_loaded:
                 print(f"[调试] 页面加载不完整，继续等待...")
-                time.sleep(WAIT_CONFIG["navigation_delay"])
+                self._wait_for_page_settled(WAIT_CONFIG["navigation_delay"])
             
             print(f"[调试] 地块详情页加载完成")
             
@@ -2605,7 +2661,7 @@ class E2ETestService:
         """读取并验证地块日志"""
         try:
             print(f"[调试] 开始读取地块日志")
-            time.sleep(WAIT_CONFIG["log_loading_delay"])
+            self._wait_for_page_settled(WAIT_CONFIG["log_loading_delay"])
             
             # 首先检查日志容器是否存在
             log_container = self._find_log_container()
@@ -2948,4 +3004,102 @@ class E2ETestService:
             return container_info
             
         except Exception as e:
-            return {"error": str(e)}
\ No newline at end of file
+            return {"error": str(e)}
+
+    # 并行执行
+    def run_test(self, test_type: str, test_config: Dict[str, Any], test_data: Dict[str, Any]) -> Dict[str, Any]:
+        """按测试类型执行单个场景"""
+        if test_type == 'plot_detection':
+            return self.run_plot_detection_test(test_config, test_data)
+        elif test_type == 'weather_info':
+            return self.run_weather_info_test(test_config)
+        elif test_type == 'plot_management':
+            return self.run_plot_management_test(test_config)
+        elif test_type == 'plot_logs':
+            return self.run_plot_logs_test(test_config)
+        return {
+            "test_type": test_type,
+            "status": "SKIPPED",
+            "message": f"未知的测试类型: {test_type}",
+            "start_time": None,
+            "end_time": None,
+            "execution_time": 0
+        }
+
+    def run_parallel_tests(self, test_config: Dict[str, Any], test_data: Dict[str, Any],
+                           test_types: List[str] = None, max_workers: int = None,
+                           on_result: Callable[[Dict[str, Any]], None] = None) -> Dict[str, Any]:
+        """
+        在多个无头浏览器中并行执行多个场景
+
+        浏览器从共享的会话池中借用，场景结束后放回池中，后续场景复用已登录的浏览器。
+        所有场景使用同一个测试账号，读写地块数据的场景（PLOT_DATA_TEST_TYPES）按给定顺序依次执行，
+        只有其余场景与它们并行
+
+        Args:
+            test_config: 测试配置，headless 会被强制设为 True
+            test_data: 测试数据（地块检测场景使用）
+            test_types: 场景列表，默认 plot_detection / weather_info / plot_management
+            max_workers: 并行数，不超过浏览器池大小
+            on_result: 每个场景结束时以场景结果调用；步骤进度沿用本实例的 on_step
+
+        Returns:
+            {"results": 各场景结果, "parallel": 并行执行统计}
+        """
+        test_types = test_types or DEFAULT_PARALLEL_TEST_TYPES
+        config = dict(test_config, headless=True)
+        pool = self.browser_pool or get_browser_pool(headless=True)
+
+        # 每组场景在一个线程中按顺序执行：读写地块数据的场景合为一组，其余场景各自一组
+        groups = []
+        plot_data_group = []
+        for index, test_type in enumerate(test_types):
+            if test_type in PLOT_DATA_TEST_TYPES:
+                if not plot_data_group:
+                    groups.append(plot_data_group)
+                plot_data_group.append(index)
+            else:
+                groups.append([index])
+        workers = max(1, min(max_workers or pool.max_sessions, pool.max_sessions, len(groups)))
+
+        def run_one(test_type):
+            start_time = time.time()
+            try:
+                result = E2ETestService(browser_pool=pool, on_step=self.on_step).run_test(test_type, config, test_data)
+            except Exception as e:
+                result = {
+                    "status": "FAILED",
+                    "error_message": str(e),
+                    "message": f"测试类型 {test_type} 执行失败",
+                    "start_time": None,
+                    "end_time": None,
+                    "execution_time": round(time.time() - start_time, 2)
+                }
+            result["test_type"] = test_type
+            result["worker"] = threading.current_thread().name
+            print(f"[并行测试] 测试类型 {test_type} 完成，状态: {result.get('status')}")
+            if on_result is not None:
+                on_result(result)
+            return result
+
+        results = [None] * len(test_types)
+
+        def run_group(indices):
+            for index in indices:
+                results[index] = run_one(test_types[index])
+
+        start_time = time.time()
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="e2e") as executor:
+            list(executor.map(run_group, groups))
+        wall_time = round(time.time() - start_time, 2)
+        serial_time = round(sum(result.get("execution_time") or 0 for result in results), 2)
+
+        return {
+            "results": results,
+            "parallel": {
+                "workers": workers,
+                "wall_time": wall_time,
+                "total_execution_time": serial_time,
+                "speedup": round(serial_time / wall_time, 2) if wall_time else None
+            }
+        }
@@ -4,10 +4,70 @@ import sys
 import os
 import time
 import asyncio
+import contextvars
+import random
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, List, Tuple, Optional, Callable, Union
 from unittest.mock import patch, MagicMock, AsyncMock
 from contextlib import ExitStack
 
+from app.service import branch_coverage
+from app.service.branch_coverage import ArcCollector
+from app.service.fuzz import (
+    FuzzCorpus, SampledFrom, strategy_for, draw_examples, shrink_example, example_key,
+    compile_invariants, check_invariants, DEFAULT_MAX_EXAMPLES, MAX_EXAMPLES, FUZZ_BATCH, MAX_COUNTEREXAMPLES
+)
+
+# 当前用例使用的 Mock 对象 {mock_target: mock_obj}，线程池中每个用例、事件循环中每个任务各自独立
+_case_mocks: contextvars.ContextVar = contextvars.ContextVar("case_mocks", default=None)
+
+# 模糊测试同步输入的默认线程数；单元测试用例默认按顺序执行，并行需由调用方指定
+DEFAULT_MAX_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+# Excel 中不是被测方法参数的列
+NON_PARAM_COLUMNS = {"ID", "期望结果", "测试方法", "测试名称", "测试描述"}
+
+
+class _CaseMockProxy:
+    """
+    整套用例只对目标 patch 一次，调用时转发给当前用例自己的 Mock 对象，
+    使并行执行的用例之间调用记录、返回值互不干扰
+    """
+
+    def __init__(self, mock_target: str, default_mock: Any):
+        self._mock_target = mock_target
+        self._default_mock = default_mock
+
+    def _current(self):
+        mocks = _case_mocks.get()
+        if mocks is None:
+            # 不在任何用例上下文中（如目标代码自行启动的线程），使用整套用例共享的 Mock
+            return self._default_mock
+        return mocks[self._mock_target]
+
+    def __call__(self, *args, **kwargs):
+        return self._current()(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._current(), name)
+
+
+def _forward_magic(name: str):
+    def method(self, *args, **kwargs):
+        return getattr(self._current(), name)(*args, **kwargs)
+
+    method.__name__ = name
+    return method
+
+
+# 魔术方法在类型上查找，不经过 __getattr__，需逐个转发，使目标代码仍能把 Mock 当作
+# 上下文管理器、可迭代对象、容器或数字使用；__eq__/__hash__ 保持代理自身的标识语义
+for _name in ("__enter__", "__exit__", "__aenter__", "__aexit__", "__iter__", "__aiter__",
+              "__len__", "__bool__", "__contains__", "__getitem__", "__setitem__", "__delitem__",
+              "__int__", "__float__", "__complex__", "__index__", "__round__", "__str__", "__fspath__",
+              "__lt__", "__le__", "__gt__", "__ge__"):
+    setattr(_CaseMockProxy, _name, _forward_magic(_name))
+del _name
+
 
 class UnitTestService:
     """单元测试服务类"""
@@ -17,7 +77,10 @@ class UnitTestService:
 
     def execute_unit_test(self, root: str, class_name: str, method_name: str,
                           test_cases: List[Dict], param_types: Dict[str, str],
-                          mock_config: Dict[str, Any] = None) -> Dict[str, Any]:
+                          mock_config: Dict[str, Any] = None,
+                          max_workers: int = None,
+                          max_concurrency: int = None,
+                          on_result: Callable[[int, Dict[str, Any]], None] = None) -> Dict[str, Any]:
         """
         执行单元测试主方法
 
@@ -28,9 +91,12 @@ class UnitTestService:
             test_cases: 测试用例列表
             param_types: 参数类型字典
             mock_config: Mock配置字典
+            max_workers: 同步用例的并行线程数，默认按顺序执行；目标有共享状态时不要并行
+            max_concurrency: 异步用例在同一事件循环中的最大并发数，默认按顺序执行
+            on_result: 每个用例完成时调用 on_result(用例下标, 结果)；回调抛出的异常会中止剩余用例
 
         Returns:
-            测试结果字典
+            测试结果字典，test_results 与 test_cases 顺序一致
         """
         try:
             # 1. 添加项目根路径到系统路径
@@ -43,36 +109,33 @@ class UnitTestService:
             # 3. 导入目标对象
             target_callable, is_async = self._import_target(module_path, target_name, target_type)
 
-            # 4. 执行测试用例
-            test_results = []
-
-            for test_case in test_cases:
-                try:
-                    # 设置Mock
-                    with ExitStack() as stack:
-                        if mock_config:
-                            self._setup_mocks(mock_config, stack)
-
-                        # 执行单个测试
-                        if is_async:
-                            result = asyncio.run(self._execute_single_test_async(
-                                target_callable, test_case, param_types
-                            ))
-                        else:
-                            result = self._execute_single_test(
-                                target_callable, test_case, param_types
-                            )
-                        test_results.append(result)
-
-                except Exception as e:
-                    # 单个用例执行失败
-                    test_results.append({
-                        "ID": test_case.get("ID", "unknown"),
-                        "Expected": test_case.get("期望结果", "N/A"),
-                        "Actual": None,
-                        "Passed": False,
-                        "Duration": "0ms"
-                    })
+            # 4. 执行测试用例：Mock 目标整套用例只 patch 一次，每个用例拿到各自新建的 Mock 对象
+            with ExitStack() as stack:
+                mock_error = None
+                if mock_config:
+                    try:
+                        self._setup_mocks(mock_config, stack)
+                    except Exception as e:
+                        mock_error = str(e)
+
+                if mock_error is not None:
+                    # Mock 设置失败时与逐个用例执行时一样，每个用例各自报告失败
+                    test_results = []
+                    for index, test_case in enumerate(test_cases):
+                        test_results.append(self._failed_result(test_case, mock_error))
+                        if on_result is not None:
+                            on_result(index, test_results[-1])
+                elif is_async:
+                    # 所有异步用例共用一个事件循环，按并发上限 gather
+                    test_results = asyncio.run(self._run_async_cases(
+                        target_callable, test_cases, param_types, mock_config,
+                        max_concurrency or 1, on_result
+                    ))
+                else:
+                    test_results = self._run_sync_cases(
+                        target_callable, test_cases, param_types, mock_config,
+                        max_workers or 1, on_result
+                    )
 
             # 5. 计算统计信息
             summary = self._calculate_summary(test_results)
@@ -97,6 +160,334 @@ class UnitTestService:
                 "test_results": []
             }
 
+    def fuzz_unit_test(self, root: str, class_name: str, method_name: str,
+                       param_types: Dict[str, str], seed_cases: List[Dict] = None,
+                       invariants: List[str] = None,
+                       max_examples: int = DEFAULT_MAX_EXAMPLES, seed: int = None,
+                       mock_config: Dict[str, Any] = None,
+                       max_workers: int = None,
+                       on_progress: Callable[[Dict[str, Any]], None] = None) -> Dict[str, Any]:
+        """
+        模糊测试：按参数类型随机生成输入调用目标，检查是否抛出异常以及不变式是否成立
+
+        先重放该目标语料库中的历史反例，再生成 max_examples 个新输入；失败的输入按
+        (失败类型, 异常类型或不成立的不变式) 分组，每组化简为一个最小反例并保存到语料库
+
+        Args:
+            param_types: Excel 第二行的参数类型，无法随机构造的类型从 seed_cases 的取值中抽取
+            seed_cases: Excel 中的用例（已完成类型转换）
+            invariants: 不变式表达式列表，可使用参数名和 result（返回值），如 "result >= 0"
+            on_progress: 每执行完一批输入时以 {"checked", "total", "failures"} 调用
+
+        Returns:
+            与 execute_unit_test 格式一致的结果，test_results 为最小反例，另有 fuzz 部分
+        """
+        seed_cases = seed_cases or []
+        try:
+            if root not in sys.path:
+                sys.path.insert(0, root)
+
+            names = [name for name in param_types if name not in NON_PARAM_COLUMNS]
+            strategies = []
+            for name in names:
+                strategy = strategy_for(param_types[name])
+                if strategy is None:
+                    values = [case[name] for case in seed_cases if case.get(name) is not None]
+                    if not values:
+                        raise ValueError(f"参数 {name} 的类型 {param_types[name]} 无法随机生成，且用例中没有可选取值")
+                    strategy = SampledFrom(values)
+                strategies.append(strategy)
+            compiled = compile_invariants(invariants)
+
+            target_type, module_path, target_name = self._parse_target(class_name, method_name)
+            target_callable, is_async = self._import_target(module_path, target_name, target_type)
+
+            max_examples = max(1, min(int(max_examples), MAX_EXAMPLES))
+            seed = seed if seed is not None else random.randrange(2 ** 32)
+            corpus = FuzzCorpus(f"unit.{class_name}.{method_name}")
+            replay = [[entry.get(name) for name in names] for entry in corpus.inputs()
+                      if isinstance(entry, dict) and set(entry) == set(names)]
+            seen = {example_key(values) for values in replay}
+            inputs = replay + draw_examples(strategies, max_examples, random.Random(seed), seen)
+
+            def check_batch(batch):
+                if is_async:
+                    return asyncio.run(self._fuzz_async_batch(target_callable, names, batch, compiled, mock_config))
+                return self._fuzz_sync_batch(target_callable, names, batch, compiled, mock_config,
+                                             max_workers or DEFAULT_MAX_WORKERS)
+
+            failures = []
+            shrunk = {}
+            start_time = time.perf_counter()
+            with ExitStack() as stack:
+                if mock_config:
+                    self._setup_mocks(mock_config, stack)
+
+                for offset in range(0, len(inputs), FUZZ_BATCH):
+                    batch = inputs[offset:offset + FUZZ_BATCH]
+                    for values, failure in zip(batch, check_batch(batch)):
+                        if failure is None:
+                            continue
+                        failure["input"] = values
+                        key = example_key(failure["signature"])
+                        if key not in shrunk:
+                            signature = failure["signature"]
+
+                            def still_fails(trial):
+                                outcome = check_batch([trial])[0]
+                                return outcome is not None and outcome["signature"] == signature
+
+                            minimal = shrink_example(values, strategies, still_fails)
+                            # 目标行为不确定时化简结果可能不再失败，退回原始输入
+                            outcome = check_batch([minimal])[0] if minimal != values else None
+                            shrunk[key] = {**outcome, "input": minimal} if outcome is not None else dict(failure)
+                        failures.append(failure)
+                    if on_progress is not None:
+                        on_progress({"checked": min(offset + FUZZ_BATCH, len(inputs)), "total": len(inputs),
+                                     "failures": len(failures)})
+            duration = time.perf_counter() - start_time
+
+            groups = {}
+            for failure in failures:
+                key = example_key(failure["signature"])
+                group = groups.setdefault(key, {"count": 0, "first": failure})
+                group["count"] += 1
+            test_results = []
+            for key, group in sorted(groups.items(), key=lambda item: -item[1]["count"]):
+                minimal = shrunk[key]
+                test_results.append({
+                    "ID": len(test_results) + 1,
+                    "Input": dict(zip(names, minimal["input"])),
+                    "Expected": minimal["expected"],
+                    "Actual": minimal["actual"],
+                    "Passed": False,
+                    "Duration": "0ms",
+                    "Count": group["count"],
+                    "Kind": minimal["kind"],
+                    "Original": dict(zip(names, group["first"]["input"]))
+                })
+            added = corpus.add([
+                {"input": result["Input"], "expected": result["Expected"], "actual": repr(result["Actual"])}
+                for result in test_results
+            ])
+
+            replay_keys = {example_key(values) for values in replay}
+            total_cases = len(inputs)
+            failed_cases = len(failures)
+            return {
+                "success": True,
+                "message": "模糊测试执行完成",
+                "summary": {
+                    "total_cases": total_cases,
+                    "passed_cases": total_cases - failed_cases,
+                    "failed_cases": failed_cases,
+                    "pass_rate": f"{((total_cases - failed_cases) / total_cases * 100):.1f}%" if total_cases else "0%"
+                },
+                "test_results": test_results[:MAX_COUNTEREXAMPLES],
+                "fuzz": {
+                    "seed": seed,
+                    "replayed": len(replay),
+                    "invariants": [expression for expression, _ in compiled],
+                    "new_corpus_entries": added,
+                    "duration": f"{round(duration, 3)}s",
+                    "examples_per_second": int(total_cases / duration) if duration > 0 else None,
+                    # 语料库中仍然失败的输入
+                    "regressions": [dict(zip(names, failure["input"])) for failure in failures
+                                    if example_key(failure["input"]) in replay_keys]
+                }
+            }
+
+        except Exception as e:
+            return {
+                "success": False,
+                "message": f"模糊测试执行失败: {str(e)}",
+                "summary": {
+                    "total_cases": 0,
+                    "passed_cases": 0,
+                    "failed_cases": 0,
+                    "pass_rate": "0%"
+                },
+                "test_results": []
+            }
+
+    def _fuzz_outcome(self, actual: Any, error: Optional[BaseException], names: List[str], values: List[Any],
+                      invariants: List[tuple]) -> Optional[Dict[str, Any]]:
+        """一个模糊测试输入的判定，通过时返回 None"""
+        if error is not None:
+            error_type = type(error).__name__
+            return {"kind": "exception", "signature": ["exception", error_type],
+                    "expected": "不抛出异常", "actual": f"{error_type}: {str(error)}"}
+        env = dict(zip(names, values))
+        env["result"] = actual
+        broken = check_invariants(invariants, env)
+        if broken is None:
+            return None
+        return {"kind": "invariant", "signature": ["invariant", broken.split("（")[0]],
+                "expected": broken, "actual": actual}
+
+    def _fuzz_call_sync(self, target_callable: Callable, names: List[str], values: List[Any],
+                        invariants: List[tuple], mock_config: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        if mock_config:
+            _case_mocks.set(self._create_mocks(mock_config))
+        try:
+            actual = self._call_target_method(target_callable, dict(zip(names, values)))
+        except Exception as e:
+            return self._fuzz_outcome(None, e, names, values, invariants)
+        return self._fuzz_outcome(actual, None, names, values, invariants)
+
+    def _fuzz_sync_batch(self, target_callable: Callable, names: List[str], batch: List[List[Any]],
+                         invariants: List[tuple], mock_config: Optional[Dict[str, Any]],
+                         max_workers: int) -> List[Optional[Dict[str, Any]]]:
+        def run(values):
+            return contextvars.copy_context().run(
+                self._fuzz_call_sync, target_callable, names, values, invariants, mock_config
+            )
+
+        if max_workers <= 1 or len(batch) <= 1:
+            return [run(values) for values in batch]
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(batch))) as executor:
+            return list(executor.map(run, batch))
+
+    async def _fuzz_async_batch(self, target_callable: Callable, names: List[str], batch: List[List[Any]],
+                                invariants: List[tuple],
+                                mock_config: Optional[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+        async def run(values):
+            if mock_config:
+                _case_mocks.set(self._create_mocks(mock_config))
+            try:
+                actual = await self._call_target_method_async(target_callable, dict(zip(names, values)))
+            except Exception as e:
+                return self._fuzz_outcome(None, e, names, values, invariants)
+            return self._fuzz_outcome(actual, None, names, values, invariants)
+
+        return list(await asyncio.gather(*[run(values) for values in batch]))
+
+    def minimize_unit_test(self, root: str, class_name: str, method_name: str,
+                           test_cases: List[Dict], param_types: Dict[str, str],
+                           mock_config: Dict[str, Any] = None) -> Dict[str, Any]:
+        """
+        用例集约简：逐个执行用例并记录目标模块内的执行弧，执行路径和期望结果类别都相同的用例
+        只保留第一个
+
+        期望结果类别中数值统一为一类，其余按原值区分；通过与失败的用例不会合并。
+        只跟踪目标所在模块文件内的代码，目标调用的其他模块不影响用例指纹
+
+        Args:
+            test_cases: 测试用例列表（已完成类型转换）
+
+        Returns:
+            {"success", "message", "summary", "coverage", "kept_indexes": 保留用例的下标,
+             "kept_ids", "groups": [{"kept", "removed", "passed"}]}
+        """
+        try:
+            if root not in sys.path:
+                sys.path.insert(0, root)
+
+            target_type, module_path, target_name = self._parse_target(class_name, method_name)
+            target_callable, is_async = self._import_target(module_path, target_name, target_type)
+            traced_file = getattr(sys.modules.get(module_path), "__file__", None)
+            if not traced_file:
+                raise ValueError(f"无法确定模块 {module_path} 的源文件")
+            with open(traced_file, "r", encoding="utf-8") as f:
+                source = f.read()
+
+            collector = ArcCollector(traced_file)
+            case_arcs = []
+            case_results = []
+            start_time = time.perf_counter()
+            loop = asyncio.new_event_loop() if is_async else None
+            try:
+                with ExitStack() as stack:
+                    if mock_config:
+                        self._setup_mocks(mock_config, stack)
+                    for test_case in test_cases:
+                        # 跟踪器只作用于当前线程，用例按顺序执行
+                        context = contextvars.copy_context()
+                        if mock_config:
+                            context.run(_case_mocks.set, self._create_mocks(mock_config))
+                        collector.start()
+                        try:
+                            if is_async:
+                                result = context.run(loop.run_until_complete, self._execute_single_test_async(
+                                    target_callable, test_case, param_types))
+                            else:
+                                result = context.run(self._execute_single_test,
+                                                     target_callable, test_case, param_types)
+                        finally:
+                            arcs = collector.stop()
+                        case_arcs.append(arcs)
+                        case_results.append(result)
+            finally:
+                if loop is not None:
+                    loop.close()
+            duration = time.perf_counter() - start_time
+
+            if test_cases and not any(case_arcs):
+                raise ValueError(f"没有记录到 {traced_file} 中代码的执行路径，无法约简")
+
+            groups: Dict[tuple, List[int]] = {}
+            for index, (arcs, result) in enumerate(zip(case_arcs, case_results)):
+                fingerprint = (tuple(arcs), result["Passed"],
+                               self._outcome_class(test_cases[index].get("期望结果")))
+                groups.setdefault(fingerprint, []).append(index)
+            kept_indexes = sorted(indexes[0] for indexes in groups.values())
+
+            original = branch_coverage.summarize(source, case_arcs)
+            minimized = branch_coverage.summarize(source, [case_arcs[index] for index in kept_indexes])
+            total_cases = len(test_cases)
+
+            def case_id(index):
+                return test_cases[index].get("ID", index + 1)
+
+            return {
+                "success": True,
+                "message": "用例集约简完成",
+                "summary": {
+                    "total_cases": total_cases,
+                    "kept_cases": len(kept_indexes),
+                    "removed_cases": total_cases - len(kept_indexes),
+                    "reduction": f"{((total_cases - len(kept_indexes)) / total_cases * 100):.1f}%" if total_cases else "0%",
+                    "duration": f"{round(duration, 3)}s"
+                },
+                "coverage": {
+                    "traced_file": traced_file,
+                    "backend": original["backend"],
+                    "original": original["summary"],
+                    "minimized": minimized["summary"],
+                    # 只按分支覆盖还可以进一步缩减到的用例
+                    "branch_minimal_ids": [case_id(position - 1) for position in original["minimal_cases"]],
+                },
+                "kept_indexes": kept_indexes,
+                "kept_ids": [case_id(index) for index in kept_indexes],
+                "groups": [
+                    {"kept": case_id(indexes[0]), "removed": [case_id(index) for index in indexes[1:]],
+                     "passed": case_results[indexes[0]]["Passed"]}
+                    for indexes in sorted(groups.values()) if len(indexes) > 1
+                ]
+            }
+
+        except Exception as e:
+            return {
+                "success": False,
+                "message": f"用例集约简失败: {str(e)}",
+                "summary": {
+                    "total_cases": len(test_cases),
+                    "kept_cases": len(test_cases),
+                    "removed_cases": 0,
+                    "reduction": "0%"
+                }
+            }
+
+    def _outcome_class(self, expected: Any) -> Any:
+        """期望结果的类别：数值归为一类，其余按原值"""
+        if isinstance(expected, (int, float)) and not isinstance(expected, bool):
+            return "<数值>"
+        try:
+            hash(expected)
+            return expected
+        except TypeError:
+            return repr(expected)
+
     def _parse_target(self, class_name: str, method_name: str) -> Tuple[str, str, str]:
         """
         解析目标路径
@@ -207,46 +598,138 @@ class UnitTestService:
         except Exception as e:
             raise Exception(f"导入目标对象失败: {str(e)}")
 
+    def _run_sync_cases(self, target_callable: Callable, test_cases: List[Dict],
+                        param_types: Dict[str, str], mock_config: Optional[Dict[str, Any]],
+                        max_workers: int,
+                        on_result: Callable[[int, Dict[str, Any]], None] = None) -> List[Dict[str, Any]]:
+        """
+        在线程池中并行执行同步用例
+
+        Args:
+            target_callable: 目标可调用对象
+            test_cases: 测试用例列表
+            param_types: 参数类型字典
+            mock_config: Mock配置字典
+            max_workers: 线程数
+            on_result: 用例完成回调
+
+        Returns:
+            与用例顺序一致的测试结果列表
+        """
+        def run_case(index, test_case):
+            # 每个用例在独立的上下文副本中运行，设置的 Mock 不会泄漏给同线程的下一个用例
+            result = contextvars.copy_context().run(
+                self._run_case_sync, target_callable, test_case, param_types, mock_config
+            )
+            if on_result is not None:
+                on_result(index, result)
+            return result
+
+        if max_workers <= 1 or len(test_cases) <= 1:
+            return [run_case(index, test_case) for index, test_case in enumerate(test_cases)]
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(test_cases))) as executor:
+            # map 按提交顺序返回结果，某个用例抛出异常时尚未开始的用例会被取消
+            return list(executor.map(run_case, range(len(test_cases)), test_cases))
+
+    def _run_case_sync(self, target_callable: Callable, test_case: Dict,
+                       param_types: Dict[str, str], mock_config: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        try:
+            if mock_config:
+                _case_mocks.set(self._create_mocks(mock_config))
+            return self._execute_single_test(target_callable, test_case, param_types)
+        except Exception:
+            return self._failed_result(test_case)
+
+    async def _run_async_cases(self, target_callable: Callable, test_cases: List[Dict],
+                               param_types: Dict[str, str], mock_config: Optional[Dict[str, Any]],
+                               max_concurrency: int,
+                               on_result: Callable[[int, Dict[str, Any]], None] = None) -> List[Dict[str, Any]]:
+        """
+        在同一个事件循环中并发执行异步用例
+
+        Args:
+            target_callable: 异步目标可调用对象
+            test_cases: 测试用例列表
+            param_types: 参数类型字典
+            mock_config: Mock配置字典
+            max_concurrency: 最大并发数
+            on_result: 用例完成回调
+
+        Returns:
+            与用例顺序一致的测试结果列表
+        """
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+        async def run_case(index, test_case):
+            async with semaphore:
+                try:
+                    # gather 为每个协程创建独立任务，任务内设置的上下文变量互不影响
+                    if mock_config:
+                        _case_mocks.set(self._create_mocks(mock_config))
+                    result = await self._execute_single_test_async(target_callable, test_case, param_types)
+                except Exception:
+                    result = self._failed_result(test_case)
+            if on_result is not None:
+                on_result(index, result)
+            return result
+
+        return list(await asyncio.gather(*[
+            run_case(index, test_case) for index, test_case in enumerate(test_cases)
+        ]))
+
+    def _failed_result(self, test_case: Dict, error: str = None) -> Dict[str, Any]:
+        """单个用例执行失败时的结果，error 为导致失败的原因（如 Mock 设置失败）"""
+        result = {
+            "ID": test_case.get("ID", "unknown"),
+            "Expected": test_case.get("期望结果", "N/A"),
+            "Actual": None,
+            "Passed": False,
+            "Duration": "0ms"
+        }
+        if error is not None:
+            result["Error"] = error
+        return result
+
     def _setup_mocks(self, mock_config: Dict[str, Any], stack: ExitStack):
         """
-        设置Mock配置
+        设置Mock配置：为每个目标 patch 一个转发代理
 
         Args:
             mock_config: Mock配置字典
             stack: 上下文管理器栈
         """
-        for mock_target, mock_value in mock_config.items():
+        default_mocks = self._create_mocks(mock_config)
+        for mock_target in mock_config:
             try:
-                # 判断是否需要异步Mock
-                is_async_mock = self._should_use_async_mock(mock_target, mock_value)
-
-                # 创建Mock对象
-                if is_async_mock:
-                    if mock_value is None:
-                        mock_obj = AsyncMock(return_value=None)
-                    elif isinstance(mock_value, dict):
-                        mock_obj = AsyncMock(return_value=mock_value['mock_value'])
-                    elif isinstance(mock_value, (list, tuple)):
-                        mock_obj = AsyncMock(return_value=mock_value)
-                    else:
-                        mock_obj = AsyncMock(return_value=mock_value)
-                else:
-                    if mock_value is None:
-                        mock_obj = MagicMock(return_value=None)
-                    elif isinstance(mock_value, dict):
-                        mock_obj = MagicMock(return_value=mock_value['mock_value'])
-                    elif isinstance(mock_value, (list, tuple)):
-                        mock_obj = MagicMock(return_value=mock_value)
-                    else:
-                        mock_obj = MagicMock(return_value=mock_value)
-
-                # 应用Mock
-                patcher = patch(mock_target, mock_obj)
+                patcher = patch(mock_target, _CaseMockProxy(mock_target, default_mocks[mock_target]))
                 stack.enter_context(patcher)
-
             except Exception as e:
                 raise Exception(f"设置Mock失败 {mock_target}: {str(e)}")
 
+    def _create_mocks(self, mock_config: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        按Mock配置创建一组新的Mock对象
+
+        Args:
+            mock_config: Mock配置字典
+
+        Returns:
+            {mock_target: mock_obj}
+        """
+        mocks = {}
+        for mock_target, mock_value in mock_config.items():
+            # 判断是否需要异步Mock
+            mock_class = AsyncMock if self._should_use_async_mock(mock_target, mock_value) else MagicMock
+
+            if mock_value is None:
+                mocks[mock_target] = mock_class(return_value=None)
+            elif isinstance(mock_value, dict):
+                mocks[mock_target] = mock_class(return_value=mock_value['mock_value'])
+            else:
+                mocks[mock_target] = mock_class(return_value=mock_value)
+        return mocks
+
     def _should_use_async_mock(self, mock_target: str, mock_value: Any) -> bool:
         """
         判断是否应该使用AsyncMock
@@ -1,31 +1,75 @@
-import pandas as pd
+import csv
+import math
+import os
 import re
 import importlib
-from typing import Any, Dict, List, Type
+import sys
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterator, List, Optional, Type
 import json
 
+# 不参与类型转换的系统列
+SYSTEM_COLUMNS = ['ID', '测试方法', '测试名称', '测试描述']
+
+
 class ExcelTestCaseLoader:
-    """Excel测试用例加载器"""
+    """Excel/CSV测试用例加载器"""
+
+    @staticmethod
+    def _is_empty(value: Any) -> bool:
+        return value is None or value == '' or (isinstance(value, float) and math.isnan(value))
+
+    @staticmethod
+    def _iter_rows(file_path: str) -> Iterator[tuple]:
+        """
+        逐行读取表格，不在内存中构造整张表
+
+        .csv 使用 csv 模块；.xlsx/.xlsm 使用 openpyxl 只读模式流式读取；
+        其他格式（如旧版 .xls）交给 pandas
+        """
+        ext = os.path.splitext(file_path)[1].lower()
+        if ext == '.csv':
+            # utf-8-sig 兼容 Excel 导出的带 BOM 的 CSV
+            with open(file_path, 'r', encoding='utf-8-sig', newline='') as f:
+                yield from (tuple(row) for row in csv.reader(f))
+            return
+
+        if ext in ('.xlsx', '.xlsm'):
+            try:
+                import openpyxl
+            except ImportError:
+                openpyxl = None
+            if openpyxl is not None:
+                workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+                try:
+                    yield from workbook.worksheets[0].iter_rows(values_only=True)
+                finally:
+                    workbook.close()
+                return
+
+        import pandas as pd
+        df_raw = pd.read_excel(file_path, header=None, dtype=object)
+        yield from df_raw.itertuples(index=False, name=None)
 
     @staticmethod
     def load_test_cases(file_path: str) -> Dict:
-        """从Excel文件加载测试用例（新格式：第一行为列名，第二行为数据类型，第三行开始为测试数据）"""
+        """从Excel/CSV文件加载测试用例（新格式：第一行为列名，第二行为数据类型，第三行开始为测试数据）"""
+        is_empty = ExcelTestCaseLoader._is_empty
         try:
-            # 读取Excel文件，不设置header，保留原始行
-            df_raw = pd.read_excel(file_path, header=None)
+            rows = ExcelTestCaseLoader._iter_rows(file_path)
 
-            if len(df_raw) < 3:
+            # 第一行作为列名，第二行作为数据类型
+            header = next(rows, None)
+            data_types = next(rows, None)
+            if header is None or data_types is None:
                 raise ValueError("Excel文件至少需要3行：列名行、数据类型行、测试数据行")
 
-            # 第一行作为列名
-            columns = df_raw.iloc[0].tolist()
-
-            # 第二行作为数据类型
-            data_types = df_raw.iloc[1].tolist()
-
-            # 第三行开始作为测试数据
-            test_data = df_raw.iloc[2:].reset_index(drop=True)
-            test_data.columns = columns
+            # 末尾的空列不计入
+            columns = list(header)
+            while columns and is_empty(columns[-1]):
+                columns.pop()
+            width = len(columns)
 
             # 检查必要的列
             required_columns = ["ID", "期望结果"]
@@ -33,37 +77,49 @@ class ExcelTestCaseLoader:
                 if col not in columns:
                     raise ValueError(f"Excel文件缺少必要的列: {col}")
 
-            # 获取测试元信息（从第一个测试数据行获取）
-            first_row = test_data.iloc[0] if len(test_data) > 0 else pd.Series()
-            test_method = first_row.get("测试方法", "") if "测试方法" in columns else ""
-            test_name = first_row.get("测试名称", "") if "测试名称" in columns else ""
-            test_description = first_row.get("测试描述", "") if "测试描述" in columns else ""
-
             # 创建参数类型映射（排除系统列）
-            system_columns = ['ID', '测试方法', '测试名称', '测试描述']
             param_types = {}
+            for col, data_type in zip(columns, data_types):
+                if col not in SYSTEM_COLUMNS and not is_empty(col) and not is_empty(data_type):
+                    param_types[col] = str(data_type).strip()
 
-            for i, col in enumerate(columns):
-                if col not in system_columns and i < len(data_types):
-                    data_type = data_types[i]
-                    if pd.notna(data_type) and data_type != '':
-                        param_types[col] = str(data_type).strip()
-
-            # 转换为字典列表，过滤掉空行
+            # 逐行组装字典，空单元格统一为 None，跳过ID为空的行
+            id_index = columns.index("ID")
+            padding = (None,) * width
             test_cases = []
-            for _, row in test_data.iterrows():
-                # 跳过ID为空的行
-                if pd.isna(row.get('ID')) or row.get('ID') == '':
+            first_row = None
+            for row in rows:
+                row = tuple(row[:width]) + padding[len(row):]
+                if first_row is None:
+                    first_row = row
+                if is_empty(row[id_index]):
                     continue
-                test_cases.append(row.to_dict())
+                test_cases.append({
+                    col: None if is_empty(value) else value
+                    for col, value in zip(columns, row)
+                })
+
+            if first_row is None:
+                raise ValueError("Excel文件至少需要3行：列名行、数据类型行、测试数据行")
+
+            # 获取测试元信息（从第一个测试数据行获取）
+            def meta(column):
+                if column not in columns:
+                    return ""
+                value = first_row[columns.index(column)]
+                return "" if is_empty(value) else value
 
             return {
                 "success": True,
-                "test_method": test_method,
-                "test_name": test_name,
-                "description": test_description,
+                "test_method": meta("测试方法"),
+                "test_name": meta("测试名称"),
+                "description": meta("测试描述"),
                 "param_types": param_types,
-                "test_cases": test_cases
+                "test_cases": test_cases,
+                # 原始的列名行和数据类型行，用于按相同格式写回用例
+                "columns": columns,
+                "data_types": [None if is_empty(value) else value
+                               for value in tuple(data_types[:width]) + padding[len(data_types):]]
             }
 
         except Exception as e:
@@ -75,13 +131,49 @@ class ExcelTestCaseLoader:
             }
 
 
+class ExcelTestCaseWriter:
+    """按 ExcelTestCaseLoader 的格式写出测试用例：第一行列名，第二行数据类型，第三行开始为测试数据"""
 
+    @staticmethod
+    def write_test_cases(file_path: str, columns: List[str], data_types: List[Any], test_cases: List[Dict]) -> str:
+        """
+        写出测试用例文件，返回实际写入的路径
+
+        .csv 使用 csv 模块；其他扩展名使用 openpyxl 写为 .xlsx，未安装 openpyxl 时改写为同名 .csv
+        """
+        rows = [list(columns), ["" if value is None else value for value in data_types]]
+        rows += [["" if case.get(column) is None else case.get(column) for column in columns] for case in test_cases]
+
+        base, ext = os.path.splitext(file_path)
+        if ext.lower() != '.csv':
+            try:
+                import openpyxl
+            except ImportError:
+                openpyxl = None
+            if openpyxl is not None:
+                file_path = base + '.xlsx'
+                workbook = openpyxl.Workbook(write_only=True)
+                sheet = workbook.create_sheet()
+                for row in rows:
+                    sheet.append(row)
+                workbook.save(file_path)
+                return file_path
+            file_path = base + '.csv'
+
+        # utf-8-sig 让 Excel 正确识别中文列名
+        with open(file_path, 'w', encoding='utf-8-sig', newline='') as f:
+            csv.writer(f).writerows(rows)
+        return file_path
 
 
 class DataTypeConverter:
     """数据类型转换器"""
 
+    # (类路径, 项目根路径) -> (类对象, 模块文件, 模块文件的 mtime_ns)
+    _class_cache: Dict[tuple, tuple] = {}
+
     @staticmethod
+    @lru_cache(maxsize=256)
     def parse_complex_type(type_str: str) -> tuple:
         """
         解析复杂类型字符串
@@ -95,43 +187,92 @@ class DataTypeConverter:
             return container_type, inner_type
         return None, type_str
 
+    @staticmethod
+    @contextmanager
+    def project_path(project_root: str = None):
+        """在整个转换过程中把项目根路径加入 sys.path，结束后移除"""
+        added = bool(project_root) and project_root not in sys.path
+        if added:
+            sys.path.insert(0, project_root)
+        try:
+            yield
+        finally:
+            if added:
+                try:
+                    sys.path.remove(project_root)
+                except ValueError:
+                    pass  # 如果已经被移除则忽略
+
     @staticmethod
     def get_class_from_string(class_path: str, project_root: str = None) -> Type:
         """
-        根据字符串路径获取类对象
+        根据字符串路径获取类对象，结果按 (类路径, 项目根路径) 缓存
         例如: 'models.models.User' -> User类
 
         Args:
             class_path: 类的完整路径，如 'models.models.User'
             project_root: 项目根路径，用于添加到sys.path
         """
-        import sys
-        import os
-
-        # 如果提供了项目根路径，添加到sys.path
-        if project_root and project_root not in sys.path:
-            sys.path.insert(0, project_root)
+        key = (class_path, project_root)
+        entry = DataTypeConverter._class_cache.get(key)
+        if entry is not None:
+            return entry[0]
 
         try:
             parts = class_path.split('.')
             module_path = '.'.join(parts[:-1])
             class_name = parts[-1]
 
-            # 动态导入模块
-            module = importlib.import_module(module_path)
+            # 动态导入模块，调用方已处于 project_path 中时不会重复修改 sys.path
+            with DataTypeConverter.project_path(project_root):
+                module = importlib.import_module(module_path)
 
             # 获取类
             cls = getattr(module, class_name)
-            return cls
         except (ImportError, AttributeError) as e:
             raise ValueError(f"无法导入类 '{class_path}': {str(e)}. 请检查项目路径和类路径是否正确")
-        finally:
-            # 清理sys.path，避免污染（可选）
-            if project_root and project_root in sys.path:
-                try:
-                    sys.path.remove(project_root)
-                except ValueError:
-                    pass  # 如果已经被移除则忽略
+
+        module_file = getattr(module, '__file__', None)
+        DataTypeConverter._class_cache[key] = (cls, module_file, DataTypeConverter._mtime(module_file))
+        return cls
+
+    @staticmethod
+    def _mtime(path: Optional[str]) -> Optional[int]:
+        try:
+            return os.stat(path).st_mtime_ns if path else None
+        except OSError:
+            return None
+
+    @staticmethod
+    def refresh_class_cache():
+        """
+        丢弃模块文件已修改的缓存类，并重新加载这些模块
+
+        用户上传修改后的模块后，下一次转换使用新的类定义；每次构造用例前调用一次，
+        单元格转换时不再检查文件
+        """
+        stale_modules = set()
+        for key, (cls, module_file, mtime) in list(DataTypeConverter._class_cache.items()):
+            if module_file and DataTypeConverter._mtime(module_file) != mtime:
+                del DataTypeConverter._class_cache[key]
+                stale_modules.add(cls.__module__)
+        for module_path in stale_modules:
+            module = sys.modules.get(module_path)
+            if module is None:
+                continue
+            try:
+                importlib.reload(module)
+            except Exception:
+                # 重新加载失败时移出 sys.modules，下次导入时报告错误
+                sys.modules.pop(module_path, None)
+
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _init_param_names(target_class: Type) -> frozenset:
+        """类构造函数接受的参数名"""
+        import inspect
+        params = inspect.signature(target_class.__init__).parameters
+        return frozenset(name for name in params if name != 'self')
 
     @staticmethod
     def dict_to_object(data: Dict, target_class: Type) -> Any:
@@ -144,16 +285,8 @@ class DataTypeConverter:
         except TypeError:
             try:
                 # 如果直接构造失败，尝试只传递类构造函数需要的参数
-                import inspect
-                sig = inspect.signature(target_class.__init__)
-                params = sig.parameters
-
-                # 过滤出构造函数需要的参数
-                filtered_data = {}
-                for param_name in params:
-                    if param_name != 'self' and param_name in data:
-                        filtered_data[param_name] = data[param_name]
-
+                param_names = DataTypeConverter._init_param_names(target_class)
+                filtered_data = {key: value for key, value in data.items() if key in param_names}
                 return target_class(**filtered_data)
             except Exception as e:
                 raise ValueError(f"无法将字典转换为 {target_class.__name__} 对象: {str(e)}")
@@ -167,114 +300,118 @@ class DataTypeConverter:
             target_type: 目标类型字符串
             project_root: 项目根路径，用于类导入
         """
-        if value is None or value == '' or (isinstance(value, str) and value.lower() == 'none'):
-            return None
+        return DataTypeConverter.compile_converter(target_type, project_root)(value)
 
-        try:
-            # 解析复杂类型
-            container_type, inner_type = DataTypeConverter.parse_complex_type(target_type)
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def compile_converter(target_type: str, project_root: str = None) -> Callable[[Any], Any]:
+        """
+        把类型字符串预编译为转换函数
 
-            if container_type:
-                # 处理容器类型
-                return DataTypeConverter._convert_container_type(value, container_type, inner_type, project_root)
-            else:
-                # 处理简单类型
-                return DataTypeConverter._convert_simple_type(value, target_type, project_root)
+        类型字符串只解析一次；类在首次转换非空值时导入并缓存，
+        之后每个单元格的转换只剩一次字典查找加对象构造
+        """
+        # 解析复杂类型
+        container_type, inner_type = DataTypeConverter.parse_complex_type(target_type)
+        if container_type:
+            # 处理容器类型
+            convert = DataTypeConverter._container_converter(container_type, inner_type, project_root)
+        else:
+            # 处理简单类型
+            convert = DataTypeConverter._simple_converter(target_type, project_root)
+
+        def converter(value):
+            if value is None or value == '' or (isinstance(value, str) and value.lower() == 'none'):
+                return None
+            try:
+                return convert(value)
+            except (ValueError, TypeError, SyntaxError) as e:
+                raise ValueError(f"无法将值 '{value}' 转换为类型 '{target_type}': {str(e)}")
+
+        return converter
+
+    @staticmethod
+    def _parse_list(value: Any) -> list:
+        if isinstance(value, str):
+            try:
+                # 尝试解析JSON格式的字符串
+                return json.loads(value) if value.startswith('[') else [value]
+            except json.JSONDecodeError:
+                # 如果JSON解析失败，尝试eval
+                return eval(value) if value.startswith('[') else [value]
+        return list(value) if not isinstance(value, list) else value
+
+    @staticmethod
+    def _parse_dict(value: Any) -> dict:
+        if isinstance(value, str):
+            try:
+                return json.loads(value) if value.startswith('{') else {}
+            except json.JSONDecodeError:
+                return eval(value) if value.startswith('{') else {}
+        return dict(value) if not isinstance(value, dict) else value
 
-        except (ValueError, TypeError, SyntaxError) as e:
-            raise ValueError(f"无法将值 '{value}' 转换为类型 '{target_type}': {str(e)}")
+    @staticmethod
+    def _object_converter(class_path: str, project_root: str = None) -> Callable[[Any], Any]:
+        """字典按关键字参数构造对象，其他值作为唯一参数构造对象"""
+        def convert(value):
+            target_class = DataTypeConverter.get_class_from_string(class_path, project_root)
+            if isinstance(value, dict):
+                return DataTypeConverter.dict_to_object(value, target_class)
+            return target_class(value)
+        return convert
 
     @staticmethod
-    def _convert_container_type(value: Any, container_type: str, inner_type: str, project_root: str = None) -> Any:
-        """转换容器类型"""
+    def _container_converter(container_type: str, inner_type: str, project_root: str = None) -> Callable[[Any], Any]:
+        """容器类型的转换函数"""
         if container_type == 'list':
-            # 处理列表类型
-            if isinstance(value, str):
-                try:
-                    # 尝试解析JSON格式的字符串
-                    parsed_value = json.loads(value) if value.startswith('[') else [value]
-                except json.JSONDecodeError:
-                    # 如果JSON解析失败，尝试eval
-                    parsed_value = eval(value) if value.startswith('[') else [value]
-            elif isinstance(value, list):
-                parsed_value = value
+            # 列表中的每个元素按内部类型转换
+            if '.' in inner_type:  # 类路径格式，如 models.models.User
+                convert_item = DataTypeConverter._object_converter(inner_type, project_root)
             else:
-                parsed_value = [value]
-
-            # 转换列表中的每个元素
-            result = []
-            for item in parsed_value:
-                if '.' in inner_type:  # 类路径格式，如 models.models.User
-                    target_class = DataTypeConverter.get_class_from_string(inner_type, project_root)
-                    if isinstance(item, dict):
-                        result.append(DataTypeConverter.dict_to_object(item, target_class))
-                    else:
-                        result.append(target_class(item))
-                else:
-                    # 简单类型
-                    result.append(DataTypeConverter._convert_simple_type(item, inner_type, project_root))
-
-            return result
+                convert_item = DataTypeConverter._simple_converter(inner_type, project_root)
 
-        elif container_type == 'dict':
-            # 处理字典类型
-            if isinstance(value, str):
-                try:
-                    parsed_value = json.loads(value) if value.startswith('{') else {}
-                except json.JSONDecodeError:
-                    parsed_value = eval(value) if value.startswith('{') else {}
-            else:
-                parsed_value = dict(value) if not isinstance(value, dict) else value
+            def convert_list(value):
+                parsed_value = value if isinstance(value, list) else (
+                    DataTypeConverter._parse_list(value) if isinstance(value, str) else [value]
+                )
+                return [convert_item(item) for item in parsed_value]
+            return convert_list
 
+        elif container_type == 'dict':
             # 如果inner_type是类路径，转换字典为对象
             if '.' in inner_type:
-                target_class = DataTypeConverter.get_class_from_string(inner_type, project_root)
-                return DataTypeConverter.dict_to_object(parsed_value, target_class)
-
-            return parsed_value
+                convert_object = DataTypeConverter._object_converter(inner_type, project_root)
+                return lambda value: convert_object(DataTypeConverter._parse_dict(value))
+            return DataTypeConverter._parse_dict
 
         else:
-            raise ValueError(f"不支持的容器类型: {container_type}")
+            def unsupported(value):
+                raise ValueError(f"不支持的容器类型: {container_type}")
+            return unsupported
 
     @staticmethod
-    def _convert_simple_type(value: Any, target_type: str, project_root: str = None) -> Any:
-        """转换简单类型"""
+    def _simple_converter(target_type: str, project_root: str = None) -> Callable[[Any], Any]:
+        """简单类型的转换函数"""
         target_type_lower = target_type.lower()
 
         if target_type_lower in ['int', 'integer']:
-            return int(float(value))  # 先转float再转int，处理Excel中的数字格式
+            return lambda value: int(float(value))  # 先转float再转int，处理Excel中的数字格式
         elif target_type_lower in ['float', 'double']:
-            return float(value)
+            return float
         elif target_type_lower in ['str', 'string']:
-            return str(value)
+            return str
         elif target_type_lower in ['bool', 'boolean']:
-            if isinstance(value, str):
-                return value.lower() in ['true', '1', 'yes', 'on']
-            return bool(value)
+            return lambda value: value.lower() in ['true', '1', 'yes', 'on'] if isinstance(value, str) else bool(value)
         elif target_type_lower in ['list', 'array']:
-            if isinstance(value, str):
-                try:
-                    return json.loads(value) if value.startswith('[') else [value]
-                except json.JSONDecodeError:
-                    return eval(value) if value.startswith('[') else [value]
-            return list(value) if not isinstance(value, list) else value
+            return DataTypeConverter._parse_list
         elif target_type_lower in ['dict', 'object']:
-            if isinstance(value, str):
-                try:
-                    return json.loads(value) if value.startswith('{') else {}
-                except json.JSONDecodeError:
-                    return eval(value) if value.startswith('{') else {}
-            return dict(value) if not isinstance(value, dict) else value
+            return DataTypeConverter._parse_dict
         elif '.' in target_type:
             # 处理类路径，如 models.models.User
-            target_class = DataTypeConverter.get_class_from_string(target_type, project_root)
-            if isinstance(value, dict):
-                return DataTypeConverter.dict_to_object(value, target_class)
-            else:
-                return target_class(value)
+            return DataTypeConverter._object_converter(target_type, project_root)
         else:
             # 默认返回原值
-            return value
+            return lambda value: value
 
 
 class TestCaseObjectBuilder:
@@ -293,29 +430,25 @@ class TestCaseObjectBuilder:
         Returns:
             转换后的测试用例列表
         """
-        converted_test_cases = []
-
-        for case in test_cases:
-            converted_case = case.copy()
-
-            # 系统字段不进行转换
-            system_fields = ['ID', '测试方法', '测试名称', '测试描述']
+        converted_test_cases = [case.copy() for case in test_cases]
 
+        # 整个转换过程只修改一次 sys.path
+        with DataTypeConverter.project_path(project_root):
+            DataTypeConverter.refresh_class_cache()
+            # 逐列处理，每列的类型字符串只编译一次；单元格仍逐个调用转换函数。
+            # 用例以行字典保存，整列用 NumPy 转换时取出和写回的开销抵消了转换本身节省的时间
             for param_name, param_type in param_types.items():
-                if param_name in converted_case and param_name not in system_fields:
+                if param_name in SYSTEM_COLUMNS:
+                    continue
+                converter = DataTypeConverter.compile_converter(param_type, project_root)
+                for converted_case in converted_test_cases:
+                    value = converted_case.get(param_name)
+                    # 跳过缺失列和空值
+                    if value is None or value == '':
+                        continue
                     try:
-                        # 跳过空值
-                        if converted_case[param_name] is None or converted_case[param_name] == '':
-                            continue
-
-                        converted_case[param_name] = DataTypeConverter.convert_value(
-                            converted_case[param_name],
-                            param_type,
-                            project_root
-                        )
+                        converted_case[param_name] = converter(value)
                     except ValueError as e:
-                        raise ValueError(f"用例ID {case.get('ID', 'unknown')}, 参数 {param_name}: {str(e)}")
-
-            converted_test_cases.append(converted_case)
+                        raise ValueError(f"用例ID {converted_case.get('ID', 'unknown')}, 参数 {param_name}: {str(e)}")
 
-        return converted_test_cases
\ No newline at end of file
+        return converted_test_cases
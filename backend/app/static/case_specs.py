@@ -0,0 +1,281 @@
+"""
+作业题目的测试用例生成规格
+
+每道题只描述输入域，边界值、等价类和决策表用例由 app.service.case_generator 按需生成，
+期望结果由 HOMEWORK_CODES 中的参考实现计算。新增题目只需在这里添加一份规格。
+TEST_CASES 中已有手写用例的测试方法仍使用手写用例，规格只补充其余方法。
+
+规格字段：
+- params: 参数列表 {"name", "min", "max", "nominal"}，边界值用例基于 [min, max] 和正常值 nominal
+- partitions: 每个参数的等价类 {"valid": [...], "invalid": [...]}，每个等价类为 {"name", "value"}，value 为代表值
+- output_classes: 按输出划分的等价类 {"name", "input"}，加入所有等价类用例集
+- definitions: 决策表条件中可使用的中间量，按顺序计算 {名称: 表达式}
+- decision_conditions: 决策表条件桩，按顺序展开；每个条件为 {"name", "entries": [{"name", "when", "final"}]}，
+  when 为以参数名和 definitions 为变量的表达式，final 为 true 时其后的条件不再关心（"-"）
+- extra_cases: 各测试方法额外追加的输入 {测试方法: [输入, ...]}
+"""
+
+CASE_SPECS = {
+    "triangle_judge": {
+        "description": "三角形判断函数测试用例",
+        "params": [
+            {"name": "a", "min": 1, "max": 200, "nominal": 100},
+            {"name": "b", "min": 1, "max": 200, "nominal": 100},
+            {"name": "c", "min": 1, "max": 200, "nominal": 100},
+        ],
+        "partitions": {
+            side: {
+                "valid": [{"name": f"1≤{side}≤200", "value": 100}],
+                "invalid": [{"name": f"{side}<1", "value": 0}, {"name": f"{side}>200", "value": 201}],
+            }
+            for side in ("a", "b", "c")
+        },
+        "output_classes": [
+            {"name": "等边三角形", "input": [50, 50, 50]},
+            {"name": "等腰三角形(a=b)", "input": [50, 50, 30]},
+            {"name": "等腰三角形(a=c)", "input": [50, 30, 50]},
+            {"name": "等腰三角形(b=c)", "input": [30, 50, 50]},
+            {"name": "普通三角形", "input": [30, 40, 60]},
+            {"name": "不能构成三角形", "input": [1, 1, 3]},
+        ],
+        "definitions": {
+            "in_range": "all(1 <= side <= 200 for side in (a, b, c))",
+            "is_triangle": "a + b > c and a + c > b and b + c > a",
+        },
+        "decision_conditions": [
+            {"name": "三边均在[1,200]", "entries": [
+                {"name": "否", "when": "not in_range", "final": True},
+                {"name": "是", "when": "in_range"},
+            ]},
+            {"name": "能构成三角形", "entries": [
+                {"name": "否", "when": "not is_triangle", "final": True},
+                {"name": "是", "when": "is_triangle"},
+            ]},
+            {"name": "a=b", "entries": [{"name": "是", "when": "a == b"}, {"name": "否", "when": "a != b"}]},
+            {"name": "a=c", "entries": [{"name": "是", "when": "a == c"}, {"name": "否", "when": "a != c"}]},
+            {"name": "b=c", "entries": [{"name": "是", "when": "b == c"}, {"name": "否", "when": "b != c"}]},
+        ],
+    },
+
+    "computer_selling": {
+        "description": "计算机销售函数测试用例",
+        "params": [
+            {"name": "host", "min": 1, "max": 70, "nominal": 35},
+            {"name": "monitor", "min": 1, "max": 80, "nominal": 40},
+            {"name": "peripheral", "min": 1, "max": 90, "nominal": 45},
+        ],
+        "partitions": {
+            "host": {
+                "valid": [{"name": "1≤host≤70", "value": 35}],
+                "invalid": [{"name": "host=-1(结束统计)", "value": -1}, {"name": "host<1", "value": 0},
+                            {"name": "host>70", "value": 71}],
+            },
+            "monitor": {
+                "valid": [{"name": "1≤monitor≤80", "value": 40}],
+                "invalid": [{"name": "monitor<1", "value": 0}, {"name": "monitor>80", "value": 81}],
+            },
+            "peripheral": {
+                "valid": [{"name": "1≤peripheral≤90", "value": 45}],
+                "invalid": [{"name": "peripheral<1", "value": 0}, {"name": "peripheral>90", "value": 91}],
+            },
+        },
+        "output_classes": [
+            {"name": "销售额≤1000", "input": [10, 10, 5]},
+            {"name": "1000<销售额≤1800", "input": [20, 20, 10]},
+            {"name": "销售额>1800", "input": [35, 40, 45]},
+        ],
+        "definitions": {
+            "total": "host * 25 + monitor * 30 + peripheral * 45",
+        },
+        "decision_conditions": [
+            {"name": "host=-1", "entries": [
+                {"name": "是", "when": "host == -1", "final": True},
+                {"name": "否", "when": "host != -1"},
+            ]},
+            {"name": "各部件数量≥1", "entries": [
+                {"name": "否", "when": "min(host, monitor, peripheral) < 1", "final": True},
+                {"name": "是", "when": "min(host, monitor, peripheral) >= 1"},
+            ]},
+            {"name": "数量不超过上限", "entries": [
+                {"name": "主机超限", "when": "host > 70", "final": True},
+                {"name": "显示器超限", "when": "host <= 70 and monitor > 80", "final": True},
+                {"name": "外设超限", "when": "host <= 70 and monitor <= 80 and peripheral > 90", "final": True},
+                {"name": "均未超限", "when": "host <= 70 and monitor <= 80 and peripheral <= 90"},
+            ]},
+            {"name": "销售额", "entries": [
+                {"name": "≤1000", "when": "total <= 1000"},
+                {"name": "(1000,1800]", "when": "1000 < total <= 1800"},
+                {"name": ">1800", "when": "total > 1800"},
+            ]},
+        ],
+    },
+
+    "telecom_system": {
+        "description": "电信计费系统函数测试用例",
+        "params": [
+            {"name": "calling_time", "min": 0, "max": 44640, "nominal": 150},
+            {"name": "count", "min": 0, "max": 11, "nominal": 5},
+        ],
+        "partitions": {
+            "calling_time": {
+                "valid": [
+                    {"name": "calling_time=0", "value": 0},
+                    {"name": "(0,60]", "value": 30},
+                    {"name": "(60,120]", "value": 90},
+                    {"name": "(120,180]", "value": 150},
+                    {"name": "(180,300]", "value": 240},
+                    {"name": "(300,44640]", "value": 400},
+                ],
+                "invalid": [{"name": "calling_time<0", "value": -10}, {"name": "calling_time>44640", "value": 50000}],
+            },
+            "count": {
+                "valid": [
+                    {"name": "count≤1", "value": 1},
+                    {"name": "count=2", "value": 2},
+                    {"name": "count=3", "value": 3},
+                    {"name": "4≤count≤6", "value": 5},
+                    {"name": "7≤count≤11", "value": 9},
+                ],
+                "invalid": [{"name": "count<0", "value": -2}, {"name": "count>11", "value": 15}],
+            },
+        },
+        "definitions": {
+            "level": "1 if 0 < calling_time <= 60 else 2 if 60 < calling_time <= 120 "
+                     "else 3 if 120 < calling_time <= 180 else 4 if 180 < calling_time <= 300 else 5",
+            "max_num": "[1, 2, 3, 3, 6][level - 1]",
+        },
+        "decision_conditions": [
+            {"name": "通话时长在[0,44640]", "entries": [
+                {"name": "否", "when": "not 0 <= calling_time <= 44640", "final": True},
+                {"name": "是", "when": "0 <= calling_time <= 44640"},
+            ]},
+            {"name": "未按时缴费次数在[0,11]", "entries": [
+                {"name": "否", "when": "not 0 <= count <= 11", "final": True},
+                {"name": "是", "when": "0 <= count <= 11"},
+            ]},
+            {"name": "通话时长档次", "entries": [
+                {"name": f"档次{level}", "when": f"level == {level}"} for level in range(1, 6)
+            ]},
+            {"name": "未按时缴费次数不超过该档上限", "entries": [
+                {"name": "是", "when": "count <= max_num"},
+                {"name": "否", "when": "count > max_num"},
+            ]},
+        ],
+    },
+
+    "calendar_problem": {
+        "description": "日历问题函数测试用例",
+        "params": [
+            {"name": "year", "min": 1900, "max": 2100, "nominal": 2000},
+            {"name": "month", "min": 1, "max": 12, "nominal": 7},
+            {"name": "day", "min": 1, "max": 31, "nominal": 15},
+        ],
+        "partitions": {
+            "year": {
+                "valid": [
+                    {"name": "能被400整除的闰年", "value": 2000},
+                    {"name": "能被4整除的闰年", "value": 2004},
+                    {"name": "平年", "value": 2001},
+                    {"name": "能被100整除的平年", "value": 1900},
+                ],
+                "invalid": [{"name": "year<1900", "value": 1800}, {"name": "year>2100", "value": 2200}],
+            },
+            "month": {
+                "valid": [
+                    {"name": "31天的月份", "value": 1},
+                    {"name": "30天的月份", "value": 4},
+                    {"name": "2月", "value": 2},
+                    {"name": "12月", "value": 12},
+                ],
+                "invalid": [{"name": "month<1", "value": 0}, {"name": "month>12", "value": 13}],
+            },
+            "day": {
+                "valid": [
+                    {"name": "1≤day≤27", "value": 15},
+                    {"name": "day=28", "value": 28},
+                    {"name": "day=29", "value": 29},
+                    {"name": "day=30", "value": 30},
+                    {"name": "day=31", "value": 31},
+                ],
+                "invalid": [{"name": "day<1", "value": 0}, {"name": "day>31", "value": 32}],
+            },
+        },
+        "definitions": {
+            "leap": "year % 400 == 0 or (year % 100 != 0 and year % 4 == 0)",
+            "month_days": "[31, 29 if leap else 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31][month - 1] "
+                          "if 1 <= month <= 12 else 0",
+        },
+        "decision_conditions": [
+            {"name": "年份在[1900,2100]", "entries": [
+                {"name": "否", "when": "not 1900 <= year <= 2100", "final": True},
+                {"name": "是", "when": "1900 <= year <= 2100"},
+            ]},
+            {"name": "月份在[1,12]", "entries": [
+                {"name": "否", "when": "not 1 <= month <= 12", "final": True},
+                {"name": "是", "when": "1 <= month <= 12"},
+            ]},
+            {"name": "闰年", "entries": [{"name": "是", "when": "leap"}, {"name": "否", "when": "not leap"}]},
+            {"name": "月份类型", "entries": [
+                {"name": "31天(非12月)", "when": "month_days == 31 and month != 12"},
+                {"name": "12月", "when": "month == 12"},
+                {"name": "30天", "when": "month_days == 30"},
+                {"name": "2月", "when": "month == 2"},
+            ]},
+            {"name": "日期", "entries": [
+                {"name": "day<1", "when": "day < 1"},
+                {"name": "1≤day<当月天数", "when": "1 <= day < month_days"},
+                {"name": "day=当月天数", "when": "day == month_days"},
+                {"name": "day>当月天数", "when": "day > month_days"},
+            ]},
+        ],
+    },
+
+    "seller_bonus": {
+        "description": "销售员佣金问题函数测试用例",
+        "params": [
+            {"name": "sales_amount", "min": 0, "max": 1000, "nominal": 300},
+            {"name": "leave_days", "min": 0, "max": 366, "nominal": 5},
+            {"name": "cash_arrival_percent", "min": 0, "max": 100, "nominal": 70},
+        ],
+        "partitions": {
+            "sales_amount": {
+                "valid": [{"name": "0≤销售额≤200", "value": 120}, {"name": "销售额>200", "value": 300}],
+                "invalid": [{"name": "销售额<0", "value": -10}],
+            },
+            "leave_days": {
+                "valid": [{"name": "0≤请假天数≤10", "value": 5}, {"name": "10<请假天数≤366", "value": 20}],
+                "invalid": [{"name": "请假天数<0", "value": -1}, {"name": "请假天数>366", "value": 367}],
+            },
+            "cash_arrival_percent": {
+                "valid": [
+                    {"name": "到账比例<60", "value": 50},
+                    {"name": "60≤到账比例≤85", "value": 70},
+                    {"name": "到账比例>85", "value": 90},
+                ],
+                "invalid": [{"name": "到账比例<0", "value": -5}, {"name": "到账比例>100", "value": 105}],
+            },
+        },
+        "definitions": {
+            "valid_input": "sales_amount >= 0 and 0 <= leave_days <= 366 and 0 <= cash_arrival_percent <= 100",
+        },
+        "decision_conditions": [
+            {"name": "输入合法", "entries": [
+                {"name": "否", "when": "not valid_input", "final": True},
+                {"name": "是", "when": "valid_input"},
+            ]},
+            {"name": "销售额>200", "entries": [
+                {"name": "是", "when": "sales_amount > 200"},
+                {"name": "否", "when": "sales_amount <= 200"},
+            ]},
+            {"name": "请假天数≤10", "entries": [
+                {"name": "是", "when": "leave_days <= 10"},
+                {"name": "否", "when": "leave_days > 10"},
+            ]},
+            {"name": "现金到账比例", "entries": [
+                {"name": "<60", "when": "cash_arrival_percent < 60"},
+                {"name": "[60,85]", "when": "60 <= cash_arrival_percent <= 85"},
+                {"name": ">85", "when": "cash_arrival_percent > 85"},
+            ]},
+        ],
+    },
+}
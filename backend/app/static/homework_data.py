@@ -126,6 +126,7 @@ HOMEWORK_CODES = {
 }
 
 # 测试用例数据结构 - 按函数名分组（重新计算后）
+# 这里的手写用例决定各题目的评分范围；没有手写用例的边界值、等价类和决策表方法由 app.static.case_specs 中的规格生成
 TEST_CASES = {
     "triangle_judge": {
         "function_name": "triangle_judge",
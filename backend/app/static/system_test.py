@@ -81,6 +81,18 @@ WAIT_CONFIG = {
     "log_scroll_delay": 1,     # 日志滚动等待时间
 }
 
+# 页面稳定判定：页面加载完成且 DOM 连续 quiet_ms 毫秒没有变化即认为已稳定
+SETTLE_CONFIG = {
+    "quiet_ms": 150,
+    "poll_frequency": 0.1,  # 无法注入脚本时退回轮询的间隔（秒）
+}
+
+# 浏览器会话池配置
+BROWSER_POOL_CONFIG = {
+    "max_sessions": 3,       # 同时存在的浏览器数量，也是并行执行的最大场景数
+    "max_uses": 20,          # 单个浏览器复用次数上限，超过后重建，避免内存持续增长
+}
+
 # 检测结果等待配置
 DETECTION_WAIT_CONFIG = {
     "max_wait_time": 5,  # 增加到2分钟
@@ -423,6 +435,48 @@ JAVASCRIPT_SCRIPTS = {
         };
     """,
     
+    "wait_dom_quiet": """
+        // 等待页面加载完成、没有 loading 遮罩，且 DOM 连续 quietMs 毫秒无变化
+        const quietMs = arguments[0];
+        const timeoutMs = arguments[1];
+        const done = arguments[arguments.length - 1];
+        let timer = null;
+        const observer = new MutationObserver(() => {
+            clearTimeout(timer);
+            timer = setTimeout(check, quietMs);
+        });
+        const limit = setTimeout(() => finish(false), timeoutMs);
+        function finish(settled) {
+            observer.disconnect();
+            clearTimeout(timer);
+            clearTimeout(limit);
+            done(settled);
+        }
+        function check() {
+            if (document.readyState !== 'complete' || document.querySelector('ion-loading')) {
+                timer = setTimeout(check, quietMs);
+            } else {
+                finish(true);
+            }
+        }
+        observer.observe(document, { subtree: true, childList: true, attributes: true, characterData: true });
+        timer = setTimeout(check, quietMs);
+    """,
+
+    "wait_dom_change": """
+        // DOM 发生任何变化后立即返回，最多等待 timeoutMs 毫秒
+        const timeoutMs = arguments[0];
+        const done = arguments[arguments.length - 1];
+        const observer = new MutationObserver(() => finish(true));
+        const limit = setTimeout(() => finish(false), timeoutMs);
+        function finish(changed) {
+            observer.disconnect();
+            clearTimeout(limit);
+            done(changed);
+        }
+        observer.observe(document, { subtree: true, childList: true, attributes: true, characterData: true });
+    """,
+
     "check_home_page_loaded": """
         // 检查首页是否加载完成
         const indicators = [
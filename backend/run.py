@@ -8,6 +8,10 @@ from app.routes.detect_controller_test import detect_test_bp
 from app.routes.plot_controller_test import plot_controller_test_bp
 from app.routes.log_controller_test import log_test_bp
 from app.routes.system_test import system_test_bp
+from app.routes.load_test import load_test_bp
+from app.routes.reports import reports_bp
+from app.routes.jobs import jobs_bp
+from app.service import history
 
 app = Flask(__name__)
 
@@ -20,6 +24,12 @@ app.register_blueprint(detect_test_bp)
 app.register_blueprint(plot_controller_test_bp)
 app.register_blueprint(log_test_bp)
 app.register_blueprint(system_test_bp)
+app.register_blueprint(load_test_bp)
+app.register_blueprint(reports_bp)
+app.register_blueprint(jobs_bp)
+
+# 自动记录每次测试运行的结果
+history.init_app(app)
 
 if __name__ == '__main__':
     app.run(debug=True)
\ No newline at end of file
@@ -1,5 +1,8 @@
+import datetime
 import uuid
+from typing import List, Optional
 from fastapi import HTTPException, Depends
+from tortoise.expressions import Q
 from tortoise.query_utils import Prefetch
 
 from core.dependency import get_current_user
@@ -7,20 +10,27 @@ from core.dependency import get_current_user
 from models.models import Plot, Log, User
 from schemas.form import LogDetail
 from controller.userController import minus_sum_count
+from controller.statsController import increment_region_stat
 
 
 async def set_log(plotId: str, diseaseName: str, advice: str, imageURL: str):
     try:
-        plot = await Plot.get(plotId=plotId)
+        plot = await Plot.get(plotId=plotId).select_related("userId")
         content = f"检测到{diseaseName}，建议：{advice}"
 
-        await Log.create(
+        log = await Log.create(
             plotId=plot,
             diseaseName=diseaseName,
             content=content,
             imagesURL=imageURL
         )
 
+        # 增量更新区域病害汇总，失败时不影响日志本身
+        try:
+            await increment_region_stat(plot.userId.location, diseaseName, log.timeStamp)
+        except Exception as e:
+            print(f"更新区域病害统计失败: {str(e)}")
+
         return "创建日志成功"
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"创建日志失败: {str(e)}")
@@ -82,6 +92,34 @@ async def get_logs(plotId: str):
         print(f"get_logs production error: {e}")
         return []
 
+# 导出日志时每批从数据库读取的行数
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_FIELDS = ('logId', 'plotId_id', 'plotId__plotName', 'timeStamp', 'diseaseName', 'content', 'imagesURL')
+
+
+async def iter_log_chunks(plotIds: List[uuid.UUID], start: Optional[datetime.date] = None,
+                          end: Optional[datetime.date] = None, chunk_size: int = EXPORT_CHUNK_SIZE):
+    """按 (timeStamp, logId) 键集分页逐批读取日志，每次只在内存中保留一批"""
+    query = Log.filter(plotId_id__in=plotIds)
+    if start:
+        query = query.filter(timeStamp__gte=datetime.datetime.combine(start, datetime.time.min))
+    if end:
+        query = query.filter(timeStamp__lt=datetime.datetime.combine(end + datetime.timedelta(days=1), datetime.time.min))
+
+    last = None
+    while True:
+        page = query
+        if last is not None:
+            page = page.filter(Q(timeStamp__gt=last[0]) | Q(timeStamp=last[0], logId__gt=last[1]))
+        rows = await page.order_by('timeStamp', 'logId').limit(chunk_size).values(*EXPORT_FIELDS)
+        if not rows:
+            break
+        yield rows
+        if len(rows) < chunk_size:
+            break
+        last = (rows[-1]['timeStamp'], rows[-1]['logId'])
+
+
 #async def call_get_user_plots(user: User = Depends(get_current_user)):
 #    return await get_user_plots(user)
 
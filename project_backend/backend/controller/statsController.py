@@ -0,0 +1,77 @@
+import datetime
+from collections import defaultdict
+
+from tortoise.exceptions import IntegrityError
+from tortoise.expressions import F
+from tortoise.transactions import in_transaction
+
+from models.models import City, Log, RegionDiseaseStat
+
+# 不计入区域病害统计的检测结果
+EXCLUDED_DISEASES = {"健康"}
+# 重建汇总表时每批读取的日志条数
+REBUILD_CHUNK_SIZE = 1000
+
+
+def week_start(value) -> datetime.date:
+    """返回所在周周一的日期"""
+    day = value.date() if isinstance(value, datetime.datetime) else value
+    return day - datetime.timedelta(days=day.weekday())
+
+
+async def get_city_code(location: str):
+    city = await City.filter(cityName=location).first()
+    return city.cityCode if city else None
+
+
+async def increment_region_stat(location: str, diseaseName: str, timeStamp: datetime.datetime):
+    """新增一条检测日志后，对应的 城市 × 病害 × 周 计数加一"""
+    if not diseaseName or diseaseName in EXCLUDED_DISEASES:
+        return
+    cityCode = await get_city_code(location)
+    if cityCode is None:
+        return
+
+    week = week_start(timeStamp)
+    query = RegionDiseaseStat.filter(cityCode=cityCode, diseaseName=diseaseName, weekStart=week)
+    if await query.update(count=F('count') + 1):
+        return
+    try:
+        await RegionDiseaseStat.create(cityCode=cityCode, diseaseName=diseaseName, weekStart=week, count=1)
+    except IntegrityError:
+        # 并发请求已经创建了这一行，退回到原子自增
+        await query.update(count=F('count') + 1)
+
+
+async def rebuild_region_stats():
+    """根据全部历史日志重建区域病害汇总表"""
+    city_codes = {city.cityName: city.cityCode for city in await City.all()}
+    counter = defaultdict(int)
+    log_count = 0
+    last_id = None
+
+    # 按 logId 分批读取，避免一次性把所有日志加载到内存
+    while True:
+        query = Log.all().order_by('logId').limit(REBUILD_CHUNK_SIZE)
+        if last_id is not None:
+            query = query.filter(logId__gt=last_id)
+        rows = await query.values('logId', 'diseaseName', 'timeStamp', 'plotId__userId__location')
+        if not rows:
+            break
+        for row in rows:
+            log_count += 1
+            diseaseName = row['diseaseName']
+            cityCode = city_codes.get(row['plotId__userId__location'])
+            if not diseaseName or diseaseName in EXCLUDED_DISEASES or cityCode is None:
+                continue
+            counter[(cityCode, diseaseName, week_start(row['timeStamp']))] += 1
+        last_id = rows[-1]['logId']
+
+    async with in_transaction():
+        await RegionDiseaseStat.all().delete()
+        await RegionDiseaseStat.bulk_create([
+            RegionDiseaseStat(cityCode=cityCode, diseaseName=diseaseName, weekStart=week, count=count)
+            for (cityCode, diseaseName, week), count in counter.items()
+        ])
+
+    return {"log_count": log_count, "stat_count": len(counter)}
@@ -1,6 +1,5 @@
 from fastapi import Depends, HTTPException
 from datetime import datetime, timedelta
-from jose import jwt
 from database.redis_config import RedisConfig
 
 from core.config import SECRET_KEY, ALGORITHM, REFRESH_TOKEN_EXPIRE_DAYS, oauth2_scheme
@@ -12,6 +11,7 @@ def create_access_token(data: dict, expires_delta: timedelta = None):
     to_encode = data.copy()  # 创建一个可修改的副本
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=15))  # 设置过期时间
     to_encode.update({"exp": expire})  # 添加到期时间到令牌数据
+    from jose import jwt
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)  # 使用密钥和算法生成 JWT
 
 
@@ -19,10 +19,12 @@ def create_refresh_token(data: dict):
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
     to_encode.update({"exp": expire})
+    from jose import jwt
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
 def decode_token(token: str):
+    from jose import jwt
     return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
 
 
@@ -0,0 +1,164 @@
+import asyncio
+import heapq
+import itertools
+import math
+import os
+import threading
+import time
+from contextlib import asynccontextmanager
+
+from fastapi import HTTPException
+
+from database.redis_config import RedisConfig
+
+# 每个用户 / 每个地块的检测频率：每秒补充的令牌数与桶容量
+USER_RATE = float(os.getenv("DETECT_USER_RATE", 0.5))
+USER_BURST = int(os.getenv("DETECT_USER_BURST", 5))
+PLOT_RATE = float(os.getenv("DETECT_PLOT_RATE", 0.2))
+PLOT_BURST = int(os.getenv("DETECT_PLOT_BURST", 3))
+# 单个 worker 内同时进行的推理数量，以及允许排队等待的请求数
+MAX_INFERENCE = int(os.getenv("DETECT_MAX_INFERENCE", max(1, (os.cpu_count() or 2) // 2)))
+MAX_QUEUE = int(os.getenv("DETECT_MAX_QUEUE", 16))
+# 排队超过该时间仍未轮到则直接拒绝（秒）
+MAX_QUEUE_WAIT = float(os.getenv("DETECT_MAX_QUEUE_WAIT", 30))
+
+PRIORITY_PAID = 0
+PRIORITY_FREE = 1
+
+# 令牌桶：按时间差补充令牌，足够则扣除，否则返回还需等待的秒数
+TOKEN_BUCKET_LUA = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local data = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(data[1]) or capacity
+local ts = tonumber(data[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+local retry = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    retry = (1 - tokens) / rate
+end
+redis.call('HMSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring(retry)}
+"""
+
+
+def too_many_requests(message: str, retry_after: float):
+    return HTTPException(
+        status_code=429,
+        detail=message,
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+    )
+
+
+class TokenBucketLimiter:
+    """优先使用 Redis 令牌桶，多个 worker 共享额度；Redis 不可用时退回进程内计数"""
+
+    def __init__(self):
+        self._script = None
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def _redis_acquire(self, key: str, rate: float, capacity: int):
+        if self._script is None:
+            self._script = RedisConfig.get_client().register_script(TOKEN_BUCKET_LUA)
+        allowed, retry = self._script(keys=[key], args=[rate, capacity, time.time()])
+        return bool(int(allowed)), float(retry)
+
+    def _local_acquire(self, key: str, rate: float, capacity: int):
+        now = time.monotonic()
+        with self._lock:
+            tokens, ts = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - ts) * rate)
+            if tokens >= 1:
+                self._buckets[key] = (tokens - 1, now)
+                return True, 0.0
+            self._buckets[key] = (tokens, now)
+            return False, (1 - tokens) / rate
+
+    def acquire(self, key: str, rate: float, capacity: int):
+        try:
+            return self._redis_acquire(key, rate, capacity)
+        except Exception as e:
+            print(f"Redis 限流不可用，使用进程内限流: {str(e)}")
+            return self._local_acquire(key, rate, capacity)
+
+
+class PriorityGate:
+    """限制同时推理的数量，排队请求按优先级放行，队列已满时立即拒绝"""
+
+    def __init__(self, capacity: int, max_queue: int):
+        self.capacity = capacity
+        self.max_queue = max_queue
+        self.active = 0
+        self._waiters = []
+        self._counter = itertools.count()
+        self._avg_seconds = 1.0
+
+    def retry_after(self) -> float:
+        return self._avg_seconds * (len(self._waiters) + 1) / self.capacity
+
+    def _wake_next(self):
+        while self._waiters and self.active < self.capacity:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                self.active += 1
+                future.set_result(True)
+
+    @asynccontextmanager
+    async def slot(self, priority: int):
+        if self.active < self.capacity and not self._waiters:
+            self.active += 1
+        else:
+            if len(self._waiters) >= self.max_queue:
+                raise too_many_requests("检测请求过多，请稍后再试", self.retry_after())
+            future = asyncio.get_running_loop().create_future()
+            entry = (priority, next(self._counter), future)
+            heapq.heappush(self._waiters, entry)
+            try:
+                await asyncio.wait_for(asyncio.shield(future), MAX_QUEUE_WAIT)
+            except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+                if future.done():
+                    # 超时或客户端断开的同时恰好被放行，归还名额
+                    self.active -= 1
+                    self._wake_next()
+                else:
+                    future.cancel()
+                    self._waiters.remove(entry)
+                    heapq.heapify(self._waiters)
+                if isinstance(e, asyncio.CancelledError):
+                    raise
+                raise too_many_requests("检测排队超时，请稍后再试", self.retry_after())
+
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            # 用指数滑动平均估计单次推理耗时，用于计算 Retry-After
+            self._avg_seconds = 0.8 * self._avg_seconds + 0.2 * (time.monotonic() - start)
+            self.active -= 1
+            self._wake_next()
+
+
+limiter = TokenBucketLimiter()
+inference_gate = PriorityGate(MAX_INFERENCE, MAX_QUEUE)
+
+
+def check_detect_rate(userId: str, plotId: str):
+    """按用户和地块两级令牌桶检查检测频率，超限时抛出 429"""
+    allowed, retry = limiter.acquire(f"ratelimit:detect:user:{userId}", USER_RATE, USER_BURST)
+    if not allowed:
+        raise too_many_requests("检测过于频繁，请稍后再试", retry)
+    allowed, retry = limiter.acquire(f"ratelimit:detect:plot:{plotId}", PLOT_RATE, PLOT_BURST)
+    if not allowed:
+        raise too_many_requests("该地块检测过于频繁，请稍后再试", retry)
+
+
+def get_priority(user) -> int:
+    """仍有剩余检测次数（已购买套餐）的用户优先推理"""
+    return PRIORITY_PAID if user.sumCount > 0 else PRIORITY_FREE
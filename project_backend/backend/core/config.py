@@ -1,9 +1,14 @@
 import os
+from functools import lru_cache
 from typing import Set
-from passlib.context import CryptContext
 from fastapi.security import OAuth2PasswordBearer
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")  # bcrypt加密密码(不能解密)
+
+@lru_cache(maxsize=None)
+def get_pwd_context():
+    # bcrypt加密密码(不能解密)，首次登录/注册时才导入 passlib，缩短启动时间
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
 if os.getenv("SECRET_KEY"):
@@ -1,5 +1,5 @@
 from fastapi import Depends, HTTPException, status
-from jose import jwt, JWTError
+from jose import JWTError
 
 from core.config import SECRET_KEY, ALGORITHM, oauth2_scheme
 
@@ -18,6 +18,8 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
         if is_token_blacklisted(token):
             raise credentials_exception
 
+        # jose.jwt 会连带导入加密后端，用到时再导入以缩短启动时间
+        from jose import jwt
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         user_id: str = payload.get("sub")
         if user_id is None:
@@ -0,0 +1,60 @@
+import asyncio
+import time
+
+from starlette.concurrency import run_in_threadpool
+from tortoise import Tortoise
+
+from database.redis_config import RedisConfig
+from database.settings import TORTOISE_ORM
+import service.model_registry as registry
+
+_state = {"status": "pending", "phases": {}, "errors": {}}
+
+
+async def warm_database():
+    # 并发执行查询，让连接池提前建立到 maxsize 个连接
+    conn = Tortoise.get_connection("default")
+    size = TORTOISE_ORM['connections']['default']['credentials'].get('maxsize', 1)
+    await asyncio.gather(*[conn.execute_query("SELECT 1") for _ in range(size)])
+
+
+async def warm_redis():
+    await run_in_threadpool(RedisConfig.get_client().ping)
+
+
+async def warm_models():
+    if not await run_in_threadpool(registry.load_models) and not registry.is_ready():
+        raise RuntimeError(registry.get_state().get("error") or "模型加载失败")
+
+
+async def _timed(name: str, func):
+    start = time.perf_counter()
+    try:
+        await func()
+    except Exception as e:
+        _state["errors"][name] = str(e)
+        print(f"预热 {name} 失败: {str(e)}")
+    finally:
+        _state["phases"][name] = round(time.perf_counter() - start, 3)
+
+
+async def run():
+    """并行预热数据库连接池、Redis 连接池和检测模型，全部成功后才视为就绪"""
+    _state.update(status="warming", phases={}, errors={})
+    start = time.perf_counter()
+    await asyncio.gather(
+        _timed("database", warm_database),
+        _timed("redis", warm_redis),
+        _timed("models", warm_models),
+    )
+    _state["phases"]["total"] = round(time.perf_counter() - start, 3)
+    _state["status"] = "failed" if _state["errors"] else "ready"
+    print(f"启动预热完成: {_state}")
+
+
+def is_ready() -> bool:
+    return _state["status"] == "ready"
+
+
+def get_state():
+    return dict(_state)
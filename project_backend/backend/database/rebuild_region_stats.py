@@ -0,0 +1,26 @@
+import asyncio
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tortoise import Tortoise
+
+from database.settings import TORTOISE_ORM
+from controller.statsController import rebuild_region_stats
+
+
+async def main():
+    await Tortoise.init(config=TORTOISE_ORM)
+    await Tortoise.generate_schemas(safe=True)
+    try:
+        result = await rebuild_region_stats()
+        print(f"处理日志 {result['log_count']} 条，生成统计 {result['stat_count']} 行")
+    finally:
+        await Tortoise.close_connections()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
+
+# 离线重建区域病害汇总表: python database/rebuild_region_stats.py
@@ -34,3 +34,12 @@ TORTOISE_ORM = {
     'use_tz': False,
     'timezone': 'Asia/Shanghai',
 }
+
+# 本地压测 / 调试时可不依赖 PostgreSQL，设置 PGUARD_DB_SQLITE=数据库文件路径 即改用 SQLite
+if os.getenv('PGUARD_DB_SQLITE'):
+    TORTOISE_ORM['connections']['default'] = {
+        'engine': 'tortoise.backends.sqlite',
+        'credentials': {
+            'file_path': os.getenv('PGUARD_DB_SQLITE'),
+        }
+    }
@@ -0,0 +1,37 @@
+import multiprocessing
+import os
+
+# 生产环境启动: gunicorn -c gunicorn.conf.py main:app
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = "uvicorn.workers.UvicornWorker"
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 120))
+graceful_timeout = 30
+keepalive = 5
+
+# 在主进程中导入应用代码（不导入 torch），模型由各 worker 在 lifespan 预热中自行加载：
+# fork 前创建的 torch/OpenMP 线程池和 CUDA 状态在子进程中可能死锁
+preload_app = True
+
+# 每个 worker 的推理线程数，默认平分 CPU 核数，避免多个 worker 互相抢占
+TORCH_THREADS = int(os.getenv("TORCH_THREADS", max(1, multiprocessing.cpu_count() // workers)))
+
+
+def when_ready(server):
+    # 主进程只把权重文件读入系统页缓存，各 worker 加载模型时不必再从磁盘读取
+    from service.model_registry import MODEL_WEIGHTS
+    for weight in MODEL_WEIGHTS.values():
+        try:
+            with open(weight, "rb") as f:
+                while f.read(1 << 20):
+                    pass
+        except OSError as e:
+            server.log.warning(f"预读模型权重失败 {weight}: {str(e)}")
+
+
+def post_fork(server, worker):
+    try:
+        import torch
+        torch.set_num_threads(TORCH_THREADS)
+    except ImportError:
+        pass
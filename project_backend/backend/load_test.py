@@ -0,0 +1,149 @@
+"""
+检测接口压测脚本，对比不同 worker 数量下的吞吐量
+
+    python load_test.py --user test --password 123456 --plot 1 --workers 1,2,4,8
+
+指定 --workers 时脚本会依次以对应的 WEB_CONCURRENCY 启动 gunicorn，
+等待 /health/ready 通过后压测；不指定时直接压测 --url 上已经运行的服务。
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+
+import httpx
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SAMPLE_IMAGE = os.path.join(BASE_DIR, "test_data", "disease_sample.jpg")
+
+
+async def wait_ready(client: httpx.AsyncClient, timeout: float):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            response = await client.get("/health/ready")
+            if response.status_code == 200:
+                return response.json()
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(1)
+    raise TimeoutError(f"服务在 {timeout} 秒内未就绪")
+
+
+async def login(client: httpx.AsyncClient, userName: str, password: str):
+    response = await client.post("/user/signin", json={"userName": userName, "password": password})
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def run_load(url: str, args):
+    with open(SAMPLE_IMAGE, "rb") as f:
+        image = f.read()
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=url, timeout=args.timeout, limits=limits) as client:
+        await wait_ready(client, args.ready_timeout)
+        token = await login(client, args.user, args.password)
+        headers = {"Authorization": f"Bearer {token}"}
+        latencies = []
+        errors = 0
+        deadline = time.monotonic() + args.duration
+
+        async def worker():
+            nonlocal errors
+            while time.monotonic() < deadline:
+                # JPEG 结束标记之后追加随机字节，图片内容不变但能绕过检测缓存
+                payload = image if args.use_cache else image + uuid.uuid4().bytes
+                start = time.perf_counter()
+                try:
+                    response = await client.post(
+                        f"/plot/{args.plot}/detect",
+                        headers=headers,
+                        files={"file": ("sample.jpg", payload, "image/jpeg")}
+                    )
+                    if response.status_code != 200:
+                        errors += 1
+                        continue
+                except httpx.HTTPError:
+                    errors += 1
+                    continue
+                latencies.append(time.perf_counter() - start)
+
+        start = time.monotonic()
+        await asyncio.gather(*[worker() for _ in range(args.concurrency)])
+        elapsed = time.monotonic() - start
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput": len(latencies) / elapsed if elapsed else 0,
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else None,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000 if latencies else None,
+    }
+
+
+def start_server(workers: int, port: int):
+    env = dict(os.environ, WEB_CONCURRENCY=str(workers), BIND=f"127.0.0.1:{port}")
+    return subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "main:app"],
+        cwd=BASE_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+
+
+def print_report(rows):
+    print(f"{'workers':>8} {'请求数':>8} {'错误':>6} {'吞吐(req/s)':>12} {'p50(ms)':>10} {'p95(ms)':>10} {'扩展效率':>8}")
+    base = None
+    for workers, result in rows:
+        per_worker = result["throughput"] / workers if workers else 0
+        if base is None:
+            base = per_worker
+        efficiency = f"{per_worker / base:.0%}" if base else "-"
+        p50 = f"{result['p50_ms']:.1f}" if result["p50_ms"] is not None else "-"
+        p95 = f"{result['p95_ms']:.1f}" if result["p95_ms"] is not None else "-"
+        print(f"{workers:>8} {result['requests']:>8} {result['errors']:>6} "
+              f"{result['throughput']:>12.2f} {p50:>10} {p95:>10} {efficiency:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PGuard 检测接口压测")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="已运行服务的地址")
+    parser.add_argument("--workers", default="", help="逗号分隔的 worker 数量，如 1,2,4")
+    parser.add_argument("--port", type=int, default=8100, help="自动启动服务时使用的端口")
+    parser.add_argument("--user", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--plot", required=True, help="属于该用户的地块 ID")
+    parser.add_argument("--duration", type=float, default=30, help="每轮压测时长（秒）")
+    parser.add_argument("--concurrency", type=int, default=0, help="并发请求数，默认 worker 数的 2 倍")
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--ready-timeout", type=float, default=300)
+    parser.add_argument("--use-cache", action="store_true", help="重复发送同一张图片，测试缓存命中的吞吐")
+    args = parser.parse_args()
+
+    rows = []
+    if not args.workers:
+        args.concurrency = args.concurrency or 8
+        rows.append((1, asyncio.run(run_load(args.url, args))))
+    else:
+        concurrency = args.concurrency
+        for workers in [int(w) for w in args.workers.split(",")]:
+            args.concurrency = concurrency or workers * 2
+            server = start_server(workers, args.port)
+            try:
+                rows.append((workers, asyncio.run(run_load(f"http://127.0.0.1:{args.port}", args))))
+            finally:
+                server.terminate()
+                server.wait()
+            print(f"workers={workers} 完成")
+    print_report(rows)
+
+
+if __name__ == "__main__":
+    main()
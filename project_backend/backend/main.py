@@ -1,7 +1,10 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 import uvicorn
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
-from tortoise.contrib.fastapi import register_tortoise
+from tortoise.contrib.fastapi import RegisterTortoise
 from database.settings import TORTOISE_ORM
 from fastapi.middleware.cors import CORSMiddleware
 from core.config import RESOURCE_PATH
@@ -11,11 +14,25 @@ from routers.user import user_api
 from routers.plot import plot_api
 from routers.detect import detect_api
 from routers.log import log_api
+from routers.stats import stats_api
+from routers.health import health_api
+import core.warmup as warmup
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    async with RegisterTortoise(app, config=TORTOISE_ORM, generate_schemas=True):
+        # 预热在后台进行，服务先开始监听，/health/ready 在预热完成前返回 503
+        warm_task = asyncio.create_task(warmup.run())
+        yield
+        warm_task.cancel()
+
 
 app = FastAPI(
     title="PGuard API",
     description="PGuard 系统的 API 文档",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # 挂载静态文件目录
@@ -26,6 +43,8 @@ app.include_router(user_api, prefix="/user", tags=["UserService"])
 app.include_router(plot_api, prefix="/plot", tags=["PlotService"])
 app.include_router(detect_api, tags=["DetectService"])
 app.include_router(log_api, prefix="/log", tags=["LogService"])
+app.include_router(stats_api, prefix="/stats", tags=["StatsService"])
+app.include_router(health_api, prefix="/health", tags=["HealthService"])
 
 app.add_middleware(
     CORSMiddleware,
@@ -34,11 +53,7 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
-register_tortoise(
-    app=app,
-    config=TORTOISE_ORM,
-    generate_schemas=True,
-)
+
 
 if __name__ == '__main__':
     uvicorn.run(
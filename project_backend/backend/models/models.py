@@ -52,3 +52,15 @@ class Disease(Model):
 class City(Model):
     cityCode = fields.CharField(primary_key=True, max_length=10)
     cityName = fields.CharField(max_length=40, unique=True)
+
+
+class RegionDiseaseStat(Model):
+    """城市 × 病害 × 周 的检测次数汇总表，由 set_log 增量维护"""
+    statId = fields.IntField(primary_key=True)
+    cityCode = fields.CharField(max_length=10, index=True)
+    diseaseName = fields.CharField(max_length=40)
+    weekStart = fields.DateField()  # 该周周一的日期
+    count = fields.IntField(default=0)
+
+    class Meta:
+        unique_together = (("cityCode", "diseaseName", "weekStart"),)
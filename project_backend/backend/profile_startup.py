@@ -0,0 +1,108 @@
+"""
+启动耗时分析与冷启动预算检查
+
+    python profile_startup.py --budget 2.0 --top 15
+
+以 python -X importtime 在新进程中导入 main，按阶段汇总各模块的导入耗时，
+并检查冷启动时间是否超出预算、启动时是否提前导入了应延迟加载的重型模块。
+超出预算或违反延迟导入约束时以非零状态码退出，可直接作为 CI 检查步骤。
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 顶层包到启动阶段的映射
+PHASES = {
+    "框架": {"fastapi", "starlette", "pydantic", "pydantic_core", "anyio", "uvicorn", "multipart", "typing_extensions"},
+    "ORM": {"tortoise", "pypika", "asyncpg", "aerich", "iso8601"},
+    "认证": {"passlib", "jose", "bcrypt", "cryptography", "ecdsa", "rsa"},
+    "缓存": {"redis"},
+    "模型": {"torch", "torchvision", "ultralytics", "numpy", "cv2", "PIL"},
+    "应用": {"main", "routers", "service", "controller", "core", "models", "schemas", "database"},
+}
+# 这些模块应在首次使用或预热时才导入，不应出现在 import main 的过程中
+LAZY_MODULES = ["torch", "ultralytics", "passlib.context", "jose.jwt"]
+
+
+def run_importtime():
+    env = dict(os.environ)
+    env.setdefault("SECRET_KEY", "profile-startup")
+    start = time.perf_counter()
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=BASE_DIR,
+        env=env,
+        capture_output=True,
+        text=True
+    )
+    wall = time.perf_counter() - start
+    if process.returncode != 0:
+        print(process.stderr[-2000:])
+        raise SystemExit("导入 main 失败")
+    return wall, parse_importtime(process.stderr)
+
+
+def parse_importtime(output: str):
+    """解析 importtime 输出，返回 [(模块名, 自身耗时us, 累计耗时us)]"""
+    records = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        records.append((parts[2].strip(), int(parts[0]), int(parts[1])))
+    return records
+
+
+def summarize(records):
+    phase_time = defaultdict(int)
+    for name, self_us, _ in records:
+        top = name.split(".")[0]
+        phase = next((phase for phase, packages in PHASES.items() if top in packages), "其他")
+        phase_time[phase] += self_us
+    return phase_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PGuard 启动耗时分析")
+    parser.add_argument("--budget", type=float, default=float(os.getenv("STARTUP_BUDGET", 3.0)),
+                        help="冷启动（新进程 import main）时间预算，单位秒")
+    parser.add_argument("--runs", type=int, default=3, help="重复测量次数，取最小值")
+    parser.add_argument("--top", type=int, default=15, help="列出累计耗时最高的模块数量")
+    args = parser.parse_args()
+
+    runs = [run_importtime() for _ in range(args.runs)]
+    wall, records = min(runs, key=lambda run: run[0])
+
+    print("各阶段导入耗时(自身耗时之和):")
+    phase_time = summarize(records)
+    for phase, us in sorted(phase_time.items(), key=lambda item: -item[1]):
+        print(f"  {phase:<6} {us / 1000:>9.1f} ms")
+
+    print(f"\n累计耗时最高的 {args.top} 个模块:")
+    for name, _, cumulative_us in sorted(records, key=lambda r: -r[2])[:args.top]:
+        print(f"  {cumulative_us / 1000:>9.1f} ms  {name}")
+
+    failed = False
+    imported = {name for name, _, _ in records}
+    eager = [module for module in LAZY_MODULES if module in imported]
+    if eager:
+        failed = True
+        print(f"\n[失败] 以下模块应延迟导入，却在启动时被导入: {', '.join(eager)}")
+
+    print(f"\n冷启动耗时: {wall:.3f} s (预算 {args.budget:.3f} s, 共测量 {args.runs} 次取最小值)")
+    if wall > args.budget:
+        failed = True
+        print("[失败] 冷启动耗时超出预算")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,7 @@ from fastapi import APIRouter, HTTPException, Query
 from models.models import Package, Plant, City, Disease
 from typing import List
 from schemas.Map import PLANT_NAME_MAP
+from controller.statsController import rebuild_region_stats
 
 admin = APIRouter()
 
@@ -261,4 +262,17 @@ async def add_disease(
     except HTTPException:
         raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail={"message": f"添加病害失败: {str(e)}"})
\ No newline at end of file
+        raise HTTPException(status_code=500, detail={"message": f"添加病害失败: {str(e)}"})
+
+
+@admin.post('/stats/rebuild')
+async def rebuild_stats():
+    """根据历史日志重建区域病害汇总表"""
+    try:
+        result = await rebuild_region_stats()
+        return {
+            "message": f"区域病害统计重建完成，共处理 {result['log_count']} 条日志",
+            **result
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail={"message": f"重建区域病害统计失败: {str(e)}"})
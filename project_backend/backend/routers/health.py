@@ -0,0 +1,27 @@
+from fastapi import APIRouter, HTTPException
+from starlette.concurrency import run_in_threadpool
+
+from database.redis_config import RedisConfig
+import core.warmup as warmup
+import service.model_registry as registry
+
+health_api = APIRouter()
+
+
+@health_api.get('/live')
+async def live():
+    """进程存活即返回，用于存活探针"""
+    return {"status": "alive"}
+
+
+@health_api.get('/ready')
+async def ready():
+    """启动预热（数据库、Redis、模型）完成且 Redis 可用时才返回 200，用于就绪探针"""
+    state = {"warmup": warmup.get_state(), "models": registry.get_state()}
+    if not warmup.is_ready():
+        raise HTTPException(status_code=503, detail={"message": "服务预热尚未完成", **state})
+    try:
+        await run_in_threadpool(RedisConfig.get_client().ping)
+    except Exception as e:
+        raise HTTPException(status_code=503, detail={"message": f"Redis 不可用: {str(e)}", **state})
+    return {"status": "ready", **state}
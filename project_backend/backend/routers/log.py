@@ -1,10 +1,13 @@
-from fastapi import APIRouter, Depends
+import datetime
+from typing import Optional
+from fastapi import APIRouter, Depends, Query
 
 from core.dependency import get_current_user
 
 from models.models import User
 
 import service.log as lo
+import service.export as ex
 
 log_api = APIRouter()
 
@@ -12,3 +15,13 @@ log_api = APIRouter()
 @log_api.get('/summary')
 async def get_summary(user: User = Depends(get_current_user)):
     return await lo.get_summary(user)
+
+
+@log_api.get('/export')
+async def export_user_logs(
+    format: str = Query("csv", pattern="^(csv|parquet)$"),
+    start: Optional[datetime.date] = None,
+    end: Optional[datetime.date] = None,
+    user: User = Depends(get_current_user)
+):
+    return await ex.export_user_logs(user, format, start, end)
@@ -1,5 +1,6 @@
-from fastapi import APIRouter, Depends, Body
-from typing import List
+import datetime
+from fastapi import APIRouter, Depends, Body, Query
+from typing import List, Optional
 
 from core.dependency import get_current_user
 
@@ -8,6 +9,7 @@ from models.models import User
 
 import service.plot as p
 import service.plant as pl
+import service.export as ex
 
 
 plot_api = APIRouter()
@@ -37,6 +39,17 @@ async def get_plot_detail(plotId: str, user: User = Depends(get_current_user)):
     return await p.get_plot_detail(plotId, user)
 
 
+@plot_api.get("/{plotId}/logs/export")
+async def export_plot_logs(
+    plotId: str,
+    format: str = Query("csv", pattern="^(csv|parquet)$"),
+    start: Optional[datetime.date] = None,
+    end: Optional[datetime.date] = None,
+    user: User = Depends(get_current_user)
+):
+    return await ex.export_plot_logs(plotId, user, format, start, end)
+
+
 @plot_api.patch("/{plotId}")
 async def update_plot_name(
     plotId: str,
@@ -0,0 +1,18 @@
+from fastapi import APIRouter, Depends, Query
+
+from core.dependency import get_current_user
+
+from models.models import User
+
+import service.stats as st
+
+stats_api = APIRouter()
+
+
+@stats_api.get('/region/{cityCode}')
+async def get_region_stats(
+        cityCode: str,
+        weeks: int = Query(12, ge=1, le=104),
+        user: User = Depends(get_current_user)
+):
+    return await st.get_region_stats(cityCode, weeks)
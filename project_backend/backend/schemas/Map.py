@@ -20,3 +20,18 @@ DISEASE_NAME_RMAP = {
     "马铃薯早疫病": "Potato_Early_Blight",
     "马铃薯晚疫病": "Potato_Late_Blight"
 }
+
+# 与 yolov8/*_defect.py 中保持一致的模型类别索引
+MODEL_CLASS_LABELS = {
+    "Grape": {
+        0: "Grape_Black_Rot",
+        1: "Grape_Black_Measles",
+        2: "Grape_Leaf_Light",
+        3: "Grape_Health"
+    },
+    "Potato": {
+        0: "Potato_Early_Blight",
+        1: "Potato_Late_Blight",
+        2: "Potato_Health",
+    }
+}
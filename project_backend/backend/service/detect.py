@@ -1,17 +1,48 @@
+import hashlib
+import json
 import os
 import subprocess
 import uuid
 
 from fastapi import HTTPException, UploadFile, Depends
+from starlette.concurrency import run_in_threadpool
 from core.config import ULTRALYTICS_PATH, UPLOAD_PATH
 from core.dependency import get_current_user
+from core.admission import check_detect_rate, get_priority, inference_gate
+from database.redis_config import RedisConfig
 
 from models.models import Disease, User
 from controller.detectController import validate_plot_access, call_set_log
 from schemas.Map import PLANT_NAME_MAP, DISEASE_NAME_MAP
+import service.model_registry as registry
+
+# 相同图片的检测结果缓存时间（秒），多个 worker 通过 Redis 共享
+DETECT_CACHE_TTL = int(os.getenv("DETECT_CACHE_TTL", 24 * 3600))
+
+
+def get_cached_result(model_type: str, digest: str):
+    try:
+        cached = RedisConfig.get_client().get(f"detect:{model_type}:{digest}")
+        return json.loads(cached) if cached else None
+    except Exception as e:
+        print(f"读取检测缓存失败: {str(e)}")
+        return None
+
+
+def set_cached_result(model_type: str, digest: str, result: dict):
+    try:
+        RedisConfig.get_client().setex(f"detect:{model_type}:{digest}", DETECT_CACHE_TTL, json.dumps(result))
+    except Exception as e:
+        print(f"写入检测缓存失败: {str(e)}")
 
 
 def detect(model_type: str, image_path: str):
+    # 模型已常驻内存时直接推理，否则退回到子进程脚本
+    if registry.is_loaded(model_type):
+        detection_result = registry.predict(model_type, image_path)
+        print(detection_result)
+        return detection_result
+
     if model_type == "Grape":
         python_script = os.path.join(ULTRALYTICS_PATH, "Grape_defect.py")
     elif model_type == "Potato":
@@ -63,6 +94,8 @@ async def do_detect(
 ):
     try:
         plot = await validate_plot_access(plotId, user)
+        # 限流脚本是同步的 Redis 调用，放到线程池中执行
+        await run_in_threadpool(check_detect_rate, str(user.userId), str(plot.plotId))
 
         # 获取植物类型并验证
         plant_name = PLANT_NAME_MAP.get(plot.plantId.plantName)
@@ -82,8 +115,20 @@ async def do_detect(
             content = await file.read()
             buffer.write(content)
 
-        # 调用检测函数
-        results = detect(plant_name, save_path)
+        # 相同图片直接复用缓存结果，否则在线程池中推理；同步的 Redis 调用和推理都不在事件循环中执行
+        digest = hashlib.sha256(content).hexdigest()
+        results = await run_in_threadpool(get_cached_result, plant_name, digest)
+        if results is None:
+            try:
+                async with inference_gate.slot(get_priority(user)):
+                    results = await run_in_threadpool(detect, plant_name, save_path)
+            except HTTPException:
+                # 被准入控制拒绝时不保留已上传的图片
+                os.remove(save_path)
+                raise
+            if not results:
+                raise HTTPException(status_code=422, detail="未能识别图片中的叶片")
+            await run_in_threadpool(set_cached_result, plant_name, digest, results)
         name = DISEASE_NAME_MAP.get(results.get('disease'))
         advice = await get_advice(results.get('disease'))
         percent = results.get('confidence', 0)
@@ -0,0 +1,132 @@
+import csv
+import datetime
+import io
+import uuid
+from typing import List, Optional
+from urllib.parse import quote
+
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+
+from controller.logController import iter_log_chunks
+from models.models import Plot, User
+
+EXPORT_COLUMNS = ["logId", "plotId", "plotName", "timeStamp", "diseaseName", "content", "imagesURL"]
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+def to_record(row: dict):
+    return [
+        str(row['logId']),
+        str(row['plotId_id']),
+        row['plotId__plotName'],
+        row['timeStamp'].strftime("%Y-%m-%d %H:%M:%S"),
+        row['diseaseName'],
+        row['content'],
+        row['imagesURL'],
+    ]
+
+
+async def stream_csv(chunks):
+    # 带 BOM，便于 Excel 正确识别中文
+    yield "\ufeff".encode("utf-8")
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    async for rows in chunks:
+        writer.writerows(to_record(row) for row in rows)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+class ChunkSink(io.RawIOBase):
+    """供 ParquetWriter 写入的输出端，写入的数据随时取走，tell() 仍返回累计偏移"""
+
+    def __init__(self):
+        self._parts = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._parts.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def pop(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts = []
+        return data
+
+
+async def stream_parquet(chunks, pa, pq):
+    schema = pa.schema([(column, pa.string()) for column in EXPORT_COLUMNS])
+    sink = ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression="snappy")
+    try:
+        # 每批日志写成一个 row group，写完立即把字节发给客户端
+        async for rows in chunks:
+            columns = list(zip(*(to_record(row) for row in rows)))
+            writer.write_table(pa.Table.from_arrays([pa.array(col, pa.string()) for col in columns], schema=schema))
+            yield sink.pop()
+    finally:
+        writer.close()
+    yield sink.pop()
+
+
+def import_pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        return pa, pq
+    except ImportError:
+        raise HTTPException(status_code=400, detail="服务器未安装 pyarrow，暂不支持导出 parquet，请使用 csv 格式")
+
+
+def build_response(plotIds: List[uuid.UUID], format: str, filename: str,
+                   start: Optional[datetime.date], end: Optional[datetime.date]):
+    if start and end and start > end:
+        raise HTTPException(status_code=400, detail="开始日期不能晚于结束日期")
+
+    chunks = iter_log_chunks(plotIds, start, end)
+    if format == "parquet":
+        pa, pq = import_pyarrow()
+        body = stream_parquet(chunks, pa, pq)
+    else:
+        body = stream_csv(chunks)
+
+    filename = f"{filename}.{format}"
+    return StreamingResponse(
+        body,
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f"attachment; filename*=UTF-8''{quote(filename)}"}
+    )
+
+
+async def export_plot_logs(plotId: str, user: User, format: str = "csv",
+                           start: Optional[datetime.date] = None, end: Optional[datetime.date] = None):
+    """导出单个地块的检测日志"""
+    try:
+        plot = await Plot.filter(plotId=uuid.UUID(plotId), userId=user.userId).first()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="无效的地块ID")
+    if not plot:
+        raise HTTPException(status_code=404, detail="未找到地块或无权访问")
+    return build_response([plot.plotId], format, f"{plot.plotName}_logs", start, end)
+
+
+async def export_user_logs(user: User, format: str = "csv",
+                           start: Optional[datetime.date] = None, end: Optional[datetime.date] = None):
+    """导出当前用户所有地块的检测日志"""
+    plotIds = await Plot.filter(userId=user.userId).values_list('plotId', flat=True)
+    return build_response(list(plotIds), format, f"{user.userName}_logs", start, end)
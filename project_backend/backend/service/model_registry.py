@@ -0,0 +1,79 @@
+import os
+import threading
+import time
+
+from core.config import ULTRALYTICS_PATH
+from schemas.Map import MODEL_CLASS_LABELS
+
+# 各作物对应的模型权重文件
+MODEL_WEIGHTS = {
+    "Grape": os.path.join(ULTRALYTICS_PATH, "Grape.pt"),
+    "Potato": os.path.join(ULTRALYTICS_PATH, "Potato.pt"),
+}
+
+# 设为 0 时不在进程内加载模型，检测退回到子进程脚本
+INPROCESS_MODELS = os.getenv("PGUARD_INPROCESS_MODELS", "1") != "0"
+
+_models = {}
+_locks = {name: threading.Lock() for name in MODEL_WEIGHTS}
+_load_lock = threading.Lock()
+_state = {"status": "pending", "error": None, "load_seconds": None}
+
+
+def load_models():
+    """加载全部模型并各预测一次完成预热，重复调用时直接返回"""
+    with _load_lock:
+        if _state["status"] == "ready":
+            return True
+        if not INPROCESS_MODELS:
+            _state["status"] = "disabled"
+            return False
+
+        _state["status"] = "loading"
+        start = time.perf_counter()
+        try:
+            # ultralytics 会连带导入 torch，只在真正需要时导入
+            from ultralytics import YOLO
+            import numpy as np
+
+            for model_type, weight in MODEL_WEIGHTS.items():
+                model = YOLO(weight)
+                model.predict(np.zeros((64, 64, 3), dtype=np.uint8), verbose=False)
+                _models[model_type] = model
+        except Exception as e:
+            _models.clear()
+            _state.update(status="failed", error=str(e))
+            print(f"模型加载失败，检测将使用子进程方式: {str(e)}")
+            return False
+
+        _state.update(status="ready", error=None, load_seconds=round(time.perf_counter() - start, 3))
+        print(f"模型加载完成，耗时 {_state['load_seconds']} 秒")
+        return True
+
+
+def is_loaded(model_type: str) -> bool:
+    return model_type in _models
+
+
+def is_ready() -> bool:
+    """模型已预热，或显式关闭了进程内推理时视为就绪"""
+    return _state["status"] in ("ready", "disabled")
+
+
+def get_state():
+    return dict(_state, models=sorted(_models))
+
+
+def predict(model_type: str, image_path: str):
+    """使用常驻模型检测，返回格式与子进程脚本解析结果一致"""
+    model = _models[model_type]
+    # 同一个模型对象不保证线程安全，按模型加锁
+    with _locks[model_type]:
+        results = model.predict(image_path, verbose=False)
+
+    boxes = results[0].boxes
+    if boxes is None or len(boxes) == 0:
+        return None
+    cls = int(boxes.cls[0].item())
+    conf = round(float(boxes.conf[0].item()), 2)
+    return {"disease": MODEL_CLASS_LABELS[model_type].get(cls), "confidence": conf}
@@ -0,0 +1,43 @@
+import datetime
+from collections import defaultdict
+from fastapi import HTTPException
+
+from controller.statsController import week_start
+from models.models import City, RegionDiseaseStat
+
+
+async def get_region_stats(cityCode: str, weeks: int = 12):
+    """从区域汇总表读取某城市最近若干周的病害检测次数"""
+    try:
+        city = await City.filter(cityCode=cityCode).first()
+        if not city:
+            raise HTTPException(status_code=404, detail="未找到该城市")
+
+        first_week = week_start(datetime.date.today()) - datetime.timedelta(weeks=weeks - 1)
+        week_list = [first_week + datetime.timedelta(weeks=i) for i in range(weeks)]
+        week_index = {week: i for i, week in enumerate(week_list)}
+
+        rows = await RegionDiseaseStat.filter(
+            cityCode=cityCode,
+            weekStart__gte=first_week
+        ).values('diseaseName', 'weekStart', 'count')
+
+        weekly_disease_count = defaultdict(lambda: [0] * weeks)
+        for row in rows:
+            index = week_index.get(row['weekStart'])
+            if index is not None:
+                weekly_disease_count[row['diseaseName']][index] += row['count']
+
+        disease_count = {name: sum(counts) for name, counts in weekly_disease_count.items()}
+        return {
+            "cityCode": city.cityCode,
+            "cityName": city.cityName,
+            "weeks": [week.strftime("%Y-%m-%d") for week in week_list],
+            "weekly_disease_count": dict(weekly_disease_count),
+            "disease_count": disease_count,
+            "total_count": sum(disease_count.values())
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"获取区域病害统计失败: {str(e)}")
@@ -1,9 +1,9 @@
 from datetime import datetime, timedelta
 from fastapi import HTTPException, Depends, Body
-from jose import jwt, JWTError
+from jose import JWTError
 
 from database.redis_config import RedisConfig
-from core.config import pwd_context, SECRET_KEY, ALGORITHM, REFRESH_TOKEN_EXPIRE_DAYS, oauth2_scheme
+from core.config import get_pwd_context, SECRET_KEY, ALGORITHM, REFRESH_TOKEN_EXPIRE_DAYS, oauth2_scheme
 from core.dependency import get_current_user
 
 from schemas.form import SignUpForm, SignInForm
@@ -12,17 +12,18 @@ from controller.weatherController import validate_location
 
 
 def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
 
 
 def get_password_hash(password):
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
 
 
 def create_access_token(data: dict, expires_delta: timedelta = None):
     to_encode = data.copy()  # 创建一个可修改的副本
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=15))  # 设置过期时间
     to_encode.update({"exp": expire})  # 添加到期时间到令牌数据
+    from jose import jwt
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)  # 使用密钥和算法生成 JWT
 
 
@@ -30,10 +31,12 @@ def create_refresh_token(data: dict):
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
     to_encode.update({"exp": expire})
+    from jose import jwt
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
 def decode_token(token: str):
+    from jose import jwt
     return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
 
 